@@ -1,5 +1,5 @@
-import google.generativeai as genai
 from app.core.config import settings
+from app.core.metrics import track_external_call, AI_RETRIES, AI_FALLBACKS
 import logging
 import asyncio
 import random
@@ -7,19 +7,71 @@ from collections import Counter
 
 logger = logging.getLogger(__name__)
 
+# 주간/월간 캡슐 프롬프트에서 날짜별 하루 요약에 쓸 최대 토큰 수 (한 달 30일치 요약이 들어와도 고정 비용)
+PERIOD_PROMPT_TOKEN_BUDGET = 1500
+# 줄 하나를 이보다 짧게 자르면 의미가 없으므로, 대신 일부 날짜를 고르게 건너뜀
+MIN_TOKENS_PER_LINE = 24
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 쓰는 보수적 추정 — UTF-8 3바이트당 1토큰 (한글은 글자당 1토큰, 영문은 3글자당 1토큰)
+    Why: SDK의 count_tokens는 API 왕복이라 프롬프트 조립 단계에서 쓰기엔 비쌈
+    """
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoded = text.encode("utf-8")
+    if len(encoded) // 3 + 1 <= max_tokens:
+        return text
+    return encoded[: max(max_tokens - 2, 0) * 3].decode("utf-8", errors="ignore").rstrip() + "…"
+
+
+def fit_to_token_budget(lines: list[str], budget: int) -> list[str]:
+    """
+    줄 목록을 전체 추정 토큰이 budget 이하가 되도록 줄입니다. (순서 유지)
+    먼저 날짜를 고르게 솎아 줄 수를 budget / MIN_TOKENS_PER_LINE 이하로 맞추고, 그래도 넘치면 긴 줄만 잘라냄
+    """
+    if sum(estimate_tokens(line) for line in lines) <= budget:
+        return lines
+    max_lines = max(budget // MIN_TOKENS_PER_LINE, 1)
+    if len(lines) > max_lines:
+        step = len(lines) / max_lines
+        lines = [lines[int(i * step)] for i in range(max_lines)]
+    # 짧은 줄이 남긴 몫은 긴 줄들이 나눠 씀 (water-filling)
+    remaining, result = budget, {}
+    for index in sorted(range(len(lines)), key=lambda i: estimate_tokens(lines[i])):
+        share = remaining // (len(lines) - len(result))
+        result[index] = _truncate_to_tokens(lines[index], share)
+        remaining -= estimate_tokens(result[index])
+    return [result[i] for i in range(len(lines))]
+
 
 class AICapsuleClient:
     """Gemini API를 통해 하루의 청취 기록을 감성적인 한 줄 요약으로 변환하는 AI 클라이언트."""
 
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
+        # Why: google.generativeai import만 ~0.7초라 콜드 스타트에서 제외하고, 첫 캡슐 생성 시 _get_model()에서 생성
+        self.model = None
+        if not self.api_key:
+            logger.warning("GEMINI_API_KEY is not set. AI Capsule features will not work.")
+
+    def _get_model(self):
+        if self.model is None and self.api_key:
+            import google.generativeai as genai
+            if settings.GEMINI_API_ENDPOINT:
+                # 가짜 서버/프록시로 보낼 때 — gRPC 대신 REST로 지정한 호스트에 요청
+                genai.configure(
+                    api_key=self.api_key, transport="rest",
+                    client_options={"api_endpoint": settings.GEMINI_API_ENDPOINT},
+                )
+            else:
+                genai.configure(api_key=self.api_key)
             # gemini-2.0-flash-lite: 무료 티어 분당 30회 허용 (비용 최적화)
             self.model = genai.GenerativeModel('gemini-2.0-flash-lite')
-        else:
-            self.model = None
-            logger.warning("GEMINI_API_KEY is not set. AI Capsule features will not work.")
+        return self.model
 
     # ──────────────────────────────────────────────
     # Private: 트랙 컨텍스트에서 최빈 아티스트를 추출하는 유틸리티
@@ -111,7 +163,12 @@ class AICapsuleClient:
         감성적인 1~2문장 요약을 생성합니다.
         API 실패 시에는 실제 청취 데이터를 기반으로 동적 폴백 문구를 반환합니다.
         """
-        if not self.model:
+        # 첫 호출의 SDK import는 이벤트 루프를 막지 않도록 스레드에서 수행
+        if self.model is None and self.api_key:
+            await asyncio.to_thread(self._get_model)
+        model = self.model
+        if not model:
+            AI_FALLBACKS.labels("no_api_key").inc()
             return "AI 요약 기능이 설정되지 않았습니다. (API KEY 누락)"
 
         if not tracks_context:
@@ -153,13 +210,134 @@ class AICapsuleClient:
 - 마침표로 끝나는 부드러운 평어체 존댓말.
 - 요약 문장만 반환."""
 
-        # 최대 3회 시도 (ResourceExhausted 등 일시적 에러 대비)
+        return await self._generate_with_retry(
+            model, prompt, lambda: self._build_context_aware_fallback(tracks_context, majority_weather)
+        )
+
+    # ──────────────────────────────────────────────
+    # Public: 연말 결산 내러티브 생성 (연말 결산 배치용)
+    # ──────────────────────────────────────────────
+    async def generate_year_summary(
+        self,
+        year: int,
+        total_plays: int,
+        top_artists: list[str],
+        top_tracks: list[str],
+        top_genres: list[str] | None = None,
+        themes: list[str] | None = None,
+        majority_weather: str | None = None,
+    ) -> str:
+        """
+        한 해의 Top 아티스트/트랙/장르와 Daily Capsule 테마 분포를 바탕으로 2~3문장 회고를 생성합니다.
+        API 실패 시에는 Top 아티스트와 재생 수로 조립한 폴백 문구를 반환합니다.
+        """
+        if self.model is None and self.api_key:
+            await asyncio.to_thread(self._get_model)
+        model = self.model
+        if not model:
+            AI_FALLBACKS.labels("no_api_key").inc()
+            return self._build_year_fallback(year, total_plays, top_artists)
+
+        artist_str = ", ".join(top_artists[:5])
+        track_str = "\n".join(f"- {t}" for t in top_tracks[:10])
+        genre_str = f"자주 들은 장르: {', '.join(top_genres[:5])}" if top_genres else ""
+        theme_str = f"하루 캡슐의 분위기 분포(많은 순): {', '.join(themes)}" if themes else ""
+        weather_str = f"가장 많이 음악을 들은 날씨: {majority_weather}" if majority_weather else ""
+
+        prompt = f"""당신은 감성적인 '음악 다이어리 큐레이터'입니다.
+사용자가 {year}년 한 해 동안 들은 음악 기록을 바탕으로, 그 해를 돌아보는 따뜻한 회고를 2~3문장으로 써주세요.
+
+총 재생 수: {total_plays}곡
+가장 많이 들은 아티스트: {artist_str}
+{genre_str}
+{theme_str}
+{weather_str}
+가장 많이 들은 곡:
+{track_str}
+
+지침:
+- 곡명이나 아티스트명은 최대 1개까지만 자연스럽게 언급하세요.
+- 장르와 분위기 분포로 한 해의 감정적 흐름(위로/설렘/그리움 등)을 추론하세요.
+- 가상의 곡을 지어내지 말 것.
+- 마침표로 끝나는 부드러운 평어체 존댓말.
+- 회고 문장만 반환."""
+
+        return await self._generate_with_retry(
+            model, prompt, lambda: self._build_year_fallback(year, total_plays, top_artists)
+        )
+
+    # ──────────────────────────────────────────────
+    # Public: 주간/월간 캡슐 생성 (기간 내 Daily Capsule 요약을 한 번의 호출로 묶음)
+    # ──────────────────────────────────────────────
+    async def generate_period_summary(
+        self,
+        period_label: str,
+        daily_summaries: list[tuple[str, str]],
+        top_artists: list[str],
+        top_tracks: list[str],
+        total_plays: int,
+        majority_weather: str | None = None,
+    ) -> str:
+        """
+        기간(예: "2026년 10월", "10월 13일~19일 한 주")의 Daily Capsule 요약과 청취 집계를 바탕으로
+        2~3문장 회고를 생성합니다. 하루 요약들은 PERIOD_PROMPT_TOKEN_BUDGET 안에 들어가도록 줄여서 넣습니다.
+        """
+        if self.model is None and self.api_key:
+            await asyncio.to_thread(self._get_model)
+        model = self.model
+        if not model:
+            AI_FALLBACKS.labels("no_api_key").inc()
+            return self._build_period_fallback(period_label, total_plays, top_artists)
+
+        daily_lines = fit_to_token_budget(
+            [f"- {day}: {summary}" for day, summary in daily_summaries], PERIOD_PROMPT_TOKEN_BUDGET
+        )
+        daily_str = "날짜별 하루 요약:\n" + "\n".join(daily_lines) if daily_lines else ""
+        track_str = "\n".join(f"- {t}" for t in top_tracks[:10])
+        weather_str = f"가장 많이 음악을 들은 날씨: {majority_weather}" if majority_weather else ""
+
+        prompt = f"""당신은 감성적인 '음악 다이어리 큐레이터'입니다.
+사용자의 {period_label} 음악 기록을 바탕으로, 그 기간의 분위기 흐름을 시적이고 감성적인 2~3문장으로 요약해주세요.
+
+총 재생 수: {total_plays}곡
+가장 많이 들은 아티스트: {", ".join(top_artists[:5])}
+{weather_str}
+가장 많이 들은 곡:
+{track_str}
+{daily_str}
+
+지침:
+- 하루 요약들의 감정 변화를 하나의 흐름으로 엮어 주세요.
+- 곡명이나 아티스트명을 직접 언급하지 마세요.
+- 가상의 곡을 지어내지 말 것.
+- 마침표로 끝나는 부드러운 평어체 존댓말.
+- 요약 문장만 반환."""
+
+        return await self._generate_with_retry(
+            model, prompt, lambda: self._build_period_fallback(period_label, total_plays, top_artists)
+        )
+
+    @staticmethod
+    def _build_period_fallback(period_label: str, total_plays: int, top_artists: list[str]) -> str:
+        if top_artists:
+            return f"{period_label}, {total_plays}곡의 음악 중 {top_artists[0]}의 노래가 가장 오래 곁에 머물렀어요. 그 선율들이 작은 위로가 되었기를 바랍니다."
+        return f"{period_label}, {total_plays}곡의 음악이 당신의 시간을 채웠어요. 음악이 만들어 준 그 기간의 온도를 기억해 주세요."
+
+    @staticmethod
+    def _build_year_fallback(year: int, total_plays: int, top_artists: list[str]) -> str:
+        if top_artists:
+            return f"{year}년, {total_plays}번의 재생 중 가장 오래 곁에 머문 목소리는 {top_artists[0]}였어요. 그 노래들이 한 해를 버티게 한 작은 위로였기를 바랍니다."
+        return f"{year}년, {total_plays}번의 재생이 당신의 한 해를 채웠어요. 음악이 만들어 준 그 해의 온도를 기억해 주세요."
+
+    async def _generate_with_retry(self, model, prompt: str, fallback) -> str:
+        """Gemini 호출 — 최대 3회 시도 (ResourceExhausted 등 일시적 에러 대비), 그래도 실패하면 fallback() 반환"""
         for attempt in range(3):
             try:
-                logger.info(f"Gemini API 호출 (attempt {attempt+1}) — 트랙 {len(trimmed_tracks)}곡")
-                response = await asyncio.to_thread(
-                    self.model.generate_content, prompt
-                )
+                logger.info(f"Gemini API 호출 (attempt {attempt+1})")
+                with track_external_call("gemini", "generate_content"):
+                    response = await asyncio.to_thread(
+                        model.generate_content, prompt
+                    )
                 summary_text = response.text.strip().replace("*", "")
                 logger.info(f"Gemini API 응답 성공: {summary_text[:80]}...")
                 return summary_text
@@ -172,13 +350,15 @@ class AICapsuleClient:
                 if is_rate_limited and attempt < 2:
                     wait_time = (attempt + 1) * 5
                     logger.info(f"Rate limit hit, {wait_time}s 대기 후 재시도...")
+                    AI_RETRIES.inc()
                     await asyncio.sleep(wait_time)
                     continue
 
                 # 재시도 한도 초과 OR 비-Rate Limit 에러 → 동적 폴백
-                fallback = self._build_context_aware_fallback(tracks_context, majority_weather)
-                logger.info(f"Fallback 문구 반환: {fallback[:60]}...")
-                return fallback
+                AI_FALLBACKS.labels("rate_limited" if is_rate_limited else "error").inc()
+                text = fallback()
+                logger.info(f"Fallback 문구 반환: {text[:60]}...")
+                return text
 
         # 루프를 모두 소진한 경우 (이론상 도달하지 않지만 안전망)
-        return self._build_context_aware_fallback(tracks_context, majority_weather)
+        return fallback()
@@ -0,0 +1,210 @@
+import csv
+import importlib.util
+import io
+import json
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.timezones import DEFAULT_TIMEZONE, local_date as to_local_date
+from app.infrastructure.db.database import AsyncReadSessionLocal
+from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
+
+EXPORT_FORMATS = {
+    # format: (media type, 파일 확장자)
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# 내보내기 컬럼 순서 (CSV 헤더/Parquet 스키마와 동일)
+EXPORT_FIELDS = [
+    "cursor", "diary_id", "listened_at", "local_date", "memo", "created_at",
+    "track_title", "track_artist", "album_artwork_url", "external_platform_id", "platform_name",
+    "latitude", "longitude", "place_name", "weather", "timezone",
+    "capsule_summary", "capsule_theme", "capsule_image_url",
+]
+
+
+class ExportUnavailable(Exception):
+    """요청한 포맷을 이 서버 환경에서 만들 수 없을 때 (예: pyarrow 미설치)"""
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite는 timezone 정보 없이 돌려주므로 UTC로 간주
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def encode_cursor(listened_at: datetime, diary_id: uuid.UUID) -> str:
+    """이어받기용 커서 — URL 쿼리에 그대로 넣을 수 있도록 '+' 없는 UTC 표기 + '_' + diary id"""
+    return f"{_as_utc(listened_at).strftime('%Y-%m-%dT%H:%M:%S.%fZ')}_{diary_id.hex}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Optional[uuid.UUID]]:
+    """
+    encode_cursor 값 또는 ISO 8601 시각을 (listened_at, diary_id)로 변환합니다.
+    시각만 주면 그 시각 이후(초과)의 기록부터 내보냅니다. 형식이 잘못되면 ValueError
+    """
+    timestamp, _, diary_id = cursor.partition("_")
+    listened_at = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if listened_at.tzinfo is None:
+        listened_at = listened_at.replace(tzinfo=timezone.utc)
+    return listened_at.astimezone(timezone.utc), uuid.UUID(diary_id) if diary_id else None
+
+
+class DiaryExporter:
+    """
+    Application Layer: 유저의 전체 다이어리(트랙/컨텍스트/해당 날짜의 캡슐 포함) 내보내기.
+    DB 커서 → 배치 직렬화 → 청크 응답까지 배치 단위로 흘려보내 기록 수와 무관하게 메모리가 일정합니다.
+    """
+    def __init__(self, session_factory=AsyncReadSessionLocal, batch_size: int = 1000):
+        # 응답 스트리밍이 요청 의존성 수명과 분리되도록 자체 세션 사용 (내보내기는 복제 지연을 허용하므로 읽기 복제본)
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+
+    async def iter_batches(
+        self, user_id: uuid.UUID, since: Optional[Tuple[datetime, Optional[uuid.UUID]]] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        async with self.session_factory() as session:
+            repo = AuditoryDiaryRepository(session)
+            capsules = await repo.get_capsules_by_date(user_id)
+            async for rows in repo.stream_export_rows(user_id, after=since, batch_size=self.batch_size):
+                batch = []
+                for row in rows:
+                    listened_at = _as_utc(row.listened_at)
+                    # 쓰기 시점에 유저 시간대로 저장한 날짜 (백필 전 기록이면 기본 시간대로 계산)
+                    local_date = row.local_date or to_local_date(listened_at, DEFAULT_TIMEZONE)
+                    capsule = capsules.get(local_date)
+                    batch.append({
+                        "cursor": encode_cursor(listened_at, row.id),
+                        "diary_id": str(row.id),
+                        "listened_at": listened_at,
+                        "local_date": local_date,
+                        "memo": row.memo,
+                        "created_at": _as_utc(row.created_at),
+                        "track_title": row.track_title,
+                        "track_artist": row.track_artist,
+                        "album_artwork_url": row.album_artwork_url,
+                        "external_platform_id": row.external_platform_id,
+                        "platform_name": row.platform_name,
+                        "latitude": row.latitude,
+                        "longitude": row.longitude,
+                        "place_name": row.place_name,
+                        "weather": row.weather,
+                        "timezone": row.timezone,
+                        "capsule_summary": capsule.ai_summary if capsule else None,
+                        "capsule_theme": capsule.theme if capsule else None,
+                        "capsule_image_url": capsule.representative_image_url if capsule else None,
+                    })
+                yield batch
+
+    def stream(
+        self, user_id: uuid.UUID, export_format: str, since: Optional[Tuple[datetime, Optional[uuid.UUID]]] = None
+    ) -> AsyncIterator[bytes]:
+        """포맷별 바이트 청크 스트림 (배치 1개 = 청크 1개)"""
+        batches = self.iter_batches(user_id, since)
+        if export_format == "jsonl":
+            return _jsonl_chunks(batches)
+        if export_format == "csv":
+            return _csv_chunks(batches)
+        if export_format == "parquet":
+            return _parquet_chunks(batches)
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+async def _jsonl_chunks(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield "".join(
+            json.dumps(row, ensure_ascii=False, default=_json_default) + "\n" for row in batch
+        ).encode("utf-8")
+
+
+async def _csv_chunks(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    # 엑셀에서 한글이 깨지지 않도록 UTF-8 BOM과 헤더를 먼저 보냄 (이어받기 응답에도 헤더는 포함)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            {key: value.isoformat() if isinstance(value, (datetime, date)) else value for key, value in row.items()}
+            for row in batch
+        )
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter가 쓴 바이트를 모아뒀다가 배치마다 꺼내 응답으로 흘려보내기 위한 파일 객체"""
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _parquet_chunks(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    pa, pq = _import_pyarrow()
+    schema = pa.schema([
+        (field, pa.float64() if field in ("latitude", "longitude")
+         else pa.timestamp("us", tz="UTC") if field in ("listened_at", "created_at")
+         else pa.date32() if field == "local_date"
+         else pa.string())
+        for field in EXPORT_FIELDS
+    ])
+    sink = _ChunkSink()
+    # 배치 1개 = row group 1개 — 푸터(메타데이터)만 마지막에 쓰이므로 앞부분은 바로 전송 가능
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        async for batch in batches:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _import_pyarrow():
+    # Why: pyarrow는 수십 MB짜리 선택 의존성 — parquet 내보내기를 쓸 때만 로드 (기동 시간/이미지 크기 보호)
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportUnavailable("parquet 내보내기에는 pyarrow 설치가 필요합니다.")
+    return pyarrow, pyarrow.parquet
+
+
+def available_export_formats() -> Tuple[str, ...]:
+    """이 서버 환경에서 만들 수 있는 포맷 — parquet은 pyarrow가 설치된 경우만 (설치 여부만 확인하고 로드는 실제 내보내기 때)"""
+    return tuple(
+        export_format for export_format in EXPORT_FORMATS
+        if export_format != "parquet" or importlib.util.find_spec("pyarrow") is not None
+    )
+
+
+def ensure_format_available(export_format: str) -> None:
+    """스트리밍 응답을 시작하기 전에(=아직 에러 상태 코드를 보낼 수 있을 때) 포맷 지원 여부를 확인"""
+    if export_format == "parquet":
+        _import_pyarrow()
@@ -0,0 +1,21 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Tuple
+
+
+def encode_search_cursor(score: float, listened_at: datetime, diary_id: uuid.UUID) -> str:
+    """
+    다음 페이지 커서 — 직전 페이지 마지막 결과의 (점수, listened_at, id).
+    점수는 repr로 그대로 옮겨 DB가 계산한 값과 정확히 같은 float로 되돌아오게 함 (키셋 비교가 = 조건을 포함하므로)
+    """
+    if listened_at.tzinfo is None:
+        listened_at = listened_at.replace(tzinfo=timezone.utc)
+    timestamp = listened_at.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    return f"{score!r}_{timestamp}_{diary_id.hex}"
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, datetime, uuid.UUID]:
+    """encode_search_cursor 값을 되돌립니다. 형식이 잘못되면 ValueError"""
+    score, timestamp, diary_id = cursor.split("_")
+    listened_at = datetime.fromisoformat(timestamp.replace("Z", "+00:00")).astimezone(timezone.utc)
+    return float(score), listened_at, uuid.UUID(diary_id)
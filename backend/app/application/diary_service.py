@@ -1,12 +1,25 @@
-from typing import Optional, List
+from datetime import datetime, timezone
+from typing import Any, Optional, List
+import logging
 import uuid
 
+from opentelemetry import trace
+
+from app.application.listening_session import ListeningSessionTracker, listening_sessions, playback_window
+from app.application.now_playing import publish_new_diaries
+from app.core.timezones import DEFAULT_TIMEZONE
+from app.core.tracing import hash_user_id, tracer
 from app.domain.models import AuditoryDiary as DomainDiary, Track as DomainTrack, Context as DomainContext
 from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
 from app.infrastructure.external.spotify_client import SpotifyAPIClient
 from app.infrastructure.external.weather_client import WeatherAPIClient
 from app.infrastructure.external.location_client import LocationAPIClient
 
+logger = logging.getLogger(__name__)
+
+# 자동 스크로블 기록의 메모 — 같은 재생에 합쳐질 때 유저가 남긴 메모를 덮어쓰지 않도록 구분
+AUTO_SCROBBLE_MEMO = "[Auto-Scrobbled]"
+
 class DiaryService:
     """
     Application Layer: 다이어리 생성 및 조회 유스케이스 구현
@@ -16,30 +29,44 @@ class DiaryService:
                  repository: AuditoryDiaryRepository,
                  spotify_client: SpotifyAPIClient,
                  weather_client: WeatherAPIClient,
-                 location_client: LocationAPIClient):
+                 location_client: LocationAPIClient,
+                 sessions: ListeningSessionTracker = listening_sessions):
         self.repo = repository
         self.spotify_client = spotify_client
         self.weather_client = weather_client
         self.location_client = location_client
+        self.sessions = sessions
 
+    @tracer.start_as_current_span("DiaryService.create_diary_from_current_context")
     async def create_diary_from_current_context(
         self, user_id: uuid.UUID, spotify_access_token: str, 
-        lat: Optional[float] = None, lon: Optional[float] = None, memo: Optional[str] = None
+        lat: Optional[float] = None, lon: Optional[float] = None, memo: Optional[str] = None,
+        timezone_name: str = DEFAULT_TIMEZONE
     ) -> DomainDiary:
         """
         사용자의 상태(위치, 토큰)를 기반으로 최신 재생 곡을 가져와 일기를 생성합니다.
+        timezone_name(유저 시간대)은 컨텍스트에 기록되고 캘린더 날짜(local_date) 계산에 쓰입니다.
+        이미 기록한 재생(같은 곡을 듣는 도중 다시 누르거나 스크로블이 다시 관찰)이면 새로 만들지 않고 그 다이어리를 반환합니다.
         """
+        span = trace.get_current_span()
+        span.set_attribute("user.id_hash", hash_user_id(user_id))
+        span.set_attribute("diary.has_location", bool(lat and lon))
+
         # 1. 외부 API 연동하여 데이터 수집
+        observed_at = datetime.now(timezone.utc)
         currently_playing = await self.spotify_client.get_currently_playing(spotify_access_token)
-        track_data = None
+        track_data, playback, played_at = None, None, None
         
         if currently_playing and "item" in currently_playing:
-            track_data = currently_playing["item"]
+            track_data, playback = currently_playing["item"], currently_playing
+            span.set_attribute("diary.track_source", "currently_playing")
         else:
             # 재생 중인게 없다면 최근 재생 목록의 가장 최신 곡을 가져옴
             recent = await self.spotify_client.get_recently_played(spotify_access_token, limit=1)
             if recent:
-                track_data = recent[0]["track"]
+                track_data, playback = recent[0]["track"], recent[0]
+                played_at = _parse_played_at(recent[0].get("played_at"))
+                span.set_attribute("diary.track_source", "recently_played")
                 
         if not track_data:
             raise ValueError("감지된 음악 재생 기록이 없습니다.")
@@ -52,32 +79,82 @@ class DiaryService:
             external_platform_id=track_data.get("id", ""),
             platform_name="spotify"
         )
-        
-        # 3. Context VO 생성 (위경도가 있다면 날씨/장소명 조회)
-        weather, place_name = None, None
-        if lat and lon:
-            # NOTE: 병렬(asyncio.gather)로 호출하여 성능 최적화 가능
-            weather = await self.weather_client.get_weather_by_coordinates(lat, lon)
-            place_name = await self.location_client.get_place_name(lat, lon)
-            
-        context = DomainContext(
-            latitude=lat,
-            longitude=lon,
-            place_name=place_name,
-            weather=weather,
-            timezone="UTC"
-        )
-        
-        # 4. Entity 지휘 및 저장
-        diary = DomainDiary(
-            user_id=user_id,
-            track=track,
-            context=context,
-            memo=memo
-        )
-        
-        return await self.repo.save(diary)
 
+        # 3. 청취 세션 병합 — 같은 재생을 이미 기록했다면 그 다이어리를 반환 (판단은 메모리에서, DB 조회 없음)
+        # 트랙 ID가 없는 로컬 파일 등은 서로 다른 곡을 구분할 수 없으므로 항상 새로 기록
+        session = None
+        if track.external_platform_id:
+            started_at, duration_ms = playback_window(playback, observed_at)
+            session = self.sessions.match(user_id, track.external_platform_id, started_at)
+            if session is not None:
+                existing = await session.diary()
+                if existing is not None:
+                    span.set_attribute("diary.merged", True)
+                    return await self._merge_memo(session, existing, memo)
+            # 저장 전에 등록 — 저장이 끝나기 전에 들어온 같은 재생 요청은 위에서 이 결과를 기다림
+            session = self.sessions.open(user_id, track.external_platform_id, started_at, duration_ms)
+        span.set_attribute("diary.merged", False)
+
+        try:
+            # 4. Context VO 생성 (위경도가 있다면 날씨/장소명 조회)
+            weather, place_name = None, None
+            if lat and lon:
+                # NOTE: 병렬(asyncio.gather)로 호출하여 성능 최적화 가능
+                weather = await self.weather_client.get_weather_by_coordinates(lat, lon)
+                place_name = await self.location_client.get_place_name(lat, lon)
+
+            context = DomainContext(
+                latitude=lat,
+                longitude=lon,
+                place_name=place_name,
+                weather=weather,
+                timezone=timezone_name
+            )
+
+            # 5. Entity 지휘 및 저장
+            diary = DomainDiary(
+                user_id=user_id,
+                track=track,
+                context=context,
+                memo=memo
+            )
+
+            if played_at is None:
+                saved, created = await self.repo.save(diary), True
+            else:
+                # 최근 재생 항목은 재생이 끝난 시각(played_at)을 키로 저장 — 세션이 메모리에서 밀려난 뒤(유휴 유저의
+                # 같은 항목 재관찰)나 다른 워커의 관찰, Sync-on-Demand로 이미 저장된 재생이면 그 행을 그대로 사용
+                stored = await self.repo.get_or_create_by_listened_at(
+                    diary.model_copy(update={"listened_at": played_at})
+                )
+                created = stored.id == diary.id
+                saved = DomainDiary.model_validate(stored, from_attributes=True)
+        except BaseException:
+            if session is not None:
+                self.sessions.discard(user_id, session)
+            raise
+
+        if session is not None:
+            session.resolve(saved)
+        if not created:
+            span.set_attribute("diary.merged", True)
+            return await self._merge_memo(session, saved, memo)
+        # 스크로블러/수동 기록 모두 — 커밋 후 대시보드 구독자에게 바로 전달
+        await publish_new_diaries(user_id, [saved])
+        return saved
+
+    async def _merge_memo(self, session, existing: DomainDiary, memo: Optional[str]) -> DomainDiary:
+        """같은 재생에 다시 기록하며 남긴 메모는 기존 다이어리에 반영 (자동 스크로블 메모로는 덮어쓰지 않음)"""
+        if not memo or memo == AUTO_SCROBBLE_MEMO or memo == existing.memo:
+            return existing
+        if not await self.repo.update_memo(existing.id, existing.user_id, memo):
+            return existing
+        updated = existing.model_copy(update={"memo": memo})
+        if session is not None:
+            session.replace(updated)
+        return updated
+
+    @tracer.start_as_current_span("DiaryService.sync_recently_played")
     async def sync_recently_played(
         self, user_id: uuid.UUID, session: Any, limit: int = 10
     ) -> List[Any]:
@@ -92,6 +169,9 @@ class DiaryService:
         from app.infrastructure.db.user_models import UserORM
         from app.core.config import settings
         
+        span = trace.get_current_span()
+        span.set_attribute("user.id_hash", hash_user_id(user_id))
+
         # 1. 유저 정보 로드
         user = await session.get(UserORM, user_id)
         if not user or not user.spotify_access_token:
@@ -100,7 +180,7 @@ class DiaryService:
         # 2. 토큰 만료 검사 및 자동 갱신
         if user.spotify_token_expires_at and datetime.datetime.utcnow() >= user.spotify_token_expires_at:
             if user.spotify_refresh_token:
-                token_url = "https://accounts.spotify.com/api/token"
+                token_url = f"{settings.SPOTIFY_ACCOUNTS_BASE_URL}/api/token"
                 payload = {
                     "grant_type": "refresh_token",
                     "refresh_token": user.spotify_refresh_token,
@@ -137,7 +217,7 @@ class DiaryService:
             await session.commit()
             return []
             
-        result_orms = []
+        result_orms, new_orms = [], []
         for item in items:
             track_data = item.get("track", {})
             played_at_str = item.get("played_at")
@@ -161,7 +241,7 @@ class DiaryService:
             context = DomainContext(
                 place_name="Spotify에서 재생",
                 weather="",
-                timezone="UTC"
+                timezone=user.timezone
             )
             
             diary_domain = DomainDiary(
@@ -175,5 +255,41 @@ class DiaryService:
             
             diary_orm = await self.repo.get_or_create_by_listened_at(diary_domain)
             result_orms.append(diary_orm)
-            
+            # 새로 만들어진 기록은 요청한 도메인 id를 그대로 씀 — 기존 기록과 구분해 새 기록만 알림
+            if diary_orm.id == diary_domain.id:
+                new_orms.append(diary_orm)
+
+        await publish_new_diaries(user_id, new_orms)
+        span.set_attribute("spotify.item_count", len(items))
+        span.set_attribute("diary.synced_count", len(result_orms))
+        span.set_attribute("diary.new_count", len(new_orms))
         return result_orms
+
+
+def _parse_played_at(value: Optional[str]) -> Optional[datetime]:
+    """recently-played 항목의 played_at (ISO8601, 'Z' 포함) — 없거나 형식이 다르면 None"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+async def rebucket_in_background(user_id: uuid.UUID, timezone_name: str) -> None:
+    """
+    시간대 변경 후 기존 기록의 local_date(캘린더 날짜)를 새 시간대로 다시 계산합니다.
+    응답 이후 BackgroundTasks로 실행되므로 요청 세션이 아닌 자체 세션을 사용합니다.
+    """
+    from app.core.query_counter import track_queries
+    from app.infrastructure.db.database import AsyncSessionLocal
+
+    try:
+        # Why: 응답 이후 실행되므로 PUT 요청의 쿼리 예산 집계와 분리
+        with track_queries(f"rebucket:{hash_user_id(user_id)}"):
+            async with AsyncSessionLocal() as session:
+                updated = await AuditoryDiaryRepository(session).rebucket_local_dates(user_id, timezone_name)
+        logger.info(f"Rebucketed {updated} diaries of user {hash_user_id(user_id)} into {timezone_name}")
+    except Exception as e:
+        # 실패해도 같은 시간대로 다시 PUT 하면 재실행됨
+        logger.error(f"Rebucket failed for user {hash_user_id(user_id)}: {type(e).__name__}: {e}")
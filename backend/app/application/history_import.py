@@ -0,0 +1,257 @@
+"""
+Spotify 스트리밍 기록(Extended streaming history) 대량 가져오기.
+
+    cd backend && python -m app.application.history_import --user-email me@example.com --file my_spotify_data.zip
+
+- 파싱: JSON 배열을 원소 단위로 스트리밍 파싱 (파일 크기와 무관하게 배치 1개 분량의 메모리만 사용)
+- 저장: 배치마다 트랙 일괄 조회/생성 + executemany INSERT, 진행 상황(rows_read)을 같은 트랜잭션에서 커밋
+- 재개: 같은 파일(sha256)로 다시 실행하면 마지막 체크포인트 이후 행부터 이어서 처리
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+from opentelemetry import trace
+from sqlalchemy import or_, update
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.metrics import HISTORY_IMPORT_ROWS
+from app.core.query_counter import track_queries
+from app.core.tracing import hash_user_id, tracer
+from app.domain.models import Track as DomainTrack
+from app.infrastructure.db.database import AsyncSessionLocal
+from app.infrastructure.db.models import HistoryImportORM
+from app.infrastructure.db.user_models import UserORM
+from app.infrastructure.external.spotify_history import iter_history_files, iter_json_array, parse_play
+from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
+
+logger = logging.getLogger(__name__)
+
+PLACE_NAME = "Spotify에서 재생"
+# 배치마다 updated_at이 갱신되므로, 이보다 오래 멈춘 running 작업은 프로세스가 죽은 것으로 보고 재개 허용
+STALE_RUNNING_AFTER = timedelta(minutes=10)
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_play_batches(path: str, skip_rows: int, batch_size: int) -> Iterator[Tuple[int, int, list]]:
+    """
+    (이번 배치에서 읽은 원본 행 수, 건너뛴 행 수, 재생 목록)을 배치 단위로 돌려줍니다.
+    앞의 skip_rows 행(이전 실행에서 이미 커밋된 행)은 파싱만 하고 버립니다.
+    """
+    row_index = 0
+    rows_read, rows_skipped, plays = 0, 0, []
+    for _, fp in iter_history_files(path):
+        for row in iter_json_array(fp):
+            row_index += 1
+            if row_index <= skip_rows:
+                continue
+            rows_read += 1
+            play = parse_play(row) if isinstance(row, dict) else None
+            if play is None:
+                rows_skipped += 1
+            else:
+                plays.append(play)
+            if rows_read >= batch_size:
+                yield rows_read, rows_skipped, plays
+                rows_read, rows_skipped, plays = 0, 0, []
+    if rows_read:
+        yield rows_read, rows_skipped, plays
+
+
+class HistoryImportService:
+    """
+    Application Layer: 스트리밍 기록 파일 → 청각적 일기 대량 생성 유스케이스
+    작업 상태는 history_imports 테이블에 남기므로 API(백그라운드 작업)와 CLI가 같은 경로를 사용합니다.
+    """
+    def __init__(self, session_factory=AsyncSessionLocal, batch_size: Optional[int] = None):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.HISTORY_IMPORT_BATCH_SIZE
+
+    async def start(self, user_id: uuid.UUID, fingerprint: str, source_name: Optional[str]) -> Tuple[HistoryImportORM, bool]:
+        """
+        (작업, 실행 필요 여부)를 반환합니다. 같은 파일의 작업이 이미 있으면 그 작업을 재사용하고,
+        완료됐거나 다른 요청/프로세스가 진행 중(또는 곧 실행할 pending)이면 다시 실행하지 않습니다.
+        """
+        now = datetime.utcnow()
+        async with self.session_factory() as session:
+            # Why: 조회 후 INSERT가 아니라 UNIQUE 제약(uq_user_history_source)으로 경합을 가려,
+            # 같은 파일이 동시에 올라와도 IntegrityError 없이 한 요청만 작업을 만들고 실행함
+            inserted = await session.execute(
+                _dialect_insert(session, HistoryImportORM.__table__).values(
+                    id=uuid.uuid4(), user_id=user_id, source_fingerprint=fingerprint,
+                    source_name=source_name, status="pending",
+                    rows_read=0, rows_imported=0, rows_skipped=0,
+                    created_at=now, updated_at=now,
+                ).on_conflict_do_nothing(index_elements=["user_id", "source_fingerprint"])
+            )
+            should_run = inserted.rowcount == 1
+            if not should_run:
+                # 실패했거나 멈춘(STALE_RUNNING_AFTER 동안 진행 없는) 작업만 재실행 — 조건부 UPDATE로 한 요청만 가져감
+                # pending은 방금 다른 요청이 만들어 곧 실행할 작업이므로 running과 같이 취급
+                claimed = await session.execute(
+                    update(HistoryImportORM)
+                    .where(
+                        HistoryImportORM.user_id == user_id,
+                        HistoryImportORM.source_fingerprint == fingerprint,
+                        or_(
+                            HistoryImportORM.status == "failed",
+                            HistoryImportORM.status.in_(("pending", "running"))
+                            & (HistoryImportORM.updated_at < now - STALE_RUNNING_AFTER),
+                        ),
+                    )
+                    .values(status="pending", updated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                should_run = claimed.rowcount == 1
+            await session.commit()
+
+            job = (await session.execute(
+                select(HistoryImportORM).where(
+                    HistoryImportORM.user_id == user_id,
+                    HistoryImportORM.source_fingerprint == fingerprint,
+                )
+            )).scalar_one()
+            return job, should_run
+
+    @tracer.start_as_current_span("HistoryImportService.run")
+    async def run(self, job_id: uuid.UUID, path: str) -> HistoryImportORM:
+        """체크포인트(rows_read) 이후부터 파일을 끝까지 가져오고 완료된 작업을 반환합니다."""
+        # Why: API에서는 응답 이후 BackgroundTasks로 실행되므로 요청의 쿼리 예산 집계와 분리
+        with track_queries(f"history_import:{job_id}"):
+            async with self.session_factory() as session:
+                job = await session.get(HistoryImportORM, job_id)
+                job.status = "running"
+                job.error = None
+                await session.commit()
+                try:
+                    await self._import(session, job, path)
+                except Exception as e:
+                    logger.exception(f"History import {job_id} failed after {job.rows_read} rows")
+                    await session.rollback()
+                    await session.refresh(job)
+                    job.status = "failed"
+                    job.error = f"{type(e).__name__}: {e}"
+                    await session.commit()
+                    raise
+                return job
+
+    async def _import(self, session, job: HistoryImportORM, path: str) -> None:
+        span = trace.get_current_span()
+        span.set_attribute("user.id_hash", hash_user_id(job.user_id))
+        span.set_attribute("import.resumed_from_row", job.rows_read)
+
+        repo = AuditoryDiaryRepository(session)
+        user = await session.get(UserORM, job.user_id)
+        batches = iter_play_batches(path, skip_rows=job.rows_read, batch_size=self.batch_size)
+        started = time.perf_counter()
+        rows_this_run = 0
+
+        while True:
+            # 파싱(CPU/디스크)은 스레드에서 — API 프로세스의 이벤트 루프를 막지 않도록
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+            rows_read, rows_skipped, plays = batch
+
+            listens: List[Tuple[datetime, DomainTrack]] = [
+                (
+                    play.listened_at,
+                    DomainTrack(
+                        title=play.title,
+                        artist=play.artist,
+                        album_artwork_url=None,
+                        external_platform_id=play.track_id,
+                        platform_name="spotify",
+                    ),
+                )
+                for play in plays
+            ]
+            imported = await repo.bulk_insert_listens(
+                job.user_id, listens, place_name=PLACE_NAME, timezone_name=user.timezone
+            )
+            duplicates = len(plays) - imported
+
+            # 체크포인트는 배치 INSERT와 같은 트랜잭션으로 커밋 — 중간에 죽어도 rows_read와 실제 데이터가 어긋나지 않음
+            job.rows_read += rows_read
+            job.rows_imported += imported
+            job.rows_skipped += rows_skipped + duplicates
+            await session.commit()
+
+            HISTORY_IMPORT_ROWS.labels("imported").inc(imported)
+            HISTORY_IMPORT_ROWS.labels("skipped").inc(rows_skipped)
+            HISTORY_IMPORT_ROWS.labels("duplicate").inc(duplicates)
+            rows_this_run += rows_read
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"History import {job.id}: {job.rows_read} rows read, {job.rows_imported} imported, "
+                f"{job.rows_skipped} skipped ({rows_this_run / elapsed:.0f} rows/s)"
+            )
+
+        job.status = "completed"
+        await session.commit()
+        span.set_attribute("import.rows_read", job.rows_read)
+        span.set_attribute("import.rows_imported", job.rows_imported)
+
+
+async def run_import_in_background(job_id: uuid.UUID, path: str) -> None:
+    """API 업로드용 — 가져오기 후 임시 파일을 지웁니다. (실패해도 같은 파일을 다시 올리면 체크포인트부터 재개)"""
+    try:
+        await HistoryImportService().run(job_id, path)
+    except Exception:
+        pass  # 실패 내용은 작업 레코드(status/error)와 로그에 남음
+    finally:
+        os.remove(path)
+
+
+def _dialect_insert(session, table):
+    """ON CONFLICT를 지원하는 방언별 INSERT (PostgreSQL/SQLite 공통 문법)"""
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(table)
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Import Spotify extended streaming history")
+    parser.add_argument("--user-email", required=True)
+    parser.add_argument("--file", required=True, help="my_spotify_data.zip 또는 Streaming_History_Audio_*.json")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as session:
+        user = (await session.execute(select(UserORM).where(UserORM.email == args.user_email))).scalar_one_or_none()
+    if user is None:
+        raise SystemExit(f"User not found: {args.user_email}")
+
+    service = HistoryImportService(batch_size=args.batch_size)
+    fingerprint = await asyncio.to_thread(file_sha256, args.file)
+    job, should_run = await service.start(user.id, fingerprint, os.path.basename(args.file))
+    if should_run:
+        if job.rows_read:
+            logger.info(f"Resuming import {job.id} from row {job.rows_read}")
+        started = time.perf_counter()
+        job = await service.run(job.id, args.file)
+        logger.info(f"Finished in {time.perf_counter() - started:.1f}s")
+    else:
+        logger.info(f"Import {job.id} is already {job.status}; nothing to do")
+    logger.info(f"rows read={job.rows_read} imported={job.rows_imported} skipped={job.rows_skipped}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(_main())
@@ -0,0 +1,123 @@
+"""
+Idempotency-Key 처리 — 모바일 클라이언트의 재시도가 외부 API 호출과 INSERT를 반복하지 않도록.
+
+    stored, replayed = await run_idempotent(session, user_id, key, fingerprint, operation)
+
+- 처음 온 요청이 키의 처리 권한(idempotency_keys 행)을 얻어 operation을 실행하고, 성공 응답을 저장
+- 보관 기간 안의 재시도는 저장된 응답을 그대로 반환 (operation 실행 없음)
+- 처리 중에 온 같은 키 요청은 완료를 기다렸다가 같은 응답을 반환
+  (같은 프로세스면 이벤트로 바로 깨우고, 다른 워커가 처리 중이면 IDEMPOTENCY_POLL_SECONDS 간격으로 확인)
+- 실패(예외)한 요청은 키를 지워 다음 재시도가 처음부터 다시 실행됨 (실패 응답은 저장하지 않음)
+"""
+import asyncio
+import hashlib
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.infrastructure.repositories.idempotency_repository import IdempotencyRepository
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+PURGE_INTERVAL_SECONDS = 60 * 60
+
+# 이 프로세스에서 처리 중인 (user_id, key) → 완료 이벤트
+_inflight: Dict[Tuple[uuid.UUID, str], asyncio.Event] = {}
+
+
+class IdempotencyError(Exception):
+    """키를 쓸 수 없는 요청 — status_code/detail 그대로 HTTP 응답으로 변환"""
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: Any
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    return hashlib.sha256(f"{method} {path}\n".encode() + body).hexdigest()
+
+
+async def _wait_for_completion(inflight_key: Tuple[uuid.UUID, str], timeout: float) -> None:
+    event = _inflight.get(inflight_key)
+    if event is None:
+        # 다른 워커가 처리 중 — 잠시 뒤 다시 조회
+        await asyncio.sleep(min(timeout, settings.IDEMPOTENCY_POLL_SECONDS))
+        return
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def run_idempotent(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    key: str,
+    fingerprint: str,
+    operation: Callable[[], Awaitable[StoredResponse]],
+) -> Tuple[StoredResponse, bool]:
+    """(응답, 저장된 응답을 재사용했는지)를 반환합니다. operation은 이 키로 한 번만 성공적으로 실행됩니다."""
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyError(400, f"{IDEMPOTENCY_HEADER}는 1~{MAX_KEY_LENGTH}자여야 합니다.")
+
+    repo = IdempotencyRepository(session)
+    inflight_key = (user_id, key)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while not await repo.try_claim(user_id, key, fingerprint):
+        record = await repo.get(user_id, key)
+        if record is None:
+            # 사이에 실패로 지워짐 — 다시 처리 권한을 시도
+            continue
+        if record.request_fingerprint != fingerprint:
+            raise IdempotencyError(422, f"이미 다른 요청에 사용된 {IDEMPOTENCY_HEADER}입니다.")
+        if record.status == "completed":
+            return StoredResponse(record.response_status, record.response_body), True
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise IdempotencyError(409, "같은 요청을 아직 처리 중입니다. 잠시 후 다시 시도해 주세요.")
+        await _wait_for_completion(inflight_key, remaining)
+
+    event = _inflight[inflight_key] = asyncio.Event()
+    try:
+        response = await operation()
+    except BaseException:
+        try:
+            await repo.release(user_id, key)
+        except Exception as e:
+            # 지우지 못한 키는 임대(IDEMPOTENCY_LOCK_SECONDS)가 끝나면 다음 재시도가 이어받음
+            logger.warning(f"Failed to release idempotency key: {e}")
+        raise
+    else:
+        await repo.complete(user_id, key, response.status_code, response.body)
+        return response, False
+    finally:
+        _inflight.pop(inflight_key, None)
+        event.set()
+
+
+async def run_idempotency_purge(stopping: asyncio.Event) -> None:
+    """TaskSupervisor 루프 — 보관 기간이 지난 키를 주기적으로 삭제"""
+    from app.infrastructure.db.database import AsyncSessionLocal
+
+    while not stopping.is_set():
+        async with AsyncSessionLocal() as session:
+            purged = await IdempotencyRepository(session).purge_expired()
+        if purged:
+            logger.info(f"Purged {purged} expired idempotency keys")
+        try:
+            await asyncio.wait_for(stopping.wait(), timeout=PURGE_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,111 @@
+"""
+청취 세션 — 같은 곡의 한 번 재생을 여러 번 관찰해도 다이어리는 하나만 남깁니다.
+
+currently-playing 응답의 progress_ms로 재생이 시작된 시각(관찰 시각 - 진행 시간)을 역산하면
+한 번의 재생을 여러 번 관찰해도 시작 시각이 거의 같습니다. 같은 곡이고 새 관찰의 시작 시각이
+직전 세션의 시작 + 곡 길이(- 허용 오차)보다 앞이면 같은 재생으로 보고 직전 다이어리를 돌려줍니다.
+(앞으로 건너뛰기는 시작 시각을 앞당기고 일시정지는 뒤로 밀지만 곡 길이 안이면 같은 재생,
+곡이 끝난 뒤 다시 들으면 시작 시각이 곡 길이 이상 뒤이므로 새 기록)
+
+유저당 마지막 세션 하나만 프로세스 메모리에 두므로 판단에 DB 조회가 없습니다.
+워커가 여러 개면 같은 유저의 수동 기록 요청이 다른 워커로 가는 경우까지는 막지 못합니다.
+(자동 스크로블은 임대를 가진 한 워커만 실행하고, recently-played 항목은 세션과 별개로 played_at을 키로 저장하므로
+세션이 만료/LRU로 밀려난 뒤 같은 항목을 다시 관찰해도 새로 기록되지 않음)
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.domain.models import AuditoryDiary as DomainDiary
+
+
+def playback_started_at(observed_at: datetime, progress_ms: Optional[int]) -> datetime:
+    """재생이 시작된 시각 — 진행 시간을 모르면 관찰 시각"""
+    return observed_at - timedelta(milliseconds=progress_ms or 0)
+
+
+def playback_window(payload: Dict[str, Any], observed_at: datetime) -> tuple[datetime, Optional[int]]:
+    """
+    Spotify 응답 한 건에서 (재생 시작 시각, 곡 길이 ms)를 계산합니다.
+    currently-playing은 progress_ms, recently-played 항목은 재생이 끝난 시각(played_at)을 기준으로 합니다.
+    """
+    track = payload.get("item") or payload.get("track") or {}
+    duration_ms = track.get("duration_ms")
+    played_at = payload.get("played_at")
+    if played_at and duration_ms:
+        ended_at = datetime.fromisoformat(played_at.replace("Z", "+00:00"))
+        return ended_at - timedelta(milliseconds=duration_ms), duration_ms
+    return playback_started_at(observed_at, payload.get("progress_ms")), duration_ms
+
+
+class ListeningSession:
+    """한 번의 재생 — 저장이 끝나기 전에 들어온 같은 재생 관찰은 diary()에서 저장 결과를 기다림"""
+    __slots__ = ("external_platform_id", "started_at", "duration", "_diary")
+
+    def __init__(self, external_platform_id: str, started_at: datetime, duration: timedelta):
+        self.external_platform_id = external_platform_id
+        self.started_at = started_at
+        self.duration = duration
+        self._diary: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def contains(self, external_platform_id: str, started_at: datetime) -> bool:
+        # 새 재생은 직전 재생보다 먼저 시작할 수 없으므로 하한은 없음 (더 이르면 앞으로 건너뛴 같은 재생)
+        tolerance = timedelta(seconds=settings.LISTENING_SESSION_TOLERANCE_SECONDS)
+        return (
+            external_platform_id == self.external_platform_id
+            and started_at < self.started_at + self.duration - tolerance
+        )
+
+    async def diary(self) -> Optional[DomainDiary]:
+        """저장된 다이어리 (먼저 시작한 저장이 실패했으면 None)"""
+        # Why: 기다리던 요청이 취소되어도 future 자체는 취소되지 않도록
+        return await asyncio.shield(self._diary)
+
+    def resolve(self, diary: Optional[DomainDiary]) -> None:
+        if not self._diary.done():
+            self._diary.set_result(diary)
+
+    def replace(self, diary: DomainDiary) -> None:
+        """저장 뒤 바뀐 다이어리(메모 수정)로 교체"""
+        self._diary = asyncio.get_running_loop().create_future()
+        self._diary.set_result(diary)
+
+
+class ListeningSessionTracker:
+    """유저별 마지막 청취 세션 (LRU + 최대 유지 시간) — 새 재생을 등록하면 이전 세션을 대체"""
+    def __init__(self, maxsize: int = settings.LISTENING_SESSION_CACHE_SIZE):
+        self._sessions = TTLCache(maxsize=maxsize, ttl_seconds=settings.LISTENING_SESSION_MAX_SECONDS)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def match(self, user_id: uuid.UUID, external_platform_id: str, started_at: datetime) -> Optional[ListeningSession]:
+        session = self._sessions.get(user_id)
+        if session is not None and session.contains(external_platform_id, started_at):
+            return session
+        return None
+
+    def open(
+        self, user_id: uuid.UUID, external_platform_id: str, started_at: datetime, duration_ms: Optional[int]
+    ) -> ListeningSession:
+        """새 재생을 유저의 마지막 세션으로 등록 — 저장 전에 등록해 연타한 요청도 같은 세션으로 묶음"""
+        duration = timedelta(
+            milliseconds=duration_ms or settings.LISTENING_SESSION_DEFAULT_DURATION_SECONDS * 1000
+        )
+        session = ListeningSession(external_platform_id, started_at, duration)
+        # Why: 재생이 끝난 뒤에도 유지 — 아무것도 재생하지 않는 동안 누르면 같은 recently-played 항목이 계속 관찰됨
+        self._sessions.set(user_id, session)
+        return session
+
+    def discard(self, user_id: uuid.UUID, session: ListeningSession) -> None:
+        """저장에 실패한 세션 제거 — 기다리던 요청은 각자 새로 기록"""
+        session.resolve(None)
+        if self._sessions.get(user_id) is session:
+            self._sessions.pop(user_id)
+
+
+# 프로세스(워커)당 하나
+listening_sessions = ListeningSessionTracker()
@@ -0,0 +1,79 @@
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.domain.geohash import EARTH_RADIUS_M, distance_m
+from app.infrastructure.db.models import AuditoryDiaryORM
+
+
+@dataclass
+class NearbyPlace:
+    """주변 기록을 묶은 장소 하나 — 좌표는 묶인 기록들의 평균"""
+    latitude: float
+    longitude: float
+    distance_m: float
+    place_name: Optional[str]
+    diary_count: int
+    last_listened_at: datetime
+    recent_diaries: List[AuditoryDiaryORM]
+
+
+@dataclass
+class _Cluster:
+    seed_lat: float
+    seed_lon: float
+    diaries: List[AuditoryDiaryORM] = field(default_factory=list)
+
+
+def cluster_places(
+    hits: Iterable[Tuple[AuditoryDiaryORM, float]],
+    center_lat: float, center_lon: float,
+    cluster_radius_m: float, recent_per_place: int = 5,
+) -> List[NearbyPlace]:
+    """
+    최신순 기록을 장소로 묶습니다 — 각 기록을 반경 cluster_radius_m 안의 기존 장소(첫 기록 기준)에 넣고, 없으면 새 장소.
+    장소 후보는 cluster_radius_m 크기 격자의 주변 9칸에서만 찾아 기록 수에 비례하는 시간으로 끝남.
+    결과는 중심에서 가까운 장소부터.
+    """
+    lat_step = math.degrees(cluster_radius_m / EARTH_RADIUS_M)
+    lon_step = lat_step / max(math.cos(math.radians(center_lat)), 1e-6)
+    grid: Dict[Tuple[int, int], List[_Cluster]] = {}
+    clusters: List[_Cluster] = []
+
+    for diary, _ in hits:
+        lat, lon = diary.context.latitude, diary.context.longitude
+        row, column = math.floor(lat / lat_step), math.floor(lon / lon_step)
+        cluster = next(
+            (
+                candidate
+                for d_row in (-1, 0, 1) for d_column in (-1, 0, 1)
+                for candidate in grid.get((row + d_row, column + d_column), ())
+                if distance_m(candidate.seed_lat, candidate.seed_lon, lat, lon) <= cluster_radius_m
+            ),
+            None,
+        )
+        if cluster is None:
+            cluster = _Cluster(seed_lat=lat, seed_lon=lon)
+            grid.setdefault((row, column), []).append(cluster)
+            clusters.append(cluster)
+        cluster.diaries.append(diary)
+
+    places = []
+    for cluster in clusters:
+        diaries = cluster.diaries
+        latitude = sum(d.context.latitude for d in diaries) / len(diaries)
+        longitude = sum(d.context.longitude for d in diaries) / len(diaries)
+        names = Counter(d.context.place_name for d in diaries if d.context.place_name)
+        places.append(NearbyPlace(
+            latitude=latitude,
+            longitude=longitude,
+            distance_m=distance_m(center_lat, center_lon, latitude, longitude),
+            place_name=names.most_common(1)[0][0] if names else None,
+            diary_count=len(diaries),
+            last_listened_at=diaries[0].listened_at,
+            recent_diaries=diaries[:recent_per_place],
+        ))
+    places.sort(key=lambda place: place.distance_m)
+    return places
@@ -0,0 +1,29 @@
+import logging
+import uuid
+from typing import Iterable, Union
+
+from app.core.timezones import as_utc
+from app.domain.models import AuditoryDiary as DomainDiary
+from app.infrastructure.db.models import AuditoryDiaryORM
+from app.infrastructure.pubsub import now_playing_broker
+
+logger = logging.getLogger(__name__)
+
+
+def diary_event(diary: Union[DomainDiary, AuditoryDiaryORM]) -> str:
+    """SSE data 한 줄 — DiaryResponse와 같은 모양의 JSON (track/context는 ORM이면 로드되어 있어야 함)"""
+    if not isinstance(diary, DomainDiary):
+        diary = DomainDiary.model_validate(diary, from_attributes=True)
+    return diary.model_copy(update={"listened_at": as_utc(diary.listened_at)}).model_dump_json()
+
+
+async def publish_new_diaries(user_id: uuid.UUID, diaries: Iterable[Union[DomainDiary, AuditoryDiaryORM]]) -> None:
+    """
+    커밋된 새 다이어리를 유저의 대시보드 구독자에게 보냅니다.
+    Why: 알림 실패가 기록 저장(스크로블/동기화) 자체를 실패로 만들지 않도록 예외는 로그만 남김
+    """
+    for diary in diaries:
+        try:
+            await now_playing_broker.publish(user_id, diary_event(diary))
+        except Exception as e:
+            logger.warning(f"Failed to publish now-playing event for diary {diary.id}: {e}")
@@ -0,0 +1,152 @@
+import asyncio
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from opentelemetry import trace
+
+from app.application.ai_client import AICapsuleClient
+from app.application.stats_service import TOP_N, UNKNOWN_TRACK
+from app.core.timezones import DEFAULT_TIMEZONE, as_utc, day_range_utc, day_start_utc, local_today
+from app.core.tracing import hash_user_id, tracer
+from app.domain.theme_classifier import DEFAULT_THEME, SCORED_THEMES
+from app.infrastructure.db.database import AsyncSessionLocal
+from app.infrastructure.db.models import PeriodCapsuleORM
+from app.infrastructure.repositories.capsule_repository import CapsuleRepository
+from app.infrastructure.repositories.stats_repository import StatsRepository
+
+PERIODS = ("week", "month")
+
+# (user_id, period, start_date) → 진행 중인 생성 작업
+# Why: 월간 뷰를 여러 탭/기기에서 동시에 열어도 같은 기간의 LLM 호출은 프로세스당 한 번만 나가도록 합류시킴
+_inflight: Dict[Tuple[uuid.UUID, str, date], asyncio.Task] = {}
+
+
+class NoListeningRecords(Exception):
+    """기간 안에 청취 기록도 Daily Capsule도 없어 캡슐을 만들 수 없을 때"""
+
+
+def period_bounds(period: str, target: date) -> Tuple[date, date]:
+    """target이 속한 주(월~일) 또는 달의 (첫날, 마지막날) — 유저 시간대의 날짜 기준"""
+    if period == "week":
+        start = target - timedelta(days=target.weekday())
+        return start, start + timedelta(days=6)
+    if period == "month":
+        start = target.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return start, next_month - timedelta(days=1)
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def period_label(period: str, start: date, end: date) -> str:
+    if period == "month":
+        return f"{start.year}년 {start.month}월"
+    return f"{start.month}월 {start.day}일~{end.month}월 {end.day}일 한 주"
+
+
+def majority_theme(themes: Counter) -> str:
+    """Daily Capsule 테마 최빈값 (동점이면 테마 우선순위 순, 캡슐이 없으면 aura)"""
+    order = SCORED_THEMES + (DEFAULT_THEME,)
+    ranked = sorted(themes.items(), key=lambda item: (-item[1], order.index(item[0]) if item[0] in order else len(order)))
+    return ranked[0][0] if ranked else DEFAULT_THEME
+
+
+def _is_final(capsule: PeriodCapsuleORM, tz_name: str) -> bool:
+    # 기간이 끝난 뒤(다음 날 현지 0시 이후)에 만들어진 캡슐이면 더 바뀔 기록이 없음
+    return as_utc(capsule.created_at) >= day_start_utc(tz_name, capsule.end_date + timedelta(days=1))
+
+
+class PeriodCapsuleService:
+    """
+    Application Layer: 주간/월간 캡슐 유스케이스.
+    원본 다이어리 대신 기간 내 Daily Capsule(요약/테마)과 SQL 집계(Top 아티스트/트랙/날씨)만 읽고,
+    LLM은 기간당 한 번만 호출합니다. (하루 캡슐을 날짜마다 새로 만들지 않음)
+    """
+    def __init__(self, ai_client: AICapsuleClient, session_factory=AsyncSessionLocal):
+        # 생성 작업은 여러 요청이 합류해 기다리므로 특정 요청의 세션이 아닌 자체 세션 사용
+        self.ai_client = ai_client
+        self.session_factory = session_factory
+
+    @tracer.start_as_current_span("PeriodCapsuleService.get_or_generate")
+    async def get_or_generate(
+        self, user_id: uuid.UUID, period: str, target: date,
+        tz_name: str = DEFAULT_TIMEZONE, now: Optional[datetime] = None
+    ) -> PeriodCapsuleORM:
+        span = trace.get_current_span()
+        span.set_attribute("user.id_hash", hash_user_id(user_id))
+        span.set_attribute("capsule.period", period)
+
+        start, end = period_bounds(period, target)
+        today = local_today(tz_name, now)
+        if start > today:
+            raise NoListeningRecords()
+
+        async with self.session_factory() as session:
+            existing = await CapsuleRepository(session).get_period_capsule(user_id, period, start)
+        # 진행 중인 기간의 캡슐은 기간이 끝날 때까지 재사용, 끝난 뒤 첫 요청에서 한 번 최종본으로 다시 생성
+        if existing is not None and (_is_final(existing, tz_name) or end >= today):
+            span.set_attribute("capsule.cached", True)
+            return existing
+        span.set_attribute("capsule.cached", False)
+
+        key = (user_id, period, start)
+        task = _inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._generate(user_id, period, start, end, tz_name))
+            _inflight[key] = task
+            task.add_done_callback(lambda _: _inflight.pop(key, None))
+        # shield: 먼저 요청한 클라이언트가 끊겨도 합류한 다른 요청을 위해 생성은 끝까지 진행
+        return await asyncio.shield(task)
+
+    async def _generate(
+        self, user_id: uuid.UUID, period: str, start: date, end: date, tz_name: str
+    ) -> PeriodCapsuleORM:
+        async with self.session_factory() as session:
+            repo = CapsuleRepository(session)
+            dailies = await repo.get_daily_capsules(user_id, start, end)
+            range_start, range_end = day_range_utc(tz_name, start, end)
+            aggregates = await StatsRepository(session).get_listening_aggregates(
+                user_id, range_start, range_start, range_end=range_end
+            )
+            total_plays = sum(aggregates.track_counts.values())
+            if not total_plays and not dailies:
+                raise NoListeningRecords()
+
+            artist_counts: Counter = Counter()
+            for track_id, count in aggregates.track_counts.items():
+                artist_counts[aggregates.track_info.get(track_id, UNKNOWN_TRACK)[1]] += count
+            top_tracks = [
+                (aggregates.track_info.get(track_id, UNKNOWN_TRACK), count)
+                for track_id, count in aggregates.track_counts.most_common(TOP_N)
+            ]
+            weathers = Counter({weather: count for weather, count in aggregates.weather_counts.items() if weather})
+
+            label = period_label(period, start, end)
+            ai_summary = await self.ai_client.generate_period_summary(
+                period_label=label,
+                daily_summaries=[(d.target_date.isoformat(), d.ai_summary) for d in dailies],
+                top_artists=[artist for artist, _ in artist_counts.most_common(TOP_N)],
+                top_tracks=[f"'{title}' by {artist}" for (title, artist, _), _ in top_tracks],
+                total_plays=total_plays,
+                majority_weather=weathers.most_common(1)[0][0] if weathers else None,
+            )
+
+            # 대표 이미지: 가장 많이 들은 곡 중 앨범아트가 있는 첫 곡, 없으면 가장 최근 Daily Capsule의 이미지
+            image_url = next((artwork for (_, _, artwork), _ in top_tracks if artwork), None)
+            if image_url is None:
+                image_url = next((d.representative_image_url for d in reversed(dailies) if d.representative_image_url), None)
+
+            capsule = await repo.upsert_period_capsule({
+                "user_id": user_id,
+                "period": period,
+                "start_date": start,
+                "end_date": end,
+                "ai_summary": ai_summary,
+                "representative_image_url": image_url,
+                "theme": majority_theme(Counter(d.theme for d in dailies)),
+                "total_plays": total_plays,
+                "daily_capsule_count": len(dailies),
+            })
+            await session.commit()
+            return capsule
@@ -0,0 +1,130 @@
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Any, Dict, Optional
+
+from opentelemetry import trace
+
+from app.core.timezones import DEFAULT_TIMEZONE, day_start_utc, get_zone, local_today
+from app.core.tracing import hash_user_id, tracer
+from app.infrastructure.repositories.stats_repository import (
+    ListeningAggregates,
+    StatsRepository,
+    get_cached_aggregates,
+    set_cached_aggregates,
+)
+
+# range 파라미터 → 일수 (None = 전체 기간)
+STATS_RANGES: Dict[str, Optional[int]] = {"7d": 7, "30d": 30, "90d": 90, "365d": 365, "all": None}
+TOP_N = 10
+UNKNOWN_WEATHER = "unknown"
+UNKNOWN_TRACK = ("Unknown Title", "Unknown Artist", None)
+
+
+class StatsService:
+    """
+    Application Layer: 청취 통계(/stats/me) 유스케이스.
+    DB에서는 GROUP BY 집계(시간 버킷/트랙/날씨)만 가져오고, 유저 시간대 기준 히트맵/스트릭/주간 비교는
+    버킷 수(1년 최대 8,760개)에 비례하는 가벼운 후처리로 계산합니다.
+    """
+    def __init__(self, repository: StatsRepository):
+        self.repo = repository
+
+    @tracer.start_as_current_span("StatsService.get_stats")
+    async def get_stats(
+        self, user_id: uuid.UUID, range_key: str, tz_name: str = DEFAULT_TIMEZONE, now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        span = trace.get_current_span()
+        span.set_attribute("user.id_hash", hash_user_id(user_id))
+        span.set_attribute("stats.range", range_key)
+        span.set_attribute("user.timezone", tz_name)
+
+        today = local_today(tz_name, now)
+        days = STATS_RANGES[range_key]
+        # 범위는 유저 시간대의 자정 기준 — 오늘을 포함한 최근 N일
+        range_start = day_start_utc(tz_name, today - timedelta(days=days - 1)) if days else None
+        # 주간 비교(최근 7일 vs 그 전 7일)는 범위와 무관하게 필요하므로 시간 버킷은 최소 14일치 확보
+        wow_start = day_start_utc(tz_name, today - timedelta(days=13))
+        window_start = min(range_start, wow_start) if range_start else None
+
+        # 캐시 키에 시간대와 시작 날짜를 넣어, 시간대를 바꾸거나 날짜가 바뀌면 새 범위로 다시 집계
+        # (그 전까지는 새 기록만 카운터에 누적)
+        cache_key = (range_key, tz_name, today)
+        aggregates = get_cached_aggregates(user_id, cache_key)
+        span.set_attribute("cache.hit", aggregates is not None)
+        if aggregates is None:
+            aggregates = await self.repo.get_listening_aggregates(user_id, range_start, window_start)
+            set_cached_aggregates(user_id, cache_key, aggregates)
+        elif aggregates.unresolved_tracks:
+            await self.repo.resolve_tracks(aggregates)
+
+        return build_stats(aggregates, range_key, today, get_zone(tz_name))
+
+
+def build_stats(aggregates: ListeningAggregates, range_key: str, today: date, zone: tzinfo) -> Dict[str, Any]:
+    heatmap = [[0] * 24 for _ in range(7)]  # [요일(월=0)][시(현지)]
+    daily: Counter = Counter()              # 현지 날짜 → 재생 수
+    # 버킷은 UTC 정시 단위라 UTC와 30/45분 차이 나는 시간대(Asia/Kolkata 등)에서는
+    # 자정 직전 30~45분의 재생이 다음(또는 이전) 날/시로 잡힘 — 히트맵/스트릭 용도로는 허용하는 근사
+    for bucket, count in aggregates.hour_counts.items():
+        local = bucket.astimezone(zone)
+        daily[local.date()] += count
+        if aggregates.range_start is None or bucket >= aggregates.range_start:
+            heatmap[local.weekday()][local.hour] += count
+
+    range_days = {day: count for day, count in daily.items()
+                  if aggregates.range_start is None or day >= aggregates.range_start.astimezone(zone).date()}
+
+    artist_counts: Counter = Counter()
+    for track_id, count in aggregates.track_counts.items():
+        artist_counts[aggregates.track_info.get(track_id, UNKNOWN_TRACK)[1]] += count
+
+    top_tracks = []
+    for track_id, count in aggregates.track_counts.most_common(TOP_N):
+        title, artist, artwork = aggregates.track_info.get(track_id, UNKNOWN_TRACK)
+        top_tracks.append({"title": title, "artist": artist, "album_artwork_url": artwork, "plays": count})
+
+    this_week = sum(daily.get(today - timedelta(days=offset), 0) for offset in range(7))
+    last_week = sum(daily.get(today - timedelta(days=offset), 0) for offset in range(7, 14))
+
+    return {
+        "range": range_key,
+        "start_date": aggregates.range_start.astimezone(zone).date().isoformat() if aggregates.range_start else None,
+        "end_date": today.isoformat(),
+        "total_plays": sum(aggregates.track_counts.values()),
+        "distinct_tracks": len(aggregates.track_counts),
+        "distinct_artists": len(artist_counts),
+        "active_days": len(range_days),
+        "top_artists": [{"artist": artist, "plays": count} for artist, count in artist_counts.most_common(TOP_N)],
+        "top_tracks": top_tracks,
+        "hourly_heatmap": heatmap,
+        "streaks": _streaks(range_days, today),
+        "weather": [
+            {"weather": weather or UNKNOWN_WEATHER, "plays": count}
+            for weather, count in aggregates.weather_counts.most_common()
+        ],
+        "week_over_week": {
+            "this_week": this_week,
+            "last_week": last_week,
+            "delta": this_week - last_week,
+            "delta_pct": round((this_week - last_week) / last_week * 100, 1) if last_week else None,
+        },
+    }
+
+
+def _streaks(active_days: Dict[date, int], today: date) -> Dict[str, int]:
+    """연속 청취 일수 — current는 오늘(또는 아직 오늘 기록이 없다면 어제)까지 이어진 연속 일수"""
+    longest = 0
+    run = 0
+    previous: Optional[date] = None
+    for day in sorted(active_days):
+        run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+
+    current = 0
+    day = today if today in active_days else today - timedelta(days=1)
+    while day in active_days:
+        current += 1
+        day -= timedelta(days=1)
+    return {"current": current, "longest": longest}
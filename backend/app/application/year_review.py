@@ -0,0 +1,243 @@
+"""
+연말 결산(Year in Review) 오프라인 배치.
+
+    cd backend && python -m app.application.year_review --year 2025 [--dry-run]
+
+- 순회: 아직 해당 연도 결산이 없는 유저를 id 순으로 청크 단위(YEAR_REVIEW_CHUNK_SIZE)로 가져와 동시 처리
+- 동시성: DB 집계/저장과 외부 호출(Spotify 장르 + Gemini)을 각각의 세마포어로 제한 — 커넥션 풀과 LLM 분당 한도 보호
+- 재개: 결과는 유저별로 바로 커밋되고 다음 실행은 결과가 없는 유저만 처리하므로, 중단 후 같은 명령을 다시 실행하면 됨
+- dry-run: 집계만 하고 외부 호출/저장 없이 결과 요약을 로그로 출력
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, tzinfo
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.application.ai_client import AICapsuleClient
+from app.application.stats_service import TOP_N, UNKNOWN_TRACK
+from app.core.config import settings
+from app.core.metrics import YEAR_REVIEW_USERS
+from app.core.query_counter import track_queries
+from app.core.timezones import DEFAULT_TIMEZONE, day_start_utc, get_zone
+from app.core.tracing import hash_user_id, tracer
+from app.domain.theme_classifier import theme_classifier
+from app.infrastructure.db.database import AsyncReadSessionLocal, AsyncSessionLocal
+from app.infrastructure.external.spotify_client import SpotifyAPIClient
+from app.infrastructure.repositories.stats_repository import ListeningAggregates, StatsRepository
+from app.infrastructure.repositories.year_review_repository import YearReviewRepository
+
+logger = logging.getLogger(__name__)
+
+
+def year_bounds(year: int, tz_name: str = DEFAULT_TIMEZONE) -> Tuple[datetime, datetime]:
+    """유저 시간대 기준 1월 1일 0시 ~ 다음 해 1월 1일 0시 (UTC)"""
+    return day_start_utc(tz_name, date(year, 1, 1)), day_start_utc(tz_name, date(year + 1, 1, 1))
+
+
+def primary_artist(artist: str) -> str:
+    # 피처링 아티스트가 포함된 경우 첫 번째 아티스트만 사용 (캡슐 생성과 동일한 규칙)
+    return artist.split(",")[0].strip()
+
+
+def build_year_review(
+    aggregates: ListeningAggregates,
+    theme_counts: Counter,
+    genres_map: Optional[Dict[str, List[str]]] = None,
+    zone: Optional[tzinfo] = None,
+) -> Dict[str, Any]:
+    """집계값 → 결산 payload (JSON 컬럼에 그대로 저장되므로 날짜는 ISO 문자열, 날짜/월은 zone 기준)"""
+    zone = zone or get_zone(DEFAULT_TIMEZONE)
+    daily: Counter = Counter()
+    monthly = [0] * 12
+    for bucket, count in aggregates.hour_counts.items():
+        local = bucket.astimezone(zone)
+        daily[local.date()] += count
+        monthly[local.month - 1] += count
+
+    artist_counts: Counter = Counter()
+    for track_id, count in aggregates.track_counts.items():
+        artist_counts[aggregates.track_info.get(track_id, UNKNOWN_TRACK)[1]] += count
+
+    top_tracks = []
+    for track_id, count in aggregates.track_counts.most_common(TOP_N):
+        title, artist, artwork = aggregates.track_info.get(track_id, UNKNOWN_TRACK)
+        top_tracks.append({"title": title, "artist": artist, "album_artwork_url": artwork, "plays": count})
+
+    # 장르는 아티스트 단위 정보이므로, 아티스트의 재생 수를 그 아티스트의 장르마다 더해 순위를 매김
+    genre_counts: Counter = Counter()
+    genre_theme = None
+    if genres_map:
+        primary_counts: Counter = Counter()
+        for artist, count in artist_counts.items():
+            primary_counts[primary_artist(artist)] += count
+        for artist, genres in genres_map.items():
+            for genre in genres:
+                genre_counts[genre.lower()] += primary_counts.get(artist, 0)
+        genre_theme = theme_classifier.classify(genres_map, primary_counts)
+
+    most_listened_day = None
+    if daily:
+        day, plays = max(daily.items(), key=lambda item: (item[1], item[0]))
+        most_listened_day = {"date": day.isoformat(), "plays": plays}
+
+    weathers = Counter({weather: count for weather, count in aggregates.weather_counts.items() if weather})
+
+    return {
+        "total_plays": sum(aggregates.track_counts.values()),
+        "distinct_tracks": len(aggregates.track_counts),
+        "distinct_artists": len(artist_counts),
+        "active_days": len(daily),
+        "top_artists": [{"artist": artist, "plays": count} for artist, count in artist_counts.most_common(TOP_N)],
+        "top_tracks": top_tracks,
+        "top_genres": [{"genre": genre, "plays": count} for genre, count in genre_counts.most_common(TOP_N) if count],
+        "genre_theme": genre_theme,
+        "most_listened_day": most_listened_day,
+        "monthly_plays": monthly,
+        "themes": [{"theme": theme, "days": count} for theme, count in theme_counts.most_common()],
+        "top_weather": weathers.most_common(1)[0][0] if weathers else None,
+    }
+
+
+class YearReviewBatch:
+    """
+    Application Layer: 전체 유저의 연말 결산을 만들어 year_in_reviews 테이블에 저장하는 배치 유스케이스.
+    유저 1명의 처리 = 집계(DB) → 장르/내러티브(외부) → 저장(DB), 실패해도 다른 유저 처리는 계속됩니다.
+    """
+    def __init__(
+        self,
+        year: int,
+        dry_run: bool = False,
+        chunk_size: Optional[int] = None,
+        db_concurrency: Optional[int] = None,
+        llm_concurrency: Optional[int] = None,
+        session_factory=AsyncSessionLocal,
+        read_session_factory=AsyncReadSessionLocal,
+        ai_client: Optional[AICapsuleClient] = None,
+        spotify_client: Optional[SpotifyAPIClient] = None,
+    ):
+        self.year = year
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size or settings.YEAR_REVIEW_CHUNK_SIZE
+        # Why: 집계 쿼리가 무거우므로(유저당 1년치) API와 함께 쓰는 DB 풀을 독점하지 않도록 제한
+        self.db_semaphore = asyncio.Semaphore(db_concurrency or settings.YEAR_REVIEW_DB_CONCURRENCY)
+        # Why: Gemini 무료 티어 분당 호출 한도 — 동시 호출이 많으면 429 재시도(5s/10s 대기)만 늘어남
+        self.llm_semaphore = asyncio.Semaphore(llm_concurrency or settings.YEAR_REVIEW_LLM_CONCURRENCY)
+        self.session_factory = session_factory
+        # 결산 대상 기간은 이미 지난 기록이므로 복제 지연과 무관 — 집계는 읽기 복제본에서
+        self.read_session_factory = read_session_factory
+        self.ai_client = ai_client or AICapsuleClient()
+        self.spotify_client = spotify_client or SpotifyAPIClient()
+
+    async def run(self) -> Counter:
+        """대상 유저를 모두 처리하고 결과(outcome)별 유저 수를 반환합니다."""
+        outcomes: Counter = Counter()
+        after: Optional[uuid.UUID] = None
+        started = time.perf_counter()
+        with track_queries(f"year_review:{self.year}") as query_stats:
+            while True:
+                async with self.session_factory() as session:
+                    users = await YearReviewRepository(session).get_pending_users(self.year, after, self.chunk_size)
+                if not users:
+                    break
+                results = await asyncio.gather(*(self._process_user(*user) for user in users))
+                outcomes.update(results)
+                after = users[-1][0]
+                logger.info(
+                    f"Year review {self.year}: {sum(outcomes.values())} users processed "
+                    f"({dict(outcomes)}), last user id {after} ({time.perf_counter() - started:.1f}s)"
+                )
+        logger.info(f"Year review {self.year} finished: {query_stats.count} queries, {query_stats.duration:.1f}s in DB")
+        return outcomes
+
+    @tracer.start_as_current_span("YearReviewBatch.process_user")
+    async def _process_user(
+        self, user_id: uuid.UUID, spotify_access_token: Optional[str], tz_name: str = DEFAULT_TIMEZONE
+    ) -> str:
+        try:
+            outcome = await self._build_and_save(user_id, spotify_access_token, tz_name)
+        except Exception as e:
+            # 실패한 유저는 결과 행이 없으므로 다음 실행에서 다시 시도됨
+            logger.error(f"Year review {self.year} failed for user {user_id}: {type(e).__name__}: {e}")
+            outcome = "failed"
+        YEAR_REVIEW_USERS.labels(outcome).inc()
+        return outcome
+
+    async def _build_and_save(self, user_id: uuid.UUID, spotify_access_token: Optional[str], tz_name: str) -> str:
+        # 연도 경계는 유저 시간대의 1월 1일 0시 (유저마다 다름)
+        start_utc, end_utc = year_bounds(self.year, tz_name)
+        zone = get_zone(tz_name)
+        async with self.db_semaphore:
+            async with self.read_session_factory() as session:
+                aggregates = await StatsRepository(session).get_listening_aggregates(
+                    user_id, start_utc, start_utc, range_end=end_utc
+                )
+                theme_counts = await YearReviewRepository(session).get_theme_counts(
+                    user_id, date(self.year, 1, 1), date(self.year + 1, 1, 1)
+                )
+
+        status = "completed" if aggregates.track_counts else "empty"
+        payload = build_year_review(aggregates, theme_counts, zone=zone)
+        narrative = None
+        if status == "completed" and not self.dry_run:
+            async with self.llm_semaphore:
+                if spotify_access_token:
+                    # 실패해도 빈 dict (Graceful Degradation) — 만료된 토큰이면 장르 없이 결산
+                    genres_map = await self.spotify_client.get_artists_genres(
+                        access_token=spotify_access_token,
+                        artist_names=[primary_artist(a["artist"]) for a in payload["top_artists"]],
+                    )
+                    if genres_map:
+                        payload = build_year_review(aggregates, theme_counts, genres_map, zone)
+                narrative = await self.ai_client.generate_year_summary(
+                    year=self.year,
+                    total_plays=payload["total_plays"],
+                    top_artists=[a["artist"] for a in payload["top_artists"]],
+                    top_tracks=[f"'{t['title']}' by {t['artist']}" for t in payload["top_tracks"]],
+                    top_genres=[g["genre"] for g in payload["top_genres"]],
+                    themes=[t["theme"] for t in payload["themes"]],
+                    majority_weather=payload["top_weather"],
+                )
+
+        if self.dry_run:
+            top_artist = payload["top_artists"][0]["artist"] if payload["top_artists"] else None
+            logger.info(
+                f"[dry-run] user {hash_user_id(user_id)}: {status}, {payload['total_plays']} plays, "
+                f"top artist={top_artist}, most listened day={payload['most_listened_day']}"
+            )
+            return "dry_run"
+
+        async with self.db_semaphore:
+            async with self.session_factory() as session:
+                saved = await YearReviewRepository(session).save(user_id, self.year, status, payload, narrative)
+                await session.commit()
+        # 같은 연도를 동시에 돌린 다른 배치가 먼저 저장했다면 그 결과를 유지
+        return status if saved else "skipped"
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Build year-in-review recaps for all users")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--dry-run", action="store_true", help="집계만 하고 Spotify/Gemini 호출과 저장은 하지 않음")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--db-concurrency", type=int, default=None)
+    parser.add_argument("--llm-concurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    batch = YearReviewBatch(
+        args.year,
+        dry_run=args.dry_run,
+        chunk_size=args.chunk_size,
+        db_concurrency=args.db_concurrency,
+        llm_concurrency=args.llm_concurrency,
+    )
+    outcomes = await batch.run()
+    logger.info(f"Year review {args.year}: {dict(outcomes) or 'nothing to do'}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(_main())
@@ -11,12 +11,45 @@ class Settings(BaseSettings):
     # App
     PROJECT_NAME: str = "Auditory Diary API"
     VERSION: str = "1.0.0"
+    DEBUG: bool = False  # True면 응답에 Server-Timing(DB 시간/쿼리 수) 헤더 추가
+
+    # 유저 시간대 기본값 (가입 시 값, 시간대를 모르는 기존 기록의 날짜 계산) — IANA 이름
+    DEFAULT_TIMEZONE: str = "Asia/Seoul"
 
     # Frontend URL (배포 시 Vercel URL로 변경)
     FRONTEND_URL: str = "http://127.0.0.1:3000"
 
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./auditory_diary.db"
+    # (선택) 읽기 전용 복제본 — 캘린더/히스토리/캡슐 조회만 이쪽으로 보냄. 비우면 모두 DATABASE_URL 사용
+    DATABASE_READ_URL: str = ""
+
+    # DB 커넥션 풀 (PostgreSQL) — 프로세스당 최대 커넥션 = POOL_SIZE + MAX_OVERFLOW
+    # gunicorn 워커 수(-w) × 위 값이 DB의 max_connections(Render 무료 플랜 기준 ~97)를 넘지 않도록 조정
+    # (각 워커 프로세스 안에서 API 요청과 백그라운드 스크로블러가 같은 풀을 공유)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # 관리형 DB/프록시의 유휴 커넥션 강제 종료 전에 재생성
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statement 캐시 (PgBouncer transaction 모드 뒤에서는 0으로 꺼야 함)
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    # PostgreSQL plan_cache_mode — 캐시된 prepared statement를 6번째 실행부터 값과 무관한 generic plan으로 돌리지 않도록
+    # (검색어/유저마다 일치 행 수가 수십~수십만 건으로 달라 generic plan은 수십 ms → 수 초). 빈 문자열이면 서버 기본값
+    DB_PLAN_CACHE_MODE: str = "force_custom_plan"
+
+    # 요청/워커 작업당 SQL 쿼리 예산 (N+1 감지) — 초과 시 경고 로그, STRICT면 예외 (테스트용)
+    DB_QUERY_BUDGET: int = 20
+    DB_QUERY_BUDGET_STRICT: bool = False
+
+    # 분산 트레이싱 — ""(끔) | "jsonl"(파일) | "otlp"(로컬 콜렉터)
+    TRACING_EXPORTER: str = ""
+    TRACING_JSONL_PATH: str = "./traces.jsonl"
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+
+    # SQLite (로컬 개발용) — WAL 모드로 스크로블러 쓰기 중에도 읽기가 막히지 않도록 함
+    SQLITE_WAL_MODE: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
 
     # Google OAuth (회원가입/로그인용)
     GOOGLE_CLIENT_ID: str = ""
@@ -28,12 +61,78 @@ class Settings(BaseSettings):
     SPOTIFY_CLIENT_SECRET: str = ""
     SPOTIFY_REDIRECT_URI: str = "http://127.0.0.1:8000/api/auth/spotify/callback"
 
+    # 외부 API 주소 — 기본값은 실제 서비스, 테스트/벤치마크에서는 가짜 서버나 녹화 재생(benchmarks/replay.py)으로 교체
+    SPOTIFY_API_BASE_URL: str = "https://api.spotify.com/v1"
+    SPOTIFY_ACCOUNTS_BASE_URL: str = "https://accounts.spotify.com"
+    GOOGLE_API_BASE_URL: str = "https://www.googleapis.com"
+    OPENWEATHER_BASE_URL: str = "https://api.openweathermap.org"
+    GOOGLE_MAPS_BASE_URL: str = "https://maps.googleapis.com"
+
     # JWT (세션 유지용)
     SECRET_KEY: str = "your-super-secret-key-change-it-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7 # 7 days
 
+    # 요청 인증 캐시 (JWT 디코딩 결과 / 유저 레코드 스냅샷)
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    USER_CACHE_SIZE: int = 5000
+    USER_CACHE_TTL_SECONDS: int = 30
+
+    # 청취 통계 캐시 (/stats/me) — 같은 프로세스의 새 기록은 즉시 반영, 다른 워커의 기록은 TTL 안에 반영
+    STATS_CACHE_SIZE: int = 2000
+    STATS_CACHE_TTL_SECONDS: int = 300
+
+    # 백그라운드 작업 (자동 스크로블러)
+    SCROBBLE_INTERVAL_SECONDS: int = 300
+    # 한 사이클에서 동시에 처리할 유저 수 — 유저마다 세션(커넥션)을 쓰므로 DB 풀 크기보다 작게 유지
+    SCROBBLE_CONCURRENCY: int = 4
+    # 종료 시 진행 중인 유저 작업을 기다리는 최대 시간 (gunicorn graceful_timeout 기본 30초보다 짧게)
+    SHUTDOWN_GRACE_SECONDS: float = 10.0
+    BACKGROUND_RESTART_BACKOFF_MAX_SECONDS: float = 300.0
+
+    # Spotify 스트리밍 기록(Extended streaming history) 가져오기
+    HISTORY_IMPORT_BATCH_SIZE: int = 5000  # 배치(=1 트랜잭션 + 체크포인트)당 행 수
+    HISTORY_IMPORT_MAX_UPLOAD_MB: int = 1024
+
+    # 연말 결산 배치 (python -m app.application.year_review)
+    YEAR_REVIEW_CHUNK_SIZE: int = 200      # 한 번에 가져와 동시 처리할 유저 수
+    YEAR_REVIEW_DB_CONCURRENCY: int = 4    # 동시 집계/저장 수 — DB_POOL_SIZE보다 작게
+    YEAR_REVIEW_LLM_CONCURRENCY: int = 2   # 동시 Spotify 장르 조회 + Gemini 호출 수
+
+    # 다이어리 검색 (/api/diaries/search) — 최근 일치 기록 몇 건 안에서 관련도순으로 정렬할지
+    # (일치 기록이 더 많으면 응답의 truncated=true — 더 오래된 일치 기록은 페이지를 넘겨도 나오지 않음)
+    SEARCH_CANDIDATE_LIMIT: int = 500
+    # 3글자 미만 단어만으로 검색할 때 훑는 최근 기록 수
+    SEARCH_SHORT_QUERY_SCAN_LIMIT: int = 20000
+
+    # 주변 기록 (/api/diaries/nearby) — 반경 안에서 최신 몇 건까지 장소로 묶을지
+    NEARBY_MAX_DIARIES: int = 2000
+
+    # 실시간 재생 알림 (/api/diaries/me/now-playing/stream, SSE)
+    # 브로커 — "memory"(프로세스 내, 단일 워커) | "postgres"(LISTEN/NOTIFY로 gunicorn 워커 간 전파) | "auto"(PostgreSQL이면 postgres)
+    NOW_PLAYING_BROKER: str = "auto"
+    NOW_PLAYING_HEARTBEAT_SECONDS: int = 25  # 프록시 유휴 타임아웃 전에 보내는 주석 줄 (끊긴 연결 감지도 겸함)
+    NOW_PLAYING_BUFFER_SIZE: int = 32        # 구독자별 미전송 이벤트 최대 수 — 느린 구독자는 오래된 것부터 버림
+
+    # 청취 세션 병합 — 같은 곡의 한 번 재생을 여러 번 기록(연타/스크로블)해도 다이어리는 하나
+    LISTENING_SESSION_CACHE_SIZE: int = 10000           # 마지막 세션을 기억할 유저 수 (워커별 메모리)
+    LISTENING_SESSION_TOLERANCE_SECONDS: int = 15       # 역산한 시작 시각의 오차 (반복 재생의 다음 회차를 같은 재생으로 오인하지 않도록)
+    LISTENING_SESSION_DEFAULT_DURATION_SECONDS: int = 240  # 응답에 곡 길이가 없을 때
+    LISTENING_SESSION_MAX_SECONDS: int = 3600           # 세션 캐시 최대 유지 시간 (아주 긴 곡/팟캐스트)
+
+    # 트랙 카탈로그 캐시 — 쓰기 경로의 external_platform_id → tracks.id 조회 생략 (워커별 메모리, 10만 건당 약 10MB)
+    TRACK_CATALOG_CACHE_SIZE: int = 200000
+    TRACK_CATALOG_WARM_SIZE: int = 50000   # 시작 시 최근 재생된 몇 곡으로 미리 채울지 (0이면 채우지 않음)
+    TRACK_CATALOG_WARM_SCAN_ROWS: int = 200000  # 워밍 때 읽는 최근 기록 수 상한 (나머지는 쓰기 경로에서 필요할 때 채워짐)
+
+    # Idempotency-Key (POST /api/diaries/) — 같은 키의 재시도는 저장된 응답을 외부 호출 없이 반환
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60   # 완료된 응답을 보관하는 기간
+    IDEMPOTENCY_LOCK_SECONDS: int = 60            # 처리 중 임대 — 처리하던 워커가 죽으면 이 시간 뒤 재시도가 이어받음
+    IDEMPOTENCY_WAIT_SECONDS: float = 30.0        # 같은 키의 동시 요청이 먼저 온 요청을 기다리는 최대 시간 (넘으면 409)
+    IDEMPOTENCY_POLL_SECONDS: float = 0.25        # 다른 워커가 처리 중일 때 완료 여부를 다시 확인하는 간격
+
     # AI (Gemini)
     GEMINI_API_KEY: str = ""
+    GEMINI_API_ENDPOINT: str = ""  # 비우면 SDK 기본 엔드포인트 (설정하면 REST 전송으로 이 호스트에 요청)
 
 settings = Settings()
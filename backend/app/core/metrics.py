@@ -0,0 +1,200 @@
+import functools
+import os
+import time
+from typing import Callable, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from opentelemetry.trace import SpanKind
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing import tracer
+
+# ──────────────────────────────────────────────
+# 메트릭 정의
+# Why: 라벨은 라우트 템플릿/서비스명처럼 값의 종류가 고정된 것만 사용 (카디널리티 폭발 방지)
+# ──────────────────────────────────────────────
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "API 요청 처리 시간",
+    ["method", "route", "status"],
+)
+
+EXTERNAL_CALL_DURATION = Histogram(
+    "external_call_duration_seconds",
+    "외부 API(Spotify/Gemini/날씨/지오코딩/Google) 호출 시간",
+    ["service", "operation", "status"],
+)
+
+AI_RETRIES = Counter(
+    "ai_capsule_retries_total",
+    "Gemini 호출 재시도 횟수",
+)
+
+AI_FALLBACKS = Counter(
+    "ai_capsule_fallbacks_total",
+    "Gemini 응답 대신 폴백 문구를 반환한 횟수",
+    ["reason"],
+)
+
+SCROBBLE_CYCLE_DURATION = Histogram(
+    "scrobble_cycle_duration_seconds",
+    "자동 스크로블 1회 사이클 소요 시간",
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+SCROBBLE_USERS = Counter(
+    "scrobble_users_total",
+    "자동 스크로블 사이클에서 처리한 유저 수",
+    ["outcome"],
+)
+
+BACKGROUND_TASK_RESTARTS = Counter(
+    "background_task_restarts_total",
+    "예외로 종료되어 재시작된 백그라운드 루프 횟수",
+    ["task"],
+)
+
+HISTORY_IMPORT_ROWS = Counter(
+    "history_import_rows_total",
+    "스트리밍 기록 가져오기에서 처리한 행 수",
+    ["outcome"],
+)
+
+YEAR_REVIEW_USERS = Counter(
+    "year_review_users_total",
+    "연말 결산 배치에서 처리한 유저 수",
+    ["outcome"],
+)
+
+REPOSITORY_CALL_DURATION = Histogram(
+    "repository_call_duration_seconds",
+    "리포지토리 메서드 실행 시간",
+    ["repository", "method"],
+)
+
+TRACK_CATALOG_LOOKUPS = Counter(
+    "track_catalog_cache_lookups_total",
+    "쓰기 경로의 트랙 ID 캐시 조회 수 (hit이면 tracks SELECT 생략)",
+    ["outcome"],
+)
+
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "실행된 SQL 문 수",
+    ["statement"],
+)
+
+
+class track_external_call:
+    """
+    외부 API 호출 시간을 status 라벨과 함께 기록하고, 같은 구간을 트레이싱 스팬으로 감싸는 컨텍스트 매니저.
+
+        with track_external_call("spotify", "recently_played") as call:
+            response = await client.get(url)
+            call.status = response.status_code
+            call.span.set_attribute("spotify.item_count", len(items))
+
+    status를 지정하지 않은 채 예외로 빠져나가면 'error'로 기록됩니다.
+    """
+    __slots__ = ("service", "operation", "status", "span", "_span_cm", "_start")
+
+    def __init__(self, service: str, operation: str):
+        self.service = service
+        self.operation = operation
+        self.status: Optional[object] = None
+
+    def __enter__(self) -> "track_external_call":
+        self._span_cm = tracer.start_as_current_span(
+            f"{self.service}.{self.operation}", kind=SpanKind.CLIENT
+        )
+        self.span = self._span_cm.__enter__()
+        self.span.set_attribute("peer.service", self.service)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        status = self.status if self.status is not None else ("error" if exc_type else "ok")
+        EXTERNAL_CALL_DURATION.labels(self.service, self.operation, str(status)).observe(
+            time.perf_counter() - self._start
+        )
+        if isinstance(self.status, int):
+            self.span.set_attribute("http.status_code", self.status)
+        self._span_cm.__exit__(exc_type, exc, tb)
+
+
+def observe_repository(method: Callable) -> Callable:
+    """리포지토리의 async 메서드 실행 시간을 기록하고 트레이싱 스팬으로 감싸는 데코레이터"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        repository = type(self).__name__
+        with tracer.start_as_current_span(f"{repository}.{method.__name__}"):
+            start = time.perf_counter()
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                REPOSITORY_CALL_DURATION.labels(repository, method.__name__).observe(
+                    time.perf_counter() - start
+                )
+    return wrapper
+
+
+def instrument_engine(engine) -> None:
+    """엔진에서 실행되는 SQL 문 수를 종류(select/insert/update/delete...)별로 집계합니다."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count_query(conn, cursor, statement, parameters, context, executemany):
+        DB_QUERIES.labels(statement.lstrip().split(None, 1)[0].lower() if statement else "unknown").inc()
+
+
+class PrometheusMiddleware:
+    """
+    라우트 템플릿(/api/diaries/{diary_id}/memo 등) 단위로 요청 지연을 기록하는 순수 ASGI 미들웨어.
+    BaseHTTPMiddleware를 쓰지 않아 요청당 추가 태스크/큐 생성이 없습니다.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # 매칭되지 않은 경로(404 스캔 등)는 하나의 라벨로 묶어 카디널리티를 제한
+            route_path = getattr(route, "path", None) or "unmatched"
+            if route_path != "/metrics":
+                HTTP_REQUEST_DURATION.labels(scope["method"], route_path, str(status_code)).observe(
+                    time.perf_counter() - start
+                )
+
+
+def render_latest() -> tuple[bytes, str]:
+    """
+    /metrics 응답 본문을 생성합니다.
+    gunicorn 다중 워커 환경에서는 PROMETHEUS_MULTIPROC_DIR을 지정하면 모든 워커의 값을 합산합니다.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
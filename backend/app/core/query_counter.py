@@ -0,0 +1,140 @@
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """요청/작업이 허용된 SQL 쿼리 수를 초과했을 때 (엄격 모드/테스트 전용)"""
+
+
+class QueryStats:
+    __slots__ = ("label", "count", "duration")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.count = 0
+        self.duration = 0.0
+
+
+_current_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "query_stats", default=None
+)
+
+# 엔드포인트(라우트 템플릿)별 쿼리 예산 — 없으면 settings.DB_QUERY_BUDGET 사용
+# Why: N+1 패턴이 다시 들어오면 예산 초과 경고로 바로 드러나도록 현재 쿼리 수에 맞춰 좁게 설정
+ENDPOINT_QUERY_BUDGETS: dict[str, int] = {
+    "/diaries/calendar/monthly": 2,
+    "/diaries/history": 3,
+    "/diaries/search": 3,
+    "/diaries/nearby": 2,
+    "/diaries/export": 2,
+    "/stats/me": 4,
+    "/stats/me/year/{year}": 1,
+    "/capsules/me": 1,
+    "/capsules/period": 1,
+    "/diaries/{diary_id}/memo": 3,
+    "/diaries/me/status": 3,
+    "/auth/google": 2,
+}
+
+
+def instrument_query_counter(engine) -> None:
+    """현재 요청/작업 컨텍스트의 QueryStats에 SQL 실행 수와 소요 시간을 누적합니다."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_stats.get() is not None:
+            conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is None:
+            return
+        start_times = conn.info.get("query_start_time")
+        if start_times:
+            stats.duration += time.perf_counter() - start_times.pop()
+        stats.count += 1
+
+
+@contextmanager
+def track_queries(label: str, budget: Optional[int] = None) -> Iterator[QueryStats]:
+    """
+    블록 안에서 실행된 SQL 문 수와 DB 시간을 집계합니다. (워커 작업, 스크립트, 테스트용)
+    budget을 넘기면 초과 시 경고를 남기고, DB_QUERY_BUDGET_STRICT 모드에서는 예외를 발생시킵니다.
+    """
+    stats = QueryStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+    if budget is not None:
+        _check_budget(stats, budget)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int, label: str = "block") -> Iterator[QueryStats]:
+    """테스트에서 특정 호출의 쿼리 수 상한을 단언할 때 사용 (엄격 모드와 무관하게 항상 예외)"""
+    with track_queries(label) as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{label}: {stats.count} queries executed (budget {max_queries})"
+        )
+
+
+def _check_budget(stats: QueryStats, budget: int) -> None:
+    if stats.count <= budget:
+        return
+    message = f"Query budget exceeded for {stats.label}: {stats.count} queries (budget {budget}), {stats.duration * 1000:.1f}ms in DB"
+    if settings.DB_QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class QueryCountMiddleware:
+    """
+    요청마다 SQL 실행 수/DB 시간을 집계하는 순수 ASGI 미들웨어.
+    - 라우트별 예산(ENDPOINT_QUERY_BUDGETS) 초과 시 경고 로그 (엄격 모드에서는 예외)
+    - DEBUG 모드에서는 Server-Timing 헤더로 브라우저 개발자도구에 DB 시간을 노출
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope["path"])
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if settings.DEBUG and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+
+        route_path = getattr(scope.get("route"), "path", None)
+        if route_path:
+            stats.label = f'{scope["method"]} {route_path}'
+            _check_budget(stats, ENDPOINT_QUERY_BUDGETS.get(route_path, settings.DB_QUERY_BUDGET))
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.metrics import BACKGROUND_TASK_RESTARTS
+
+logger = logging.getLogger(__name__)
+
+# 감독 대상 루프: 종료 신호(stopping)를 받아, 신호가 올 때까지 돌다가 정상 반환해야 함
+LoopFactory = Callable[[asyncio.Event], Awaitable[None]]
+
+
+@dataclass
+class TaskState:
+    name: str
+    factory: LoopFactory
+    status: str = "pending"  # pending | running | restarting | stopped | cancelled
+    restarts: int = 0
+    running_since: Optional[datetime] = None
+    last_error: Optional[str] = None
+    last_error_at: Optional[datetime] = None
+    task: Optional["asyncio.Task[None]"] = None
+
+
+class TaskSupervisor:
+    """
+    FastAPI lifespan이 소유하는 백그라운드 루프 감독자.
+    - 루프가 예외로 죽으면 지수 백오프(최대 backoff_max_seconds) 후 재시작
+    - 종료 시 stopping 이벤트로 새 작업 시작을 멈추고, 진행 중인 작업은 grace 시간 안에서 마무리 후 취소
+    - 종료 시 등록된 정리 콜백(HTTP 클라이언트/엔진 close)을 역순으로 실행
+    """
+    def __init__(self, backoff_initial_seconds: float = 1.0, backoff_max_seconds: float = 300.0):
+        self.backoff_initial_seconds = backoff_initial_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.stopping = asyncio.Event()
+        self._tasks: Dict[str, TaskState] = {}
+        self._cleanups: List[Callable[[], Awaitable[None]]] = []
+
+    def start(self, name: str, factory: LoopFactory) -> None:
+        state = TaskState(name=name, factory=factory)
+        state.task = asyncio.create_task(self._supervise(state), name=f"supervised:{name}")
+        self._tasks[name] = state
+
+    def add_cleanup(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._cleanups.append(callback)
+
+    async def _supervise(self, state: TaskState) -> None:
+        failures = 0
+        while not self.stopping.is_set():
+            state.status = "running"
+            state.running_since = datetime.now(timezone.utc)
+            try:
+                await state.factory(self.stopping)
+                if self.stopping.is_set():
+                    break
+                state.last_error = "loop exited unexpectedly"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Background task '{state.name}' crashed")
+                state.last_error = f"{type(e).__name__}: {e}"
+            state.last_error_at = datetime.now(timezone.utc)
+
+            # 충분히 오래 정상 동작한 뒤의 실패는 새로운 장애로 보고 백오프를 처음부터 다시 시작
+            uptime = (state.last_error_at - state.running_since).total_seconds()
+            failures = 1 if uptime > self.backoff_max_seconds else failures + 1
+            delay = min(self.backoff_max_seconds, self.backoff_initial_seconds * 2 ** (failures - 1))
+
+            state.restarts += 1
+            state.status = "restarting"
+            BACKGROUND_TASK_RESTARTS.labels(state.name).inc()
+            logger.warning(f"Restarting '{state.name}' in {delay:.1f}s (restart #{state.restarts})")
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        state.status = "stopped"
+
+    async def shutdown(self, grace_seconds: float) -> None:
+        """진행 중인 작업을 grace_seconds 동안 기다린 뒤 남은 태스크를 취소하고 정리 콜백을 실행합니다."""
+        self.stopping.set()
+        tasks = [state.task for state in self._tasks.values() if state.task]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=grace_seconds)
+            for state in self._tasks.values():
+                if state.task in pending:
+                    logger.warning(f"Background task '{state.name}' did not finish within {grace_seconds}s; cancelling")
+                    state.task.cancel()
+                    state.status = "cancelled"
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for callback in reversed(self._cleanups):
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Shutdown cleanup failed: {e}")
+
+    @property
+    def healthy(self) -> bool:
+        return all(state.status == "running" for state in self._tasks.values()) or self.stopping.is_set()
+
+    def health(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "status": state.status,
+                "restarts": state.restarts,
+                "running_since": state.running_since.isoformat() if state.running_since else None,
+                "last_error": state.last_error,
+                "last_error_at": state.last_error_at.isoformat() if state.last_error_at else None,
+            }
+            for name, state in self._tasks.items()
+        }
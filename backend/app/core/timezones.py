@@ -0,0 +1,56 @@
+"""
+유저별 시간대(IANA 이름, 예: Asia/Seoul) 기준 날짜 계산 헬퍼.
+캘린더/히스토리/통계/캡슐의 '하루'는 모두 여기서 계산한 경계를 사용합니다.
+"""
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.core.config import settings
+
+DEFAULT_TIMEZONE = settings.DEFAULT_TIMEZONE
+
+
+@lru_cache(maxsize=None)  # IANA 시간대는 ~600개로 한정
+def _load_zone(name: str) -> Optional[tzinfo]:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def is_valid_timezone(name: str) -> bool:
+    return bool(name) and _load_zone(name) is not None
+
+
+def get_zone(name: Optional[str]) -> tzinfo:
+    """시간대 객체 (저장값이 비었거나 알 수 없는 이름이면 DEFAULT_TIMEZONE)"""
+    return (_load_zone(name) if name else None) or _load_zone(DEFAULT_TIMEZONE)
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite는 timezone 정보 없이 돌려주므로 UTC로 간주
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=8192)
+def day_start_utc(tz_name: Optional[str], day: date) -> datetime:
+    """
+    해당 시간대에서 day가 시작되는 시각(UTC).
+    Why: 캘린더/통계가 같은 (시간대, 날짜) 경계를 반복 계산하므로 캐시 — DST로 23/25시간인 날도 정확
+    """
+    return datetime(day.year, day.month, day.day, tzinfo=get_zone(tz_name)).astimezone(timezone.utc)
+
+
+def day_range_utc(tz_name: Optional[str], first_day: date, last_day: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """[first_day 시작, last_day 다음 날 시작) — listened_at 범위 조건에 그대로 사용"""
+    return day_start_utc(tz_name, first_day), day_start_utc(tz_name, (last_day or first_day) + timedelta(days=1))
+
+
+def local_date(value: datetime, tz_name: Optional[str]) -> date:
+    return as_utc(value).astimezone(get_zone(tz_name)).date()
+
+
+def local_today(tz_name: Optional[str], now: Optional[datetime] = None) -> date:
+    return local_date(now or datetime.now(timezone.utc), tz_name)
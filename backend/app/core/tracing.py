@@ -0,0 +1,90 @@
+import hashlib
+import json
+import logging
+import threading
+import uuid
+from typing import Sequence, Union
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 스팬 생성은 OpenTelemetry API만 사용 — TracerProvider가 설정되지 않으면 no-op이라 비용이 거의 없음
+tracer = trace.get_tracer("auditory-diary")
+
+
+def hash_user_id(user_id: Union[uuid.UUID, str]) -> str:
+    """트레이스에 원본 user_id를 남기지 않도록 짧은 해시로 변환"""
+    return hashlib.sha256(str(user_id).encode()).hexdigest()[:16]
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """
+    완료된 스팬을 한 줄에 하나씩 JSON으로 파일에 기록하는 익스포터.
+    콜렉터 없이도 `jq` 등으로 트레이스를 오프라인 분석할 수 있습니다.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = []
+        for span in spans:
+            ctx = span.get_span_context()
+            lines.append(json.dumps({
+                "trace_id": format(ctx.trace_id, "032x"),
+                "span_id": format(ctx.span_id, "016x"),
+                "parent_span_id": format(span.parent.span_id, "016x") if span.parent else None,
+                "name": span.name,
+                "start_time_unix_nano": span.start_time,
+                "duration_ms": (span.end_time - span.start_time) / 1e6 if span.end_time else None,
+                "status": span.status.status_code.name,
+                "attributes": dict(span.attributes or {}),
+            }, ensure_ascii=False, default=str))
+
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.error(f"Failed to write spans to {self.path}: {e}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def setup_tracing() -> None:
+    """
+    TRACING_EXPORTER 설정에 따라 TracerProvider를 구성합니다.
+    - "": 비활성화 (기본값, 모든 스팬은 no-op)
+    - "jsonl": TRACING_JSONL_PATH 파일에 JSON-lines로 기록
+    - "otlp": OTEL_EXPORTER_OTLP_ENDPOINT의 로컬 콜렉터로 전송 (opentelemetry-exporter-otlp 필요)
+    """
+    exporter_name = settings.TRACING_EXPORTER.lower()
+    if not exporter_name:
+        return
+
+    if exporter_name == "jsonl":
+        exporter = JsonLinesSpanExporter(settings.TRACING_JSONL_PATH)
+    elif exporter_name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("opentelemetry-exporter-otlp is not installed. Tracing disabled.")
+            return
+        exporter = OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT)
+    else:
+        logger.warning(f"Unknown TRACING_EXPORTER '{exporter_name}'. Tracing disabled.")
+        return
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.PROJECT_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    logger.info(f"Tracing enabled ({exporter_name})")
+
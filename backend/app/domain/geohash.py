@@ -0,0 +1,106 @@
+"""
+지오해시 — 위도/경도를 base32 문자열로 인코딩한 공간 키.
+앞자리가 같을수록 가까운 칸이므로, 영역 검색은 '칸 접두사로 시작하는 문자열 범위' 몇 개로 바뀌어
+PostgreSQL/SQLite 공통의 일반 B-tree 인덱스로 처리됩니다. (PostGIS/R*Tree 없이)
+"""
+import math
+from typing import List, Optional, Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# 저장 정밀도 — 9자리 ≈ 4.8m × 4.8m 칸 (GPS 오차 수준)
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_M = 6_371_008.8
+
+BoundingBox = Tuple[float, float, float, float]  # (min_lat, min_lon, max_lat, max_lon)
+
+
+def encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True  # 짝수 번째 비트는 경도
+    while len(chars) < precision:
+        bounds, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (bounds[0] + bounds[1]) / 2
+        if coordinate >= middle:
+            value = value * 2 + 1
+            bounds[0] = middle
+        else:
+            value *= 2
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def encode_coordinates(latitude: Optional[float], longitude: Optional[float]) -> Optional[str]:
+    """다이어리 저장용 — context에 좌표가 없으면(스크로블/기록 가져오기) None"""
+    if latitude is None or longitude is None:
+        return None
+    return encode(latitude, longitude)
+
+
+def cell_size_deg(precision: int) -> Tuple[float, float]:
+    """precision자리 칸의 (위도 폭, 경도 폭) — 비트는 경도부터 번갈아 배정"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def bounding_box(latitude: float, longitude: float, radius_m: float) -> BoundingBox:
+    """중심에서 반경 radius_m 원을 감싸는 위도/경도 사각형 (극/날짜변경선 부근은 범위를 잘라냄)"""
+    lat_delta = math.degrees(radius_m / EARTH_RADIUS_M)
+    lon_delta = lat_delta / max(math.cos(math.radians(latitude)), 1e-6)
+    return (
+        max(latitude - lat_delta, -90.0), max(longitude - lon_delta, -180.0),
+        min(latitude + lat_delta, 90.0), min(longitude + lon_delta, 180.0),
+    )
+
+
+def covering_prefixes(box: BoundingBox, max_cells: int = 16) -> List[str]:
+    """
+    사각형을 덮는 지오해시 칸 접두사 목록 — 칸 수가 max_cells 이하인 가장 긴(작은 칸) 정밀도를 고름.
+    Why: 칸이 너무 크면 인덱스가 반경 밖 행까지 읽고, 너무 작으면 범위 조건이 많아짐
+    """
+    min_lat, min_lon, max_lat, max_lon = box
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lon_step = cell_size_deg(precision)
+        rows = math.floor(max_lat / lat_step) - math.floor(min_lat / lat_step) + 1
+        columns = math.floor(max_lon / lon_step) - math.floor(min_lon / lon_step) + 1
+        if rows * columns <= max_cells or precision == 1:
+            break
+    prefixes = set()
+    for row in range(rows):
+        latitude = min(min_lat + row * lat_step, max_lat)
+        for column in range(columns):
+            longitude = min(min_lon + column * lon_step, max_lon)
+            prefixes.add(encode(latitude, longitude, precision))
+    # 칸 폭 단위로 걸으면 마지막 행/열 칸을 건너뛸 수 있어 모서리는 직접 포함
+    for latitude in (min_lat, max_lat):
+        for longitude in (min_lon, max_lon):
+            prefixes.add(encode(latitude, longitude, precision))
+    return sorted(prefixes)
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    prefix로 시작하는 모든 지오해시보다 큰 가장 작은 문자열 — [prefix, 상한) 범위 조건에 사용.
+    마지막 글자를 BASE32 다음 글자로 올리고('z'면 앞자리로 올림), 모두 'z'면 상한 없음(None)
+    """
+    chars = list(prefix)
+    while chars:
+        index = BASE32.index(chars[-1])
+        if index + 1 < len(BASE32):
+            chars[-1] = BASE32[index + 1]
+            return "".join(chars)
+        chars.pop()
+    return None
+
+
+def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """두 지점 사이 대원 거리(m, haversine)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi, d_lambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
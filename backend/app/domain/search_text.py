@@ -0,0 +1,62 @@
+import unicodedata
+from typing import List, Optional, Tuple
+
+# 트라이그램 인덱스(pg_trgm / FTS5 trigram)가 쓸 수 있는 최소 검색어 길이
+MIN_INDEXED_TERM_LENGTH = 3
+MAX_SEARCH_TERMS = 8
+
+# 자동 기록(동기화/스크로블/기록 가져오기)에 일괄로 붙는 장소명 — 거의 모든 문서에 들어가 검색 의미 없이 인덱스만 키움
+UNINDEXED_PLACE_NAMES = frozenset({"Spotify에서 재생"})
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """
+    검색용 정규화 — NFKC(전각/호환 문자, 분리된 한글 자모 결합) + casefold.
+    문서와 검색어에 같은 규칙을 적용해 'ＩＵ'/'iu', 조합형/완성형 한글이 서로 검색되도록 함
+    """
+    return unicodedata.normalize("NFKC", value or "").casefold().strip()
+
+
+def build_search_document(
+    memo: Optional[str], title: Optional[str], artist: Optional[str], place_name: Optional[str]
+) -> str:
+    """
+    다이어리 1건의 검색 문서 (메모/곡 제목/아티스트/장소를 줄바꿈으로 연결).
+    Why: 검색 대상이 세 테이블에 흩어져 있어, 쓰기 시점에 한 컬럼으로 모아 두고 그 컬럼 하나에만 인덱스를 검
+    """
+    if place_name in UNINDEXED_PLACE_NAMES:
+        place_name = None
+    return "\n".join(normalize_text(part) for part in (memo, title, artist, place_name))
+
+
+def parse_search_terms(query: str) -> Tuple[List[str], List[str]]:
+    """
+    검색어 → (인덱스로 찾을 단어, 부분 문자열로만 거를 짧은 단어). 모든 단어를 포함하는 기록만 결과에 포함(AND).
+    트라이그램은 3글자 미만 단어('비', '바다')를 인덱스로 찾을 수 없으므로 따로 분리
+    """
+    terms = list(dict.fromkeys(normalize_text(query).split()))[:MAX_SEARCH_TERMS]
+    indexed = [term for term in terms if len(term) >= MIN_INDEXED_TERM_LENGTH]
+    short = [term for term in terms if len(term) < MIN_INDEXED_TERM_LENGTH]
+    return indexed, short
+
+
+def search_phrase(query: str) -> str:
+    """검색어 전체를 정규화하고 공백을 하나로 줄인 구문 — 단어들이 입력한 그대로 이어진 기록에 가산점을 줄 때 사용"""
+    return " ".join(normalize_text(query).split())
+
+
+def _fts5_quote(term: str) -> str:
+    # 큰따옴표 구문으로 감싸 연산자(AND/OR/NEAR, '-', '*')로 해석되지 않게 함
+    return '"' + term.replace('"', '""') + '"'
+
+
+def fts5_match_expression(terms: List[str], phrase: str = "") -> str:
+    """
+    FTS5 MATCH 식 — 모든 단어를 포함(AND).
+    phrase가 단어들과 다르면 'OR 구문'을 덧붙임: 구문이 있는 문서는 이미 모든 단어를 포함하므로 결과 집합은 그대로이고,
+    bm25만 구문이 그대로 이어진 기록('artist 15')을 흩어진 기록보다 위로 올림
+    """
+    expression = " AND ".join(_fts5_quote(term) for term in terms)
+    if phrase and phrase not in terms:
+        expression = f"({expression}) OR {_fts5_quote(phrase)}"
+    return expression
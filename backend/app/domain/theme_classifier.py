@@ -0,0 +1,128 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Daily Capsule 테마 (aura = 어느 테마 키워드에도 걸리지 않을 때의 기본값)
+SCORED_THEMES: Tuple[str, ...] = ("y2k", "midnight", "editorial")  # 동점이면 앞쪽 테마 우선
+DEFAULT_THEME = "aura"
+
+# 장르 키워드 → 테마별 가중치 (도메인 정책)
+# 장르 문자열에 키워드가 포함되면 해당 테마에 가중치를 더함 ("k-pop", "indie pop"처럼 세분화된 장르도 매칭)
+# Why: 'pop'/'indie'는 거의 모든 세부 장르에 붙는 넓은 태그라 다른 단서보다 약하게 반영
+THEME_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "hip hop": {"y2k": 1.0},
+    "rap": {"y2k": 1.0},
+    "dance": {"y2k": 1.0},
+    "techno": {"y2k": 1.0},
+    "electronic": {"y2k": 1.0},
+    "house": {"y2k": 1.0},
+    "idol": {"y2k": 1.0},
+    "pop": {"y2k": 0.5},
+    "r&b": {"midnight": 1.0},
+    "soul": {"midnight": 1.0},
+    "jazz": {"midnight": 1.0},
+    "indie": {"midnight": 0.5},
+    "ambient": {"midnight": 1.0},
+    "lo-fi": {"midnight": 1.0},
+    "chill": {"midnight": 1.0},
+    "blues": {"midnight": 1.0},
+    "acoustic": {"editorial": 1.0},
+    "folk": {"editorial": 1.0},
+    "classical": {"editorial": 1.0},
+    "piano": {"editorial": 1.0},
+    "ost": {"editorial": 1.0},
+    "singer-songwriter": {"editorial": 1.0},
+}
+
+ThemeVector = Tuple[float, ...]  # SCORED_THEMES 순서의 테마별 점수
+
+
+class ThemeClassifier:
+    """
+    장르 → 테마 벡터 분류기.
+    장르 문자열마다 테마 벡터를 한 번만 계산해 두고(어휘 캐시), 하루의 점수는
+    아티스트별 재생 수 × 아티스트 장르 벡터 합으로 구합니다.
+
+        classifier.classify({"IU": ["k-pop"], "Norah Jones": ["jazz"]}, {"IU": 3, "Norah Jones": 5})
+    """
+    def __init__(self, keywords: Mapping[str, Mapping[str, float]] = THEME_KEYWORDS, vocabulary_size: int = 16384):
+        # 키워드를 테마별 (키워드, 가중치) 목록으로 미리 펼쳐 둠
+        self._keywords_by_theme = [
+            [(keyword, weights[theme]) for keyword, weights in keywords.items() if theme in weights]
+            for theme in SCORED_THEMES
+        ]
+        # Why: Spotify 장르 어휘는 수천 개로 한정 — 같은 장르 태그의 부분 문자열 검사를 반복하지 않도록 캐시
+        self.genre_vector = lru_cache(maxsize=vocabulary_size)(self._genre_vector)
+
+    def _genre_vector(self, genre: str) -> ThemeVector:
+        # 테마별로 매칭된 키워드 중 가장 큰 가중치 (한 장르가 같은 테마 키워드 여러 개에 걸려도 한 번만 반영)
+        g = genre.lower()
+        return tuple(
+            max((weight for keyword, weight in keywords if keyword in g), default=0.0)
+            for keywords in self._keywords_by_theme
+        )
+
+    def artist_vector(self, genres: Sequence[str]) -> ThemeVector:
+        """아티스트의 장르 벡터 합 (재생 1회당 점수)"""
+        vectors = [self.genre_vector(genre) for genre in genres]
+        return tuple(map(sum, zip(*vectors))) if vectors else (0.0,) * len(SCORED_THEMES)
+
+    def scores(
+        self, genres_map: Mapping[str, Sequence[str]], artist_plays: Optional[Mapping[str, int]] = None
+    ) -> ThemeVector:
+        """
+        genres_map(아티스트 → 장르 목록)의 테마 점수. artist_plays를 주면 아티스트별 재생 수로 가중
+        (없거나 목록에 없는 아티스트는 1회로 간주)
+        """
+        return self._weighted_sum(
+            {artist: self.artist_vector(genres) for artist, genres in genres_map.items()}, artist_plays
+        )
+
+    def classify(
+        self, genres_map: Mapping[str, Sequence[str]], artist_plays: Optional[Mapping[str, int]] = None
+    ) -> str:
+        return pick_theme(self.scores(genres_map, artist_plays))
+
+    def classify_days(
+        self, genres_map: Mapping[str, Sequence[str]], days: Iterable[Mapping[str, int]]
+    ) -> List[str]:
+        """
+        여러 날(또는 기간)을 한 번에 분류 — 각 원소는 그날의 아티스트별 재생 수.
+        아티스트 벡터를 한 번만 계산해 모든 날에서 재사용 (백필/연말 결산용)
+        """
+        artist_vectors = {artist: self.artist_vector(genres) for artist, genres in genres_map.items()}
+        return [pick_theme(self._weighted_sum(artist_vectors, plays, only_played=True)) for plays in days]
+
+    @staticmethod
+    def _weighted_sum(
+        artist_vectors: Mapping[str, ThemeVector],
+        artist_plays: Optional[Mapping[str, int]],
+        only_played: bool = False,
+    ) -> ThemeVector:
+        totals = [0.0] * len(SCORED_THEMES)
+        if only_played:
+            # 그날 들은 아티스트만 순회 (전체 장르 맵보다 훨씬 작음)
+            items = ((artist_vectors.get(artist), plays) for artist, plays in artist_plays.items())
+        else:
+            items = (
+                (vector, artist_plays.get(artist, 1) if artist_plays is not None else 1)
+                for artist, vector in artist_vectors.items()
+            )
+        for vector, plays in items:
+            if vector is None:
+                continue
+            for i, score in enumerate(vector):
+                if score:
+                    totals[i] += score * plays
+        return tuple(totals)
+
+
+def pick_theme(scores: ThemeVector) -> str:
+    """가장 높은 점수의 테마 (동점이면 SCORED_THEMES 순서, 모두 0이면 aura) — 입력 순서와 무관하게 결정적"""
+    best_theme, best_score = DEFAULT_THEME, 0.0
+    for theme, score in zip(SCORED_THEMES, scores):
+        if score > best_score:
+            best_theme, best_score = theme, score
+    return best_theme
+
+
+theme_classifier = ThemeClassifier()
@@ -1,30 +1,90 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-import os
 
+from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.query_counter import instrument_query_counter
 
-# TODO: pydantic-settings 등 환경 변수 관리 도구로 이동 권장
-DATABASE_URL = os.getenv(
-    "DATABASE_URL", 
-    "sqlite+aiosqlite:///./auditory_diary.db"
-)
+
+def normalize_database_url(url: str) -> str:
+    # Render 등에서 제공하는 postgres:// URL을 asyncpg용으로 변환 (필요시)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+DATABASE_URL = normalize_database_url(settings.DATABASE_URL)
+DATABASE_READ_URL = normalize_database_url(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else None
+
+
+def build_engine_options(url: str) -> tuple[str, dict]:
+    """
+    DB 종류별 엔진 URL/옵션을 구성합니다.
+    - PostgreSQL: 커넥션 풀 크기/재활용/pre-ping + prepared statement 캐시 (실행 계획은 custom plan)
+    - SQLite: 기본 풀 유지 (파일 락 특성상 풀을 키워도 이득이 없음)
+    """
+    engine_kwargs = {"echo": False, "future": True}
+
+    # SQLite 사용 시에만 필요한 커넥션 인자 (PostgreSQL에서는 에러남)
+    if "sqlite" in url:
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+        return url, engine_kwargs
+
+    engine_kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+    if "asyncpg" in url:
+        # statement_cache_size: asyncpg 커넥션 단위 캐시 / prepared_statement_cache_size: SQLAlchemy 방언 단위 캐시
+        engine_kwargs["connect_args"] = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+        if settings.DB_PLAN_CACHE_MODE:
+            # 파싱은 캐시로 아끼고 실행 계획은 매번 실제 값으로 (generic plan은 검색어 선택도를 모름)
+            engine_kwargs["connect_args"]["server_settings"] = {"plan_cache_mode": settings.DB_PLAN_CACHE_MODE}
+        url = make_url(url).update_query_dict(
+            {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)}
+        ).render_as_string(hide_password=False)
+
+    return url, engine_kwargs
 
 
-# Render 등에서 제공하는 postgres:// URL을 asyncpg용으로 변환 (필요시)
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+asyncpg://", 1)
-elif DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+def _register_sqlite_pragmas(engine) -> None:
+    """
+    SQLite 커넥션이 열릴 때마다 WAL + synchronous=NORMAL + busy_timeout을 설정합니다.
+    Why: 기본 rollback journal 모드에서는 스크로블러가 쓰는 동안 읽기 요청이 'database is locked'로 실패함
+    """
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if settings.SQLITE_WAL_MODE:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.close()
+
 
+def _create_engine(url: str):
+    engine_url, engine_kwargs = build_engine_options(url)
+    new_engine = create_async_engine(engine_url, **engine_kwargs)
+    if "sqlite" in url:
+        _register_sqlite_pragmas(new_engine)
+    instrument_engine(new_engine)
+    instrument_query_counter(new_engine)
+    return new_engine
 
-engine_kwargs = {"echo": False, "future": True}
-# SQLite 사용 시에만 필요한 커넥션 인자 (PostgreSQL에서는 에러남)
-if "sqlite" in DATABASE_URL:
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
 
+# 비동기 엔진 생성 (primary: 모든 쓰기 + read-your-writes 경로)
+engine = _create_engine(DATABASE_URL)
 
-# 비동기 엔진 생성
-engine = create_async_engine(DATABASE_URL, **engine_kwargs)
+# 읽기 전용 복제본 엔진 — 설정이 없으면 primary를 그대로 사용
+read_engine = _create_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
 
 
 # 비동기 세션 팩토리
@@ -34,6 +94,13 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False
 )
 
+# 읽기 전용 세션 팩토리 (복제 지연이 있으므로 방금 쓴 데이터를 바로 읽어야 하는 경로에는 사용 금지)
+AsyncReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
 
 async def get_db_session() -> AsyncSession:
     """
@@ -41,3 +108,12 @@ async def get_db_session() -> AsyncSession:
     """
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_db_session() -> AsyncSession:
+    """
+    조회 전용 엔드포인트(캘린더, 히스토리, 캡슐 조회)용 세션 제너레이터.
+    DATABASE_READ_URL이 설정되어 있으면 복제본으로, 아니면 primary로 라우팅됩니다.
+    """
+    async with AsyncReadSessionLocal() as session:
+        yield session
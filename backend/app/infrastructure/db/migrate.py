@@ -0,0 +1,183 @@
+"""
+DB 스키마 생성 단계 (배포 시 1회 실행).
+
+    cd backend && python -m app.infrastructure.db.migrate
+
+Why: 서버 기동(on_startup)마다 create_all을 돌리면 콜드 스타트 때마다 테이블 존재 확인 쿼리가
+첫 요청 앞에 끼어들고, gunicorn 워커 수만큼 중복 실행됩니다. 스키마 준비는 배포 단계로 분리합니다.
+create_all은 이미 있는 테이블을 건드리지 않으므로 여러 번 실행해도 안전합니다.
+(기존 테이블에 나중에 추가된 컬럼/인덱스는 create_all이 만들지 않으므로 따로 추가)
+
+무료 플랜처럼 배포 단계가 없는 환경은 gunicorn 기동 시 ensure_schema()로 schema_version 1행만 비교하고,
+모델이 바뀐 배포 직후에만 create_schema()를 실행합니다 (gunicorn.conf.py).
+"""
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import inspect
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.future import select
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.database import AsyncSessionLocal, engine
+# models 들이 import 되어야 Base.metadata에 등록됨
+from app.infrastructure.db import models, user_models  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# 모델 DDL로 드러나지 않는 마이그레이션 변경(백필 로직, FTS 트리거 등)을 배포하면 올림 — 다음 기동 때 create_schema 전체 실행
+SCHEMA_REVISION = 1
+
+
+def schema_fingerprint(dialect) -> str:
+    """현재 모델의 CREATE TABLE/INDEX DDL(방언별) + SCHEMA_REVISION의 sha256 — 테이블/컬럼/인덱스가 바뀌면 달라짐"""
+    digest = hashlib.sha256(f"revision:{SCHEMA_REVISION}".encode())
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    if dialect.name == "sqlite":
+        for statement in models._SQLITE_FTS_DDL:
+            digest.update(statement.encode())
+    return digest.hexdigest()
+
+
+def _add_missing_columns(sync_conn) -> None:
+    """
+    기존 테이블에 모델에만 있는 컬럼을 ALTER TABLE ADD COLUMN으로 추가합니다.
+    (NOT NULL 컬럼은 server_default가 있어야 기존 행을 채울 수 있음)
+    """
+    inspector = inspect(sync_conn)
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} " \
+                  f"{column.type.compile(sync_conn.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT '{column.server_default.arg}'"
+            if not column.nullable and column.server_default is not None:
+                ddl += " NOT NULL"
+            sync_conn.exec_driver_sql(ddl)
+            logger.info(f"Added column {table.name}.{column.name}")
+
+
+def _create_missing_indexes(sync_conn) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
+async def _backfill_local_dates() -> None:
+    """local_date 컬럼 추가 전 기록을 유저 시간대 기준 날짜로 채움 (이미 채워진 행은 건너뛰므로 재실행 안전)"""
+    from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
+
+    async with AsyncSessionLocal() as session:
+        users = (await session.execute(
+            select(user_models.UserORM.id, user_models.UserORM.timezone)
+            .where(select(models.AuditoryDiaryORM.id).where(
+                models.AuditoryDiaryORM.user_id == user_models.UserORM.id,
+                models.AuditoryDiaryORM.local_date.is_(None),
+            ).exists())
+        )).all()
+        for user_id, timezone_name in users:
+            updated = await AuditoryDiaryRepository(session).rebucket_local_dates(
+                user_id, timezone_name, only_missing=True
+            )
+            logger.info(f"Backfilled local_date for {updated} diaries of user {user_id} ({timezone_name})")
+
+
+async def _backfill_search_documents() -> None:
+    """search_document 컬럼 추가 전 기록의 검색 문서를 채움 (SQLite는 트리거가 FTS5 인덱스에 반영)"""
+    from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
+
+    async with AsyncSessionLocal() as session:
+        updated = await AuditoryDiaryRepository(session).backfill_search_documents()
+    if updated:
+        logger.info(f"Backfilled search_document for {updated} diaries")
+
+
+async def _backfill_geohashes() -> None:
+    """geohash 컬럼 추가 전 좌표가 있는 기록의 지오해시를 채움"""
+    from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
+
+    async with AsyncSessionLocal() as session:
+        updated = await AuditoryDiaryRepository(session).backfill_geohashes()
+    if updated:
+        logger.info(f"Backfilled geohash for {updated} diaries")
+
+
+async def _backfill_listening_rollups() -> None:
+    """청취 통계 롤업(listening_hourly)이 없는 유저(테이블 추가 전 기록, Core INSERT로 시드한 기록)의 롤업을 다이어리에서 계산"""
+    from app.infrastructure.repositories.stats_repository import StatsRepository
+
+    async with AsyncSessionLocal() as session:
+        user_ids = (await session.execute(
+            select(user_models.UserORM.id).where(
+                select(models.AuditoryDiaryORM.id).where(
+                    models.AuditoryDiaryORM.user_id == user_models.UserORM.id
+                ).exists(),
+                ~select(models.ListeningHourlyORM.user_id).where(
+                    models.ListeningHourlyORM.user_id == user_models.UserORM.id
+                ).exists(),
+            )
+        )).scalars().all()
+        for user_id in user_ids:
+            buckets = await StatsRepository(session).rebuild_listening_rollup([user_id])
+            logger.info(f"Backfilled {buckets} listening_hourly buckets for user {user_id}")
+
+
+async def create_schema() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
+        # 기존 SQLite DB에는 테이블 생성 이벤트가 다시 오지 않으므로 FTS5 검색 인덱스를 직접 확인/생성
+        await conn.run_sync(models.install_sqlite_search_index)
+    await _backfill_local_dates()
+    await _backfill_search_documents()
+    await _backfill_geohashes()
+    await _backfill_listening_rollups()
+    async with AsyncSessionLocal() as session:
+        await session.merge(models.SchemaVersionORM(
+            id=1, fingerprint=schema_fingerprint(engine.dialect), applied_at=datetime.now(timezone.utc),
+        ))
+        await session.commit()
+    await engine.dispose()
+
+
+async def _schema_is_current() -> bool:
+    async with AsyncSessionLocal() as session:
+        try:
+            applied = (await session.execute(
+                select(models.SchemaVersionORM.fingerprint).where(models.SchemaVersionORM.id == 1)
+            )).scalar_one_or_none()
+        except DBAPIError:
+            # schema_version 테이블이 없음 (빈 DB, 또는 이 단계가 생기기 전에 만든 DB)
+            return False
+    return applied == schema_fingerprint(engine.dialect)
+
+
+async def ensure_schema() -> bool:
+    """
+    기동 경로용: 스키마 지문이 같으면 쿼리 1번으로 끝내고, 다르면 create_schema()를 실행합니다. 실행했으면 True
+    Why: create_schema는 테이블마다 컬럼/인덱스 확인 + 백필 스캔이라 슬립 후 재기동마다 돌리면 콜드 스타트에 ~1s가 더해짐
+    """
+    if await _schema_is_current():
+        await engine.dispose()
+        return False
+    await create_schema()
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(create_schema())
+    logger.info(f"Schema is up to date ({engine.url.get_backend_name()}): {', '.join(sorted(Base.metadata.tables))}")
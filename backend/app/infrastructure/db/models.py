@@ -1,4 +1,10 @@
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Uuid, Date, Text, UniqueConstraint
+from sqlalchemy import (
+    Column, String, Float, Integer, DateTime, ForeignKey, Uuid, Date, Text, UniqueConstraint, Index, JSON,
+    DDL, event, func, literal_column,
+)
+# func.to_tsvector 등이 PostgreSQL 전문 검색 함수로 등록되도록 인덱스 정의보다 먼저 import
+# (database.py보다 models가 먼저 import 되는 경로에서 CREATE INDEX 컴파일이 실패하지 않도록)
+import sqlalchemy.dialects.postgresql  # noqa: F401
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
@@ -36,7 +42,14 @@ class AuditoryDiaryORM(Base):
     context_id = Column(Uuid(as_uuid=True), ForeignKey("contexts.id"), nullable=False)
     
     listened_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    # 유저 시간대 기준 날짜 (쓰기 시점에 계산, 시간대 변경 시 재계산) — 하루 조회를 (user_id, local_date) 동등 조건으로
+    local_date = Column(Date, nullable=True)
     memo = Column(String, nullable=True)
+    # 검색 문서 (메모/곡 제목/아티스트/장소를 정규화해 연결, app.domain.search_text) — 쓰기 시점에 갱신
+    search_document = Column(Text, nullable=True)
+    # context 좌표의 지오해시 (app.domain.geohash, 쓰기 시점에 계산, 좌표 없으면 NULL)
+    # Why: contexts에는 user_id가 없어, 다이어리에 두어야 (user_id, geohash) 인덱스 하나로 '내 기록 중 이 근처'를 찾음
+    geohash = Column(String(12), nullable=True)
     
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
@@ -44,6 +57,106 @@ class AuditoryDiaryORM(Base):
     track = relationship("TrackORM", backref="diaries")
     context = relationship("ContextORM", backref="diaries")
 
+    __table_args__ = (
+        # 유저별 기간 조회(캘린더/히스토리/가져오기 중복 검사)가 user_id 인덱스 스캔 후 전체 필터링이 되지 않도록
+        # track_id/context_id까지 포함해 청취 통계의 트랙별 집계는 테이블을 읽지 않고 인덱스만으로 처리 (covering index)
+        Index('ix_auditory_diaries_user_listened_at_track', 'user_id', 'listened_at', 'track_id', 'context_id'),
+        Index('ix_auditory_diaries_user_local_date', 'user_id', 'local_date'),
+        # 주변 기록 검색: 반경을 덮는 지오해시 칸마다 유저의 접두사 범위만 읽음
+        Index('ix_auditory_diaries_user_geohash', 'user_id', 'geohash'),
+        # 트랙 카탈로그 캐시 워밍: 전체 유저의 최근 기록 N건을 인덱스 역순 스캔으로만 읽음 (테이블 크기와 무관)
+        Index('ix_auditory_diaries_listened_at_track', 'listened_at', 'track_id'),
+        # 전문 검색 (PostgreSQL): 단어 단위 tsvector + 부분 문자열(한국어 조사가 붙은 단어 등)용 트라이그램
+        # SQLite는 아래 FTS5 가상 테이블을 사용
+        Index(
+            'ix_auditory_diaries_search_tsv',
+            func.to_tsvector(literal_column("'simple'::regconfig"), search_document),
+            postgresql_using='gin',
+        ).ddl_if(dialect='postgresql'),
+        Index(
+            'ix_auditory_diaries_search_trgm', 'search_document',
+            postgresql_using='gin', postgresql_ops={'search_document': 'gin_trgm_ops'},
+        ).ddl_if(dialect='postgresql'),
+    )
+
+# pg_trgm은 트라이그램 인덱스(gin_trgm_ops)와 word_similarity()에 필요
+event.listen(
+    Base.metadata, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+# SQLite 전문 검색: auditory_diaries.search_document를 원본으로 하는 FTS5(trigram) 외부 콘텐츠 테이블.
+# 트리거가 INSERT/DELETE/검색 문서 UPDATE를 인덱스에 반영 (local_date 재계산 같은 다른 UPDATE는 건드리지 않음)
+# 주의: 외부 콘텐츠는 rowid로 연결되므로 VACUUM 후에는 'rebuild' 필요 (install_sqlite_search_index(rebuild=True))
+SQLITE_FTS_TABLE = "auditory_diaries_fts"
+_SQLITE_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+    "search_document, content='auditory_diaries', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON auditory_diaries "
+    f"WHEN new.search_document IS NOT NULL BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, search_document) VALUES (new.rowid, new.search_document); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON auditory_diaries "
+    f"WHEN old.search_document IS NOT NULL BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, search_document) "
+    f"VALUES ('delete', old.rowid, old.search_document); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE OF search_document ON auditory_diaries BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, search_document) "
+    f"SELECT 'delete', old.rowid, old.search_document WHERE old.search_document IS NOT NULL; "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, search_document) "
+    f"SELECT new.rowid, new.search_document WHERE new.search_document IS NOT NULL; END",
+)
+
+
+def install_sqlite_search_index(connection, rebuild: bool = False) -> None:
+    """FTS5 테이블/트리거를 만들고(이미 있으면 그대로), 새로 만들었거나 rebuild면 기존 행으로 인덱스를 채움"""
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SQLITE_FTS_TABLE,)
+    ).first() is not None
+    for statement in _SQLITE_FTS_DDL:
+        connection.exec_driver_sql(statement)
+    if rebuild or not exists:
+        connection.exec_driver_sql(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+
+event.listen(
+    AuditoryDiaryORM.__table__, "after_create",
+    lambda target, connection, **kw: install_sqlite_search_index(connection),
+)
+
+class ListeningHourlyORM(Base):
+    """
+    청취 통계용 롤업: 유저별 UTC 정시 버킷 → 재생 수. 다이어리 INSERT와 같은 트랜잭션에서 더해짐
+    Why: 1년치 히트맵/스트릭/주간 비교를 기록 수(수만 건) 대신 버킷 수(최대 8,760개)만 읽어 계산
+    """
+    __tablename__ = "listening_hourly"
+
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    hour_start = Column(DateTime(timezone=True), primary_key=True)  # UTC 정시
+    plays = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # 기본 키 인덱스에 plays까지 얹어 집계가 테이블을 읽지 않도록 (covering index)
+        Index('ix_listening_hourly_user_hour', 'user_id', 'hour_start', 'plays'),
+    )
+
+class ListeningWeatherHourlyORM(Base):
+    """
+    청취 통계용 롤업: 유저별 UTC 정시 버킷 × 날씨 → 재생 수 (listening_hourly와 같은 트랜잭션에서 더해짐)
+    Why: 날씨 분포를 기록마다 contexts를 조인하지 않고 계산. 시간 버킷 합계와 나눠 두어 히트맵 조회가 날씨 수만큼 늘어난 행을 읽지 않음
+    """
+    __tablename__ = "listening_hourly_weather"
+
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    hour_start = Column(DateTime(timezone=True), primary_key=True)  # UTC 정시
+    weather = Column(String, primary_key=True, default="")  # 날씨 없음은 '' (NULL은 기본 키에 둘 수 없음)
+    plays = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ix_listening_hourly_weather_user_hour', 'user_id', 'hour_start', 'weather', 'plays'),
+    )
+
 class DailyCapsuleORM(Base):
     __tablename__ = "daily_capsules"
 
@@ -60,3 +173,121 @@ class DailyCapsuleORM(Base):
     __table_args__ = (
         UniqueConstraint('user_id', 'target_date', name='uq_user_target_date'),
     )
+
+class PeriodCapsuleORM(Base):
+    """
+    주간/월간 캡슐. 원본 다이어리를 다시 읽지 않고, 기간 내 Daily Capsule + 청취 집계로 한 번의 LLM 호출로 생성.
+    진행 중인 기간에 만든 캡슐은 기간이 끝난 뒤 첫 요청에서 한 번 다시 생성됨 (created_at < 기간 끝)
+    """
+    __tablename__ = "period_capsules"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+
+    period = Column(String, nullable=False)  # week(월~일) | month
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)  # 마지막 날 (포함)
+    ai_summary = Column(Text, nullable=False)
+    representative_image_url = Column(String, nullable=True)
+    theme = Column(String, nullable=False, default="aura")
+    total_plays = Column(Integer, nullable=False, default=0)
+    daily_capsule_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'period', 'start_date', name='uq_user_period_start'),
+    )
+
+class HistoryImportORM(Base):
+    """
+    Spotify 스트리밍 기록(Extended streaming history) 가져오기 작업의 진행 상황 체크포인트.
+    rows_read는 배치 INSERT와 같은 트랜잭션에서 커밋되므로, 중단된 작업은 rows_read 이후 행부터 재개하면 됨
+    """
+    __tablename__ = "history_imports"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+
+    source_fingerprint = Column(String, nullable=False)  # 업로드 파일의 sha256 — 같은 파일 재업로드 시 이어서 진행
+    source_name = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending | running | completed | failed
+
+    rows_read = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_skipped = Column(Integer, nullable=False, default=0)  # 팟캐스트/30초 미만 재생/이미 기록된 재생
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'source_fingerprint', name='uq_user_history_source'),
+    )
+
+class YearInReviewORM(Base):
+    """
+    연말 결산(Year in Review) 결과. 오프라인 배치가 미리 만들어 두고, API는 (user_id, year) 1행만 읽습니다.
+    배치는 이 테이블에 행이 없는 유저만 처리하므로, 중단 후 다시 실행하면 남은 유저부터 이어서 진행됨
+    """
+    __tablename__ = "year_in_reviews"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+
+    year = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default="completed")  # completed | empty(그 해 청취 기록 없음)
+    payload = Column(JSON, nullable=False)  # Top 아티스트/트랙/장르, 최다 청취일, 테마 분포 등 (YearInReviewResponse 형태)
+    narrative = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'year', name='uq_user_year_in_review'),
+    )
+
+class IdempotencyKeyORM(Base):
+    """
+    쓰기 API의 Idempotency-Key 기록 (POST /api/diaries/). 같은 키의 재시도는 저장된 응답을 외부 호출 없이 돌려주고,
+    먼저 온 요청이 처리 중이면 끝나기를 기다림. 워커가 여러 개여도 이 행 하나로 처리 권한을 나눔
+    """
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+
+    request_fingerprint = Column(String, nullable=False)  # 요청 경로+본문 sha256 — 같은 키를 다른 요청에 재사용하면 거부
+    status = Column(String, nullable=False, default="in_progress")  # in_progress | completed
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(JSON, nullable=True)
+
+    # 처리 중 임대 만료 — 처리하던 워커가 죽어 in_progress로 남으면 이 시각 이후의 재시도가 이어받음
+    locked_until = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'key', name='uq_user_idempotency_key'),
+    )
+
+class WorkerLeaseORM(Base):
+    """
+    워커 간 단일 실행 임대 — gunicorn 워커가 여러 개여도 이름 하나당 한 워커만 백그라운드 작업(자동 스크로블)을 실행.
+    보유한 워커가 죽어 갱신이 끊기면 locked_until 이후 다른 워커가 이어받음
+    """
+    __tablename__ = "worker_leases"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)  # 호스트:PID
+    locked_until = Column(DateTime(timezone=True), nullable=False)
+
+class SchemaVersionORM(Base):
+    """
+    마지막으로 마이그레이션(create_schema)을 끝낸 스키마의 지문 1행. 기동 경로는 이 행만 비교해 같으면 전체 확인을 건너뜀
+    """
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True, default=1)
+    fingerprint = Column(String(64), nullable=False)  # 모델 DDL + 마이그레이션 리비전의 sha256
+    applied_at = Column(DateTime(timezone=True), default=datetime.utcnow)
@@ -2,6 +2,7 @@ from sqlalchemy import Column, String, DateTime, Uuid
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
+from app.core.config import settings
 from .base import Base
 
 class UserORM(Base):
@@ -17,6 +18,9 @@ class UserORM(Base):
     spotify_refresh_token = Column(String, nullable=True)
     spotify_token_expires_at = Column(DateTime(timezone=True), nullable=True)
 
+    # 캘린더/통계의 '하루' 기준 시간대 (IANA 이름) — 바뀌면 기존 기록의 local_date도 다시 계산
+    timezone = Column(String, nullable=False, default=settings.DEFAULT_TIMEZONE, server_default=settings.DEFAULT_TIMEZONE)
+
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
     # Relationships (문자열 방식 지연 평가로 순환 참조 방지)
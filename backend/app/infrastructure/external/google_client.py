@@ -0,0 +1,78 @@
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+from opentelemetry import trace
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import track_external_call
+
+logger = logging.getLogger(__name__)
+
+
+class GoogleAuthClient:
+    """
+    Google OAuth 액세스 토큰으로 UserInfo를 조회하는 클라이언트.
+    앱 실행 직후 같은 토큰으로 로그인 요청이 몰리는 경우를 위해
+    커넥션을 재사용하고, 검증 결과를 토큰 해시 기준으로 잠시 캐시합니다.
+    """
+    USERINFO_PATH = "/oauth2/v3/userinfo"
+    # Google 액세스 토큰 수명(1시간)보다 충분히 짧게 유지 — 토큰 폐기 후 반영 지연 상한
+    CACHE_TTL_SECONDS = 300
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.userinfo_url = (base_url or settings.GOOGLE_API_BASE_URL).rstrip("/") + self.USERINFO_PATH
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache = TTLCache(maxsize=10000, ttl_seconds=self.CACHE_TTL_SECONDS)
+        # 같은 토큰으로 동시에 들어온 요청은 하나의 Google 호출 결과를 공유 (single-flight)
+        self._inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=10.0)
+        return self._client
+
+    @staticmethod
+    def _token_key(access_token: str) -> str:
+        # 원본 토큰을 메모리에 키로 남기지 않도록 해시 사용
+        return hashlib.sha256(access_token.encode()).hexdigest()
+
+    async def get_userinfo(self, access_token: str) -> Dict[str, Any]:
+        """
+        UserInfo를 반환합니다. 토큰이 유효하지 않으면 ValueError를 발생시킵니다.
+        """
+        key = self._token_key(access_token)
+        cached = self._cache.get(key)
+        trace.get_current_span().set_attribute("google.userinfo.cache_hit", cached is not None)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_userinfo(key, access_token))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: 한 요청이 취소되어도 같은 토큰을 기다리는 다른 요청의 조회는 계속 진행
+        return await asyncio.shield(task)
+
+    async def _fetch_userinfo(self, key: str, access_token: str) -> Dict[str, Any]:
+        with track_external_call("google", "userinfo") as call:
+            resp = await self._get_client().get(
+                self.userinfo_url,
+                headers={"Authorization": f"Bearer {access_token}"}
+            )
+            call.status = resp.status_code
+        if resp.status_code != 200:
+            raise ValueError(f"유효하지 않은 Google Access Token (Status: {resp.status_code})")
+
+        idinfo = resp.json()
+        self._cache.set(key, idinfo)
+        return idinfo
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,160 @@
+import asyncio
+import io
+import logging
+from collections import OrderedDict
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+from opentelemetry import trace
+
+from app.core.metrics import track_external_call
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow 미설치 환경에서는 리사이즈 없이 원본을 그대로 전달
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+class ImageResizeError(Exception):
+    """썸네일을 만들 수 없는 원본 — status_code/detail 그대로 HTTP 응답으로 변환 (너무 큼 413, 디코딩 불가 502)"""
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ImageCache:
+    """
+    (이미지 URL, 너비) → (바이트, content-type) 을 보관하는 바이트 용량 기준 LRU 캐시.
+    리사이즈된 썸네일은 수 KB 수준이라 적은 메모리로 캘린더 한 달치를 충분히 담을 수 있습니다.
+    """
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[bytes, str]]" = OrderedDict()
+
+    def get(self, key: Tuple[str, int]) -> Optional[Tuple[bytes, str]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple[str, int], content: bytes, content_type: str) -> None:
+        if len(content) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.current_bytes -= len(old[0])
+
+        self._entries[key] = (content, content_type)
+        self.current_bytes += len(content)
+
+        # 용량 초과 시 가장 오래 안 쓰인 항목부터 제거
+        while self.current_bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+
+
+class ImageProxyClient:
+    """
+    Spotify CDN 앨범아트를 CORS-safe하게 전달하는 이미지 프록시 클라이언트.
+    - 원본 요청: 업스트림 바이트를 청크 단위로 그대로 흘려보내 요청당 메모리를 일정하게 유지
+    - 썸네일 요청(width 지정): 고정된 크기 목록으로만 리사이즈하여 LRU 캐시에 보관
+    """
+    # 안전한 도메인만 허용 (스팸/악용 방지)
+    ALLOWED_DOMAINS = frozenset([
+        "i.scdn.co",
+        "mosaic.scdn.co",
+        "image-cdn-ak.spotifycdn.com",
+        "image-cdn-fa.spotifycdn.com",
+    ])
+    # 캘린더 칩(64/160), 타임라인(300), 캡슐 카드(640) 용도로 고정 — 임의 크기는 캐시 폭발 방지를 위해 불허
+    ALLOWED_WIDTHS = (64, 160, 300, 640)
+    CHUNK_SIZE = 64 * 1024
+    # 리사이즈를 위해 메모리에 올릴 원본의 최대 크기 (Spotify 640px 커버는 보통 100KB 내외)
+    MAX_SOURCE_BYTES = 5 * 1024 * 1024
+    TIMEOUT = 10.0
+
+    def __init__(self, cache: Optional[ImageCache] = None):
+        self.cache = cache or ImageCache()
+
+    @classmethod
+    def is_allowed_url(cls, url: str) -> bool:
+        return urlparse(url).hostname in cls.ALLOWED_DOMAINS
+
+    @property
+    def can_resize(self) -> bool:
+        return Image is not None
+
+    async def stream(self, url: str) -> Tuple[str, AsyncIterator[bytes]]:
+        """
+        업스트림 응답을 스트리밍 모드로 열어 (content-type, 바이트 청크 이터레이터)를 반환합니다.
+        상태 코드 확인은 본문을 읽기 전에 끝나므로, 실패 시 httpx.HTTPStatusError가 즉시 발생합니다.
+        커넥션은 이터레이터 소진(또는 클라이언트 연결 종료) 시점에 정리됩니다.
+        """
+        client = httpx.AsyncClient(timeout=self.TIMEOUT)
+        try:
+            with track_external_call("spotify_cdn", "image") as call:
+                response = await client.send(client.build_request("GET", url), stream=True)
+                call.status = response.status_code
+            response.raise_for_status()
+        except Exception:
+            await client.aclose()
+            raise
+
+        content_type = response.headers.get("content-type", "image/jpeg")
+
+        async def body() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                    yield chunk
+            finally:
+                await response.aclose()
+                await client.aclose()
+
+        return content_type, body()
+
+    async def get_resized(self, url: str, width: int) -> Tuple[bytes, str]:
+        """
+        지정한 너비로 줄인 JPEG 썸네일을 반환합니다. (캐시 우선)
+        원본이 MAX_SOURCE_BYTES를 넘거나 디코딩할 수 없으면 ImageResizeError가 발생합니다.
+        """
+        key = (url, width)
+        cached = self.cache.get(key)
+        trace.get_current_span().set_attribute("image.cache_hit", cached is not None)
+        if cached is not None:
+            return cached
+
+        async with httpx.AsyncClient(timeout=self.TIMEOUT) as client:
+            with track_external_call("spotify_cdn", "image") as call:
+                async with client.stream("GET", url) as response:
+                    call.status = response.status_code
+                    response.raise_for_status()
+                    buffer = bytearray()
+                    async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                        buffer.extend(chunk)
+                        if len(buffer) > self.MAX_SOURCE_BYTES:
+                            raise ImageResizeError(413, "원본 이미지가 너무 커서 리사이즈할 수 없습니다.")
+
+        # 디코딩/인코딩은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드로 분리
+        try:
+            content = await asyncio.to_thread(self._resize, bytes(buffer), width)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            # 이미지가 아닌 응답, 잘린 파일, 픽셀 수가 지나치게 큰 이미지 등 — 업스트림이 쓸 수 없는 원본을 보낸 것
+            logger.warning(f"Image resize failed for {url}: {type(e).__name__}: {e}")
+            raise ImageResizeError(502, "이미지를 디코딩할 수 없습니다.") from e
+        self.cache.put(key, content, "image/jpeg")
+        return content, "image/jpeg"
+
+    @staticmethod
+    def _resize(source: bytes, width: int) -> bytes:
+        with Image.open(io.BytesIO(source)) as img:
+            img = img.convert("RGB")
+            # thumbnail은 비율을 유지하며 확대는 하지 않음 (원본보다 큰 요청은 원본 크기 유지)
+            img.thumbnail((width, width))
+            out = io.BytesIO()
+            img.save(out, format="JPEG", quality=85, optimize=True)
+            return out.getvalue()
@@ -1,25 +1,30 @@
 import httpx
 from typing import Optional
+from app.core.config import settings
+from app.core.metrics import track_external_call
 
 class LocationAPIClient:
     """
     Google Maps Reverse Geocoding API 등을 활용해 위경도를 장소명(Place Name)으로 반환하는 클라이언트
     """
     # TODO: .env에 GOOGLE_MAPS_API_KEY 추가 필요
-    BASE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+    PATH = "/maps/api/geocode/json"
     
-    def __init__(self, api_key: str = "demo_key"):
+    def __init__(self, api_key: str = "demo_key", base_url: Optional[str] = None):
         self.api_key = api_key
+        self.base_url = (base_url or settings.GOOGLE_MAPS_BASE_URL).rstrip("/")
 
     async def get_place_name(self, lat: float, lon: float) -> Optional[str]:
         """
         위경도를 기반으로 사람이 읽을 수 있는 주소/장소명을 반환
         """
-        url = f"{self.BASE_URL}?latlng={lat},{lon}&key={self.api_key}&language=ko"
+        url = f"{self.base_url}{self.PATH}?latlng={lat},{lon}&key={self.api_key}&language=ko"
         
         try:
             async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=5.0)
+                with track_external_call("google_maps", "reverse_geocode") as call:
+                    response = await client.get(url, timeout=5.0)
+                    call.status = response.status_code
                 response.raise_for_status()
                 data = response.json()
                 
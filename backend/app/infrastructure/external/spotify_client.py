@@ -5,6 +5,7 @@ import logging
 
 from app.domain.models import Track as DomainTrack
 from app.core.config import settings
+from app.core.metrics import track_external_call
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +14,8 @@ class SpotifyAPIClient:
     """
     Spotify Web API 연동을 담당하는 Infrastructure 계층의 클라이언트
     """
-    BASE_URL = "https://api.spotify.com/v1"
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or settings.SPOTIFY_API_BASE_URL).rstrip("/")
 
     async def _get_headers(self, access_token: str) -> dict:
         return {
@@ -27,12 +29,14 @@ class SpotifyAPIClient:
         주의: Spotify API는 최근 50개까지의 제약이 있으며,
              현재 재생 중인 곡은 포함되지 않을 수 있습니다.
         """
-        url = f"{self.BASE_URL}/me/player/recently-played?limit={limit}"
+        url = f"{self.base_url}/me/player/recently-played?limit={limit}"
         
         async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url, headers=await self._get_headers(access_token)
-            )
+            with track_external_call("spotify", "recently_played") as call:
+                response = await client.get(
+                    url, headers=await self._get_headers(access_token)
+                )
+                call.status = response.status_code
             
             if response.status_code == 401:
                 raise ValueError("Spotify Access Token is expired or invalid.")
@@ -47,12 +51,14 @@ class SpotifyAPIClient:
         사용자가 현재 재생 중인 곡을 가져옵니다.
         재생 중이 아니라면 None을 반환합니다.
         """
-        url = f"{self.BASE_URL}/me/player/currently-playing"
+        url = f"{self.base_url}/me/player/currently-playing"
         
         async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url, headers=await self._get_headers(access_token)
-            )
+            with track_external_call("spotify", "currently_playing") as call:
+                response = await client.get(
+                    url, headers=await self._get_headers(access_token)
+                )
+                call.status = response.status_code
             
             if response.status_code == 204:
                 return None
@@ -92,13 +98,15 @@ class SpotifyAPIClient:
                 for artist_name in unique_artists:
                     try:
                         # Spotify Search API로 아티스트 ID 조회
-                        search_url = f"{self.BASE_URL}/search"
+                        search_url = f"{self.base_url}/search"
                         params = {
                             "q": f'artist:"{artist_name}"',
                             "type": "artist",
                             "limit": 1
                         }
-                        resp = await client.get(search_url, headers=headers, params=params)
+                        with track_external_call("spotify", "search_artist") as call:
+                            resp = await client.get(search_url, headers=headers, params=params)
+                            call.status = resp.status_code
 
                         if resp.status_code != 200:
                             logger.warning(f"Artist search failed for '{artist_name}': {resp.status_code}")
@@ -0,0 +1,122 @@
+import io
+import json
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, Iterator, Optional
+
+# Spotify는 30초 이상 재생된 곡만 '스트리밍 1회'로 집계 — 스킵/미리듣기는 일기로 가져오지 않음
+MIN_MS_PLAYED = 30_000
+READ_CHUNK_SIZE = 256 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+@dataclass(frozen=True)
+class HistoryPlay:
+    """Extended streaming history의 음악 재생 1건 (팟캐스트/오디오북 항목은 제외)"""
+    listened_at: datetime  # UTC, 재생이 끝난 시각(ts)
+    track_id: str          # spotify:track:<id> 의 <id> — Spotify API의 track.id와 같은 값
+    title: str
+    artist: str
+    ms_played: int
+
+
+def iter_json_array(fp: IO[str], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    최상위가 배열인 JSON 파일을 원소 단위로 스트리밍 파싱합니다.
+    파일 전체를 json.load 하지 않고 chunk_size씩 읽으며 raw_decode로 원소를 하나씩 꺼내므로,
+    수백 MB 파일도 '원소 1개 + 청크 1개' 크기의 메모리만 사용합니다.
+    """
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace() -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    skip_whitespace()
+    if pos >= len(buffer) or buffer[pos] != "[":
+        raise ValueError("Streaming history file must contain a JSON array.")
+    pos += 1
+
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise ValueError("Unexpected end of streaming history file.")
+        if buffer[pos] == "]":
+            return
+        if buffer[pos] == ",":
+            pos += 1
+            skip_whitespace()
+
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 원소가 청크 경계에서 잘린 경우 — 더 읽어서 다시 시도
+                if eof or not fill():
+                    raise
+                continue
+            # 숫자 같은 원시값은 청크 끝에서 잘려도 디코딩이 성공하므로 경계에 닿았으면 더 읽고 재시도
+            if end == len(buffer) and not eof and fill():
+                continue
+            break
+        pos = end
+        yield item
+
+
+def iter_history_files(path: str) -> Iterator[tuple[str, IO[str]]]:
+    """
+    .zip(Spotify가 보내주는 내보내기 원본) 또는 단일 .json 파일에서
+    음악 스트리밍 기록 파일을 (이름, 텍스트 스트림) 순서대로 돌려줍니다.
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = sorted(
+                name for name in archive.namelist()
+                if name.endswith(".json") and "Streaming_History_Audio" in name
+            )
+            for name in names:
+                with archive.open(name) as raw:
+                    yield name, io.TextIOWrapper(raw, encoding="utf-8")
+    else:
+        with open(path, encoding="utf-8") as fp:
+            yield path, fp
+
+
+def parse_play(row: Dict[str, Any], min_ms_played: int = MIN_MS_PLAYED) -> Optional[HistoryPlay]:
+    """내보내기 행 1개를 HistoryPlay로 변환. 음악이 아니거나 너무 짧게 재생된 항목은 None"""
+    uri = row.get("spotify_track_uri")
+    title = row.get("master_metadata_track_name")
+    if not uri or not title or not uri.startswith("spotify:track:"):
+        return None
+    ms_played = row.get("ms_played") or 0
+    if ms_played < min_ms_played:
+        return None
+    try:
+        listened_at = datetime.fromisoformat(row["ts"].replace("Z", "+00:00")).astimezone(timezone.utc)
+    except (KeyError, AttributeError, ValueError):
+        return None
+    return HistoryPlay(
+        listened_at=listened_at,
+        track_id=uri.rsplit(":", 1)[-1],
+        title=title,
+        artist=row.get("master_metadata_album_artist_name") or "Unknown Artist",
+        ms_played=ms_played,
+    )
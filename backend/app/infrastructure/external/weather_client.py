@@ -1,26 +1,30 @@
 import httpx
 from typing import Optional, Dict, Any
 from app.core.config import settings
+from app.core.metrics import track_external_call
 
 class WeatherAPIClient:
     """
     OpenWeather API 등을 활용해 주어진 위경도의 현재 날씨를 가져오는 클라이언트
     """
     # TODO: .env에 OPENWEATHER_API_KEY 추가 필요
-    BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
+    PATH = "/data/2.5/weather"
     
-    def __init__(self, api_key: str = "demo_key"):
+    def __init__(self, api_key: str = "demo_key", base_url: Optional[str] = None):
         self.api_key = api_key
+        self.base_url = (base_url or settings.OPENWEATHER_BASE_URL).rstrip("/")
 
     async def get_weather_by_coordinates(self, lat: float, lon: float) -> Optional[str]:
         """
         위경도를 기반으로 날씨 상태(예: 'Clear', 'Clouds', 'Rain')를 반환
         """
-        url = f"{self.BASE_URL}?lat={lat}&lon={lon}&appid={self.api_key}&units=metric"
+        url = f"{self.base_url}{self.PATH}?lat={lat}&lon={lon}&appid={self.api_key}&units=metric"
         
         try:
             async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=5.0)
+                with track_external_call("openweather", "current_weather") as call:
+                    response = await client.get(url, timeout=5.0)
+                    call.status = response.status_code
                 response.raise_for_status()
                 data = response.json()
                 
@@ -0,0 +1,159 @@
+"""
+유저별 실시간 이벤트 pub/sub (새로 기록된 다이어리 → 대시보드 SSE 구독자).
+
+- InProcessBroker: 같은 프로세스의 구독자에게만 전달 (단일 워커/로컬 개발)
+- PostgresNotifyBroker: NOTIFY로 발행하고 워커마다 LISTEN 연결 하나로 받아 전달 — gunicorn 워커 간 전파
+구독자는 큐/태스크 없이 고정 길이 deque와 대기 future 하나만 가지므로, 유휴 연결이 많아도 구독자당 메모리가 작습니다.
+"""
+import asyncio
+import logging
+import uuid
+from collections import deque
+from typing import Deque, Dict, Optional, Set
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.infrastructure.db.database import normalize_database_url
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """한 SSE 연결의 수신함 — broker.subscribe()로 만들고 끝나면 close()"""
+    __slots__ = ("_broker", "user_id", "_pending", "_waiter")
+
+    def __init__(self, broker: "InProcessBroker", user_id: uuid.UUID, buffer_size: int):
+        self._broker = broker
+        self.user_id = user_id
+        self._pending: Deque[str] = deque(maxlen=buffer_size)
+        self._waiter: Optional[asyncio.Future] = None
+
+    def _deliver(self, message: str) -> None:
+        self._pending.append(message)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def get(self, timeout: float) -> Optional[str]:
+        """다음 메시지 (timeout초 동안 없으면 None — 호출자는 하트비트를 보냄)"""
+        if not self._pending:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(self._waiter, timeout)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                self._waiter = None
+        return self._pending.popleft()
+
+    def close(self) -> None:
+        self._broker._unsubscribe(self)
+
+
+class InProcessBroker:
+    def __init__(self, buffer_size: int = settings.NOW_PLAYING_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._subscribers: Dict[uuid.UUID, Set[Subscription]] = {}
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def subscribe(self, user_id: uuid.UUID) -> Subscription:
+        subscription = Subscription(self, user_id, self.buffer_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscribers.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscribers[subscription.user_id]
+
+    def _deliver(self, user_id: uuid.UUID, message: str) -> None:
+        for subscription in self._subscribers.get(user_id, ()):
+            subscription._deliver(message)
+
+    async def publish(self, user_id: uuid.UUID, message: str) -> None:
+        """커밋된 뒤에 호출 — 롤백된 기록이 화면에 나타나지 않도록"""
+        self._deliver(user_id, message)
+
+    async def run(self, stopping: asyncio.Event) -> None:
+        """TaskSupervisor 루프 — 프로세스 내 브로커는 할 일이 없음"""
+        await stopping.wait()
+
+
+class PostgresNotifyBroker(InProcessBroker):
+    CHANNEL = "now_playing"
+    # NOTIFY payload 한도(8000 bytes)보다 여유 있게
+    MAX_PAYLOAD_BYTES = 7900
+
+    def __init__(self, database_url: str, buffer_size: int = settings.NOW_PLAYING_BUFFER_SIZE):
+        super().__init__(buffer_size)
+        # SQLAlchemy URL(postgresql+asyncpg://, Render/Heroku의 postgres://) → asyncpg DSN
+        self._dsn = make_url(normalize_database_url(database_url)).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._connection = None
+        # asyncpg 연결은 동시에 한 명령만 실행 가능 — 여러 코루틴의 NOTIFY를 순서대로
+        self._lock = asyncio.Lock()
+
+    async def publish(self, user_id: uuid.UUID, message: str) -> None:
+        payload = f"{user_id.hex}:{message}"
+        if self._connection is None or len(payload.encode()) > self.MAX_PAYLOAD_BYTES:
+            # LISTEN 연결이 재시작 중이거나 payload가 너무 크면 이 워커의 구독자에게만 전달
+            self._deliver(user_id, message)
+            return
+        try:
+            async with self._lock:
+                await self._connection.execute("SELECT pg_notify($1, $2)", self.CHANNEL, payload)
+        except Exception as e:
+            logger.warning(f"NOTIFY failed, delivering locally only: {e}")
+            self._deliver(user_id, message)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        # 자기 워커가 보낸 NOTIFY도 여기로 돌아오므로 로컬 전달은 이 경로 한 번뿐
+        user_hex, _, message = payload.partition(":")
+        try:
+            self._deliver(uuid.UUID(hex=user_hex), message)
+        except ValueError:
+            logger.warning(f"Ignoring malformed {channel} payload")
+
+    async def run(self, stopping: asyncio.Event) -> None:
+        """LISTEN 전용 연결을 유지 — 연결이 끊기면 예외로 끝나 TaskSupervisor가 백오프 후 재연결"""
+        import asyncpg
+
+        connection = await asyncpg.connect(self._dsn)
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        try:
+            await connection.add_listener(self.CHANNEL, self._on_notify)
+            self._connection = connection
+            stop_wait = asyncio.create_task(stopping.wait())
+            lost_wait = asyncio.create_task(lost.wait())
+            await asyncio.wait({stop_wait, lost_wait}, return_when=asyncio.FIRST_COMPLETED)
+            stop_wait.cancel()
+            lost_wait.cancel()
+            if lost.is_set() and not stopping.is_set():
+                raise ConnectionError("LISTEN connection lost")
+        finally:
+            self._connection = None
+            if not connection.is_closed():
+                await connection.close()
+
+
+def _create_broker() -> InProcessBroker:
+    backend = settings.NOW_PLAYING_BROKER.lower()
+    # Why: Render/Heroku는 postgres:// 를 주는데 이 스킴의 백엔드 이름은 "postgres"라 그대로 비교하면 메모리 브로커로 빠짐
+    database_url = normalize_database_url(settings.DATABASE_URL)
+    if backend == "auto":
+        backend = "postgres" if make_url(database_url).get_backend_name() == "postgresql" else "memory"
+    if backend == "postgres":
+        return PostgresNotifyBroker(database_url)
+    if backend != "memory":
+        logger.warning(f"Unknown NOW_PLAYING_BROKER '{backend}'. Using in-process broker.")
+    return InProcessBroker()
+
+
+# 프로세스(워커)당 하나
+now_playing_broker = _create_broker()
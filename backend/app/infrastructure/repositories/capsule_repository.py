@@ -0,0 +1,63 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.metrics import observe_repository
+from app.infrastructure.db.models import DailyCapsuleORM, PeriodCapsuleORM
+
+
+class CapsuleRepository:
+    """Daily/주간/월간 캡슐 조회·저장"""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _dialect_insert(self, table):
+        """ON CONFLICT를 지원하는 방언별 INSERT (PostgreSQL/SQLite 공통 문법)"""
+        if self.session.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(table)
+
+    @observe_repository
+    async def get_daily_capsules(self, user_id: uuid.UUID, start: date, end: date) -> List[DailyCapsuleORM]:
+        """[start, end] 기간의 Daily Capsule (날짜순)"""
+        stmt = (
+            select(DailyCapsuleORM)
+            .where(
+                DailyCapsuleORM.user_id == user_id,
+                DailyCapsuleORM.target_date >= start,
+                DailyCapsuleORM.target_date <= end,
+            )
+            .order_by(DailyCapsuleORM.target_date.asc())
+        )
+        return list((await self.session.execute(stmt)).scalars().all())
+
+    @observe_repository
+    async def get_period_capsule(self, user_id: uuid.UUID, period: str, start: date) -> Optional[PeriodCapsuleORM]:
+        stmt = select(PeriodCapsuleORM).where(
+            PeriodCapsuleORM.user_id == user_id,
+            PeriodCapsuleORM.period == period,
+            PeriodCapsuleORM.start_date == start,
+        )
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    @observe_repository
+    async def upsert_period_capsule(self, values: Dict[str, Any]) -> PeriodCapsuleORM:
+        """(user_id, period, start_date) 기준으로 저장 — 이미 있으면 내용과 created_at을 덮어씀 (커밋은 호출자 몫)"""
+        values = {"id": uuid.uuid4(), "created_at": datetime.utcnow(), **values}
+        stmt = self._dialect_insert(PeriodCapsuleORM.__table__).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "period", "start_date"],
+            set_={
+                key: stmt.excluded[key]
+                for key in values
+                if key not in ("id", "user_id", "period", "start_date")
+            },
+        ).returning(PeriodCapsuleORM.__table__.c.id)
+        capsule_id = (await self.session.execute(stmt)).scalar_one()
+        # Core UPSERT는 identity map을 갱신하지 않으므로, 같은 세션에서 읽은 기존 객체가 있으면 새 값으로 다시 로드
+        return await self.session.get(PeriodCapsuleORM, capsule_id, populate_existing=True)
@@ -1,12 +1,21 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import insert, func, extract, cast, Date, desc
-from sqlalchemy.orm import selectinload
-from typing import Optional, List, Dict, Any
+from sqlalchemy import insert, update, func, extract, cast, Date, Double, desc, or_, and_, literal, literal_column, table, column
+from sqlalchemy.orm import contains_eager, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+from datetime import date, datetime, timezone
 import uuid
 
 from app.domain.models import AuditoryDiary as DomainDiary, Track as DomainTrack, Context as DomainContext
-from app.infrastructure.db.models import AuditoryDiaryORM, TrackORM, ContextORM
+from app.domain.geohash import bounding_box, covering_prefixes, distance_m, encode_coordinates, prefix_upper_bound
+from app.domain.search_text import build_search_document, fts5_match_expression, parse_search_terms, search_phrase
+from app.infrastructure.db.models import AuditoryDiaryORM, TrackORM, ContextORM, DailyCapsuleORM, SQLITE_FTS_TABLE
+from app.core.config import settings
+from app.core.metrics import observe_repository
+from app.core.timezones import DEFAULT_TIMEZONE, local_date as to_local_date
+from app.infrastructure.repositories.stats_repository import add_listens_to_rollup, mark_stats_dirty
+from app.infrastructure.repositories.track_catalog import lookup_cached_track_ids, remember_track_ids
 
 class AuditoryDiaryRepository:
     """
@@ -15,18 +24,66 @@ class AuditoryDiaryRepository:
     """
     def __init__(self, session: AsyncSession):
         self.session = session
+        # external_platform_id → tracks.id (대량 가져오기에서 배치마다 같은 트랙을 다시 조회하지 않도록)
+        self._track_ids: Dict[str, uuid.UUID] = {}
 
-    async def save(self, diary: DomainDiary) -> DomainDiary:
-        # 1. Track 저장 또는 조회 (UPSERT 로직 필요 - 여기선 단순화)
-        track_orm = TrackORM(
-            id=uuid.uuid4(), # 고유 ID 생성 (도메인엔 없지만 DB 매핑용)
-            title=diary.track.title,
-            artist=diary.track.artist,
-            album_artwork_url=diary.track.album_artwork_url,
-            external_platform_id=diary.track.external_platform_id,
-            platform_name=diary.track.platform_name
+    def _dialect_insert(self, table):
+        """ON CONFLICT를 지원하는 방언별 INSERT (PostgreSQL/SQLite 공통 문법)"""
+        if self.session.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(table)
+
+    async def _resolve_track_ids(self, tracks: Dict[str, DomainTrack]) -> Dict[str, uuid.UUID]:
+        """
+        external_platform_id → tracks.id 매핑을 한 번에 조회하고, 없는 트랙은 일괄 INSERT 합니다.
+        다른 트랜잭션이 같은 트랙을 먼저 넣었더라도 ON CONFLICT DO NOTHING 후 재조회로 수렴 (UNIQUE 제약 방어)
+        프로세스 전역 트랙 카탈로그 캐시에 있는 트랙은 SELECT 없이 바로 사용합니다.
+        """
+        missing = [ext_id for ext_id in tracks if ext_id not in self._track_ids]
+        if missing:
+            cached = lookup_cached_track_ids(missing)
+            self._track_ids.update(cached)
+            missing = [ext_id for ext_id in missing if ext_id not in cached]
+        if missing:
+            await self._load_track_ids(missing)
+            new_tracks = [tracks[ext_id] for ext_id in missing if ext_id not in self._track_ids]
+            if new_tracks:
+                await self.session.execute(
+                    self._dialect_insert(TrackORM.__table__).on_conflict_do_nothing(
+                        index_elements=["external_platform_id"]
+                    ),
+                    [
+                        {
+                            "id": uuid.uuid4(),
+                            "title": track.title,
+                            "artist": track.artist,
+                            "album_artwork_url": track.album_artwork_url,
+                            "external_platform_id": track.external_platform_id,
+                            "platform_name": track.platform_name,
+                        }
+                        for track in new_tracks
+                    ],
+                )
+                await self._load_track_ids([track.external_platform_id for track in new_tracks])
+            # 방금 INSERT 한 트랙도 섞여 있으므로 커밋된 뒤에 캐시에 올림
+            remember_track_ids(self.session, {ext_id: self._track_ids[ext_id] for ext_id in missing})
+        return {ext_id: self._track_ids[ext_id] for ext_id in tracks}
+
+    async def _load_track_ids(self, external_ids: List[str]) -> None:
+        stmt = select(TrackORM.external_platform_id, TrackORM.id).where(
+            TrackORM.external_platform_id.in_(external_ids)
         )
-        self.session.add(track_orm)
+        result = await self.session.execute(stmt)
+        self._track_ids.update(dict(result.all()))
+
+    @observe_repository
+    async def save(self, diary: DomainDiary) -> DomainDiary:
+        # 1. Track 조회 또는 생성 (external_platform_id 기준 UPSERT)
+        track_id = (await self._resolve_track_ids({diary.track.external_platform_id: diary.track}))[
+            diary.track.external_platform_id
+        ]
 
         # 2. Context 저장
         context_orm = ContextORM(
@@ -43,16 +100,137 @@ class AuditoryDiaryRepository:
         diary_orm = AuditoryDiaryORM(
             id=diary.id,
             user_id=diary.user_id,
-            track_id=track_orm.id,
+            track_id=track_id,
             context_id=context_orm.id,
             listened_at=diary.listened_at,
-            memo=diary.memo
+            local_date=to_local_date(diary.listened_at, diary.context.timezone),
+            memo=diary.memo,
+            geohash=encode_coordinates(diary.context.latitude, diary.context.longitude),
+            search_document=build_search_document(
+                diary.memo, diary.track.title, diary.track.artist, diary.context.place_name
+            )
         )
         self.session.add(diary_orm)
+        # 청취 통계 롤업(시간 버킷, 시간 버킷 × 날씨)에 같은 트랜잭션으로 더함
+        await add_listens_to_rollup(self.session, diary.user_id, [(diary.listened_at, diary.context.weather)])
 
         await self.session.commit()
         return diary
 
+    @observe_repository
+    async def bulk_insert_listens(
+        self, user_id: uuid.UUID, listens: List[Tuple[datetime, DomainTrack]], place_name: Optional[str] = None,
+        timezone_name: str = DEFAULT_TIMEZONE,
+    ) -> int:
+        """
+        재생 기록 묶음을 트랙 일괄 조회/생성 + executemany INSERT로 저장하고 실제로 추가한 개수를 반환합니다.
+        이미 기록된 재생(같은 유저, 같은 초에 끝난 재생)은 건너뜁니다. 커밋은 호출자가 담당.
+        Why: 행마다 get_or_create 하면 재생 1건에 쿼리 4~5개 — 수십만 건 가져오기에서는 배치당 쿼리 5개로 고정
+        """
+        if not listens:
+            return 0
+
+        # 1. 배치 기간 안에 이미 있는 재생 시각을 한 번에 조회해 중복 제거
+        existing = await self._listened_at_keys(
+            user_id, min(at for at, _ in listens), max(at for at, _ in listens)
+        )
+        new_listens = []
+        for listened_at, track in listens:
+            key = _listen_key(listened_at)
+            if key not in existing:
+                existing.add(key)
+                new_listens.append((listened_at, track))
+        if not new_listens:
+            return 0
+
+        # 2. 트랙 일괄 조회/생성
+        track_ids = await self._resolve_track_ids({track.external_platform_id: track for _, track in new_listens})
+
+        # 3. Context / Diary executemany INSERT (SQLAlchemy insertmanyvalues가 다중 VALUES 문으로 묶어 전송)
+        contexts, diaries = [], []
+        for listened_at, track in new_listens:
+            context_id = uuid.uuid4()
+            contexts.append({
+                "id": context_id, "latitude": None, "longitude": None,
+                "place_name": place_name, "weather": "", "timezone": timezone_name,
+            })
+            diaries.append({
+                "id": uuid.uuid4(), "user_id": user_id,
+                "track_id": track_ids[track.external_platform_id], "context_id": context_id,
+                "listened_at": listened_at, "local_date": to_local_date(listened_at, timezone_name),
+                "memo": None, "created_at": datetime.utcnow(),
+                "search_document": build_search_document(None, track.title, track.artist, place_name),
+            })
+        await self.session.execute(insert(ContextORM.__table__), contexts)
+        await self.session.execute(insert(AuditoryDiaryORM.__table__), diaries)
+        await add_listens_to_rollup(self.session, user_id, [(listened_at, "") for listened_at, _ in new_listens])
+        # Core INSERT는 ORM 이벤트를 거치지 않으므로 통계 캐시 무효화를 직접 예약
+        mark_stats_dirty(self.session, user_id)
+        return len(new_listens)
+
+    async def stream_export_rows(
+        self, user_id: uuid.UUID, after: Optional[Tuple[datetime, Optional[uuid.UUID]]] = None, batch_size: int = 1000
+    ) -> AsyncIterator[List[Any]]:
+        """
+        유저의 전체 다이어리를 트랙/컨텍스트와 조인해 (listened_at, id) 순으로 batch_size 행씩 흘려보냅니다.
+        서버 사이드 커서(yield_per)로 읽으므로 기록 수와 무관하게 메모리는 배치 1개 분량만 사용.
+        after=(listened_at, id)를 주면 그 행 이후부터 이어서 읽음 (id가 None이면 listened_at 초과만)
+        """
+        stmt = (
+            select(
+                AuditoryDiaryORM.id,
+                AuditoryDiaryORM.listened_at,
+                AuditoryDiaryORM.local_date,
+                AuditoryDiaryORM.memo,
+                AuditoryDiaryORM.created_at,
+                TrackORM.title.label("track_title"),
+                TrackORM.artist.label("track_artist"),
+                TrackORM.album_artwork_url,
+                TrackORM.external_platform_id,
+                TrackORM.platform_name,
+                ContextORM.latitude,
+                ContextORM.longitude,
+                ContextORM.place_name,
+                ContextORM.weather,
+                ContextORM.timezone,
+            )
+            .join(TrackORM, AuditoryDiaryORM.track_id == TrackORM.id)
+            .join(ContextORM, AuditoryDiaryORM.context_id == ContextORM.id)
+            .where(AuditoryDiaryORM.user_id == user_id)
+            .order_by(AuditoryDiaryORM.listened_at, AuditoryDiaryORM.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if after is not None:
+            after_at, after_id = after
+            if after_id is None:
+                stmt = stmt.where(AuditoryDiaryORM.listened_at > after_at)
+            else:
+                # 행 값 비교(tuple_) 대신 OR/AND로 풀어 SQLite/PostgreSQL 모두에서 같은 키셋 조건을 사용
+                stmt = stmt.where(or_(
+                    AuditoryDiaryORM.listened_at > after_at,
+                    and_(AuditoryDiaryORM.listened_at == after_at, AuditoryDiaryORM.id > after_id),
+                ))
+
+        result = await self.session.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+
+    @observe_repository
+    async def get_capsules_by_date(self, user_id: uuid.UUID) -> Dict[date, DailyCapsuleORM]:
+        """유저의 전체 일일 캡슐을 target_date(유저 시간대 날짜) 기준으로 반환 (하루 1개라 10년치도 수천 건 수준)"""
+        stmt = select(DailyCapsuleORM).where(DailyCapsuleORM.user_id == user_id)
+        result = await self.session.execute(stmt)
+        return {capsule.target_date: capsule for capsule in result.scalars()}
+
+    async def _listened_at_keys(self, user_id: uuid.UUID, start: datetime, end: datetime) -> set:
+        stmt = select(AuditoryDiaryORM.listened_at).where(
+            AuditoryDiaryORM.user_id == user_id,
+            AuditoryDiaryORM.listened_at >= start.replace(microsecond=0),
+            AuditoryDiaryORM.listened_at <= end.replace(microsecond=999999),
+        )
+        result = await self.session.execute(stmt)
+        return {_listen_key(listened_at) for listened_at in result.scalars()}
+
     async def get_by_user_id(self, user_id: uuid.UUID) -> List[DomainDiary]:
         # TODO: 도메인 객체로의 재조립 로직 구현 필요
         # stmt = select(AuditoryDiaryORM).where(AuditoryDiaryORM.user_id == user_id)
@@ -60,6 +238,7 @@ class AuditoryDiaryRepository:
         # ... fetch & transform
         pass
 
+    @observe_repository
     async def get_or_create_by_listened_at(self, diary_domain: DomainDiary) -> AuditoryDiaryORM:
         """
         user_id와 listened_at을 조건으로 검사하여 존재하면 반환하고,
@@ -79,23 +258,9 @@ class AuditoryDiaryRepository:
         if existing:
             return existing
             
-        # 신규 생성 — 트랙은 external_platform_id로 기존 레코드를 먼저 조회 (UNIQUE 제약 방어)
-        existing_track_stmt = select(TrackORM).where(
-            TrackORM.external_platform_id == diary_domain.track.external_platform_id
-        )
-        existing_track_result = await self.session.execute(existing_track_stmt)
-        track_orm = existing_track_result.scalar_one_or_none()
-
-        if not track_orm:
-            track_orm = TrackORM(
-                id=uuid.uuid4(),
-                title=diary_domain.track.title,
-                artist=diary_domain.track.artist,
-                album_artwork_url=diary_domain.track.album_artwork_url,
-                external_platform_id=diary_domain.track.external_platform_id,
-                platform_name=diary_domain.track.platform_name
-            )
-            self.session.add(track_orm)
+        # 신규 생성 — 트랙은 카탈로그 캐시 적중 시 조회 없이, 아니면 조회/일괄 INSERT (UNIQUE 제약 방어)
+        track = diary_domain.track
+        track_id = (await self._resolve_track_ids({track.external_platform_id: track}))[track.external_platform_id]
 
         context_orm = ContextORM(
             id=uuid.uuid4(),
@@ -110,85 +275,97 @@ class AuditoryDiaryRepository:
         new_diary_orm = AuditoryDiaryORM(
             id=diary_domain.id,
             user_id=diary_domain.user_id,
-            track_id=track_orm.id,
+            track_id=track_id,
             context_id=context_orm.id,
             listened_at=diary_domain.listened_at,
-            memo=diary_domain.memo
+            local_date=to_local_date(diary_domain.listened_at, diary_domain.context.timezone),
+            memo=diary_domain.memo,
+            geohash=encode_coordinates(diary_domain.context.latitude, diary_domain.context.longitude),
+            search_document=build_search_document(
+                diary_domain.memo, track.title, track.artist, context_orm.place_name
+            )
         )
         self.session.add(new_diary_orm)
+        await add_listens_to_rollup(
+            self.session, diary_domain.user_id, [(diary_domain.listened_at, diary_domain.context.weather)]
+        )
         
         await self.session.commit()
         
         # 새 객체에 track과 context 할당 (다시 select 안해도 됨)
-        new_diary_orm.track = track_orm
+        # Why: 트랙 행은 읽지 않았으므로 응답용 값 객체로 채우되, 세션에 추가(INSERT)되지 않도록 이력 없이 설정
+        set_committed_value(new_diary_orm, "track", TrackORM(
+            id=track_id,
+            title=track.title,
+            artist=track.artist,
+            album_artwork_url=track.album_artwork_url,
+            external_platform_id=track.external_platform_id,
+            platform_name=track.platform_name,
+        ))
         new_diary_orm.context = context_orm
         return new_diary_orm
 
+    @observe_repository
     async def update_memo(self, diary_id: uuid.UUID, user_id: uuid.UUID, memo: Optional[str]) -> bool:
         """
         특정 다이어리의 메모를 업데이트. 본인의 다이어리인지 user_id로 검증.
+        검색 문서도 함께 갱신 (트랙/장소는 같은 쿼리에서 JOIN으로 읽어 쿼리 수는 그대로)
         """
-        stmt = select(AuditoryDiaryORM).where(
-            AuditoryDiaryORM.id == diary_id,
-            AuditoryDiaryORM.user_id == user_id
+        stmt = (
+            select(AuditoryDiaryORM, TrackORM.title, TrackORM.artist, ContextORM.place_name)
+            .join(TrackORM, TrackORM.id == AuditoryDiaryORM.track_id)
+            .join(ContextORM, ContextORM.id == AuditoryDiaryORM.context_id)
+            .where(
+                AuditoryDiaryORM.id == diary_id,
+                AuditoryDiaryORM.user_id == user_id
+            )
         )
         result = await self.session.execute(stmt)
-        diary = result.scalar_one_or_none()
+        row = result.first()
         
-        if not diary:
+        if not row:
             return False
             
+        diary, title, artist, place_name = row
         diary.memo = memo
+        diary.search_document = build_search_document(memo, title, artist, place_name)
         await self.session.commit()
         return True
 
+    @observe_repository
     async def get_monthly_summary(self, user_id: uuid.UUID, year: int, month: int) -> List[Dict[str, Any]]:
         """
         특정 월의 날짜별 다이어리 개수와 대표 트랙 썸네일(가장 최신 곡) 반환
         """
-        from datetime import datetime, timezone, timedelta
-        from sqlalchemy.orm import selectinload
-        
-        kst_tz = timezone(timedelta(hours=9))
-        
-        # 1. KST 기준 해당 월의 시작과 끝 계산
-        # 시작: year-month-01 00:00:00 KST
-        start_kst = datetime(year, month, 1, 0, 0, 0, tzinfo=kst_tz)
-        
-        # 끝: 다음 달의 1일 00:00:00 KST
-        next_month = month + 1 if month < 12 else 1
-        next_year = year if month < 12 else year + 1
-        end_kst = datetime(next_year, next_month, 1, 0, 0, 0, tzinfo=kst_tz)
-        
-        # UTC로 변환하여 DB 검색 범위 설정
-        start_utc = start_kst.astimezone(timezone.utc)
-        end_utc = end_kst.astimezone(timezone.utc)
-        
-        # 2. 이번 달의 모든 다이어리 로드 (selectinload로 N+1 방지)
+        from datetime import timedelta
+
+        # 1. 해당 월의 날짜 범위 (유저 시간대 기준 날짜는 쓰기 시점에 local_date로 저장되어 있음)
+        first_day = date(year, month, 1)
+        last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+        # 2. 이번 달의 모든 다이어리 로드 (selectinload로 N+1 방지, (user_id, local_date) 인덱스 범위 스캔)
         stmt = (
             select(AuditoryDiaryORM)
             .options(selectinload(AuditoryDiaryORM.track))
             .where(AuditoryDiaryORM.user_id == user_id)
-            .where(AuditoryDiaryORM.listened_at >= start_utc)
-            .where(AuditoryDiaryORM.listened_at < end_utc)
+            .where(AuditoryDiaryORM.local_date >= first_day)
+            .where(AuditoryDiaryORM.local_date <= last_day)
             .order_by(AuditoryDiaryORM.listened_at.asc()) # 시간순 정렬
         )
         
         result = await self.session.execute(stmt)
         diaries = result.scalars().all()
         
-        # 3. 파이썬 메모리 상에서 KST 날짜를 기준으로 그룹핑 (DB 방언 종속 제거 및 정확도 향상)
+        # 3. 파이썬 메모리 상에서 local_date를 기준으로 그룹핑
         summary_map = {}
         
         for diary in diaries:
-            # DB의 UTC를 KST로 변환
-            listened_kst = diary.listened_at.replace(tzinfo=timezone.utc).astimezone(kst_tz)
-            date_str = listened_kst.strftime("%Y-%m-%d")
+            date_str = diary.local_date.isoformat()
             
             if date_str not in summary_map:
                 summary_map[date_str] = {
                     "record_count": 0,
-                    "latest_record_time": listened_kst,
+                    "latest_record_time": diary.listened_at,
                     "representative_thumbnail": diary.track.album_artwork_url if diary.track else None
                 }
                 
@@ -196,7 +373,7 @@ class AuditoryDiaryRepository:
             summary["record_count"] += 1
             
             # 오름차순 정렬되어 있으므로 가장 마지막 값이 최신 값
-            summary["latest_record_time"] = listened_kst
+            summary["latest_record_time"] = diary.listened_at
             summary["representative_thumbnail"] = diary.track.album_artwork_url if diary.track else None
             
         final_response = [
@@ -212,30 +389,264 @@ class AuditoryDiaryRepository:
         final_response.sort(key=lambda x: x["date"])
         return final_response
 
+    @observe_repository
     async def get_daily_history(self, user_id: uuid.UUID, date_str: str) -> List[AuditoryDiaryORM]:
         """
         YYYY-MM-DD 형식의 date_str을 받아서 해당 날짜의 전체 타임라인 반환
         presentation schema 변환을 위해 ORM 객체(Joined Load) 반환
         """
-        from datetime import datetime, timezone, timedelta
-        
-        # date_str (YYYY-MM-DD)를 KST 기준 00:00:00 ~ 23:59:59로 변환 후 UTC로 변환하여 쿼리
-        kst_tz = timezone(timedelta(hours=9))
+        # 유저 시간대 기준 날짜가 local_date로 저장되어 있으므로 (user_id, local_date) 동등 조건 한 번으로 조회
         target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        
-        start_kst = datetime.combine(target_date, datetime.min.time()).replace(tzinfo=kst_tz)
-        end_kst = start_kst + timedelta(days=1)
-        
-        start_utc = start_kst.astimezone(timezone.utc)
-        end_utc = end_kst.astimezone(timezone.utc)
 
         stmt = (
             select(AuditoryDiaryORM)
             .options(selectinload(AuditoryDiaryORM.track), selectinload(AuditoryDiaryORM.context))
             .where(AuditoryDiaryORM.user_id == user_id)
-            .where(AuditoryDiaryORM.listened_at >= start_utc)
-            .where(AuditoryDiaryORM.listened_at < end_utc)
+            .where(AuditoryDiaryORM.local_date == target_date)
             .order_by(desc(AuditoryDiaryORM.listened_at))
         )
         result = await self.session.execute(stmt)
         return result.scalars().all()
+
+    @observe_repository
+    async def search(
+        self, user_id: uuid.UUID, query: str, limit: int,
+        after: Optional[Tuple[float, datetime, uuid.UUID]] = None,
+    ) -> Tuple[List[Tuple[AuditoryDiaryORM, float]], bool]:
+        """
+        메모/곡 제목/아티스트/장소 전문 검색 — ([(다이어리, 점수)...], truncated)를 반환합니다.
+        결과는 점수 → 최신순으로 limit건, after는 직전 페이지 마지막 결과의 (점수, listened_at, id) — 키셋 페이지네이션
+
+        후보는 최근 일치 기록 SEARCH_CANDIDATE_LIMIT건으로 제한하고 그 안에서만 점수를 매기며,
+        그보다 많이 일치해 더 오래된 기록이 빠졌으면 truncated=True (페이지를 넘겨도 닿지 않음)
+        Why: 흔한 단어는 유저당 수십만 건이 일치해 전부 점수를 매기면 수백 ms — 일기 검색은 최근 기록이 우선
+        """
+        indexed, short = parse_search_terms(query)
+        if not indexed and not short:
+            return [], False
+        doc = AuditoryDiaryORM.search_document
+        # 짧은 단어(트라이그램 미만)는 후보 행에서 부분 문자열로 거름 (문서와 검색어 모두 정규화되어 있어 LIKE로 충분)
+        conditions = [AuditoryDiaryORM.user_id == user_id]
+        conditions += [doc.contains(term, autoescape=True) for term in short]
+
+        if not indexed:
+            # 인덱스로 찾을 단어가 없으면 (user_id, listened_at) 인덱스로 최근 SEARCH_SHORT_QUERY_SCAN_LIMIT건만 훑으며 부분 문자열 검사
+            # Why: '비' 같은 한 글자 검색이 유저 전체 기록(최대 수백만 건)을 훑지 않도록 범위를 고정
+            recent = (
+                select(AuditoryDiaryORM.id, AuditoryDiaryORM.listened_at, doc)
+                .where(AuditoryDiaryORM.user_id == user_id)
+                .order_by(AuditoryDiaryORM.listened_at.desc())
+                .limit(settings.SEARCH_SHORT_QUERY_SCAN_LIMIT)
+                .subquery()
+            )
+            candidates = (
+                select(recent.c.id, recent.c.listened_at, literal(0.0, Double).label("score"))
+                .where(*[recent.c.search_document.contains(term, autoescape=True) for term in short])
+                .order_by(recent.c.listened_at.desc())
+            )
+        elif self.session.bind.dialect.name == "postgresql":
+            # 단어 단위 일치(tsvector GIN) 또는 모든 단어의 부분 문자열 일치(pg_trgm GIN)
+            # 점수: 단어 일치 가중치(ts_rank) + 가장 비슷한 부분 문자열과의 유사도(word_similarity)
+            config = literal_column("'simple'::regconfig")
+            ts_vector = func.to_tsvector(config, doc)
+            ts_query = func.plainto_tsquery(config, " ".join(indexed + short))
+            score = cast(func.ts_rank(ts_vector, ts_query) + func.word_similarity(search_phrase(query), doc), Double)
+            candidates = (
+                select(AuditoryDiaryORM.id, AuditoryDiaryORM.listened_at, score.label("score"))
+                .where(
+                    *conditions,
+                    or_(ts_vector.bool_op("@@")(ts_query), and_(*[doc.contains(term, autoescape=True) for term in indexed])),
+                )
+                .order_by(AuditoryDiaryORM.listened_at.desc())
+            )
+        else:
+            # FTS5(trigram) MATCH → rowid로 다이어리 조인. rowid 역순(≈ 최근 기록부터)으로 읽어 후보 수만큼만 bm25 계산
+            fts = table(SQLITE_FTS_TABLE, column("rowid"))
+            score = -func.bm25(literal_column(SQLITE_FTS_TABLE))  # bm25는 낮을수록 관련도가 높음
+            candidates = (
+                select(AuditoryDiaryORM.id, AuditoryDiaryORM.listened_at, score.label("score"))
+                .select_from(fts)
+                .join(AuditoryDiaryORM, literal_column("auditory_diaries.rowid") == fts.c.rowid)
+                .where(literal_column(SQLITE_FTS_TABLE).op("MATCH")(fts5_match_expression(indexed, search_phrase(query))), *conditions)
+                .order_by(fts.c.rowid.desc())
+            )
+
+        # 한 건 더 읽어 상한을 넘었는지 판단 — 개수는 잘린 후보 안에서만 세므로 전체 일치 수를 세지 않음
+        cap = settings.SEARCH_CANDIDATE_LIMIT
+        window = candidates.limit(cap + 1).subquery()
+        ranked = select(
+            window,
+            func.row_number().over(order_by=(window.c.listened_at.desc(), window.c.id.desc())).label("recency"),
+            func.count().over().label("matched"),
+        ).subquery()
+        stmt = (
+            select(AuditoryDiaryORM, ranked.c.score, ranked.c.matched)
+            .join(ranked, ranked.c.id == AuditoryDiaryORM.id)
+            .where(ranked.c.recency <= cap)
+            .options(selectinload(AuditoryDiaryORM.track), selectinload(AuditoryDiaryORM.context))
+            .order_by(ranked.c.score.desc(), ranked.c.listened_at.desc(), ranked.c.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            after_score, after_listened_at, after_id = after
+            stmt = stmt.where(or_(
+                ranked.c.score < after_score,
+                and_(ranked.c.score == after_score, or_(
+                    ranked.c.listened_at < after_listened_at,
+                    and_(ranked.c.listened_at == after_listened_at, ranked.c.id < after_id),
+                )),
+            ))
+        rows = (await self.session.execute(stmt)).all()
+        truncated = bool(rows) and rows[0].matched > cap
+        return [(diary, score) for diary, score, _ in rows], truncated
+
+    @observe_repository
+    async def find_nearby(
+        self, user_id: uuid.UUID, latitude: float, longitude: float, radius_m: float, limit: int
+    ) -> List[Tuple[AuditoryDiaryORM, float]]:
+        """
+        (latitude, longitude) 반경 radius_m 안에서 남긴 기록 — (다이어리, 중심까지 거리 m)를 최신순으로 최대 limit건.
+        반경을 덮는 지오해시 칸마다 (user_id, geohash) 인덱스의 접두사 범위만 읽고,
+        위도/경도 사각형으로 한 번 더 거른 뒤 정확한 거리는 후보에만 계산합니다.
+        """
+        box = bounding_box(latitude, longitude, radius_m)
+        min_lat, min_lon, max_lat, max_lon = box
+        # 칸마다 (user_id = ? AND geohash 범위) — user_id를 OR 안에 둬야 칸별 인덱스 범위 검색의 합집합으로 계획됨
+        cell_ranges = []
+        for prefix in covering_prefixes(box):
+            upper = prefix_upper_bound(prefix)
+            cell = [AuditoryDiaryORM.user_id == user_id, AuditoryDiaryORM.geohash >= prefix]
+            if upper is not None:
+                cell.append(AuditoryDiaryORM.geohash < upper)
+            cell_ranges.append(and_(*cell))
+        stmt = (
+            select(AuditoryDiaryORM)
+            .join(ContextORM, ContextORM.id == AuditoryDiaryORM.context_id)
+            .options(contains_eager(AuditoryDiaryORM.context), selectinload(AuditoryDiaryORM.track))
+            .where(
+                or_(*cell_ranges),
+                ContextORM.latitude.between(min_lat, max_lat),
+                ContextORM.longitude.between(min_lon, max_lon),
+            )
+            .order_by(desc(AuditoryDiaryORM.listened_at))
+            .limit(limit)
+        )
+        diaries = (await self.session.execute(stmt)).scalars().all()
+        hits = [
+            (diary, distance_m(latitude, longitude, diary.context.latitude, diary.context.longitude))
+            for diary in diaries
+        ]
+        # 사각형의 모서리 부분(원 밖) 제외
+        return [(diary, distance) for diary, distance in hits if distance <= radius_m]
+
+    @observe_repository
+    async def backfill_geohashes(self, batch_size: int = 5000) -> int:
+        """context에 좌표가 있는데 geohash가 비어 있는 기록(컬럼 추가 전 기록)을 채우고 채운 행 수를 반환합니다"""
+        updated = 0
+        while True:
+            rows = (await self.session.execute(
+                select(AuditoryDiaryORM.id, ContextORM.latitude, ContextORM.longitude)
+                .join(ContextORM, ContextORM.id == AuditoryDiaryORM.context_id)
+                .where(
+                    AuditoryDiaryORM.geohash.is_(None),
+                    ContextORM.latitude.is_not(None), ContextORM.longitude.is_not(None),
+                )
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                return updated
+            await self.session.execute(
+                update(AuditoryDiaryORM).execution_options(synchronize_session=False),
+                [{"id": diary_id, "geohash": encode_coordinates(lat, lon)} for diary_id, lat, lon in rows],
+            )
+            await self.session.commit()
+            updated += len(rows)
+
+    @observe_repository
+    async def backfill_search_documents(self, batch_size: int = 5000) -> int:
+        """
+        search_document가 비어 있는 기록(컬럼 추가 전 기록)의 검색 문서를 채우고 채운 행 수를 반환합니다.
+        id 키셋 배치마다 커밋 — 중단돼도 다시 실행하면 남은 행부터 이어서 진행
+        """
+        updated = 0
+        after: Optional[uuid.UUID] = None
+        while True:
+            stmt = (
+                select(AuditoryDiaryORM.id, AuditoryDiaryORM.memo, TrackORM.title, TrackORM.artist, ContextORM.place_name)
+                .join(TrackORM, TrackORM.id == AuditoryDiaryORM.track_id)
+                .join(ContextORM, ContextORM.id == AuditoryDiaryORM.context_id)
+                .where(AuditoryDiaryORM.search_document.is_(None))
+                .order_by(AuditoryDiaryORM.id)
+                .limit(batch_size)
+            )
+            if after is not None:
+                stmt = stmt.where(AuditoryDiaryORM.id > after)
+            rows = (await self.session.execute(stmt)).all()
+            if not rows:
+                return updated
+            await self.session.execute(
+                update(AuditoryDiaryORM).execution_options(synchronize_session=False),
+                [
+                    {"id": diary_id, "search_document": build_search_document(memo, title, artist, place_name)}
+                    for diary_id, memo, title, artist, place_name in rows
+                ],
+            )
+            await self.session.commit()
+            updated += len(rows)
+            after = rows[-1][0]
+
+    @observe_repository
+    async def rebucket_local_dates(
+        self, user_id: uuid.UUID, timezone_name: str, only_missing: bool = False, batch_size: int = 5000
+    ) -> int:
+        """
+        유저 기록의 local_date를 timezone_name 기준으로 다시 계산하고 바뀐 행 수를 반환합니다.
+        (유저 시간대 변경 / 컬럼 추가 전 기록 백필용, only_missing이면 local_date가 비어 있는 행만)
+        PostgreSQL은 UPDATE 한 번으로 DB에서 변환하고, SQLite는 id 키셋 배치마다 파이썬에서 계산해 커밋합니다.
+        """
+        conditions = [AuditoryDiaryORM.user_id == user_id]
+        if only_missing:
+            conditions.append(AuditoryDiaryORM.local_date.is_(None))
+
+        if self.session.bind.dialect.name == "postgresql":
+            result = await self.session.execute(
+                update(AuditoryDiaryORM)
+                .where(*conditions)
+                .values(local_date=cast(func.timezone(timezone_name, AuditoryDiaryORM.listened_at), Date))
+                .execution_options(synchronize_session=False)
+            )
+            await self.session.commit()
+            return result.rowcount
+
+        updated = 0
+        after: Optional[uuid.UUID] = None
+        while True:
+            stmt = (
+                select(AuditoryDiaryORM.id, AuditoryDiaryORM.listened_at)
+                .where(*conditions)
+                .order_by(AuditoryDiaryORM.id)
+                .limit(batch_size)
+            )
+            if after is not None:
+                stmt = stmt.where(AuditoryDiaryORM.id > after)
+            rows = (await self.session.execute(stmt)).all()
+            if not rows:
+                return updated
+            await self.session.execute(
+                update(AuditoryDiaryORM).execution_options(synchronize_session=False),
+                [{"id": diary_id, "local_date": to_local_date(listened_at, timezone_name)} for diary_id, listened_at in rows],
+            )
+            await self.session.commit()
+            updated += len(rows)
+            after = rows[-1][0]
+
+
+def _listen_key(listened_at: datetime) -> datetime:
+    """
+    중복 판정용 재생 시각 키 — naive UTC, 초 단위.
+    SQLite는 naive, PostgreSQL은 aware datetime을 돌려주고, 내보내기 파일(ts)은 초 단위,
+    recently-played API(played_at)는 밀리초 단위라 같은 재생도 값이 달라지므로 정규화해서 비교
+    """
+    if listened_at.tzinfo is not None:
+        listened_at = listened_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return listened_at.replace(microsecond=0)
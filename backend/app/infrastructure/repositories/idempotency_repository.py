@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+import uuid
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.metrics import observe_repository
+from app.infrastructure.db.models import IdempotencyKeyORM
+
+
+class IdempotencyRepository:
+    """Idempotency-Key 처리 권한(임대)과 완료된 응답 저장/조회 — 각 메서드가 바로 커밋 (다른 워커에 즉시 보이도록)"""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _dialect_insert(self, table):
+        """ON CONFLICT를 지원하는 방언별 INSERT (PostgreSQL/SQLite 공통 문법)"""
+        if self.session.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(table)
+
+    @observe_repository
+    async def try_claim(self, user_id: uuid.UUID, key: str, fingerprint: str) -> bool:
+        """
+        키의 처리 권한을 얻으면 True. 처음 보는 키는 INSERT로, 만료된 키나 임대가 끝난 처리 중 키는 UPDATE로 이어받음.
+        Why: 확인 후 INSERT가 아니라 UNIQUE 제약으로 경합을 가려, 동시에 온 같은 키 요청 중 하나만 실행됨
+        """
+        now = datetime.now(timezone.utc)
+        values = dict(
+            request_fingerprint=fingerprint,
+            status="in_progress",
+            response_status=None,
+            response_body=None,
+            locked_until=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        )
+        inserted = await self.session.execute(
+            self._dialect_insert(IdempotencyKeyORM.__table__).values(
+                id=uuid.uuid4(), user_id=user_id, key=key, created_at=now, **values
+            ).on_conflict_do_nothing(index_elements=["user_id", "key"])
+        )
+        claimed = inserted.rowcount == 1
+        if not claimed:
+            taken_over = await self.session.execute(
+                update(IdempotencyKeyORM)
+                .where(
+                    IdempotencyKeyORM.user_id == user_id,
+                    IdempotencyKeyORM.key == key,
+                    or_(
+                        IdempotencyKeyORM.expires_at < now,
+                        (IdempotencyKeyORM.status == "in_progress") & (IdempotencyKeyORM.locked_until < now),
+                    ),
+                )
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            claimed = taken_over.rowcount == 1
+        await self.session.commit()
+        return claimed
+
+    @observe_repository
+    async def get(self, user_id: uuid.UUID, key: str) -> Optional[IdempotencyKeyORM]:
+        stmt = select(IdempotencyKeyORM).where(IdempotencyKeyORM.user_id == user_id, IdempotencyKeyORM.key == key)
+        # Why: 기다리는 동안 반복 조회하므로 identity map에 남은 이전 상태가 아니라 새로 읽은 값을 사용
+        return (await self.session.execute(stmt.execution_options(populate_existing=True))).scalar_one_or_none()
+
+    @observe_repository
+    async def complete(self, user_id: uuid.UUID, key: str, status_code: int, body: Any) -> None:
+        await self.session.execute(
+            update(IdempotencyKeyORM)
+            .where(IdempotencyKeyORM.user_id == user_id, IdempotencyKeyORM.key == key)
+            .values(status="completed", response_status=status_code, response_body=body)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+
+    @observe_repository
+    async def release(self, user_id: uuid.UUID, key: str) -> None:
+        """처리에 실패한 키를 지워 다음 재시도가 처음부터 다시 실행되게 함"""
+        await self.session.rollback()
+        await self.session.execute(
+            delete(IdempotencyKeyORM).where(
+                IdempotencyKeyORM.user_id == user_id,
+                IdempotencyKeyORM.key == key,
+                IdempotencyKeyORM.status == "in_progress",
+            )
+        )
+        await self.session.commit()
+
+    @observe_repository
+    async def purge_expired(self) -> int:
+        result = await self.session.execute(
+            delete(IdempotencyKeyORM).where(IdempotencyKeyORM.expires_at < datetime.now(timezone.utc))
+        )
+        await self.session.commit()
+        return result.rowcount
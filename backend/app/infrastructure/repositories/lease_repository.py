@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import observe_repository
+from app.infrastructure.db.models import WorkerLeaseORM
+
+
+class WorkerLeaseRepository:
+    """워커 간 단일 실행 임대 획득/갱신/반납 — 각 메서드가 바로 커밋 (다른 워커에 즉시 보이도록)"""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _dialect_insert(self, table):
+        """ON CONFLICT를 지원하는 방언별 INSERT (PostgreSQL/SQLite 공통 문법)"""
+        if self.session.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(table)
+
+    @observe_repository
+    async def try_acquire(self, name: str, holder: str, lease_seconds: float) -> bool:
+        """
+        임대를 얻거나(처음/만료) 이미 가진 임대를 연장하면 True. 다른 워커가 유효한 임대를 갖고 있으면 False
+        Why: 확인 후 INSERT가 아니라 기본 키 충돌과 조건부 UPDATE로 경합을 가려, 동시에 시도해도 한 워커만 얻음
+        """
+        now = datetime.now(timezone.utc)
+        locked_until = now + timedelta(seconds=lease_seconds)
+        inserted = await self.session.execute(
+            self._dialect_insert(WorkerLeaseORM.__table__).values(
+                name=name, holder=holder, locked_until=locked_until
+            ).on_conflict_do_nothing(index_elements=["name"])
+        )
+        acquired = inserted.rowcount == 1
+        if not acquired:
+            renewed = await self.session.execute(
+                update(WorkerLeaseORM)
+                .where(
+                    WorkerLeaseORM.name == name,
+                    or_(WorkerLeaseORM.holder == holder, WorkerLeaseORM.locked_until < now),
+                )
+                .values(holder=holder, locked_until=locked_until)
+                .execution_options(synchronize_session=False)
+            )
+            acquired = renewed.rowcount == 1
+        await self.session.commit()
+        return acquired
+
+    @observe_repository
+    async def release(self, name: str, holder: str) -> None:
+        """종료하는 워커가 임대를 반납 — 다른 워커가 만료를 기다리지 않고 바로 이어받음"""
+        await self.session.execute(
+            delete(WorkerLeaseORM).where(WorkerLeaseORM.name == name, WorkerLeaseORM.holder == holder)
+        )
+        await self.session.commit()
@@ -0,0 +1,274 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import uuid
+
+from sqlalchemy import delete, event, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session, object_session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import observe_repository
+from app.infrastructure.db.models import (
+    AuditoryDiaryORM,
+    ContextORM,
+    ListeningHourlyORM,
+    ListeningWeatherHourlyORM,
+    TrackORM,
+)
+
+
+@dataclass
+class ListeningAggregates:
+    """
+    청취 통계의 원천 집계값. SQL GROUP BY 결과를 그대로 담고, 새 기록은 카운터에 더하기만 하면 되도록 유지.
+    - hour_counts: UTC 시(hour) 버킷 → 재생 수 (유저 시간대 히트맵/스트릭/주간 비교는 이 버킷에서 계산)
+    - track_counts / weather_counts: range_start 이후 트랙별/날씨별 재생 수
+    """
+    range_start: Optional[datetime]   # 트랙/날씨 집계 시작 (None이면 전체 기간)
+    window_start: Optional[datetime]  # 시간 버킷 집계 시작 (주간 비교를 위해 range_start보다 이를 수 있음)
+    hour_counts: Counter = field(default_factory=Counter)
+    track_counts: Counter = field(default_factory=Counter)
+    track_info: Dict[uuid.UUID, Tuple[str, str, Optional[str]]] = field(default_factory=dict)  # id → (title, artist, artwork)
+    weather_counts: Counter = field(default_factory=Counter)
+    unresolved_tracks: Set[uuid.UUID] = field(default_factory=set)  # 카운트는 반영됐지만 제목/아티스트를 아직 모르는 트랙
+
+    def apply(self, listened_at: datetime, track_id: uuid.UUID, weather: Optional[str]) -> None:
+        """새 재생 1건을 카운터에 더합니다. 처음 보는 트랙은 다음 조회 때 정보를 채우도록 표시"""
+        if self.window_start is not None and listened_at < self.window_start:
+            return
+        self.hour_counts[_hour_bucket(listened_at)] += 1
+        if self.range_start is None or listened_at >= self.range_start:
+            self.track_counts[track_id] += 1
+            self.weather_counts[weather or ""] += 1
+            if track_id not in self.track_info:
+                self.unresolved_tracks.add(track_id)
+
+
+# 유저 → {(range 키, 시작 날짜): ListeningAggregates}
+# Why: 같은 프로세스에서 생긴 새 기록은 커밋 시점에 카운터에 더해 재계산 없이 반영하고,
+# 다른 워커 프로세스에서 생긴 기록은 TTL 안에서만 지연되도록 함
+_stats_cache = TTLCache(maxsize=settings.STATS_CACHE_SIZE, ttl_seconds=settings.STATS_CACHE_TTL_SECONDS)
+
+_PENDING_LISTENS = "stats_pending_listens"
+_PENDING_WEATHER = "stats_pending_weather"
+_DIRTY_USERS = "stats_dirty_users"
+
+
+def get_cached_aggregates(user_id: uuid.UUID, key: Hashable) -> Optional[ListeningAggregates]:
+    entries = _stats_cache.get(user_id)
+    return entries.get(key) if entries else None
+
+
+def set_cached_aggregates(user_id: uuid.UUID, key: Hashable, aggregates: ListeningAggregates) -> None:
+    entries = _stats_cache.get(user_id)
+    if entries is None:
+        entries = {}
+        _stats_cache.set(user_id, entries)
+    entries[key] = aggregates
+
+
+def mark_stats_dirty(session: AsyncSession, user_id: uuid.UUID) -> None:
+    """ORM 이벤트를 거치지 않는 대량 INSERT(Core executemany) 후 — 커밋되면 해당 유저의 통계 캐시를 버림"""
+    session.sync_session.info.setdefault(_DIRTY_USERS, set()).add(user_id)
+
+
+async def _upsert_plays(session: AsyncSession, table, key_columns: List[str], rows: List[dict]) -> None:
+    """롤업 행에 재생 수를 더하는 UPSERT (executemany) — 동시에 같은 버킷에 더해도 DB에서 plays + excluded.plays로 누적"""
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(index_elements=key_columns, set_={"plays": table.c.plays + stmt.excluded.plays})
+    await session.execute(stmt, rows)
+
+
+async def add_listens_to_rollup(
+    session: AsyncSession, user_id: uuid.UUID, listens: Iterable[Tuple[datetime, Optional[str]]]
+) -> None:
+    """
+    새 재생(재생 시각, 날씨)을 시간 버킷 롤업(listening_hourly, listening_hourly_weather)에 더합니다.
+    다이어리 INSERT와 같은 트랜잭션에서 호출 (커밋은 호출자). 같은 버킷끼리 먼저 합쳐 테이블마다 UPSERT 1회
+    """
+    by_weather = Counter((_hour_bucket(listened_at), weather or "") for listened_at, weather in listens)
+    if not by_weather:
+        return
+    by_hour: Counter = Counter()
+    for (bucket, _), count in by_weather.items():
+        by_hour[bucket] += count
+    await _upsert_plays(session, ListeningHourlyORM.__table__, ["user_id", "hour_start"], [
+        {"user_id": user_id, "hour_start": bucket, "plays": count} for bucket, count in by_hour.items()
+    ])
+    await _upsert_plays(session, ListeningWeatherHourlyORM.__table__, ["user_id", "hour_start", "weather"], [
+        {"user_id": user_id, "hour_start": bucket, "weather": weather, "plays": count}
+        for (bucket, weather), count in by_weather.items()
+    ])
+
+
+@event.listens_for(ContextORM, "after_insert")
+def _record_new_context(mapper, connection, target: ContextORM) -> None:
+    # FK 순서상 같은 flush에서 다이어리보다 먼저 INSERT 되므로, 다이어리 쪽에서 날씨를 찾을 수 있도록 보관
+    object_session(target).info.setdefault(_PENDING_WEATHER, {})[target.id] = target.weather
+
+
+@event.listens_for(AuditoryDiaryORM, "after_insert")
+def _record_new_listen(mapper, connection, target: AuditoryDiaryORM) -> None:
+    # 커밋 전까지는 세션에 모아두기만 함 (롤백되면 버려짐)
+    session = object_session(target)
+    session.info.setdefault(_PENDING_LISTENS, []).append((
+        target.user_id, _as_utc(target.listened_at), target.track_id, target.context_id,
+    ))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_listens(session: Session) -> None:
+    for user_id in session.info.pop(_DIRTY_USERS, ()):
+        _stats_cache.pop(user_id)
+    weathers = session.info.pop(_PENDING_WEATHER, {})
+    for user_id, listened_at, track_id, context_id in session.info.pop(_PENDING_LISTENS, ()):
+        entries = _stats_cache.get(user_id)
+        if not entries:
+            continue
+        if context_id not in weathers:
+            # 기존 컨텍스트를 재사용한 기록은 날씨를 알 수 없어 카운터를 맞출 수 없으므로 다음 조회 때 다시 집계
+            _stats_cache.pop(user_id)
+            continue
+        for aggregates in entries.values():
+            aggregates.apply(listened_at, track_id, weathers[context_id])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_listens(session: Session, previous_transaction) -> None:
+    for key in (_PENDING_LISTENS, _PENDING_WEATHER, _DIRTY_USERS):
+        session.info.pop(key, None)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite는 timezone 정보 없이 돌려주므로 UTC로 간주
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _hour_bucket(value: datetime) -> datetime:
+    return _as_utc(value).replace(minute=0, second=0, microsecond=0)
+
+
+class StatsRepository:
+    """
+    청취 통계용 집계 쿼리. ORM 객체를 로드하지 않고 GROUP BY 결과(시간 버킷/트랙/날씨별 개수)만 가져옵니다.
+    Why: 1년치(수만 건)를 ORM으로 로드해 파이썬에서 순회하면 수백 ms — 집계는 DB에서, 결과 행 수는 버킷 수로 고정
+    시간 버킷/날씨별 개수는 쓰기 시점에 더해 둔 롤업(listening_hourly, listening_hourly_weather)에서 읽어 다이어리/contexts를 훑지 않음
+    """
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _utc_hour_expr(self):
+        # 롤업 재계산용: 다이어리의 UTC 정시 버킷을 롤업의 hour_start와 같은 형태로 (DB 세션 타임존 설정에 의존하지 않도록 UTC 기준)
+        if self.session.bind.dialect.name == "postgresql":
+            return func.timezone("UTC", func.date_trunc("hour", func.timezone("UTC", AuditoryDiaryORM.listened_at)))
+        # SQLite는 'YYYY-MM-DD HH:MM:SS.ffffff' 문자열로 저장하므로 앞 13자리(시간)에 정시 부분을 붙임
+        return func.substr(AuditoryDiaryORM.listened_at, 1, 13).concat(":00:00.000000")
+
+    @observe_repository
+    async def get_listening_aggregates(
+        self, user_id: uuid.UUID, range_start: Optional[datetime], window_start: Optional[datetime],
+        range_end: Optional[datetime] = None,
+    ) -> ListeningAggregates:
+        """
+        range_end(미포함)를 주면 그 이전 기록만 집계 — 지난 기간 결산용 (캐시/apply 대상이 아님)
+        시간 버킷/날씨는 UTC 정시 버킷 단위로 범위를 자르므로, UTC와 30/45분 차이 나는 시간대에서는
+        경계 시간의 재생이 범위 안/밖으로 잡힐 수 있음 (히트맵과 같은 근사, 트랙별 집계는 재생 시각 기준으로 정확)
+        """
+        aggregates = ListeningAggregates(range_start=range_start, window_start=window_start)
+        rollup = ListeningHourlyORM
+
+        # 1. UTC 시간 버킷별 재생 수 (롤업)
+        stmt = select(rollup.hour_start, func.sum(rollup.plays)).where(rollup.user_id == user_id).group_by(
+            rollup.hour_start
+        )
+        if window_start is not None:
+            stmt = stmt.where(rollup.hour_start >= window_start)
+        if range_end is not None:
+            stmt = stmt.where(rollup.hour_start < range_end)
+        for bucket, count in (await self.session.execute(stmt)).all():
+            aggregates.hour_counts[_as_utc(bucket)] = count
+
+        # 2. 트랙별 재생 수 (아티스트 순위는 트랙 집계에서 파생)
+        # 다이어리 인덱스만으로 track_id별 개수를 먼저 집계한 뒤, 트랙 수만큼만 tracks와 조인
+        per_track = (
+            select(AuditoryDiaryORM.track_id, func.count().label("plays"))
+            .where(AuditoryDiaryORM.user_id == user_id)
+            .group_by(AuditoryDiaryORM.track_id)
+        )
+        if range_start is not None:
+            per_track = per_track.where(AuditoryDiaryORM.listened_at >= range_start)
+        if range_end is not None:
+            per_track = per_track.where(AuditoryDiaryORM.listened_at < range_end)
+        per_track = per_track.subquery()
+        stmt = select(
+            TrackORM.id, TrackORM.title, TrackORM.artist, TrackORM.album_artwork_url, per_track.c.plays
+        ).join(per_track, per_track.c.track_id == TrackORM.id)
+        for track_id, title, artist, artwork, count in (await self.session.execute(stmt)).all():
+            aggregates.track_counts[track_id] = count
+            aggregates.track_info[track_id] = (title, artist, artwork)
+
+        # 3. 날씨별 재생 수 (롤업 — 기록마다 contexts를 조인하지 않음)
+        weather_rollup = ListeningWeatherHourlyORM
+        stmt = select(weather_rollup.weather, func.sum(weather_rollup.plays)).where(
+            weather_rollup.user_id == user_id
+        ).group_by(weather_rollup.weather)
+        if range_start is not None:
+            stmt = stmt.where(weather_rollup.hour_start >= range_start)
+        if range_end is not None:
+            stmt = stmt.where(weather_rollup.hour_start < range_end)
+        for weather, count in (await self.session.execute(stmt)).all():
+            aggregates.weather_counts[weather] += count
+
+        return aggregates
+
+    async def rebuild_listening_rollup(self, user_ids: List[uuid.UUID]) -> int:
+        """
+        유저들의 시간 버킷 롤업을 다이어리/contexts에서 다시 계산합니다 (마이그레이션 백필, Core INSERT로 시드한 데이터용).
+        기존 롤업 행을 지우고 테이블마다 INSERT ... SELECT 한 번으로 채우며, 커밋까지 하고 만든 시간 버킷 수를 반환
+        """
+        if not user_ids:
+            return 0
+        bucket = self._utc_hour_expr().label("hour_start")
+        weather = func.coalesce(ContextORM.weather, "").label("weather")
+        hourly = (
+            select(AuditoryDiaryORM.user_id, bucket, func.count())
+            .where(AuditoryDiaryORM.user_id.in_(user_ids))
+            .group_by(AuditoryDiaryORM.user_id, bucket)
+        )
+        weather_hourly = (
+            select(AuditoryDiaryORM.user_id, bucket, weather, func.count())
+            .join(ContextORM, ContextORM.id == AuditoryDiaryORM.context_id)
+            .where(AuditoryDiaryORM.user_id.in_(user_ids))
+            .group_by(AuditoryDiaryORM.user_id, bucket, weather)
+        )
+        for rollup in (ListeningHourlyORM, ListeningWeatherHourlyORM):
+            await self.session.execute(delete(rollup).where(rollup.user_id.in_(user_ids)))
+        result = await self.session.execute(
+            insert(ListeningHourlyORM).from_select(["user_id", "hour_start", "plays"], hourly)
+        )
+        await self.session.execute(
+            insert(ListeningWeatherHourlyORM).from_select(["user_id", "hour_start", "weather", "plays"], weather_hourly)
+        )
+        for user_id in user_ids:
+            mark_stats_dirty(self.session, user_id)
+        await self.session.commit()
+        return result.rowcount
+
+    @observe_repository
+    async def resolve_tracks(self, aggregates: ListeningAggregates) -> None:
+        """캐시된 집계에 새로 더해진 트랙의 제목/아티스트를 채웁니다. (트랙 수만큼의 IN 조회 1회)"""
+        track_ids = list(aggregates.unresolved_tracks)
+        stmt = select(TrackORM.id, TrackORM.title, TrackORM.artist, TrackORM.album_artwork_url).where(
+            TrackORM.id.in_(track_ids)
+        )
+        for track_id, title, artist, artwork in (await self.session.execute(stmt)).all():
+            aggregates.track_info[track_id] = (title, artist, artwork)
+        aggregates.unresolved_tracks.difference_update(track_ids)
@@ -0,0 +1,173 @@
+"""
+트랙 카탈로그 캐시 — external_platform_id → tracks.id (프로세스 전역 LRU).
+
+인기 곡은 여러 유저의 동기화/스크로블에서 계속 다시 조회되므로, 쓰기 경로가 트랙 행을 찾는 SELECT를
+캐시 적중 시 건너뜁니다. 트랙 행은 삭제/수정되지 않아(ID 매핑 불변) 무효화가 필요 없고,
+세션 안에서 새로 INSERT 한 트랙은 커밋된 뒤에만 캐시에 올려 롤백된 ID가 남지 않게 합니다.
+
+항목을 작게 유지하기 위해 키(ID 문자열의 바이트)와 값(UUID의 128비트)을 모두 정수로 보관하고,
+항목마다 연결 리스트 노드가 붙는 OrderedDict 대신 dict 두 개(세대)로 LRU를 근사합니다.
+"""
+import asyncio
+import logging
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import TRACK_CATALOG_LOOKUPS
+from app.infrastructure.db.models import AuditoryDiaryORM, TrackORM
+
+logger = logging.getLogger(__name__)
+
+_PENDING_TRACK_IDS = "pending_track_ids"
+
+
+# 이보다 긴 ID는 정수로 바꿔도 작아지지 않으므로 문자열 그대로 키로 사용
+_MAX_PACKED_KEY_BYTES = 32
+
+
+def _compact_key(external_platform_id: str) -> Union[int, str]:
+    """ID 문자열 → 정수 키 (Spotify ID 22자: str 71바이트 → int 48바이트). NUL 문자가 없으면 서로 다른 ID는 다른 정수"""
+    encoded = external_platform_id.encode()
+    if len(encoded) > _MAX_PACKED_KEY_BYTES or b"\0" in encoded:
+        return external_platform_id
+    return int.from_bytes(encoded, "big")
+
+
+class TrackIdCache:
+    """
+    항목 수 제한 LRU 근사. asyncio 단일 스레드 전제 (TTLCache와 같음).
+    새 항목과 적중한 항목은 young 세대에 들어가고, young이 maxsize의 절반을 채우면 통째로 old가 되며
+    이전 old(그동안 한 번도 조회되지 않은 항목)는 버려집니다.
+    Why: 트랙 ID는 바뀌지 않으므로 만료 시각이 필요 없고, 항목당 추가 객체 없이 dict 항목만 남김
+    """
+    __slots__ = ("maxsize", "hits", "misses", "_young", "_old")
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._young: Dict[Union[int, str], int] = {}
+        self._old: Dict[Union[int, str], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._young) + len(self._old)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, external_platform_id: str) -> Optional[uuid.UUID]:
+        key = _compact_key(external_platform_id)
+        value = self._young.get(key)
+        if value is None:
+            value = self._old.pop(key, None)
+            if value is None:
+                self.misses += 1
+                return None
+            self._put(key, value)
+        self.hits += 1
+        return uuid.UUID(int=value)
+
+    def update(self, mapping: Iterable[Tuple[str, uuid.UUID]]) -> None:
+        for external_platform_id, track_id in mapping:
+            key = _compact_key(external_platform_id)
+            self._old.pop(key, None)
+            self._put(key, track_id.int)
+
+    def _put(self, key: Union[int, str], value: int) -> None:
+        self._young[key] = value
+        if len(self._young) >= max(self.maxsize // 2, 1):
+            self._old = self._young
+            self._young = {}
+
+    def clear(self) -> None:
+        self._young = {}
+        self._old = {}
+        self.hits = 0
+        self.misses = 0
+
+
+# 프로세스(워커)당 하나
+track_id_cache = TrackIdCache(maxsize=settings.TRACK_CATALOG_CACHE_SIZE)
+
+
+def lookup_cached_track_ids(external_ids: List[str]) -> Dict[str, uuid.UUID]:
+    """캐시에 있는 것만 돌려줌 (적중/실패는 메트릭에도 기록)"""
+    found = {}
+    for external_id in external_ids:
+        track_id = track_id_cache.get(external_id)
+        if track_id is not None:
+            found[external_id] = track_id
+    if found:
+        TRACK_CATALOG_LOOKUPS.labels("hit").inc(len(found))
+    if len(found) < len(external_ids):
+        TRACK_CATALOG_LOOKUPS.labels("miss").inc(len(external_ids) - len(found))
+    return found
+
+
+def remember_track_ids(session, mapping: Dict[str, uuid.UUID]) -> None:
+    """DB에서 확인한 매핑 — 세션이 커밋되면 캐시에 올림 (같은 트랜잭션에서 INSERT 한 트랙일 수 있으므로)"""
+    session.sync_session.info.setdefault(_PENDING_TRACK_IDS, {}).update(mapping)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_track_ids(session: Session) -> None:
+    pending = session.info.pop(_PENDING_TRACK_IDS, None)
+    if pending:
+        track_id_cache.update(pending.items())
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_track_ids(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_TRACK_IDS, None)
+
+
+async def warm_track_catalog(
+    limit: int = settings.TRACK_CATALOG_WARM_SIZE,
+    scan_rows: int = settings.TRACK_CATALOG_WARM_SCAN_ROWS,
+) -> int:
+    """
+    최근 재생된 트랙으로 캐시를 채우고 채운 개수를 반환 (읽기 복제본 사용 — 커밋된 행만 보임)
+    Why: 전체 기록을 GROUP BY 하면 워커가 뜰 때마다 테이블 크기만큼 비용이 늘어남 —
+         최근 scan_rows건만 (listened_at, track_id) 인덱스 역순으로 읽고, 나머지는 캐시 미스 때 채워짐
+    """
+    from app.infrastructure.db.database import AsyncReadSessionLocal
+
+    if limit <= 0 or scan_rows <= 0:
+        return 0
+    recent = (
+        select(AuditoryDiaryORM.track_id, AuditoryDiaryORM.listened_at)
+        .order_by(AuditoryDiaryORM.listened_at.desc())
+        .limit(scan_rows)
+        .subquery()
+    )
+    last_played = func.max(recent.c.listened_at).label("last_played")
+    latest = (
+        select(recent.c.track_id, last_played)
+        .group_by(recent.c.track_id)
+        .order_by(last_played.desc())
+        .limit(limit)
+        .subquery()
+    )
+    stmt = (
+        select(TrackORM.external_platform_id, TrackORM.id)
+        .join(latest, latest.c.track_id == TrackORM.id)
+        # 오래전에 재생된 것부터 넣어 가장 최근 트랙이 LRU의 최근 쪽에 오도록
+        .order_by(latest.c.last_played.asc())
+    )
+    async with AsyncReadSessionLocal() as session:
+        rows = (await session.execute(stmt)).all()
+    track_id_cache.update((external_id, track_id) for external_id, track_id in rows)
+    return len(rows)
+
+
+async def run_track_catalog_warmup(stopping: asyncio.Event) -> None:
+    """TaskSupervisor 루프 — 시작 시 한 번 채우고 종료 신호까지 대기 (DB가 아직 준비되지 않았으면 백오프 후 재시도)"""
+    warmed = await warm_track_catalog()
+    logger.info(f"Track catalog cache warmed with {warmed} tracks")
+    await stopping.wait()
@@ -1,29 +1,82 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import event
+from pydantic import BaseModel, ConfigDict
+from opentelemetry import trace
+from datetime import datetime
 from typing import Optional
 import uuid
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import observe_repository
 from app.infrastructure.db.user_models import UserORM
 
+
+class CachedUser(BaseModel):
+    """
+    짧은 TTL로 프로세스 메모리에 보관하는 유저 레코드 스냅샷 (읽기 전용).
+    세션에 묶이지 않으므로 토큰 갱신 등 쓰기 작업에는 사용하지 말고 UserORM을 다시 로드해야 합니다.
+    """
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+
+    id: uuid.UUID
+    email: str
+    name: Optional[str] = None
+    spotify_access_token: Optional[str] = None
+    spotify_token_expires_at: Optional[datetime] = None
+    timezone: str = settings.DEFAULT_TIMEZONE
+
+
+# 핫 엔드포인트(일기 생성, 캡슐 생성 등)에서 매 요청마다 users 테이블을 조회하지 않도록 하는 캐시
+# Why: TTL을 짧게 두어 다른 워커 프로세스에서의 토큰 변경도 금방 반영되도록 함
+_user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(UserORM, "after_update")
+def _invalidate_cached_user(mapper, connection, target: UserORM) -> None:
+    # Spotify 토큰 갱신/해제 등 어느 경로에서 UPDATE가 flush되든 같은 프로세스의 스냅샷은 즉시 폐기
+    _user_cache.pop(target.id)
+
+
 class UserRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @observe_repository
     async def get_by_email(self, email: str) -> Optional[UserORM]:
         stmt = select(UserORM).where(UserORM.email == email)
         result = await self.session.execute(stmt)
         return result.scalars().first()
     
+    @observe_repository
     async def get_by_google_id(self, google_id: str) -> Optional[UserORM]:
         stmt = select(UserORM).where(UserORM.google_id == google_id)
         result = await self.session.execute(stmt)
         return result.scalars().first()
 
+    @observe_repository
     async def get_by_id(self, user_id: uuid.UUID) -> Optional[UserORM]:
-        stmt = select(UserORM).where(UserORM.id == user_id)
-        result = await self.session.execute(stmt)
-        return result.scalars().first()
+        # session.get은 identity map을 먼저 확인하므로, 같은 요청(세션)에서 재호출해도 쿼리가 나가지 않음
+        return await self.session.get(UserORM, user_id)
+
+    @observe_repository
+    async def get_cached(self, user_id: uuid.UUID) -> Optional[CachedUser]:
+        """TTL 캐시에 스냅샷이 있으면 DB 조회 없이 반환하고, 없으면 로드 후 캐시합니다."""
+        cached = _user_cache.get(user_id)
+        trace.get_current_span().set_attribute("cache.hit", cached is not None)
+        if cached is not None:
+            return cached
+
+        user = await self.get_by_id(user_id)
+        if not user:
+            return None
 
+        snapshot = CachedUser.model_validate(user)
+        _user_cache.set(user_id, snapshot)
+        return snapshot
+
+    @observe_repository
     async def create_user(self, email: str, name: str, google_id: str) -> UserORM:
         new_user = UserORM(
             email=email,
@@ -35,6 +88,35 @@ class UserRepository:
         await self.session.refresh(new_user)
         return new_user
     
+    @observe_repository
+    async def upsert_google_user(self, email: str, name: str, google_id: str) -> UserORM:
+        """
+        google_id 기준 INSERT ... ON CONFLICT DO UPDATE ... RETURNING 한 번으로 로그인 유저를 확정합니다.
+        조회 후 생성(get → create)과 달리 DB 왕복이 1회이며, 같은 계정의 최초 로그인이
+        동시에 들어와도 UNIQUE(google_id) 충돌 없이 같은 행을 반환합니다.
+        """
+        dialect = self.session.bind.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            # ON CONFLICT 미지원 DB: 기존 조회 후 생성 경로로 대체
+            user = await self.get_by_google_id(google_id)
+            return user or await self.create_user(email=email, name=name, google_id=google_id)
+
+        stmt = insert(UserORM).values(email=email, name=name, google_id=google_id)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserORM.google_id],
+            set_={"email": stmt.excluded.email, "name": stmt.excluded.name},
+        ).returning(UserORM)
+
+        result = await self.session.execute(stmt, execution_options={"populate_existing": True})
+        user = result.scalars().one()
+        await self.session.commit()
+        return user
+    
+    @observe_repository
     async def update_spotify_tokens(self, user_id: uuid.UUID, access_token: str, refresh_token: str, expires_at) -> Optional[UserORM]:
         stmt = select(UserORM).where(UserORM.id == user_id)
         result = await self.session.execute(stmt)
@@ -0,0 +1,82 @@
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+import uuid
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.metrics import observe_repository
+from app.infrastructure.db.models import DailyCapsuleORM, YearInReviewORM
+from app.infrastructure.db.user_models import UserORM
+
+
+class YearReviewRepository:
+    """연말 결산 결과 저장/조회 + 배치 대상 유저 순회용 쿼리"""
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _dialect_insert(self, table):
+        """ON CONFLICT를 지원하는 방언별 INSERT (PostgreSQL/SQLite 공통 문법)"""
+        if self.session.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(table)
+
+    @observe_repository
+    async def get(self, user_id: uuid.UUID, year: int) -> Optional[YearInReviewORM]:
+        stmt = select(YearInReviewORM).where(YearInReviewORM.user_id == user_id, YearInReviewORM.year == year)
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    @observe_repository
+    async def get_pending_users(
+        self, year: int, after: Optional[uuid.UUID], limit: int
+    ) -> List[Tuple[uuid.UUID, Optional[str], str]]:
+        """
+        아직 해당 연도 결산이 없는 유저를 id 순으로 limit명씩 (id, spotify_access_token, timezone) 반환합니다.
+        Why: 결과 테이블 자체가 체크포인트 — 중단 후 재실행해도 완료된 유저는 anti-join으로 걸러짐
+        """
+        done = select(YearInReviewORM.id).where(
+            YearInReviewORM.user_id == UserORM.id, YearInReviewORM.year == year
+        ).exists()
+        stmt = (
+            select(UserORM.id, UserORM.spotify_access_token, UserORM.timezone)
+            .where(~done)
+            .order_by(UserORM.id)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(UserORM.id > after)
+        return [tuple(row) for row in (await self.session.execute(stmt)).all()]
+
+    @observe_repository
+    async def get_theme_counts(self, user_id: uuid.UUID, start: date, end: date) -> Counter:
+        """기간 [start, end) 안의 Daily Capsule 테마별 개수"""
+        stmt = (
+            select(DailyCapsuleORM.theme, func.count())
+            .where(
+                DailyCapsuleORM.user_id == user_id,
+                DailyCapsuleORM.target_date >= start,
+                DailyCapsuleORM.target_date < end,
+            )
+            .group_by(DailyCapsuleORM.theme)
+        )
+        return Counter({theme: count for theme, count in (await self.session.execute(stmt)).all()})
+
+    @observe_repository
+    async def save(
+        self, user_id: uuid.UUID, year: int, status: str, payload: Dict[str, Any], narrative: Optional[str]
+    ) -> bool:
+        """결산 1건 저장 — 다른 배치 프로세스가 먼저 저장했으면 건너뛰고 False (커밋은 호출자 몫)"""
+        stmt = self._dialect_insert(YearInReviewORM.__table__).values(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            year=year,
+            status=status,
+            payload=payload,
+            narrative=narrative,
+        ).on_conflict_do_nothing(index_elements=["user_id", "year"])
+        result = await self.session.execute(stmt)
+        return result.rowcount == 1
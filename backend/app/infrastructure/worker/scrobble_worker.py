@@ -1,29 +1,40 @@
 import asyncio
 from datetime import datetime, timezone, timedelta
 import logging
+import os
+import socket
+from typing import Optional
 import httpx
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.core.config import settings
+from app.core.metrics import track_external_call, SCROBBLE_CYCLE_DURATION, SCROBBLE_USERS
+from app.core.query_counter import track_queries
 from app.infrastructure.db.database import AsyncSessionLocal
 from app.infrastructure.db.user_models import UserORM
 from app.infrastructure.external.spotify_client import SpotifyAPIClient
 from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
+from app.infrastructure.repositories.lease_repository import WorkerLeaseRepository
 from app.infrastructure.external.location_client import LocationAPIClient
 from app.infrastructure.external.weather_client import WeatherAPIClient
-from app.application.diary_service import DiaryService
+from app.application.diary_service import AUTO_SCROBBLE_MEMO, DiaryService
 
 logger = logging.getLogger(__name__)
 
+# 워커(프로세스)가 여러 개여도 자동 스크로블은 이 임대를 가진 한 워커만 실행
+SCROBBLER_LEASE = "auto_scrobbler"
+
 class ScrobbleWorker:
     """
     백그라운드에서 주기적으로 사용자들의 Spotify 계정을 순회하며
     최근 재생 곡을 자동으로 일기(AuditoryDiary)에 기록하는 워커
     """
-    def __init__(self):
+    def __init__(self, stopping: Optional[asyncio.Event] = None):
         self.spotify_client = SpotifyAPIClient()
+        # 종료 신호 — 설정되면 아직 시작하지 않은 유저 작업은 건너뛰고 진행 중인 작업만 마무리
+        self.stopping = stopping or asyncio.Event()
 
     async def _process_user(self, session: AsyncSession, user: UserORM):
         if not user.spotify_access_token:
@@ -39,7 +50,7 @@ class ScrobbleWorker:
         if expires_at and expires_at <= now_utc:
             if user.spotify_refresh_token:
                 try:
-                    token_url = "https://accounts.spotify.com/api/token"
+                    token_url = f"{settings.SPOTIFY_ACCOUNTS_BASE_URL}/api/token"
                     payload = {
                         "grant_type": "refresh_token",
                         "refresh_token": user.spotify_refresh_token,
@@ -48,7 +59,9 @@ class ScrobbleWorker:
                     }
                     headers = {"Content-Type": "application/x-www-form-urlencoded"}
                     async with httpx.AsyncClient() as client:
-                        resp = await client.post(token_url, data=payload, headers=headers)
+                        with track_external_call("spotify", "token_refresh") as call:
+                            resp = await client.post(token_url, data=payload, headers=headers)
+                            call.status = resp.status_code
                         if resp.status_code == 200:
                             token_data = resp.json()
                             user.spotify_access_token = token_data.get("access_token")
@@ -86,10 +99,12 @@ class ScrobbleWorker:
             )
 
             if not recent_tracks:
+                SCROBBLE_USERS.labels("no_tracks").inc()
                 return
 
             track_item = recent_tracks[0]
-            # 추가적으로 "이미 기록된 곡인지(중복 방지)" 검사 로직이 필요하나 청사진이므로 생략
+            # 같은 재생을 다시 관찰한 경우는 DiaryService가 기존 다이어리를 반환 (중복 기록 없음)
+            # 재생 중이면 청취 세션 병합, 최근 재생 항목이면 played_at 키로 조회
             
             # 2. 다이어리 서비스로 기록 (자동 기록이므로 위치/메모는 None)
             service = DiaryService(
@@ -103,12 +118,18 @@ class ScrobbleWorker:
             await service.create_diary_from_current_context(
                 user_id=user.id,
                 spotify_access_token=user.spotify_access_token,
-                lat=None, lon=None, memo="[Auto-Scrobbled]"
+                lat=None, lon=None, memo=AUTO_SCROBBLE_MEMO,
+                timezone_name=user.timezone
             )
             logger.info(f"Auto-scrobbled for user {user.email}")
+            SCROBBLE_USERS.labels("scrobbled").inc()
             
         except Exception as e:
+            # 실패한 flush가 남긴 트랜잭션을 정리하고, rollback으로 만료된 유저 속성을 다시 로드
+            await session.rollback()
+            await session.refresh(user)
             logger.error(f"Failed to auto-scrobble for user {user.email}: {e}")
+            SCROBBLE_USERS.labels("failed").inc()
             
             # API 호출 시 권한 오류(토큰 만료나 앱 연동 해제 등) 발생하면 Invalidate 처리
             if "expired or invalid" in str(e).lower() or getattr(e, "response", None) and getattr(e.response, "status_code", None) == 401:
@@ -123,20 +144,67 @@ class ScrobbleWorker:
         모든 활성 사용자에 대해 스크로블링을 실행
         """
         logger.info("Starting auto-scrobble job...")
+        with SCROBBLE_CYCLE_DURATION.time(), track_queries("scrobble_cycle") as query_stats:
+            await self._run_cycle()
+        logger.info(
+            f"Auto-scrobble job completed. ({query_stats.count} queries, {query_stats.duration * 1000:.1f}ms in DB)"
+        )
+
+    async def _run_cycle(self):
         async with AsyncSessionLocal() as session:
             stmt = select(UserORM).where(UserORM.spotify_access_token != None)
             result = await session.execute(stmt)
             users = result.scalars().all()
 
-            # TODO: 실무에서는 Celery, ARQ 커스텀 큐 활용 권장 (병목 방지)
-            tasks = [self._process_user(session, user) for user in users]
-            await asyncio.gather(*tasks)
-            
-        logger.info("Auto-scrobble job completed.")
-
-# FastAPI app 시작 시 등록할 백그라운드 태스크 무한 루프 
-async def start_auto_scrobbler(interval_seconds: int = 300):
-    worker = ScrobbleWorker()
-    while True:
-        await worker.run()
-        await asyncio.sleep(interval_seconds)
+        # Why: AsyncSession은 동시 사용이 불가하므로 유저마다 별도 세션에서 처리하고,
+        #      동시 처리 수는 DB 풀을 API 요청과 나눠 쓸 수 있도록 SCROBBLE_CONCURRENCY로 제한
+        # TODO: 실무에서는 Celery, ARQ 커스텀 큐 활용 권장 (병목 방지)
+        semaphore = asyncio.Semaphore(settings.SCROBBLE_CONCURRENCY)
+
+        async def process(user: UserORM):
+            async with semaphore:
+                if self.stopping.is_set():
+                    SCROBBLE_USERS.labels("skipped").inc()
+                    return
+                user_id = user.id
+                try:
+                    async with AsyncSessionLocal() as user_session:
+                        # 이미 로드한 컬럼을 그대로 붙여 재조회 쿼리 없이 사용
+                        await self._process_user(user_session, await user_session.merge(user, load=False))
+                except Exception as e:
+                    # 한 유저의 예상치 못한 오류가 사이클 전체(다른 유저 작업)를 중단시키지 않도록 격리
+                    logger.error(f"Unexpected auto-scrobble error for user {user_id}: {e}")
+                    SCROBBLE_USERS.labels("failed").inc()
+
+        await asyncio.gather(*(process(user) for user in users))
+
+async def _hold_lease(holder: str, lease_seconds: float) -> bool:
+    async with AsyncSessionLocal() as session:
+        return await WorkerLeaseRepository(session).try_acquire(SCROBBLER_LEASE, holder, lease_seconds)
+
+
+async def _release_lease(holder: str) -> None:
+    try:
+        async with AsyncSessionLocal() as session:
+            await WorkerLeaseRepository(session).release(SCROBBLER_LEASE, holder)
+    except Exception as e:
+        # 반납하지 못해도 임대가 만료되면 다른 워커가 이어받음
+        logger.warning(f"Failed to release scrobbler lease: {e}")
+
+
+# FastAPI lifespan의 TaskSupervisor가 실행하는 백그라운드 루프 (예외로 종료되면 백오프 후 재시작됨)
+async def start_auto_scrobbler(stopping: asyncio.Event, interval_seconds: int = 300):
+    worker = ScrobbleWorker(stopping)
+    holder = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        while not stopping.is_set():
+            # 임대를 가진 워커만 사이클을 돌림 — 워커마다 같은 재생을 관찰해 각자 다이어리를 만들지 않도록
+            # (사이클마다 갱신하고, 갱신이 두 주기 동안 끊기면 다른 워커가 이어받음)
+            if await _hold_lease(holder, interval_seconds * 2):
+                await worker.run()
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await _release_lease(holder)
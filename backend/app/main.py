@@ -1,11 +1,57 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.metrics import PrometheusMiddleware, render_latest
+from app.core.query_counter import QueryCountMiddleware
+from app.core.supervisor import TaskSupervisor
+from app.core.tracing import setup_tracing
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    백그라운드 루프와 공유 리소스(HTTP 클라이언트, DB 엔진)의 수명을 관리합니다.
+    NOTE: DB 스키마 생성은 배포 단계로 분리됨 — `python -m app.infrastructure.db.migrate` (로컬 최초 실행 시에도 1회 필요)
+          gunicorn으로 기동하면 gunicorn.conf.py가 워커를 띄우기 전에 스키마 버전을 확인
+    """
+    from app.infrastructure.db.database import engine, read_engine
+
+    supervisor = TaskSupervisor(backoff_max_seconds=settings.BACKGROUND_RESTART_BACKOFF_MAX_SECONDS)
+    app.state.supervisor = supervisor
+
+    # 정리 콜백은 등록 역순으로 실행 — 워커가 멈춘 뒤 클라이언트, 마지막에 엔진을 닫음
+    supervisor.add_cleanup(engine.dispose)
+    if read_engine is not engine:
+        supervisor.add_cleanup(read_engine.dispose)
+    supervisor.add_cleanup(auth.google_client.aclose)
+
+    # 트랙 카탈로그 캐시를 최근 재생된 트랙으로 미리 채움 (쓰기 경로의 트랙 조회 생략)
+    supervisor.start("track_catalog_warmup", run_track_catalog_warmup)
+
+    # 보관 기간이 지난 Idempotency-Key 정리 (1시간마다)
+    supervisor.start("idempotency_purge", run_idempotency_purge)
+
+    # 실시간 재생 알림 브로커 (PostgreSQL LISTEN 연결 — 끊기면 백오프 후 재연결)
+    supervisor.start("now_playing_broker", now_playing_broker.run)
+
+    # 5분마다 스크로블 (루프가 예외로 죽으면 백오프 후 재시작)
+    supervisor.start(
+        "auto_scrobbler",
+        lambda stopping: start_auto_scrobbler(stopping, interval_seconds=settings.SCROBBLE_INTERVAL_SECONDS),
+    )
+    try:
+        yield
+    finally:
+        await supervisor.shutdown(grace_seconds=settings.SHUTDOWN_GRACE_SECONDS)
+
 
 app = FastAPI(
     title="Auditory Diary API",
     description="청각적 일기 서비스를 위한 백엔드 API (DDD 구조 적용)",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS 설정 — settings.FRONTEND_URL로 배포/로컬 자동 대응
@@ -25,32 +71,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-import asyncio
-from app.presentation.routers import auth, diary, capsule
+# 분산 트레이싱 (TRACING_EXPORTER 미설정 시 no-op)
+# Why: FastAPI가 요청/엔드포인트 스팬을 기본 생성하므로 TracerProvider만 구성하면 하위 스팬이 한 트레이스로 묶임
+setup_tracing()
+
+# 요청당 SQL 쿼리 수/DB 시간 집계 (쿼리 예산 초과 경고, DEBUG 시 Server-Timing 헤더)
+app.add_middleware(QueryCountMiddleware)
+
+# 라우트별 요청 지연 메트릭 수집 (/metrics로 노출)
+app.add_middleware(PrometheusMiddleware)
+
+from app.presentation.routers import auth, diary, capsule, stats
 from app.infrastructure.worker.scrobble_worker import start_auto_scrobbler
+from app.infrastructure.pubsub import now_playing_broker
+from app.infrastructure.repositories.track_catalog import run_track_catalog_warmup
+from app.application.idempotency import run_idempotency_purge
 
 app.include_router(auth.router, prefix="/api")
 app.include_router(diary.router, prefix="/api")
 app.include_router(capsule.router, prefix="/api")
-
-@app.on_event("startup")
-async def on_startup():
-    # 1. DB 스키마 자동 생성 (개발용)
-    from app.infrastructure.db.database import engine
-    from app.infrastructure.db.base import Base
-    # models 들이 import 되어야 Base.metadata에 등록됨
-    import app.infrastructure.db.models
-    import app.infrastructure.db.user_models
-    
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-        
-    # 2. 서버 기동 시 무한 루프로 도는 워커 백그라운드 태스크 등록
-    asyncio.create_task(start_auto_scrobbler(interval_seconds=300)) # 5분마다 스크로블
+app.include_router(stats.router, prefix="/api")
 
 @app.get("/health", tags=["System"])
-def health_check():
+def health_check(request: Request):
     """
     서버 상태 확인 엔드포인트
+    백그라운드 루프가 재시작 대기 중이면 status가 'degraded'가 됩니다.
+    (API 자체는 정상이므로 플랫폼 헬스체크가 인스턴스를 재시작하지 않도록 200 유지)
+    """
+    supervisor = getattr(request.app.state, "supervisor", None)
+    tasks = supervisor.health() if supervisor else {}
+    return {
+        "status": "ok" if supervisor is None or supervisor.healthy else "degraded",
+        "message": "Auditory Diary API is running.",
+        "tasks": tasks,
+    }
+
+@app.get("/metrics", tags=["System"], include_in_schema=False)
+def metrics():
+    """
+    Prometheus 스크레이프용 메트릭 엔드포인트
     """
-    return {"status": "ok", "message": "Auditory Diary API is running."}
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
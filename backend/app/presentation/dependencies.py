@@ -0,0 +1,66 @@
+import time
+import uuid
+from typing import Optional
+
+import jwt
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.infrastructure.db.database import get_db_session
+from app.infrastructure.db.user_models import UserORM
+from app.infrastructure.repositories.user_repository import UserRepository, CachedUser
+
+# 디코딩된 JWT → user_id 캐시. 토큰의 exp까지만 유지되므로 만료 검증 의미는 그대로 보존됨
+# Why: 대시보드 진입 시 한 화면에서 4~5개의 API가 동시에 같은 토큰으로 호출되어 HMAC 검증이 반복됨
+_token_cache = TTLCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE, ttl_seconds=60 * 60)
+
+
+async def get_current_user_id(request: Request) -> uuid.UUID:
+    """헤더의 JWT 토큰을 디코딩하여 현재 유저의 UUID를 식별합니다. (디코딩 결과는 만료 시각까지 캐시)"""
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="인증 토큰이 없습니다.")
+
+    token = auth_header.split(" ")[1]
+    cached_user_id = _token_cache.get(token)
+    if cached_user_id is not None:
+        return cached_user_id
+
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        user_id_str = payload.get("sub")
+        if not user_id_str:
+            raise ValueError("Token missing sub")
+        user_id = uuid.UUID(user_id_str)
+    except Exception:
+        raise HTTPException(status_code=401, detail="유효하지 않은 토큰입니다.")
+
+    exp = payload.get("exp")
+    if exp:
+        _token_cache.set(token, user_id, ttl_seconds=exp - time.time())
+    return user_id
+
+
+async def get_current_user(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_db_session)
+) -> Optional[UserORM]:
+    """
+    현재 유저의 ORM 객체를 요청 세션에 로드합니다. (토큰 갱신 등 쓰기가 필요한 엔드포인트용)
+    유저가 없으면 None을 반환하며, 응답 처리는 각 엔드포인트에 맡깁니다.
+    FastAPI가 요청 단위로 의존성 결과를 재사용하고, 이후의 session.get()은 identity map에서
+    바로 반환되므로 한 요청에서 users 테이블 조회는 최대 1회입니다.
+    """
+    return await UserRepository(session).get_by_id(user_id)
+
+
+async def get_current_user_cached(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_db_session)
+) -> Optional[CachedUser]:
+    """
+    읽기 전용 유저 스냅샷을 짧은 TTL 캐시에서 반환합니다. (일기/캡슐 생성 등 핫 엔드포인트용)
+    """
+    return await UserRepository(session).get_cached(user_id)
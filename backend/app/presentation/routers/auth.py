@@ -1,17 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 import httpx
 from datetime import datetime, timedelta
 import jwt
 
 from app.core.config import settings
+from app.core.timezones import is_valid_timezone
+from app.application.diary_service import rebucket_in_background
 from app.infrastructure.db.database import get_db_session
 from app.infrastructure.repositories.user_repository import UserRepository
-from app.presentation.schemas.auth_schemas import GoogleAuthResponse, TokenResponse, SpotifyLinkRequest
+from app.infrastructure.external.google_client import GoogleAuthClient
+from app.presentation.schemas.auth_schemas import (
+    GoogleAuthResponse, TokenResponse, SpotifyLinkRequest, TimezoneUpdateRequest, TimezoneResponse,
+)
+from app.presentation.dependencies import get_current_user
+from app.infrastructure.db.user_models import UserORM
+from typing import Optional
 import urllib.parse
 from fastapi.responses import RedirectResponse
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
+google_client = GoogleAuthClient()
 
 def create_access_token(data: dict, expires_delta: timedelta):
     to_encode = data.copy()
@@ -30,16 +39,8 @@ async def google_auth(
     백엔드가 구글 UserInfo를 조회하여 검증 후 자체 JWT 토큰을 발급하는 엔드포인트
     """
     try:
-        # 1. Google UserInfo API 호출을 통해 토큰 유효성 검증
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                "https://www.googleapis.com/oauth2/v3/userinfo",
-                headers={"Authorization": f"Bearer {auth_data.access_token}"}
-            )
-            if resp.status_code != 200:
-                raise ValueError(f"유효하지 않은 Google Access Token (Status: {resp.status_code})")
-            
-            idinfo = resp.json()
+        # 1. Google UserInfo API 호출을 통해 토큰 유효성 검증 (커넥션 재사용 + 토큰 해시 기준 단기 캐시)
+        idinfo = await google_client.get_userinfo(auth_data.access_token)
 
         email = idinfo.get('email')
         if not email:
@@ -50,10 +51,8 @@ async def google_auth(
 
         repo = UserRepository(session)
         
-        # 2. 기존 유저 확인 또는 신규 가입 (Application 로직)
-        user = await repo.get_by_google_id(google_id)
-        if not user:
-            user = await repo.create_user(email=email, name=name, google_id=google_id)
+        # 2. 기존 유저 확인 또는 신규 가입을 단일 UPSERT로 처리 (동시 최초 로그인 경합 방지)
+        user = await repo.upsert_google_user(email=email, name=name, google_id=google_id)
 
         # 3. JWT 베어러 토큰 생성 (Presentation 응답)
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -84,6 +83,31 @@ async def google_auth(
         )
 
 
+@router.put("/me/timezone", response_model=TimezoneResponse)
+async def update_my_timezone(
+    request: TimezoneUpdateRequest,
+    background_tasks: BackgroundTasks,
+    user: Optional[UserORM] = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session)
+):
+    """
+    유저 시간대를 변경합니다. 이후 기록은 새 시간대의 날짜로 저장되고,
+    기존 기록의 캘린더 날짜(local_date)는 응답 이후 백그라운드에서 새 시간대로 다시 계산됩니다.
+    """
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="사용자를 찾을 수 없습니다.")
+    if not is_valid_timezone(request.timezone):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"알 수 없는 시간대입니다: {request.timezone} (IANA 이름, 예: Asia/Seoul)"
+        )
+
+    # 같은 시간대로 다시 요청해도 재계산을 돌림 (이전 재계산이 실패했을 때의 재시도 경로)
+    user.timezone = request.timezone
+    await session.commit()
+    background_tasks.add_task(rebucket_in_background, user.id, request.timezone)
+    return TimezoneResponse(timezone=user.timezone, rebucketing=True)
+
 @router.get("/spotify/login")
 async def spotify_login(token: str):
     """
@@ -109,7 +133,7 @@ async def spotify_login(token: str):
         "state": user_id,
         "show_dialog": "true"
     }
-    url = f"https://accounts.spotify.com/authorize?{urllib.parse.urlencode(params)}"
+    url = f"{settings.SPOTIFY_ACCOUNTS_BASE_URL}/authorize?{urllib.parse.urlencode(params)}"
     return RedirectResponse(url)
 
 
@@ -130,7 +154,7 @@ async def spotify_callback(
             return RedirectResponse(f"{settings.FRONTEND_URL}/dashboard?spotify_error=no_state")
 
         # 1. Spotify Token API로 인가 코드 → 토큰 교환
-        token_url = "https://accounts.spotify.com/api/token"
+        token_url = f"{settings.SPOTIFY_ACCOUNTS_BASE_URL}/api/token"
         payload = {
             "grant_type": "authorization_code",
             "code": code,
@@ -1,61 +1,54 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy import cast, Date
 import uuid
 import datetime
+import httpx
+from typing import Optional
+from opentelemetry import trace
 
-from app.infrastructure.db.database import get_db_session
+from app.infrastructure.db.database import get_db_session, get_read_db_session
 from app.infrastructure.db.models import DailyCapsuleORM, AuditoryDiaryORM
-from app.presentation.schemas.capsule_schemas import CapsuleCreateRequest, DailyCapsuleResponse
+from app.presentation.schemas.capsule_schemas import (
+    CapsuleCreateRequest, DailyCapsuleResponse, PeriodCapsuleRequest, PeriodCapsuleResponse,
+)
 from app.application.ai_client import AICapsuleClient
+from app.application.period_capsule import NoListeningRecords, PeriodCapsuleService, period_bounds
+from app.domain.theme_classifier import theme_classifier
+from app.infrastructure.repositories.capsule_repository import CapsuleRepository
 from app.infrastructure.external.spotify_client import SpotifyAPIClient
-from app.core.config import settings
-from fastapi import Request
-import jwt
-
-async def get_current_user_id(request: Request) -> uuid.UUID:
-    """JWT 토큰을 디코딩하여 현재 유저의 UUID를 반환합니다."""
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="인증 토큰이 없습니다.")
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id_str = payload.get("sub")
-        if not user_id_str:
-            raise ValueError("Token missing sub")
-        return uuid.UUID(user_id_str)
-    except Exception:
-        raise HTTPException(status_code=401, detail="유효하지 않은 토큰입니다.")
+from app.infrastructure.external.image_client import ImageProxyClient, ImageResizeError
+from app.core.timezones import DEFAULT_TIMEZONE
+from app.core.tracing import hash_user_id
+from app.infrastructure.repositories.user_repository import CachedUser
+from app.presentation.dependencies import get_current_user_id, get_current_user_cached
 
 router = APIRouter(prefix="/capsules", tags=["Capsules"])
 ai_client = AICapsuleClient()
 spotify_client = SpotifyAPIClient()
+image_proxy_client = ImageProxyClient()
+period_capsule_service = PeriodCapsuleService(ai_client)
 
 @router.post("/generate", response_model=DailyCapsuleResponse)
 async def generate_daily_capsule(
     request: CapsuleCreateRequest,
     user_id: uuid.UUID = Depends(get_current_user_id),
+    user: Optional[CachedUser] = Depends(get_current_user_cached),
     session: AsyncSession = Depends(get_db_session)
 ):
     """
     [AI Daily Capsule 생성]
     특정 일자의 청취 기록(Auditory Diaries)을 수집하여 LLM을 통해 감성적인 '한 줄 요약 일기'를 생성 후 저장합니다.
     """
+    # 엔드포인트 스팬에 파이프라인 단계별 속성을 기록 (하위 DB/Spotify/Gemini 스팬과 같은 트레이스)
+    span = trace.get_current_span()
+    span.set_attribute("user.id_hash", hash_user_id(user_id))
     try:
-        # 1. 대상 날짜 파싱 및 KST 범위 설정 (diary_repository 로직 참고)
-        from datetime import timezone, timedelta
-        kst_tz = timezone(timedelta(hours=9))
+        # 1. 대상 날짜 파싱 (기록 시점에 유저 시간대로 계산해 둔 local_date와 비교)
         target_date = datetime.datetime.strptime(request.target_date, "%Y-%m-%d").date()
-        
-        start_kst = datetime.datetime.combine(target_date, datetime.datetime.min.time()).replace(tzinfo=kst_tz)
-        end_kst = start_kst + timedelta(days=1)
-        
-        start_utc = start_kst.astimezone(timezone.utc)
-        end_utc = end_kst.astimezone(timezone.utc)
 
         # 2. 이미 해당 날짜에 생성된 캡슐이 있는지 확인
         existing_stmt = select(DailyCapsuleORM).where(
@@ -74,8 +67,7 @@ async def generate_daily_capsule(
             select(AuditoryDiaryORM)
             .options(selectinload(AuditoryDiaryORM.track), selectinload(AuditoryDiaryORM.context))
             .where(AuditoryDiaryORM.user_id == user_id)
-            .where(AuditoryDiaryORM.listened_at >= start_utc)
-            .where(AuditoryDiaryORM.listened_at < end_utc)
+            .where(AuditoryDiaryORM.local_date == target_date)
             .order_by(AuditoryDiaryORM.listened_at.asc())
         )
         result = await session.execute(stmt)
@@ -103,13 +95,13 @@ async def generate_daily_capsule(
                 weathers[w] = weathers.get(w, 0) + 1
 
         majority_weather = max(weathers, key=weathers.get) if weathers else None
+        span.set_attribute("capsule.diary_count", len(diaries))
+        span.set_attribute("capsule.artist_count", len(artist_names_set))
 
         # 4-1. Spotify API로 아티스트별 장르(Genre) 조회 — AI 프롬프트 품질 향상용
         # Why: Audio Features API 폐기 이후, 장르가 LLM에게 곡의 무드를 추론시키는 핵심 단서
         genres_map: dict[str, list[str]] = {}
         try:
-            from app.infrastructure.db.user_models import UserORM
-            user = await session.get(UserORM, user_id)
             if user and user.spotify_access_token:
                 genres_map = await spotify_client.get_artists_genres(
                     access_token=user.spotify_access_token,
@@ -119,6 +111,7 @@ async def generate_daily_capsule(
             # 장르 조회 실패해도 캡슐 생성은 계속 진행 (Graceful Degradation)
             import logging
             logging.getLogger(__name__).warning(f"Genre fetch skipped: {e}")
+        span.set_attribute("capsule.genre_artist_count", len(genres_map))
 
         # 5. Gemini API 호출 (장르 컨텍스트 포함)
         ai_summary = await ai_client.generate_daily_summary(
@@ -147,28 +140,9 @@ async def generate_daily_capsule(
         else:
             representative_image_url = diaries[0].track.album_artwork_url if diaries[0].track else None
 
-        # 6-1. 자동 테마(Vibe) 매핑 엔진 (Genre-based Inference)
-        theme_scores = {"y2k": 0, "midnight": 0, "editorial": 0, "aura": 0}
-        
-        y2k_keywords = ["hip hop", "rap", "dance", "techno", "electronic", "house", "idol", "pop"]
-        midnight_keywords = ["r&b", "soul", "jazz", "indie", "ambient", "lo-fi", "chill", "blues"]
-        editorial_keywords = ["acoustic", "folk", "classical", "piano", "ost", "singer-songwriter"]
-        
-        if genres_map:
-            for artist, genres in genres_map.items():
-                for genre in genres:
-                    g = genre.lower()
-                    if any(k in g for k in y2k_keywords): theme_scores["y2k"] += 1
-                    if any(k in g for k in midnight_keywords): theme_scores["midnight"] += 1
-                    if any(k in g for k in editorial_keywords): theme_scores["editorial"] += 1
-        
-        # Determine winning theme (if scores are 0, defaults to 'aura')
-        determined_theme = "aura"
-        max_score = 0
-        for t_name, score in theme_scores.items():
-            if score > max_score:
-                max_score = score
-                determined_theme = t_name
+        # 6-1. 자동 테마(Vibe) 매핑 — 아티스트별 재생 수로 가중한 장르 테마 벡터 합 (점수가 없으면 'aura')
+        determined_theme = theme_classifier.classify(genres_map, artist_play_counts)
+        span.set_attribute("capsule.theme", determined_theme)
 
         # 7. DB 저장
         new_capsule = DailyCapsuleORM(
@@ -198,7 +172,7 @@ async def generate_daily_capsule(
 async def get_daily_capsule(
     date: str, # YYYY-MM-DD
     user_id: uuid.UUID = Depends(get_current_user_id),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_read_db_session)
 ):
     """
     [AI Daily Capsule 조회]
@@ -227,38 +201,95 @@ async def get_daily_capsule(
             detail=f"AI Daily Capsule 조회 중 오류가 발생했습니다: {str(e)}"
         )
 
+@router.post("/generate-period", response_model=PeriodCapsuleResponse)
+async def generate_period_capsule(
+    request: PeriodCapsuleRequest,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    user: Optional[CachedUser] = Depends(get_current_user_cached)
+):
+    """
+    [주간/월간 캡슐 생성]
+    기간 내 Daily Capsule 요약과 청취 집계를 묶어 한 번의 LLM 호출로 회고를 만듭니다.
+    이미 만든 캡슐은 그대로 반환하므로(진행 중인 기간은 기간이 끝난 뒤 한 번 갱신) 월간 뷰를 열 때마다 호출해도 됩니다.
+    """
+    span = trace.get_current_span()
+    span.set_attribute("user.id_hash", hash_user_id(user_id))
+    try:
+        # 형식은 스키마에서 검사하지만 2026-02-30처럼 없는 날짜는 여기서 걸러짐
+        target_date = datetime.datetime.strptime(request.target_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="존재하지 않는 날짜입니다.")
+    try:
+        capsule = await period_capsule_service.get_or_generate(
+            user_id, request.period, target_date, user.timezone if user else DEFAULT_TIMEZONE
+        )
+    except NoListeningRecords:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="해당 기간에는 들은 음악 기록이 없어서 캡슐을 생성할 수 없습니다."
+        )
+    return PeriodCapsuleResponse.model_validate(capsule)
+
+@router.get("/period", response_model=PeriodCapsuleResponse)
+async def get_period_capsule(
+    period: str = Query(..., pattern="^(week|month)$"),
+    date: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$", description="기간 안의 아무 날짜 (YYYY-MM-DD)"),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_read_db_session)
+):
+    """
+    [주간/월간 캡슐 조회]
+    생성된 캡슐이 없으면 404를 반환합니다. (생성은 POST /capsules/generate-period)
+    """
+    try:
+        target_date = datetime.datetime.strptime(date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="존재하지 않는 날짜입니다.")
+    start, _ = period_bounds(period, target_date)
+    capsule = await CapsuleRepository(session).get_period_capsule(user_id, period, start)
+    if not capsule:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="캡슐을 찾을 수 없습니다.")
+    return PeriodCapsuleResponse.model_validate(capsule)
+
 @router.get("/image-proxy")
-async def image_proxy(url: str = Query(..., description="프록시할 이미지 URL")):
+async def image_proxy(
+    url: str = Query(..., description="프록시할 이미지 URL"),
+    w: Optional[int] = Query(None, description="썸네일 너비 (64/160/300/640 중 하나)")
+):
     """
     [이미지 프록시]
     Spotify CDN 등 외부 이미지를 백엔드를 경유하여 CORS-safe하게 전달합니다.
     html2canvas가 tainted canvas 에러 없이 캡처할 수 있도록 지원합니다.
+    - w 미지정: 원본을 메모리에 올리지 않고 청크 단위로 스트리밍
+    - w 지정: 고정 크기 썸네일로 리사이즈 후 캐시 (캘린더 칩 등 작은 UI용)
     """
-    import httpx
-    
-    # 안전한 도메인만 허용 (스팸/악용 방지)
-    allowed_domains = ["i.scdn.co", "mosaic.scdn.co", "image-cdn-ak.spotifycdn.com", "image-cdn-fa.spotifycdn.com"]
-    from urllib.parse import urlparse
-    parsed = urlparse(url)
-    if parsed.hostname not in allowed_domains:
+    if not image_proxy_client.is_allowed_url(url):
         raise HTTPException(status_code=400, detail="허용되지 않은 이미지 도메인입니다.")
-    
+    if w is not None and w not in image_proxy_client.ALLOWED_WIDTHS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 썸네일 크기입니다. (허용: {', '.join(map(str, image_proxy_client.ALLOWED_WIDTHS))})"
+        )
+
+    headers = {
+        "Access-Control-Allow-Origin": "*",
+        "Cache-Control": "public, max-age=86400"
+    }
+
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, timeout=10.0)
-            if resp.status_code != 200:
-                raise HTTPException(status_code=resp.status_code, detail="이미지를 가져올 수 없습니다.")
-            
-            content_type = resp.headers.get("content-type", "image/jpeg")
-            return Response(
-                content=resp.content,
-                media_type=content_type,
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Cache-Control": "public, max-age=86400"
-                }
-            )
+        # Pillow가 없는 환경에서는 리사이즈 요청도 원본 스트리밍으로 대체 (Graceful Degradation)
+        if w is not None and image_proxy_client.can_resize:
+            content, content_type = await image_proxy_client.get_resized(url, w)
+            return Response(content=content, media_type=content_type, headers=headers)
+
+        content_type, body = await image_proxy_client.stream(url)
+        return StreamingResponse(body, media_type=content_type, headers=headers)
+
+    except ImageResizeError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail="이미지를 가져올 수 없습니다.")
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="이미지 요청 시간 초과")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"이미지 프록시 에러: {str(e)}")
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="이미지를 가져올 수 없습니다.")
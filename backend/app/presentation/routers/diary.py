@@ -1,51 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+import hashlib
+import os
+import tempfile
 import uuid
-from typing import List
+from typing import List, Literal, Optional
 
-from app.infrastructure.db.database import get_db_session
+from app.infrastructure.db.database import get_db_session, get_read_db_session
+from app.infrastructure.db.user_models import UserORM
 from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
-from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.repositories.user_repository import CachedUser
 from app.infrastructure.external.spotify_client import SpotifyAPIClient
 from app.infrastructure.external.weather_client import WeatherAPIClient
 from app.infrastructure.external.location_client import LocationAPIClient
 from app.application.diary_service import DiaryService
-from app.presentation.schemas.diary_schemas import DiaryCreateRequest, DiaryResponse, CalendarDaySummary, MemoUpdateRequest
-
-router = APIRouter(prefix="/diaries", tags=["Auditory Diary"])
-
-from fastapi import Request
-import jwt
+from app.application.history_import import HistoryImportService, run_import_in_background
+from app.application.idempotency import IDEMPOTENCY_HEADER, IdempotencyError, StoredResponse, request_fingerprint, run_idempotent
+from app.application.diary_search import decode_search_cursor, encode_search_cursor
+from app.application.nearby_places import cluster_places
+from app.application.diary_export import (
+    DiaryExporter, ExportUnavailable, EXPORT_FORMATS, available_export_formats, decode_cursor, ensure_format_available
+)
 from app.core.config import settings
+from app.infrastructure.db.models import HistoryImportORM
+from app.infrastructure.pubsub import now_playing_broker
+from app.presentation.schemas.diary_schemas import (
+    DiaryCreateRequest, DiaryResponse, CalendarDaySummary, MemoUpdateRequest, HistoryImportResponse,
+    DiarySearchHit, DiarySearchResponse, NearbyPlaceResponse,
+)
+from app.presentation.dependencies import get_current_user_id, get_current_user, get_current_user_cached
 
-async def get_current_user_id(request: Request) -> uuid.UUID:
-    """헤더의 JWT 토큰을 디코딩하여 현재 유저의 UUID를 식별합니다."""
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="인증 토큰이 없습니다.")
-    
-    token = auth_header.split(" ")[1]
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id_str = payload.get("sub")
-        if not user_id_str:
-            raise ValueError("Token missing sub")
-        return uuid.UUID(user_id_str)
-    except Exception:
-        raise HTTPException(status_code=401, detail="유효하지 않은 토큰입니다.")
+router = APIRouter(prefix="/diaries", tags=["Auditory Diary"])
 
 @router.post("/", response_model=DiaryResponse)
 async def create_diary(
     request: DiaryCreateRequest,
-    user_id: uuid.UUID = Depends(get_current_user_id),
-    session: AsyncSession = Depends(get_db_session)
+    user: Optional[CachedUser] = Depends(get_current_user_cached),
+    session: AsyncSession = Depends(get_db_session),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
 ):
     """
     현재 듣고 있는(또는 최근 들은) 음악과 사용자의 위치를 합쳐 새로운 청각적 일기를 생성합니다.
+    Idempotency-Key 헤더를 보내면 같은 키의 재시도는 저장된 응답을 그대로 돌려줍니다
+    (Spotify/날씨/지오코딩 호출과 INSERT 없음, 응답 헤더 Idempotent-Replayed: true).
+    처리 중에 같은 키로 다시 오면 먼저 온 요청이 끝나기를 기다립니다.
     """
-    user_repo = UserRepository(session)
-    user = await user_repo.get_by_id(user_id) # 여기서 user_repository.py 에 get_by_id 추가해야 함
-    
     if not user or not user.spotify_access_token:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
@@ -59,17 +59,39 @@ async def create_diary(
         location_client=LocationAPIClient()
     )
     
+    async def create():
+        try:
+            return await service.create_diary_from_current_context(
+                user_id=user.id,
+                spotify_access_token=user.spotify_access_token,
+                lat=request.latitude,
+                lon=request.longitude,
+                memo=request.memo,
+                timezone_name=user.timezone
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    if idempotency_key is None:
+        return await create() # from_attributes=True 덕에 DomainDiary 로 반환해도 스키마에 맞게 필터링됨
+
+    async def create_and_serialize() -> StoredResponse:
+        diary = await create()
+        return StoredResponse(status.HTTP_200_OK, DiaryResponse.model_validate(diary).model_dump(mode="json"))
+
     try:
-        diary = await service.create_diary_from_current_context(
-            user_id=user.id,
-            spotify_access_token=user.spotify_access_token,
-            lat=request.latitude,
-            lon=request.longitude,
-            memo=request.memo
+        stored, replayed = await run_idempotent(
+            session, user.id, idempotency_key,
+            request_fingerprint("POST", "/diaries/", request.model_dump_json().encode()),
+            create_and_serialize,
         )
-        return diary # from_attributes=True 덕에 DomainDiary 로 반환해도 스키마에 맞게 필터링됨
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    except IdempotencyError as e:
+        headers = {"Retry-After": "1"} if e.status_code == status.HTTP_409_CONFLICT else None
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
+    return JSONResponse(
+        stored.body, status_code=stored.status_code,
+        headers={"Idempotent-Replayed": "true" if replayed else "false"},
+    )
 
 @router.patch("/{diary_id}/memo")
 async def update_diary_memo(
@@ -106,16 +128,14 @@ async def update_diary_memo(
 @router.get("/me/recently-played")
 async def get_my_recently_played(
     session: AsyncSession = Depends(get_db_session),
-    user_id: uuid.UUID = Depends(get_current_user_id)
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    user: Optional[UserORM] = Depends(get_current_user)
 ):
     """
     [Phase 5: Sync-on-Demand 적용]
     현재 로그인한 유저의 Spotify 최근 재생 목록을 가져와서 DB와 실시간 동기화(Upsert)한 후
     확인된 타임라인(UUID 포함)을 반환합니다.
     """
-    from app.infrastructure.db.user_models import UserORM
-    user = await session.get(UserORM, user_id)
-
     if not user:
         return {"diaries": [], "message": "사용자를 찾을 수 없습니다."}
 
@@ -138,26 +158,17 @@ async def get_my_recently_played(
             logging.getLogger(__name__).warning(f"Spotify sync 실패 (기존 DB 데이터로 진행): {sync_err}")
 
     try:
-        # 오늘(KST) 범위의 전체 다이어리를 DB에서 조회 (Spotify 연동 여부와 무관)
+        # 오늘(유저 시간대) 기록된 전체 다이어리를 DB에서 조회 (Spotify 연동 여부와 무관)
         from sqlalchemy.future import select
         from sqlalchemy.orm import selectinload
         from app.infrastructure.db.models import AuditoryDiaryORM
-        from datetime import datetime, timezone, timedelta
-
-        kst_tz = timezone(timedelta(hours=9))
-        now_kst = datetime.now(timezone.utc).astimezone(kst_tz)
-        start_kst = now_kst.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_kst = start_kst + timedelta(days=1)
-
-        start_utc = start_kst.astimezone(timezone.utc)
-        end_utc = end_kst.astimezone(timezone.utc)
+        from app.core.timezones import local_today
 
         stmt = (
             select(AuditoryDiaryORM)
             .options(selectinload(AuditoryDiaryORM.track), selectinload(AuditoryDiaryORM.context))
             .where(AuditoryDiaryORM.user_id == user_id)
-            .where(AuditoryDiaryORM.listened_at >= start_utc)
-            .where(AuditoryDiaryORM.listened_at < end_utc)
+            .where(AuditoryDiaryORM.local_date == local_today(user.timezone))
             .order_by(AuditoryDiaryORM.listened_at.desc())
         )
         result = await session.execute(stmt)
@@ -171,10 +182,38 @@ async def get_my_recently_played(
         traceback.print_exc()
         return {"diaries": [], "message": f"데이터 조회 실패: {str(e)}"}
 
+@router.get("/me/now-playing/stream")
+async def stream_now_playing(user_id: uuid.UUID = Depends(get_current_user_id)):
+    """
+    [실시간 재생 알림 — Server-Sent Events]
+    스크로블러/동기화/수동 기록으로 새 다이어리가 커밋되면 `event: diary`(DiaryResponse JSON)를 바로 보냅니다.
+    대시보드는 /me/recently-played를 반복 호출(매번 Spotify 동기화)하지 않고 이 스트림만 열어 둡니다.
+    NOW_PLAYING_HEARTBEAT_SECONDS마다 주석 줄(': ping')을 보내 프록시 유휴 종료를 막고, 끊긴 연결은 이때 정리됩니다.
+    DB 세션을 잡지 않으므로 열린 스트림 수가 커넥션 풀에 영향을 주지 않습니다.
+    """
+    async def events():
+        # 구독은 스트림이 시작된 뒤에 — 응답 전에 끊긴 연결이 구독자로 남지 않도록
+        subscription = now_playing_broker.subscribe(user_id)
+        try:
+            yield "retry: 3000\n: connected\n\n"
+            while True:
+                message = await subscription.get(timeout=settings.NOW_PLAYING_HEARTBEAT_SECONDS)
+                yield ": ping\n\n" if message is None else f"event: diary\ndata: {message}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # 프록시(nginx 등)가 응답을 버퍼링하면 이벤트가 모였다가 한꺼번에 도착하므로 끔
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/me/status")
 async def get_my_status(
     session: AsyncSession = Depends(get_db_session),
-    user_id: uuid.UUID = Depends(get_current_user_id)
+    user: Optional[UserORM] = Depends(get_current_user)
 ):
     """
     스포티파이 연동 상태를 실시간으로 검증합니다.
@@ -183,17 +222,19 @@ async def get_my_status(
     """
     import httpx
     import datetime
-    from app.infrastructure.db.user_models import UserORM
     from app.core.config import settings
 
-    user = await session.get(UserORM, user_id)
     if not user or not user.spotify_access_token:
         return {"spotify_connected": False}
 
     # 1. 토큰 만료 시 자동 갱신 시도
     # datetime.now(UTC) 사용 — utcnow()는 naive datetime이라 PostgreSQL의 timezone-aware와 비교 시 TypeError 발생
     now_utc = datetime.datetime.now(datetime.timezone.utc)
-    if user.spotify_token_expires_at and now_utc >= user.spotify_token_expires_at:
+    # SQLite는 timezone 정보 없이 돌려주므로 UTC로 간주 (워커와 동일한 방어 처리)
+    expires_at = user.spotify_token_expires_at
+    if expires_at and expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=datetime.timezone.utc)
+    if expires_at and now_utc >= expires_at:
         if not user.spotify_refresh_token:
             # Refresh Token 자체가 없으면 연동 해제 상태
             user.spotify_access_token = None
@@ -201,7 +242,7 @@ async def get_my_status(
             await session.commit()
             return {"spotify_connected": False}
 
-        token_url = "https://accounts.spotify.com/api/token"
+        token_url = f"{settings.SPOTIFY_ACCOUNTS_BASE_URL}/api/token"
         payload = {
             "grant_type": "refresh_token",
             "refresh_token": user.spotify_refresh_token,
@@ -229,7 +270,7 @@ async def get_my_status(
     # 2. 실제 Spotify API에 토큰을 보내 유효성 확인
     async with httpx.AsyncClient() as client:
         resp = await client.get(
-            "https://api.spotify.com/v1/me",
+            f"{settings.SPOTIFY_API_BASE_URL}/me",
             headers={"Authorization": f"Bearer {user.spotify_access_token}"}
         )
         if resp.status_code == 200:
@@ -247,7 +288,7 @@ async def get_monthly_calendar_summary(
     year: int,
     month: int,
     user_id: uuid.UUID = Depends(get_current_user_id),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_read_db_session)
 ):
     """
     [과거 기록 조회 - 월별 요약]
@@ -269,7 +310,7 @@ async def get_monthly_calendar_summary(
 async def get_daily_history(
     date: str, # YYYY-MM-DD 포맷 가정
     user_id: uuid.UUID = Depends(get_current_user_id),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_read_db_session)
 ):
     """
     [과거 기록 조회 - 일별 타임라인]
@@ -285,3 +326,139 @@ async def get_daily_history(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"과거 타임라인 기록을 불러오는 중 오류가 발생했습니다: {str(e)}"
         )
+
+@router.get("/search", response_model=DiarySearchResponse)
+async def search_my_diaries(
+    q: str = Query(..., min_length=1, max_length=100, description="검색어 (공백으로 구분한 모든 단어를 포함하는 기록)"),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_read_db_session)
+):
+    """
+    [기록 검색]
+    메모, 곡 제목, 아티스트, 장소에서 검색어를 찾아 관련도순(같으면 최신순)으로 반환합니다.
+    3글자 이상 단어는 전문 검색 인덱스로, 더 짧은 단어('비', '바다')는 부분 문자열로 찾습니다.
+    결과는 최근 일치 기록 SEARCH_CANDIDATE_LIMIT건(기본 500) 안에서 정렬되고 페이지도 그 안에서만 넘어갑니다.
+    더 오래된 일치 기록이 빠졌으면 truncated=true — 검색어를 구체적으로 하면 닿을 수 있습니다.
+    짧은 단어만으로 검색하면 최근 SEARCH_SHORT_QUERY_SCAN_LIMIT건 안에서만 찾습니다.
+    """
+    try:
+        after = decode_search_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="cursor 값의 형식이 올바르지 않습니다.")
+
+    # 한 건 더 읽어 다음 페이지가 있는지 판단
+    hits, truncated = await AuditoryDiaryRepository(session).search(user_id, q, limit + 1, after=after)
+    items = [
+        DiarySearchHit(score=score, **DiaryResponse.model_validate(diary).model_dump())
+        for diary, score in hits[:limit]
+    ]
+    next_cursor = None
+    if len(hits) > limit:
+        last, last_score = hits[limit - 1]
+        next_cursor = encode_search_cursor(last_score, last.listened_at, last.id)
+    return DiarySearchResponse(items=items, next_cursor=next_cursor, truncated=truncated)
+
+@router.get("/nearby", response_model=List[NearbyPlaceResponse])
+async def get_nearby_places(
+    lat: float = Query(..., ge=-90, le=90, description="현재 위도"),
+    lon: float = Query(..., ge=-180, le=180, description="현재 경도"),
+    radius_m: float = Query(500, ge=10, le=20000, description="검색 반경(m)"),
+    cluster_m: float = Query(100, ge=10, le=2000, description="한 장소로 묶을 거리(m)"),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_read_db_session)
+):
+    """
+    [이 근처에서 들었던 음악]
+    반경 안에서 남긴 기록을 장소별로 묶어 가까운 장소부터 반환합니다. (반경 안 최신 NEARBY_MAX_DIARIES건 기준)
+    """
+    hits = await AuditoryDiaryRepository(session).find_nearby(
+        user_id, lat, lon, radius_m, limit=settings.NEARBY_MAX_DIARIES
+    )
+    return cluster_places(hits, lat, lon, cluster_m)
+
+
+@router.post("/import/spotify-history", response_model=HistoryImportResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_spotify_history(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    filename: Optional[str] = None,
+    user_id: uuid.UUID = Depends(get_current_user_id)
+):
+    """
+    Spotify 개인정보 다운로드의 'Extended streaming history'(my_spotify_data.zip 또는
+    Streaming_History_Audio_*.json)를 요청 본문 그대로 업로드받아 백그라운드에서 일기로 가져옵니다.
+    같은 파일을 다시 올리면 마지막 체크포인트부터 이어서 진행하며, 진행 상황은 GET /diaries/import/{job_id}로 확인합니다.
+    """
+    # 본문을 메모리에 올리지 않고 임시 파일로 흘려 쓰면서 지문(sha256)을 같이 계산
+    max_bytes = settings.HISTORY_IMPORT_MAX_UPLOAD_MB * 1024 * 1024
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="spotify-history-")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"파일이 너무 큽니다. (최대 {settings.HISTORY_IMPORT_MAX_UPLOAD_MB}MB)"
+                    )
+                digest.update(chunk)
+                fp.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="업로드된 파일이 비어 있습니다.")
+
+        job, should_run = await HistoryImportService().start(user_id, digest.hexdigest(), filename)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    if should_run:
+        background_tasks.add_task(run_import_in_background, job.id, path)
+    else:
+        os.remove(path)
+    return job
+
+@router.get("/import/{job_id}", response_model=HistoryImportResponse)
+async def get_import_status(
+    job_id: uuid.UUID,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_db_session)
+):
+    """스트리밍 기록 가져오기 작업의 진행 상황 (진행 중인 값을 봐야 하므로 primary에서 조회)"""
+    job = await session.get(HistoryImportORM, job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="가져오기 작업을 찾을 수 없습니다.")
+    return job
+
+# 허용 포맷(OpenAPI enum)은 기동 시점의 설치 상태로 결정 — pyarrow가 없는 서버는 parquet을 광고하지 않음
+ExportFormat = Literal[available_export_formats()]
+
+@router.get("/export")
+async def export_my_diaries(
+    format: ExportFormat = Query("jsonl"),
+    since: Optional[str] = Query(None, description="이전 다운로드의 마지막 행 cursor 값 (또는 ISO 8601 시각) — 그 이후부터 이어받기"),
+    user_id: uuid.UUID = Depends(get_current_user_id)
+):
+    """
+    내 전체 청각적 일기를 트랙/컨텍스트/해당 날짜 캡슐과 함께 청취 시각순으로 내보냅니다. (jsonl | csv, pyarrow가 설치된 서버는 parquet도)
+    DB 커서에서 읽은 배치를 바로 청크 응답으로 흘려보내므로 기록이 수십만 건이어도 서버 메모리는 일정합니다.
+    다운로드가 끊기면 받은 마지막 행의 cursor 값을 since로 넘겨 이어받을 수 있습니다.
+    """
+    try:
+        after = decode_cursor(since) if since else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="since 값의 형식이 올바르지 않습니다.")
+    try:
+        ensure_format_available(format)
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        DiaryExporter().stream(user_id, format, since=after),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="auditory-diary.{extension}"'},
+    )
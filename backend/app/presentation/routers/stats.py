@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import uuid
+
+from app.infrastructure.db.database import get_read_db_session
+from app.infrastructure.repositories.stats_repository import StatsRepository
+from app.infrastructure.repositories.year_review_repository import YearReviewRepository
+from app.application.stats_service import StatsService
+from app.core.timezones import DEFAULT_TIMEZONE
+from app.infrastructure.repositories.user_repository import CachedUser
+from app.presentation.schemas.stats_schemas import ListeningStatsResponse, YearInReviewResponse
+from app.presentation.dependencies import get_current_user_id, get_current_user_cached
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+
+@router.get("/me", response_model=ListeningStatsResponse)
+async def get_my_stats(
+    range: str = Query("30d", pattern="^(7d|30d|90d|365d|all)$", description="오늘(유저 시간대) 포함 최근 기간"),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    user: Optional[CachedUser] = Depends(get_current_user_cached),
+    session: AsyncSession = Depends(get_read_db_session)
+):
+    """
+    [청취 통계]
+    기간 내 Top 아티스트/트랙, 요일×시간(유저 시간대) 히트맵, 연속 청취 일수, 날씨별 분포, 지난주 대비 증감을 반환합니다.
+    집계 결과는 유저별로 캐시되고, 이후 새로 기록된 곡은 캐시된 집계에 더해져 반영됩니다.
+    """
+    service = StatsService(StatsRepository(session))
+    return await service.get_stats(user_id, range, user.timezone if user else DEFAULT_TIMEZONE)
+
+@router.get("/me/year/{year}", response_model=YearInReviewResponse)
+async def get_my_year_in_review(
+    year: int = Path(..., ge=2000, le=2100),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_read_db_session)
+):
+    """
+    [연말 결산]
+    오프라인 배치(app.application.year_review)가 미리 만들어 둔 결과를 1행 조회로 반환합니다.
+    아직 생성되지 않았으면 404.
+    """
+    review = await YearReviewRepository(session).get(user_id, year)
+    if review is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{year}년 연말 결산이 아직 준비되지 않았습니다."
+        )
+    return YearInReviewResponse(
+        year=review.year,
+        status=review.status,
+        narrative=review.narrative,
+        generated_at=review.created_at,
+        **review.payload,
+    )
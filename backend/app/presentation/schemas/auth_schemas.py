@@ -12,3 +12,10 @@ class TokenResponse(BaseModel):
 
 class SpotifyLinkRequest(BaseModel):
     authorization_code: str = Field(..., description="Spotify 로그인 후 받은 코드")
+
+class TimezoneUpdateRequest(BaseModel):
+    timezone: str = Field(..., max_length=64, description="IANA 시간대 이름 (예: Asia/Seoul, America/New_York)")
+
+class TimezoneResponse(BaseModel):
+    timezone: str
+    rebucketing: bool = Field(..., description="기존 기록의 캘린더 날짜를 백그라운드에서 다시 계산 중인지 여부")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from datetime import date, datetime
 from uuid import UUID
 
@@ -23,3 +23,28 @@ class DailyCapsuleResponse(BaseModel):
     created_at: datetime
     
     model_config = {"from_attributes": True}
+
+class PeriodCapsuleRequest(BaseModel):
+    """
+    주간/월간 캡슐 생성 요청 — target_date가 속한 주(월~일) 또는 달의 캡슐
+    """
+    period: Literal["week", "month"]
+    target_date: str = Field(..., description="YYYY-MM-DD 형태의 문자열 (기간 안의 아무 날짜)", pattern=r"^\d{4}-\d{2}-\d{2}$")
+
+class PeriodCapsuleResponse(BaseModel):
+    """
+    주간/월간 캡슐 (기간은 유저 시간대의 날짜 기준, end_date 포함)
+    """
+    id: UUID
+    user_id: UUID
+    period: str
+    start_date: date
+    end_date: date
+    ai_summary: str
+    representative_image_url: Optional[str] = None
+    theme: str
+    total_plays: int
+    daily_capsule_count: int = Field(..., description="요약에 반영된 Daily Capsule 수")
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
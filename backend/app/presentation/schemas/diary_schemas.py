@@ -54,7 +54,42 @@ class DiaryResponse(BaseModel):
 
     model_config = {"from_attributes": True}
 
+class DiarySearchHit(DiaryResponse):
+    score: float = Field(..., description="관련도 점수 (높을수록 관련 있음, 같은 점수는 최신순)")
+
+class DiarySearchResponse(BaseModel):
+    items: List[DiarySearchHit]
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 요청 시 cursor로 전달 (없으면 마지막 페이지)")
+    truncated: bool = Field(
+        False,
+        description="일치 기록이 후보 상한(SEARCH_CANDIDATE_LIMIT, 기본 500)보다 많아 최근 기록 안에서만 정렬됨 — "
+                    "더 오래된 일치 기록은 페이지를 넘겨도 나오지 않으므로 검색어를 구체적으로",
+    )
+
+class NearbyPlaceResponse(BaseModel):
+    latitude: float = Field(..., description="장소 중심 위도 (묶인 기록들의 평균)")
+    longitude: float = Field(..., description="장소 중심 경도")
+    distance_m: float = Field(..., description="요청 좌표에서 장소 중심까지 거리(m)")
+    place_name: Optional[str] = Field(None, description="묶인 기록에서 가장 많이 쓰인 장소명")
+    diary_count: int = Field(..., description="이 장소에서 남긴 기록 수 (검색 한도 안에서)")
+    last_listened_at: datetime
+    recent_diaries: List[DiaryResponse] = Field(..., description="최근 기록 (최신순)")
+
+    model_config = {"from_attributes": True}
+
 class CalendarDaySummary(BaseModel):
     date: str = Field(..., description="날짜 문자열 (YYYY-MM-DD)")
     record_count: int = Field(..., description="해당 날짜에 기록된 다이어리 개수")
     representative_thumbnail: Optional[str] = Field(None, description="가장 많이 들은(혹은 최신) 곡의 앨범 아트")
+
+class HistoryImportResponse(BaseModel):
+    """Spotify 스트리밍 기록 가져오기 작업의 진행 상황"""
+    id: UUID
+    status: str = Field(..., description="pending | running | completed | failed")
+    source_name: Optional[str] = None
+    rows_read: int = Field(..., description="지금까지 읽은 원본 행 수 (재개 지점)")
+    rows_imported: int = Field(..., description="새로 추가된 다이어리 수")
+    rows_skipped: int = Field(..., description="팟캐스트/30초 미만 재생/이미 기록된 재생")
+    error: Optional[str] = None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,78 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+class ArtistStat(BaseModel):
+    artist: str
+    plays: int
+
+class TrackStat(BaseModel):
+    title: str
+    artist: str
+    album_artwork_url: Optional[str] = None
+    plays: int
+
+class WeatherStat(BaseModel):
+    weather: str = Field(..., description="날씨 (기록이 없으면 unknown)")
+    plays: int
+
+class StreakStat(BaseModel):
+    current: int = Field(..., description="오늘(또는 어제)까지 이어진 연속 청취 일수")
+    longest: int = Field(..., description="기간 내 최장 연속 청취 일수")
+
+class WeekOverWeek(BaseModel):
+    this_week: int = Field(..., description="오늘 포함 최근 7일 재생 수")
+    last_week: int = Field(..., description="그 전 7일 재생 수")
+    delta: int
+    delta_pct: Optional[float] = Field(None, description="지난주 대비 증감률(%) — 지난주 기록이 없으면 null")
+
+class ListeningStatsResponse(BaseModel):
+    """
+    청취 통계 (날짜/시간은 모두 유저 시간대 기준)
+    """
+    range: str
+    start_date: Optional[str] = Field(None, description="집계 시작일 (range=all이면 null)")
+    end_date: str
+    total_plays: int
+    distinct_tracks: int
+    distinct_artists: int
+    active_days: int
+    top_artists: List[ArtistStat]
+    top_tracks: List[TrackStat]
+    hourly_heatmap: List[List[int]] = Field(..., description="[요일(월=0..일=6)][시(0..23)] 재생 수")
+    streaks: StreakStat
+    weather: List[WeatherStat]
+    week_over_week: WeekOverWeek
+
+class GenreStat(BaseModel):
+    genre: str
+    plays: int = Field(..., description="해당 장르 아티스트들의 재생 수 합")
+
+class DayStat(BaseModel):
+    date: str
+    plays: int
+
+class ThemeStat(BaseModel):
+    theme: str
+    days: int = Field(..., description="해당 테마로 생성된 Daily Capsule 수")
+
+class YearInReviewResponse(BaseModel):
+    """
+    연말 결산 (날짜/월은 유저 시간대 기준) — 배치가 미리 생성한 결과
+    """
+    year: int
+    status: str = Field(..., description="completed | empty(그 해 청취 기록 없음)")
+    narrative: Optional[str] = None
+    generated_at: Optional[datetime] = None
+    total_plays: int
+    distinct_tracks: int
+    distinct_artists: int
+    active_days: int
+    top_artists: List[ArtistStat]
+    top_tracks: List[TrackStat]
+    top_genres: List[GenreStat]
+    genre_theme: Optional[str] = Field(None, description="Top 아티스트 장르로 분류한 한 해의 테마 (장르 정보가 없으면 null)")
+    most_listened_day: Optional[DayStat] = None
+    monthly_plays: List[int] = Field(..., description="1~12월 재생 수")
+    themes: List[ThemeStat]
+    top_weather: Optional[str] = None
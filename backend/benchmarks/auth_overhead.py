@@ -0,0 +1,85 @@
+"""
+요청 인증 의존성의 요청당 오버헤드 마이크로벤치마크.
+
+    cd backend && python -m benchmarks.auth_overhead
+
+- 기존 방식: 매 요청 jwt.decode(HMAC 검증) + users 테이블 SELECT
+- 변경 방식: 토큰 LRU 캐시 + 유저 스냅샷 TTL 캐시
+"""
+import asyncio
+import os
+import time
+import uuid
+from datetime import timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+import jwt
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.database import engine, AsyncSessionLocal
+from app.infrastructure.db.user_models import UserORM
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.presentation.dependencies import get_current_user_id
+from app.presentation.routers.auth import create_access_token
+from app.infrastructure.db import models  # noqa: F401  (Base.metadata 등록)
+
+ITERATIONS = 20000
+
+
+def _make_request(token: str) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    })
+
+
+def _report(label: str, elapsed: float, iterations: int) -> None:
+    print(f"{label:<40} {elapsed / iterations * 1e6:8.2f} us/req")
+
+
+async def main() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as session:
+        user = UserORM(email="bench@example.com", name="bench", google_id="bench-google-id")
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    token = create_access_token({"sub": str(user_id)}, timedelta(minutes=10))
+    request = _make_request(token)
+
+    # 1. JWT 디코딩
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        uuid.UUID(jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])["sub"])
+    _report("jwt.decode (uncached)", time.perf_counter() - start, ITERATIONS)
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await get_current_user_id(request)
+    _report("get_current_user_id (token cache)", time.perf_counter() - start, ITERATIONS)
+
+    # 2. 유저 레코드 로드 (요청마다 새 세션 = 실제 요청과 동일 조건)
+    lookups = ITERATIONS // 10
+    start = time.perf_counter()
+    for _ in range(lookups):
+        async with AsyncSessionLocal() as session:
+            await session.get(UserORM, user_id)
+    _report("session.get(UserORM) (uncached)", time.perf_counter() - start, lookups)
+
+    start = time.perf_counter()
+    for _ in range(lookups):
+        async with AsyncSessionLocal() as session:
+            await UserRepository(session).get_cached(user_id)
+    _report("UserRepository.get_cached (TTL cache)", time.perf_counter() - start, lookups)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
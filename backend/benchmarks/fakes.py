@@ -0,0 +1,272 @@
+"""
+벤치마크용 로컬 가짜 외부 서비스 (Spotify / Google / OpenWeather / Google Maps / Spotify CDN / Gemini).
+
+앱 코드는 그대로 두고, httpx.AsyncClient 생성 시 외부 호스트(settings의 *_BASE_URL)를 인프로세스 ASGI 가짜 서버로
+마운트하여 네트워크 없이 재현 가능한 지연/에러율로 부하 테스트를 할 수 있게 합니다.
+(녹화한 실제 응답을 그대로 재생하려면 benchmarks/replay.py)
+
+    upstreams = FakeUpstreams({"spotify": FakeServiceConfig(latency_ms=80, error_rate=0.01)})
+    upstreams.install()
+    ...
+    upstreams.uninstall()
+"""
+import asyncio
+import hashlib
+import io
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+GENRES = [
+    ["k-pop", "dance pop"], ["indie rock", "lo-fi"], ["r&b", "soul"], ["hip hop", "rap"],
+    ["jazz", "ambient"], ["acoustic", "folk"], ["classical", "piano"], ["house", "techno"],
+]
+WEATHERS = ["Clear", "Clouds", "Rain", "Snow", "Mist"]
+# 스크로블 주기마다 새 곡이 조금씩 생기도록 재생 시각을 이 간격의 격자에 맞춤
+PLAY_INTERVAL_SECONDS = 180
+
+
+def upstream_origins() -> Dict[str, str]:
+    """외부 서비스 이름 → 앱이 요청을 보내는 origin (settings의 base URL 기준, httpx mounts 키)"""
+    from app.core.config import settings
+
+    def origin(url: str) -> str:
+        parsed = httpx.URL(url)
+        return f"{parsed.scheme}://{parsed.netloc.decode()}"
+
+    return {
+        "spotify": origin(settings.SPOTIFY_API_BASE_URL),
+        "spotify_accounts": origin(settings.SPOTIFY_ACCOUNTS_BASE_URL),
+        "google": origin(settings.GOOGLE_API_BASE_URL),
+        "openweather": origin(settings.OPENWEATHER_BASE_URL),
+        "google_maps": origin(settings.GOOGLE_MAPS_BASE_URL),
+        # 앨범 아트워크는 Spotify 응답에 담긴 URL을 그대로 가져옴
+        "spotify_cdn": "https://i.scdn.co",
+    }
+
+
+def mount_upstreams(transports: Dict[str, httpx.AsyncBaseTransport]) -> Callable[[], None]:
+    """
+    이후 생성되는 모든 httpx.AsyncClient에 origin → transport 마운트를 추가하고, 원래대로 되돌리는 함수를 반환합니다.
+    Why: 클라이언트들이 호출마다 AsyncClient를 새로 만들므로 transport를 인자로 넘길 지점이 없음
+    """
+    original_init = httpx.AsyncClient.__init__
+
+    def patched_init(client_self, *args, **kwargs):
+        mounts = dict(kwargs.pop("mounts", None) or {})
+        for origin, transport in transports.items():
+            mounts.setdefault(origin, transport)
+        original_init(client_self, *args, mounts=mounts, **kwargs)
+
+    httpx.AsyncClient.__init__ = patched_init
+
+    def restore() -> None:
+        httpx.AsyncClient.__init__ = original_init
+
+    return restore
+
+
+@dataclass
+class FakeServiceConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+
+
+@dataclass
+class FakeUpstreams:
+    """서비스별 지연/에러율 설정과 호출 횟수를 관리하는 가짜 외부 서비스 묶음"""
+    configs: Dict[str, FakeServiceConfig] = field(default_factory=dict)
+    seed: int = 42
+    calls: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._restore: Optional[Callable[[], None]] = None
+        # Why: 가짜 서버의 경로는 실제 API와 같으므로 base URL은 origin만 바꿔야 함 (경로 접두사 변경은 미지원)
+        self._transports = {
+            origin: httpx.ASGITransport(app=self._build_app(service))
+            for service, origin in upstream_origins().items()
+        }
+
+    def config(self, service: str) -> FakeServiceConfig:
+        return self.configs.get(service) or self.configs.get("default") or FakeServiceConfig()
+
+    def _roll(self, service: str) -> tuple[float, bool]:
+        """(지연 초, 에러 여부)를 결정하고 호출 수를 기록 (Gemini 가짜는 스레드에서 호출되므로 락 사용)"""
+        cfg = self.config(service)
+        with self._lock:
+            self.calls[service] = self.calls.get(service, 0) + 1
+            delay = max(0.0, cfg.latency_ms + self._rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000
+            failed = self._rng.random() < cfg.error_rate
+        return delay, failed
+
+    # ──────────────────────────────────────────────
+    # httpx 라우팅
+    # ──────────────────────────────────────────────
+    def install(self) -> None:
+        """이후 생성되는 모든 httpx.AsyncClient의 외부 호스트 요청을 가짜 서버로 보냅니다."""
+        if self._restore is None:
+            self._restore = mount_upstreams(self._transports)
+
+    def uninstall(self) -> None:
+        if self._restore is not None:
+            self._restore()
+            self._restore = None
+
+    def install_gemini(self, ai_client) -> None:
+        """AICapsuleClient의 Gemini 모델을 같은 지연/에러율 규칙을 따르는 가짜 모델로 교체"""
+        ai_client.model = _FakeGeminiModel(self)
+
+    # ──────────────────────────────────────────────
+    # 가짜 서버
+    # ──────────────────────────────────────────────
+    def _build_app(self, service: str) -> FastAPI:
+        fake = FastAPI()
+
+        @fake.middleware("http")
+        async def latency_and_errors(request: Request, call_next):
+            delay, failed = self._roll(service)
+            if delay:
+                await asyncio.sleep(delay)
+            if failed:
+                return JSONResponse({"error": "injected failure"}, status_code=self.config(service).error_status)
+            return await call_next(request)
+
+        if service == "spotify":
+            @fake.get("/v1/me")
+            async def me(request: Request):
+                return {"id": _token_of(request)[:16], "display_name": "bench"}
+
+            @fake.get("/v1/me/player/recently-played")
+            async def recently_played(request: Request, limit: int = 20):
+                return {"items": recently_played_items(_token_of(request), min(limit, 50))}
+
+            @fake.get("/v1/me/player/currently-playing")
+            async def currently_playing(request: Request):
+                token = _token_of(request)
+                # 절반의 유저는 재생 중이 아님 → 최근 재생 폴백 경로도 함께 측정
+                if int(_digest(token)[:2], 16) % 2:
+                    return Response(status_code=204)
+                return {"is_playing": True, "item": fake_track(_digest(token)[:8])}
+
+            @fake.get("/v1/search")
+            async def search(q: str):
+                genres = GENRES[int(_digest(q)[:4], 16) % len(GENRES)]
+                return {"artists": {"items": [{"id": _digest(q)[:22], "name": q, "genres": genres}]}}
+
+        elif service == "spotify_accounts":
+            @fake.post("/api/token")
+            async def token(request: Request):
+                form = await request.form()
+                return {
+                    "access_token": f"bench-{_digest(str(form.get('refresh_token')))[:24]}",
+                    "token_type": "Bearer",
+                    "expires_in": 3600,
+                }
+
+        elif service == "google":
+            @fake.get("/oauth2/v3/userinfo")
+            async def userinfo(request: Request):
+                sub = _digest(_token_of(request))[:21]
+                return {"sub": sub, "email": f"{sub}@bench.local", "name": f"bench {sub[:6]}"}
+
+        elif service == "openweather":
+            @fake.get("/data/2.5/weather")
+            async def weather(lat: float, lon: float):
+                return {"weather": [{"main": WEATHERS[int(abs(lat * 10 + lon)) % len(WEATHERS)]}]}
+
+        elif service == "google_maps":
+            @fake.get("/maps/api/geocode/json")
+            async def geocode(latlng: str):
+                return {"status": "OK", "results": [{"formatted_address": f"벤치마크시 {latlng}"}]}
+
+        elif service == "spotify_cdn":
+            @fake.get("/image/{image_id}")
+            async def image(image_id: str):
+                return Response(content=_fake_jpeg(), media_type="image/jpeg")
+
+        return fake
+
+
+class _FakeGeminiModel:
+    """google.generativeai.GenerativeModel.generate_content와 같은 동기 인터페이스 (asyncio.to_thread로 호출됨)"""
+    def __init__(self, upstreams: FakeUpstreams):
+        self.upstreams = upstreams
+
+    def generate_content(self, prompt: str):
+        delay, failed = self.upstreams._roll("gemini")
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise RuntimeError("503 injected Gemini failure")
+        return _FakeGeminiResponse(f"오늘은 {len(prompt) % 7 + 1}가지 색의 음악이 흐른 하루였어요.")
+
+
+@dataclass
+class _FakeGeminiResponse:
+    text: str
+
+
+def _token_of(request: Request) -> str:
+    return request.headers.get("authorization", "").removeprefix("Bearer ")
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def fake_track(key: str) -> dict:
+    n = int(_digest(key)[:6], 16) % 5000
+    return {
+        "id": f"bench-track-{n}",
+        "name": f"Track {n}",
+        "artists": [{"name": f"Artist {n % 300}"}],
+        "album": {"images": [{"url": f"https://i.scdn.co/image/bench{n % 300}"}]},
+    }
+
+
+def recently_played_items(token: str, limit: int, now: Optional[datetime] = None) -> list[dict]:
+    """
+    토큰별로 결정적인 최근 재생 목록.
+    재생 시각을 PLAY_INTERVAL_SECONDS 격자에 맞춰, 같은 주기 안의 반복 호출은 같은 목록을,
+    시간이 지나면 앞쪽에 새 곡이 추가된 목록을 돌려줍니다. (실제 스크로블의 중복 제거 경로 재현)
+    """
+    now = now or datetime.now(timezone.utc)
+    offset = int(_digest(token)[:4], 16) % PLAY_INTERVAL_SECONDS
+    latest = int((now.timestamp() - offset) // PLAY_INTERVAL_SECONDS) * PLAY_INTERVAL_SECONDS + offset
+    items = []
+    for i in range(limit):
+        played_ts = latest - i * PLAY_INTERVAL_SECONDS
+        played_at = datetime.fromtimestamp(played_ts, timezone.utc)
+        items.append({
+            "track": fake_track(f"{token}:{played_ts}"),
+            "played_at": played_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        })
+    return items
+
+
+_JPEG_CACHE: Optional[bytes] = None
+
+
+def _fake_jpeg() -> bytes:
+    global _JPEG_CACHE
+    if _JPEG_CACHE is None:
+        try:
+            from PIL import Image
+            out = io.BytesIO()
+            Image.new("RGB", (640, 640), (120, 80, 200)).save(out, format="JPEG", quality=85)
+            _JPEG_CACHE = out.getvalue()
+        except ImportError:
+            # Pillow가 없으면 리사이즈 경로는 측정되지 않으므로 최소 바이트만 반환
+            _JPEG_CACHE = b"\xff\xd8\xff\xd9"
+    return _JPEG_CACHE
@@ -0,0 +1,123 @@
+"""
+스크로블러가 쓰기를 하는 동안의 히스토리 조회 처리량 부하 테스트.
+
+    cd backend && python -m benchmarks.history_under_scrobble [읽기동시성] [초]
+    # WAL 비교: SQLITE_WAL_MODE=false python -m benchmarks.history_under_scrobble
+    # PostgreSQL: DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.history_under_scrobble
+
+GET /api/diaries/history 를 여러 코루틴이 반복 호출하는 동안, 별도 태스크가
+스크로블러와 같은 경로(AuditoryDiaryRepository.get_or_create_by_listened_at)로 계속 기록합니다.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+_db_path = os.path.join(tempfile.mkdtemp(), "history_under_scrobble.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+
+import httpx
+
+from app.main import app as api_app
+from app.core.config import settings
+from app.core.timezones import DEFAULT_TIMEZONE, get_zone
+from app.domain.models import AuditoryDiary as DomainDiary, Track as DomainTrack, Context as DomainContext
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.database import engine, AsyncSessionLocal
+from app.infrastructure.db.user_models import UserORM
+from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
+from app.presentation.routers.auth import create_access_token
+from app.infrastructure.db import models  # noqa: F401  (Base.metadata 등록)
+
+SEED_DIARIES = 300
+LOCAL_TZ = get_zone(DEFAULT_TIMEZONE)
+
+
+def _diary(user_id: uuid.UUID, listened_at: datetime, n: int) -> DomainDiary:
+    return DomainDiary(
+        user_id=user_id,
+        track=DomainTrack(
+            title=f"Track {n % 500}",
+            artist=f"Artist {n % 50}",
+            album_artwork_url="https://i.scdn.co/image/bench",
+            external_platform_id=f"bench-track-{n % 500}",
+        ),
+        context=DomainContext(place_name="Spotify에서 재생", weather="", timezone=DEFAULT_TIMEZONE),
+        listened_at=listened_at,
+    )
+
+
+async def main(readers: int, duration: float) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as session:
+        user = UserORM(email="bench@example.com", name="bench", google_id=f"bench-{uuid.uuid4()}")
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    today_local = datetime.now(LOCAL_TZ).replace(hour=0, minute=0, second=0, microsecond=0)
+    async with AsyncSessionLocal() as session:
+        repo = AuditoryDiaryRepository(session)
+        for i in range(SEED_DIARIES):
+            await repo.get_or_create_by_listened_at(_diary(user_id, today_local + timedelta(seconds=i * 60), i))
+
+    token = create_access_token({"sub": str(user_id)}, timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+    date_str = today_local.strftime("%Y-%m-%d")
+
+    stop_at = time.perf_counter() + duration
+    read_latencies: list[float] = []
+    read_errors = 0
+    writes = 0
+    write_errors = 0
+
+    async def reader(client: httpx.AsyncClient) -> None:
+        nonlocal read_errors
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            resp = await client.get(f"/api/diaries/history?date={date_str}", headers=headers)
+            if resp.status_code == 200:
+                read_latencies.append(time.perf_counter() - start)
+            else:
+                read_errors += 1
+
+    async def scrobbler() -> None:
+        nonlocal writes, write_errors
+        n = SEED_DIARIES
+        while time.perf_counter() < stop_at:
+            try:
+                async with AsyncSessionLocal() as session:
+                    await AuditoryDiaryRepository(session).get_or_create_by_listened_at(
+                        _diary(user_id, today_local + timedelta(seconds=n * 60), n)
+                    )
+                writes += 1
+            except Exception:
+                write_errors += 1
+            n += 1
+            await asyncio.sleep(0)
+
+    transport = httpx.ASGITransport(app=api_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.gather(scrobbler(), *(reader(client) for _ in range(readers)))
+
+    read_latencies.sort()
+    count = len(read_latencies)
+    print(f"database           {engine.url.get_backend_name()} (wal={settings.SQLITE_WAL_MODE})")
+    print(f"readers / duration {readers} / {duration:.0f}s")
+    print(f"history reads      {count} ok, {read_errors} failed -> {count / duration:.1f} req/s")
+    if count:
+        print(f"read p50 / p95     {read_latencies[count // 2] * 1000:.1f} / {read_latencies[int(count * 0.95)] * 1000:.1f} ms")
+    print(f"scrobble writes    {writes} ok, {write_errors} failed -> {writes / duration:.1f} writes/s")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    r = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    d = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(main(r, d))
@@ -0,0 +1,79 @@
+"""
+앱 실행 직후 로그인 폭주 상황을 흉내 내는 POST /api/auth/google 부하 벤치마크.
+
+    cd backend && python -m benchmarks.login_burst [동시요청수] [고유계정수]
+
+Google UserInfo 호출은 지연(50ms)만 흉내 내는 가짜 응답으로 대체하며,
+같은 계정의 최초 로그인이 동시에 몰려도 유저 행이 하나만 생기는지 함께 확인합니다.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+_db_path = os.path.join(tempfile.mkdtemp(), "login_burst.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+
+import httpx
+from sqlalchemy import func, select
+
+from app.main import app as api_app
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.database import engine, AsyncSessionLocal
+from app.infrastructure.db.user_models import UserORM
+from app.presentation.routers import auth
+from app.infrastructure.db import models  # noqa: F401  (Base.metadata 등록)
+
+GOOGLE_LATENCY_SECONDS = 0.05
+google_calls = 0
+
+
+async def fake_fetch_userinfo(key: str, access_token: str) -> dict:
+    global google_calls
+    google_calls += 1
+    await asyncio.sleep(GOOGLE_LATENCY_SECONDS)
+    account = access_token.split("-")[-1]
+    idinfo = {"sub": f"google-{account}", "email": f"user{account}@example.com", "name": f"User {account}"}
+    auth.google_client._cache.set(key, idinfo)
+    return idinfo
+
+
+async def main(concurrency: int, accounts: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    auth.google_client._fetch_userinfo = fake_fetch_userinfo
+
+    transport = httpx.ASGITransport(app=api_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies: list[float] = []
+
+        async def login(i: int) -> int:
+            start = time.perf_counter()
+            resp = await client.post("/api/auth/google", json={"access_token": f"token-{i % accounts}"})
+            latencies.append(time.perf_counter() - start)
+            return resp.status_code
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(login(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    async with AsyncSessionLocal() as session:
+        user_count = await session.scalar(select(func.count()).select_from(UserORM))
+
+    latencies.sort()
+    print(f"requests           {concurrency} ({accounts} accounts)")
+    print(f"status codes       {sorted(set(statuses))}")
+    print(f"users created      {user_count}")
+    print(f"google calls       {google_calls}")
+    print(f"throughput         {concurrency / elapsed:.1f} req/s")
+    print(f"p50 / p95 latency  {latencies[len(latencies) // 2] * 1000:.1f} / {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(main(n, k))
@@ -0,0 +1,78 @@
+"""
+메트릭 계측의 hot path 오버헤드 마이크로벤치마크.
+
+    cd backend && python -m benchmarks.metrics_overhead
+
+- PrometheusMiddleware 유무에 따른 요청당 처리 시간 차이
+- track_external_call / observe_repository 1회 호출 비용
+"""
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.metrics import PrometheusMiddleware, observe_repository, track_external_call
+
+REQUESTS = 5000
+CALLS = 200000
+
+
+def _build_app(with_metrics: bool) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"item_id": item_id}
+
+    if with_metrics:
+        bench_app.add_middleware(PrometheusMiddleware)
+    return bench_app
+
+
+async def _time_requests(bench_app: FastAPI) -> float:
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(200):  # 워밍업
+            await client.get(f"/items/{i}")
+        start = time.perf_counter()
+        for i in range(REQUESTS):
+            await client.get(f"/items/{i}")
+        return (time.perf_counter() - start) / REQUESTS
+
+
+class _BenchRepository:
+    @observe_repository
+    async def noop(self):
+        return None
+
+    async def noop_plain(self):
+        return None
+
+
+async def main() -> None:
+    plain = await _time_requests(_build_app(with_metrics=False))
+    instrumented = await _time_requests(_build_app(with_metrics=True))
+    print(f"request without middleware  {plain * 1e6:8.1f} us")
+    print(f"request with middleware     {instrumented * 1e6:8.1f} us  (+{(instrumented - plain) * 1e6:.1f} us)")
+
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        with track_external_call("bench", "noop") as call:
+            call.status = 200
+    print(f"track_external_call         {(time.perf_counter() - start) / CALLS * 1e6:8.2f} us/call")
+
+    repo = _BenchRepository()
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        await repo.noop_plain()
+    plain_call = (time.perf_counter() - start) / CALLS
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        await repo.noop()
+    observed_call = (time.perf_counter() - start) / CALLS
+    print(f"observe_repository          {(observed_call - plain_call) * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+"""
+주변 기록(/api/diaries/nearby) 벤치마크 — context 100만 건에서 지오해시 인덱스 사용 여부와 지연을 측정합니다.
+
+    cd backend && python -W ignore -m benchmarks.nearby [context 수] [반복 횟수]
+    # PostgreSQL: DATABASE_URL=postgresql+asyncpg://... python -W ignore -m benchmarks.nearby
+
+여러 유저의 기록을 몇몇 도시 주변에 흩어 넣고(일부는 좌표 없는 스크로블 기록),
+한 유저로 반경을 바꿔 가며 호출합니다. 실제로 실행된 SQL의 실행 계획을 출력해
+contexts나 유저의 전체 기록을 훑지 않고 ix_auditory_diaries_user_geohash 범위 검색으로 시작하는지 확인합니다.
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+_db_path = os.path.join(tempfile.mkdtemp(), "nearby.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+
+import httpx
+from sqlalchemy import event, insert, select
+
+from app.main import app as api_app
+from app.core.timezones import DEFAULT_TIMEZONE
+from app.domain.geohash import encode_coordinates
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.database import engine, AsyncSessionLocal
+from app.infrastructure.db.models import AuditoryDiaryORM, ContextORM, TrackORM
+from app.infrastructure.db.user_models import UserORM
+from app.presentation.routers.auth import create_access_token
+from app.infrastructure.db import models  # noqa: F401  (Base.metadata 등록)
+
+USERS = 200
+CHUNK_SIZE = 20000
+LOCATED_RATE = 0.6  # 좌표가 있는 기록 비율 (나머지는 스크로블/기록 가져오기)
+CITIES = [(37.5665, 126.9780), (35.1796, 129.0756), (33.4996, 126.5312), (37.4563, 126.7052)]
+# 유저마다 자주 가는 장소(집/회사/카페 등) 몇 곳
+PLACES_PER_USER = 12
+RADII_M = (200, 1000, 5000)
+
+
+async def seed(contexts: int, rng: random.Random) -> uuid.UUID:
+    now = datetime.now(timezone.utc)
+    users = [
+        {"id": uuid.uuid4(), "email": f"near{i}@bench.local", "name": f"near {i}",
+         "google_id": f"near-{i}", "timezone": DEFAULT_TIMEZONE, "created_at": now}
+        for i in range(USERS)
+    ]
+    track_id = uuid.uuid4()
+    places = {
+        user["id"]: [
+            (city[0] + rng.gauss(0, 0.05), city[1] + rng.gauss(0, 0.05))
+            for city in (rng.choice(CITIES) for _ in range(PLACES_PER_USER))
+        ]
+        for user in users
+    }
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(UserORM), users)
+        await session.execute(insert(TrackORM), [{
+            "id": track_id, "title": "Track", "artist": "Artist",
+            "external_platform_id": "near-track", "platform_name": "spotify",
+        }])
+        for start in range(0, contexts, CHUNK_SIZE):
+            context_rows, diary_rows = [], []
+            for n in range(start, min(start + CHUNK_SIZE, contexts)):
+                user_id = users[n % USERS]["id"]
+                latitude = longitude = None
+                if rng.random() < LOCATED_RATE:
+                    base_lat, base_lon = rng.choice(places[user_id])
+                    latitude, longitude = base_lat + rng.gauss(0, 0.0005), base_lon + rng.gauss(0, 0.0005)
+                context_id = uuid.uuid4()
+                context_rows.append({
+                    "id": context_id, "latitude": latitude, "longitude": longitude,
+                    "place_name": None if latitude is None else f"장소 {n % 97}",
+                    "weather": "", "timezone": DEFAULT_TIMEZONE,
+                })
+                diary_rows.append({
+                    "id": uuid.uuid4(), "user_id": user_id, "track_id": track_id, "context_id": context_id,
+                    "listened_at": now - timedelta(minutes=n), "created_at": now,
+                    "geohash": encode_coordinates(latitude, longitude),
+                })
+            await session.execute(insert(ContextORM), context_rows)
+            await session.execute(insert(AuditoryDiaryORM), diary_rows)
+            await session.commit()
+    return users[0]["id"]
+
+
+async def explain(statement: str, parameters) -> None:
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    async with engine.connect() as conn:
+        plan = await conn.exec_driver_sql(prefix + statement, parameters)
+        for row in plan.all():
+            print("   ", row[-1])
+
+
+async def main(contexts: int, repeats: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(42)
+    start = time.perf_counter()
+    user_id = await seed(contexts, rng)
+    print(f"seeded {contexts} contexts / {USERS} users in {time.perf_counter() - start:.1f}s")
+
+    captured = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "geohash" in statement and not statement.startswith("EXPLAIN"):
+            captured.append((statement, parameters))
+
+    token = create_access_token({"sub": str(user_id)}, timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+    # 유저가 기록을 남긴 장소 하나를 중심으로 검색
+    async with AsyncSessionLocal() as session:
+        home = (await session.execute(
+            select(ContextORM)
+            .join(AuditoryDiaryORM, AuditoryDiaryORM.context_id == ContextORM.id)
+            .where(AuditoryDiaryORM.user_id == user_id, ContextORM.latitude.is_not(None))
+            .limit(1)
+        )).scalar_one()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api_app), base_url="http://bench") as client:
+        for radius in RADII_M:
+            latencies, places, diaries = [], 0, 0
+            for _ in range(repeats):
+                t = time.perf_counter()
+                response = await client.get(
+                    "/api/diaries/nearby", headers=headers,
+                    params={"lat": home.latitude, "lon": home.longitude, "radius_m": radius},
+                )
+                latencies.append(time.perf_counter() - t)
+                response.raise_for_status()
+                places = len(response.json())
+                diaries = sum(place["diary_count"] for place in response.json())
+            latencies.sort()
+            print(f"radius {radius:>5}m: p50 {latencies[len(latencies) // 2] * 1000:7.1f}ms  "
+                  f"max {latencies[-1] * 1000:7.1f}ms  places {places}  diaries {diaries}")
+
+    statement, parameters = captured[-1]
+    print("plan (largest radius):")
+    await explain(statement, parameters)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    ))
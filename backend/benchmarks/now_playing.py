@@ -0,0 +1,127 @@
+"""
+실시간 재생 알림(SSE) 유휴 연결 벤치마크 — 워커 하나에 구독자를 많이 붙였을 때의 메모리와 전달 지연을 측정합니다.
+
+    cd backend && python -W ignore -m benchmarks.now_playing [연결 수] [유저 수]
+
+uvicorn 서버를 자식 프로세스로 띄워(클라이언트 소켓과 메모리를 분리) /proc의 RSS를 읽고,
+연결 수만큼 /api/diaries/me/now-playing/stream 을 열어 둔 채 구독자당 증가량을 계산합니다.
+그다음 벤치마크 전용 발행 경로(자식 프로세스의 앱에만 추가)로 유저마다 이벤트 1건을 보내
+모든 연결이 받기까지의 시간을 잽니다.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+
+BENCH_PUBLISH_PATH = "/bench/publish"
+CONNECT_BATCH = 500
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def serve(port: int) -> None:
+    """자식 프로세스: 앱에 벤치마크 전용 발행 경로를 붙여 uvicorn 실행"""
+    import uvicorn
+    from fastapi import Request
+
+    from app.main import app as api_app
+    from app.infrastructure.pubsub import now_playing_broker
+
+    @api_app.post(BENCH_PUBLISH_PATH)
+    async def publish(request: Request):
+        user_ids = [uuid.UUID(value) for value in (await request.json())["user_ids"]]
+        for user_id in user_ids:
+            await now_playing_broker.publish(user_id, f'{{"id": "{uuid.uuid4()}", "bench": true}}')
+        return {"subscribers": now_playing_broker.subscriber_count}
+
+    uvicorn.run(api_app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+
+async def open_stream(port: int, token: str):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((
+        "GET /api/diaries/me/now-playing/stream HTTP/1.1\r\nHost: bench\r\n"
+        f"Authorization: Bearer {token}\r\nAccept: text/event-stream\r\n\r\n"
+    ).encode())
+    await writer.drain()
+    await reader.readuntil(b": connected")
+    return reader, writer
+
+
+async def main(connections: int, users: int) -> None:
+    import httpx
+
+    from app.infrastructure.db.migrate import create_schema
+    from app.presentation.routers.auth import create_access_token
+
+    # 서버 시작 시 스크로블러가 한 번 돌므로 스키마는 미리 준비
+    await create_schema()
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    env = {**os.environ, "SCROBBLE_INTERVAL_SECONDS": "86400", "NOW_PLAYING_BROKER": "memory"}
+    server = subprocess.Popen([sys.executable, "-W", "ignore", "-m", "benchmarks.now_playing", "--serve", str(port)], env=env)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            for _ in range(100):
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.2)
+
+            user_ids = [uuid.uuid4() for _ in range(users)]
+            tokens = [create_access_token({"sub": str(user_id)}, timedelta(hours=1)) for user_id in user_ids]
+            # 연결 1개로 첫 요청 경로(임포트/캐시)를 데운 뒤 기준선 측정
+            warm = await open_stream(port, tokens[0])
+            await asyncio.sleep(0.5)
+            baseline = rss_mb(server.pid)
+
+            start = time.perf_counter()
+            streams = []
+            for batch_start in range(0, connections, CONNECT_BATCH):
+                streams += await asyncio.gather(*(
+                    open_stream(port, tokens[n % users])
+                    for n in range(batch_start, min(batch_start + CONNECT_BATCH, connections))
+                ))
+            connect_seconds = time.perf_counter() - start
+            await asyncio.sleep(1.0)
+            loaded = rss_mb(server.pid)
+            print(f"{connections} idle SSE connections ({users} users) opened in {connect_seconds:.1f}s")
+            print(f"server RSS {baseline:.1f} MB -> {loaded:.1f} MB "
+                  f"({(loaded - baseline) * 1024 * 1024 / connections / 1024:.1f} KB per subscriber)")
+
+            start = time.perf_counter()
+            response = await client.post(BENCH_PUBLISH_PATH, json={"user_ids": [str(u) for u in user_ids]})
+            await asyncio.gather(*(reader.readuntil(b"event: diary") for reader, _ in streams))
+            print(f"fan-out to {response.json()['subscribers']} subscribers: "
+                  f"{(time.perf_counter() - start) * 1000:.1f} ms until every connection received its event")
+
+            for _, writer in streams + [warm]:
+                writer.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--serve":
+        serve(int(sys.argv[2]))
+    else:
+        os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'now_playing.db')}")
+        asyncio.run(main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+        ))
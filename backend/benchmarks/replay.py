@@ -0,0 +1,428 @@
+"""
+외부 API 녹화/재생 하네스 — 실제 응답을 JSON 픽스처(benchmarks/fixtures/*.json)로 저장해 두고
+네트워크 없이 그대로 재생합니다. (fakes.py가 규칙으로 응답을 만든다면, 여기는 녹화된 응답과 상태 코드/지연을 재현)
+
+    cd backend && python -W ignore -m benchmarks.replay                 # 모든 픽스처로 클라이언트 검증
+    cd backend && python -W ignore -m benchmarks.replay rate_limited    # 특정 픽스처만
+    cd backend && python -m benchmarks.suite --fixtures rate_limited    # 부하 테스트에 픽스처를 덧씌움
+
+픽스처 형식:
+
+    {
+      "interactions": [
+        {"service": "spotify", "method": "GET", "path": "/v1/me/player/currently-playing",
+         "query": {"limit": "10"},           # (선택) 이 쿼리 값이 모두 같을 때만 매칭
+         "status": 200, "headers": {...}, "json": {...} | "text": "...",
+         "delay_ms": 0,                      # 요청의 읽기 타임아웃보다 길면 httpx.ReadTimeout
+         "times": 1}                         # (선택) 이 횟수만큼만 사용하고 다음 매칭으로 넘어감
+      ],
+      "gemini": [{"text": "..."} | {"error": "429 Resource has been exhausted", "times": 1}],
+      "expect": {"<검사 이름>": "<기대 결과>"}   # python -m benchmarks.replay 가 비교
+    }
+
+Gemini는 httpx가 아니라 SDK(gRPC)로 호출되므로 fakes.py와 같이 AICapsuleClient의 모델을 교체해 재생합니다.
+(SDK의 실제 HTTP 요청을 가로채려면 GEMINI_API_ENDPOINT로 REST 엔드포인트를 지정)
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from benchmarks.fakes import FakeUpstreams, mount_upstreams, upstream_origins
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# 녹화 시 값을 지우는 응답 JSON 필드 (쿼리 문자열은 API 키가 담기므로 아예 녹화하지 않음 — 필요하면 픽스처에 query를 직접 추가)
+SECRET_FIELDS = {"access_token", "refresh_token", "id_token", "client_secret"}
+# 응답 헤더 중 재생에 의미가 있는 것만 녹화
+RECORDED_HEADERS = {"content-type", "retry-after", "www-authenticate"}
+REDACTED = "REDACTED"
+
+
+@dataclass
+class Interaction:
+    """녹화된 요청/응답 한 쌍"""
+    service: str
+    method: str
+    path: str
+    status: int = 200
+    query: Dict[str, str] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
+    json: Any = None
+    text: Optional[str] = None
+    delay_ms: float = 0.0
+    times: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Interaction":
+        return cls(
+            service=data["service"], method=data.get("method", "GET").upper(), path=data["path"],
+            status=data.get("status", 200), query={k: str(v) for k, v in data.get("query", {}).items()},
+            headers=data.get("headers", {}), json=data.get("json"), text=data.get("text"),
+            delay_ms=data.get("delay_ms", 0.0), times=data.get("times"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"service": self.service, "method": self.method, "path": self.path}
+        if self.query:
+            data["query"] = self.query
+        data["status"] = self.status
+        if self.headers:
+            data["headers"] = self.headers
+        if self.json is not None:
+            data["json"] = self.json
+        elif self.text is not None:
+            data["text"] = self.text
+        if self.delay_ms:
+            data["delay_ms"] = self.delay_ms
+        return data
+
+    def matches(self, service: str, request: httpx.Request) -> bool:
+        if self.times is not None and self.times <= 0:
+            return False
+        if service != self.service or request.method != self.method or request.url.path != self.path:
+            return False
+        params = request.url.params
+        return all(params.get(name) == value for name, value in self.query.items())
+
+    def build_response(self) -> httpx.Response:
+        if self.json is not None:
+            return httpx.Response(self.status, headers=self.headers, json=self.json)
+        return httpx.Response(self.status, headers=self.headers, text=self.text or "")
+
+
+@dataclass
+class Cassette:
+    """픽스처 파일 하나 (여러 개를 합치면 앞의 것이 먼저 매칭)"""
+    interactions: List[Interaction] = field(default_factory=list)
+    gemini: List[Dict[str, Any]] = field(default_factory=list)
+    expect: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, name_or_path: str) -> "Cassette":
+        path = Path(name_or_path)
+        if not path.suffix:
+            path = FIXTURES_DIR / f"{name_or_path}.json"
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(
+            interactions=[Interaction.from_dict(item) for item in data.get("interactions", [])],
+            gemini=[dict(entry) for entry in data.get("gemini", [])],
+            expect=data.get("expect", {}),
+        )
+
+    def merge(self, other: "Cassette") -> "Cassette":
+        return Cassette(
+            self.interactions + other.interactions,
+            self.gemini + other.gemini,
+            {**other.expect, **self.expect},
+        )
+
+    def save(self, path: Path) -> None:
+        data: Dict[str, Any] = {"interactions": [item.to_dict() for item in self.interactions]}
+        if self.gemini:
+            data["gemini"] = self.gemini
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+class ReplayUpstreams:
+    """
+    픽스처를 재생하는 외부 서비스 묶음 — FakeUpstreams와 같은 install/uninstall/install_gemini/calls 인터페이스.
+    매칭되는 녹화가 없는 요청은 fallback(FakeUpstreams)이 있으면 그쪽으로, 없으면 연결 실패로 처리하고 unmatched에 남깁니다.
+    speed: 지연을 이 배수만큼 빠르게 재생 (타임아웃 판정은 녹화된 지연 기준)
+    """
+    def __init__(self, cassette: Cassette, fallback: Optional[FakeUpstreams] = None, speed: float = 1.0):
+        self.cassette = cassette
+        self.fallback = fallback
+        self.speed = speed
+        self.calls: Dict[str, int] = {}
+        self.unmatched: List[str] = []
+        self._lock = threading.Lock()
+        self._restore: Optional[Callable[[], None]] = None
+        self._gemini_queue = [dict(entry) for entry in cassette.gemini]
+
+    @classmethod
+    def load(cls, *names: str, fallback: Optional[FakeUpstreams] = None, speed: float = 1.0) -> "ReplayUpstreams":
+        cassette = Cassette()
+        for name in names:
+            cassette = cassette.merge(Cassette.load(name))
+        return cls(cassette, fallback=fallback, speed=speed)
+
+    def _transport(self, service: str, origin: str) -> httpx.MockTransport:
+        fallback = self.fallback._transports.get(origin) if self.fallback is not None else None
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            interaction = self._take(service, request)
+            if interaction is None:
+                if fallback is not None:
+                    return await fallback.handle_async_request(request)
+                self.unmatched.append(f"{service} {request.method} {request.url.path}")
+                raise httpx.ConnectError(f"no recorded interaction for {request.method} {request.url}", request=request)
+            self._count(service)
+            await self._delay(interaction.delay_ms, request)
+            return interaction.build_response()
+
+        # Why: MockTransport는 비동기 핸들러의 코루틴을 await 하므로 지연/타임아웃을 이벤트 루프를 막지 않고 재현
+        return httpx.MockTransport(handler)
+
+    def _take(self, service: str, request: httpx.Request) -> Optional[Interaction]:
+        for interaction in self.cassette.interactions:
+            if interaction.matches(service, request):
+                if interaction.times is not None:
+                    interaction.times -= 1
+                return interaction
+        return None
+
+    def _count(self, service: str) -> None:
+        with self._lock:
+            self.calls[service] = self.calls.get(service, 0) + 1
+
+    async def _delay(self, delay_ms: float, request: httpx.Request) -> None:
+        read_timeout = (request.extensions.get("timeout") or {}).get("read")
+        if read_timeout is not None and delay_ms / 1000 > read_timeout:
+            await asyncio.sleep(read_timeout / self.speed)
+            raise httpx.ReadTimeout(f"recorded delay {delay_ms:.0f}ms exceeds read timeout", request=request)
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000 / self.speed)
+
+    def install(self) -> None:
+        """이후 생성되는 모든 httpx.AsyncClient의 외부 호스트 요청을 녹화 재생으로 보냅니다."""
+        if self._restore is None:
+            transports = {origin: self._transport(service, origin) for service, origin in upstream_origins().items()}
+            self._restore = mount_upstreams(transports)
+        if self.fallback is not None:
+            self.fallback.calls = self.calls
+
+    def uninstall(self) -> None:
+        if self._restore is not None:
+            self._restore()
+            self._restore = None
+
+    def install_gemini(self, ai_client) -> None:
+        """AICapsuleClient의 Gemini 모델을 녹화된 응답/에러를 순서대로 돌려주는 모델로 교체 (녹화가 없으면 fallback 규칙)"""
+        if not self._gemini_queue and self.fallback is not None:
+            self.fallback.install_gemini(ai_client)
+            return
+        ai_client.model = _ReplayGeminiModel(self)
+
+    def next_gemini(self) -> Dict[str, Any]:
+        """다음 Gemini 응답 — times가 있는 항목은 소진되면 넘어가고, 마지막 항목은 계속 반복"""
+        with self._lock:
+            self.calls["gemini"] = self.calls.get("gemini", 0) + 1
+            if not self._gemini_queue:
+                return {"error": "no recorded Gemini response"}
+            entry = self._gemini_queue[0]
+            if entry.get("times") is not None:
+                entry["times"] -= 1
+                if entry["times"] <= 0 and len(self._gemini_queue) > 1:
+                    self._gemini_queue.pop(0)
+            return entry
+
+
+class _ReplayGeminiModel:
+    """google.generativeai.GenerativeModel.generate_content와 같은 동기 인터페이스 (asyncio.to_thread로 호출됨)"""
+    def __init__(self, upstreams: ReplayUpstreams):
+        self.upstreams = upstreams
+
+    def generate_content(self, prompt: str):
+        entry = self.upstreams.next_gemini()
+        if entry.get("delay_ms"):
+            time.sleep(entry["delay_ms"] / 1000 / self.upstreams.speed)
+        if "error" in entry:
+            raise RuntimeError(entry["error"])
+        return _GeminiResponse(entry["text"])
+
+
+@dataclass
+class _GeminiResponse:
+    text: str
+
+
+# ──────────────────────────────────────────────
+# 녹화
+# ──────────────────────────────────────────────
+def _redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: REDACTED if k in SECRET_FIELDS else _redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """실제 transport로 보낸 요청/응답을 카세트에 추가 (API 키/토큰은 지움)"""
+    def __init__(self, service: str, cassette: Cassette, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.service = service
+        self.cassette = cassette
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        interaction = Interaction(
+            service=self.service, method=request.method, path=request.url.path, status=response.status_code,
+            headers={k: v for k, v in response.headers.items() if k.lower() in RECORDED_HEADERS},
+            delay_ms=round(elapsed_ms),
+        )
+        try:
+            interaction.json = _redact(json.loads(body)) if body else None
+        except ValueError:
+            interaction.text = body.decode(errors="replace")
+        if interaction.json is None and interaction.text is None and body:
+            interaction.text = body.decode(errors="replace")
+        self.cassette.interactions.append(interaction)
+
+        # 본문을 이미 읽었으므로 (압축 해제된) 본문으로 새 응답을 만들어 돌려줌
+        headers = [(k, v) for k, v in response.headers.items()
+                   if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class _RecordingGeminiModel:
+    """실제 Gemini 모델 호출 결과(또는 에러 메시지)를 카세트에 추가"""
+    def __init__(self, model, cassette: Cassette):
+        self.model = model
+        self.cassette = cassette
+
+    def generate_content(self, prompt: str):
+        started = time.perf_counter()
+        try:
+            response = self.model.generate_content(prompt)
+        except Exception as e:
+            self.cassette.gemini.append({"error": f"{type(e).__name__}: {e}",
+                                         "delay_ms": round((time.perf_counter() - started) * 1000)})
+            raise
+        self.cassette.gemini.append({"text": response.text, "delay_ms": round((time.perf_counter() - started) * 1000)})
+        return response
+
+
+@contextmanager
+def record_upstreams(path: Path, ai_client=None) -> Iterator[Cassette]:
+    """
+    블록 안에서 나간 외부 호출을 녹화해 path에 저장합니다. (실제 네트워크/API 키 필요)
+    ai_client를 넘기면 Gemini 응답도 녹화 — 모델이 만들어진 뒤(_get_model 이후)여야 함
+    """
+    cassette = Cassette()
+    restore = mount_upstreams({
+        origin: RecordingTransport(service, cassette) for service, origin in upstream_origins().items()
+    })
+    original_model = None
+    if ai_client is not None and ai_client._get_model() is not None:
+        original_model = ai_client.model
+        ai_client.model = _RecordingGeminiModel(original_model, cassette)
+    try:
+        yield cassette
+    finally:
+        restore()
+        if original_model is not None:
+            ai_client.model = original_model
+        cassette.save(path)
+
+
+# ──────────────────────────────────────────────
+# 검증: 픽스처마다 외부 클라이언트를 호출하고 expect와 비교
+# ──────────────────────────────────────────────
+BURST_SIZE = 50
+
+
+def _describe(result: Any) -> str:
+    if isinstance(result, BaseException):
+        if isinstance(result, httpx.HTTPStatusError):
+            return f"HTTP {result.response.status_code}"
+        return type(result).__name__
+    if isinstance(result, dict):
+        track = result.get("item") or {}
+        return track.get("name") or result.get("email") or json.dumps(result, ensure_ascii=False, sort_keys=True)
+    if isinstance(result, list):
+        return f"{len(result)} items"
+    return str(result)
+
+
+async def _call(coro) -> str:
+    try:
+        return _describe(await coro)
+    except Exception as e:
+        return _describe(e)
+
+
+async def run_checks(upstreams: ReplayUpstreams) -> Dict[str, str]:
+    from app.application.ai_client import AICapsuleClient
+    from app.infrastructure.external.google_client import GoogleAuthClient
+    from app.infrastructure.external.location_client import LocationAPIClient
+    from app.infrastructure.external.spotify_client import SpotifyAPIClient
+    from app.infrastructure.external.weather_client import WeatherAPIClient
+
+    spotify = SpotifyAPIClient()
+    results = {
+        "spotify.currently_playing": await _call(spotify.get_currently_playing("replay-token")),
+        "spotify.recently_played": await _call(spotify.get_recently_played("replay-token", limit=10)),
+        "spotify.artist_genres": await _call(spotify.get_artists_genres("replay-token", ["NewJeans"])),
+        "weather": await _call(WeatherAPIClient().get_weather_by_coordinates(37.5665, 126.978)),
+        "location": await _call(LocationAPIClient().get_place_name(37.5665, 126.978)),
+    }
+
+    # 같은 토큰으로 몰린 로그인 — single-flight로 Google 호출이 하나만 나가는지
+    google = GoogleAuthClient()
+    before = upstreams.calls.get("google", 0)
+    burst = await asyncio.gather(
+        *(_call(google.get_userinfo("replay-google-token")) for _ in range(BURST_SIZE))
+    )
+    await google.aclose()
+    results["google.userinfo"] = burst[0]
+    results["google.userinfo_burst_calls"] = str(upstreams.calls.get("google", 0) - before)
+
+    ai_client = AICapsuleClient()
+    upstreams.install_gemini(ai_client)
+    recorded_texts = {entry.get("text") for entry in upstreams.cassette.gemini}
+    summary = await ai_client.generate_daily_summary(["NewJeans - Ditto", "IU - 밤편지"], "Clear")
+    results["gemini.daily_summary"] = summary if summary in recorded_texts else "fallback"
+    return results
+
+
+async def check(names: List[str], speed: float) -> bool:
+    ok = True
+    for name in names:
+        upstreams = ReplayUpstreams.load(name, speed=speed)
+        upstreams.install()
+        started = time.perf_counter()
+        try:
+            results = await run_checks(upstreams)
+        finally:
+            upstreams.uninstall()
+        print(f"[{name}] {time.perf_counter() - started:.1f}s  upstream calls {dict(sorted(upstreams.calls.items()))}")
+        for probe, actual in results.items():
+            expected = upstreams.cassette.expect.get(probe)
+            passed = expected is None or expected == actual
+            ok &= passed
+            mark = "ok  " if passed else "FAIL"
+            print(f"  {mark} {probe:<30} {actual}" + ("" if passed else f"  (expected {expected})"))
+        if upstreams.unmatched:
+            print(f"  unmatched requests: {', '.join(sorted(set(upstreams.unmatched)))}")
+    return ok
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="녹화된 외부 API 응답으로 클라이언트 동작 검증")
+    parser.add_argument("fixtures", nargs="*", help="픽스처 이름 (기본값: benchmarks/fixtures의 전부)")
+    parser.add_argument("--speed", type=float, default=10.0, help="녹화된 지연을 이 배수만큼 빠르게 재생")
+    return parser
+
+
+if __name__ == "__main__":
+    cli_args = build_parser().parse_args()
+    fixture_names = cli_args.fixtures or sorted(path.stem for path in FIXTURES_DIR.glob("*.json"))
+    sys.exit(0 if asyncio.run(check(fixture_names, cli_args.speed)) else 1)
@@ -0,0 +1,154 @@
+"""
+다이어리 검색(/api/diaries/search) 벤치마크 — 유저 한 명의 기록 100만 건에서 검색어 종류별 지연을 측정합니다.
+
+    cd backend && python -W ignore -m benchmarks.search [기록 수] [반복 횟수]
+    # PostgreSQL (pg_trgm 필요): DATABASE_URL=postgresql+asyncpg://... python -W ignore -m benchmarks.search
+
+곡 제목/아티스트는 수천 종, 메모는 일부 기록에만 흔한 구문 + 드문 단어로 채우고,
+선택도가 다른 검색어(드문 단어 / 메모 구문 / 아티스트 / 거의 모든 기록에 있는 단어 / 짧은 단어)마다
+첫 페이지와 다음 페이지의 p50/p95와 truncated 여부를 출력한 뒤, 가장 흔한 검색어의 실행 계획을 보여 줍니다.
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+_db_path = os.path.join(tempfile.mkdtemp(), "search.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+
+import httpx
+from sqlalchemy import event, insert
+
+from app.main import app as api_app
+from app.core.timezones import DEFAULT_TIMEZONE, local_date
+from app.domain.search_text import build_search_document
+from app.infrastructure.db.database import engine, AsyncSessionLocal
+from app.infrastructure.db.migrate import create_schema
+from app.infrastructure.db.models import AuditoryDiaryORM, ContextORM, TrackORM
+from app.infrastructure.db.user_models import UserORM
+from app.presentation.routers.auth import create_access_token
+
+from benchmarks.seed import MEMO_PHRASES
+
+TRACKS = 20000
+ARTISTS = 2000
+CHUNK_SIZE = 20000
+MEMO_RATE = 0.2
+RARE_WORDS = ("등대", "오로라", "몽돌해변", "첫눈")
+RARE_RATE = 0.0005  # 메모 있는 기록 중 드문 단어가 들어가는 비율
+QUERIES = {
+    "rare word": "몽돌해변",
+    "memo phrase": "해운대 바닷가",
+    "memo word": "퇴근길",
+    "artist": "Artist 42",
+    "common word": "Track",
+    "short word": "비",
+}
+
+
+async def seed(diaries: int, rng: random.Random) -> uuid.UUID:
+    now = datetime.now(timezone.utc)
+    user_id = uuid.uuid4()
+    tracks = [
+        {"id": uuid.uuid4(), "title": f"Track {n}", "artist": f"Artist {n % ARTISTS}",
+         "external_platform_id": f"search-track-{n}", "platform_name": "spotify"}
+        for n in range(TRACKS)
+    ]
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(UserORM), [{
+            "id": user_id, "email": "search@bench.local", "name": "search", "google_id": "search-user",
+            "timezone": DEFAULT_TIMEZONE, "created_at": now,
+        }])
+        await session.execute(insert(TrackORM), tracks)
+        for start in range(0, diaries, CHUNK_SIZE):
+            context_rows, diary_rows = [], []
+            for n in range(start, min(start + CHUNK_SIZE, diaries)):
+                track = tracks[rng.randrange(TRACKS)]
+                memo = None
+                if rng.random() < MEMO_RATE:
+                    memo = f"{rng.choice(MEMO_PHRASES)} {rng.randrange(1000)}번째"
+                    if rng.random() < RARE_RATE:
+                        memo += f" {rng.choice(RARE_WORDS)}"
+                context_id = uuid.uuid4()
+                listened_at = now - timedelta(minutes=3 * n)
+                context_rows.append({
+                    "id": context_id, "latitude": None, "longitude": None,
+                    "place_name": "Spotify에서 재생", "weather": "", "timezone": DEFAULT_TIMEZONE,
+                })
+                diary_rows.append({
+                    "id": uuid.uuid4(), "user_id": user_id, "track_id": track["id"], "context_id": context_id,
+                    "listened_at": listened_at, "local_date": local_date(listened_at, DEFAULT_TIMEZONE),
+                    "memo": memo, "created_at": now,
+                    "search_document": build_search_document(memo, track["title"], track["artist"], None),
+                })
+            await session.execute(insert(ContextORM), context_rows)
+            await session.execute(insert(AuditoryDiaryORM), diary_rows)
+            await session.commit()
+    return user_id
+
+
+async def explain(statement: str, parameters) -> None:
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN ANALYZE "
+    async with engine.connect() as conn:
+        plan = await conn.exec_driver_sql(prefix + statement, parameters)
+        for row in plan.all():
+            print("   ", row[-1])
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+async def main(diaries: int, repeats: int) -> None:
+    await create_schema()
+    start = time.perf_counter()
+    user_id = await seed(diaries, random.Random(42))
+    print(f"seeded {diaries} diaries for one user on {engine.dialect.name} in {time.perf_counter() - start:.1f}s")
+    if engine.dialect.name == "postgresql":
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("ANALYZE")
+
+    captured = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "search_document" in statement and "row_number" in statement and not statement.startswith("EXPLAIN"):
+            captured.append((statement, parameters))
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)}, timedelta(minutes=30))}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api_app), base_url="http://bench") as client:
+        for label, query in QUERIES.items():
+            first, second, items, truncated = [], [], 0, False
+            for _ in range(repeats):
+                t = time.perf_counter()
+                response = await client.get("/api/diaries/search", headers=headers, params={"q": query, "limit": 20})
+                first.append(time.perf_counter() - t)
+                page = response.raise_for_status().json()
+                items, truncated = len(page["items"]), page["truncated"]
+                if page["next_cursor"]:
+                    t = time.perf_counter()
+                    await client.get("/api/diaries/search", headers=headers,
+                                     params={"q": query, "limit": 20, "cursor": page["next_cursor"]})
+                    second.append(time.perf_counter() - t)
+            line = f"{label:<12} {query!r:<18} p50 {percentile(first, 0.5):7.1f}ms  p95 {percentile(first, 0.95):7.1f}ms"
+            if second:
+                line += f"  next page p50 {percentile(second, 0.5):7.1f}ms"
+            print(f"{line}  hits {items}  truncated {truncated}")
+            if label == "common word":
+                common_statement = captured[-1]
+
+    print(f"plan ({QUERIES['common word']!r}):")
+    await explain(*common_statement)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    ))
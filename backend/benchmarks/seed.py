@@ -0,0 +1,120 @@
+"""
+벤치마크용 합성 데이터 시딩.
+
+ORM 객체를 하나씩 add 하지 않고 Core bulk insert(executemany)로 넣어
+1k 유저 × 100k 다이어리 규모도 수십 초 안에 준비합니다.
+"""
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from app.core.timezones import DEFAULT_TIMEZONE, get_zone, local_date
+from app.domain.search_text import build_search_document
+from app.infrastructure.db.models import AuditoryDiaryORM, ContextORM, TrackORM
+from app.infrastructure.db.user_models import UserORM
+from app.infrastructure.repositories.stats_repository import StatsRepository
+
+from benchmarks.fakes import WEATHERS
+
+LOCAL_TZ = get_zone(DEFAULT_TIMEZONE)  # 시드 유저는 모두 기본 시간대
+TRACK_COUNT = 5000
+ARTIST_COUNT = 300
+CHUNK_SIZE = 5000
+MEMO_RATE = 0.2  # 메모를 남긴 기록 비율 (검색 시나리오용)
+MEMO_PHRASES = (
+    "퇴근길 지하철에서", "비 오는 날 창가에서", "해운대 바닷가 산책하며", "새벽 코딩하면서",
+    "친구들이랑 드라이브", "카페에서 공부하다가", "운동하면서 신나게", "잠들기 전에 조용히",
+)
+
+
+@dataclass
+class SeededData:
+    user_ids: list[uuid.UUID]
+    days: int
+    first_day_local: datetime
+    diaries: int
+
+
+async def seed(session_factory, users: int, diaries: int, days: int, seed_value: int = 42) -> SeededData:
+    """
+    users명의 Spotify 연동 유저와, 최근 days일에 고르게 퍼진 diaries개의 청취 기록을 생성합니다.
+    트랙 ID는 가짜 Spotify가 돌려주는 곡과 같은 공간(bench-track-N)을 사용해 스크로블 시 재사용됩니다.
+    """
+    rng = random.Random(seed_value)
+    now = datetime.now(timezone.utc)
+    first_day_local = (now.astimezone(LOCAL_TZ) - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    user_rows = [
+        {
+            "id": uuid.uuid4(),
+            "email": f"bench{i}@bench.local",
+            "name": f"bench {i}",
+            "google_id": f"bench-google-{i}",
+            "spotify_access_token": f"bench-token-{i}",
+            "spotify_refresh_token": f"bench-refresh-{i}",
+            "spotify_token_expires_at": now + timedelta(days=1),
+            "timezone": DEFAULT_TIMEZONE,
+            "created_at": now,
+        }
+        for i in range(users)
+    ]
+    track_rows = [
+        {
+            "id": uuid.uuid4(),
+            "title": f"Track {n}",
+            "artist": f"Artist {n % ARTIST_COUNT}",
+            "album_artwork_url": f"https://i.scdn.co/image/bench{n % ARTIST_COUNT}",
+            "external_platform_id": f"bench-track-{n}",
+            "platform_name": "spotify",
+        }
+        for n in range(TRACK_COUNT)
+    ]
+
+    async with session_factory() as session:
+        await session.execute(insert(UserORM), user_rows)
+        await session.execute(insert(TrackORM), track_rows)
+        await session.commit()
+
+        span_seconds = days * 86400
+        for start in range(0, diaries, CHUNK_SIZE):
+            context_rows, diary_rows = [], []
+            for n in range(start, min(start + CHUNK_SIZE, diaries)):
+                context_id = uuid.uuid4()
+                context_rows.append({
+                    "id": context_id,
+                    "latitude": None,
+                    "longitude": None,
+                    "place_name": "Spotify에서 재생",
+                    "weather": rng.choice(WEATHERS),
+                    "timezone": DEFAULT_TIMEZONE,
+                })
+                listened_at = first_day_local + timedelta(seconds=rng.randrange(span_seconds))
+                track = track_rows[rng.randrange(TRACK_COUNT)]
+                memo = f"{rng.choice(MEMO_PHRASES)} {rng.randrange(1000)}번째" if rng.random() < MEMO_RATE else None
+                diary_rows.append({
+                    "id": uuid.uuid4(),
+                    "user_id": user_rows[n % users]["id"],
+                    "track_id": track["id"],
+                    "context_id": context_id,
+                    "listened_at": listened_at.astimezone(timezone.utc),
+                    "local_date": local_date(listened_at, DEFAULT_TIMEZONE),
+                    "memo": memo,
+                    "search_document": build_search_document(memo, track["title"], track["artist"], None),
+                    "created_at": now,
+                })
+            await session.execute(insert(ContextORM), context_rows)
+            await session.execute(insert(AuditoryDiaryORM), diary_rows)
+            await session.commit()
+
+        # Core INSERT는 청취 통계 롤업을 거치지 않으므로 시드 후 한 번에 계산
+        await StatsRepository(session).rebuild_listening_rollup([row["id"] for row in user_rows])
+
+    return SeededData(
+        user_ids=[row["id"] for row in user_rows],
+        days=days,
+        first_day_local=first_day_local,
+        diaries=diaries,
+    )
@@ -0,0 +1,138 @@
+"""
+콜드 스타트 벤치마크 — import 시간과 프로세스 기동부터 첫 /health 200까지의 시간.
+
+    cd backend && python -m benchmarks.startup
+    python -m benchmarks.startup --runs 5 --import-budget-ms 1000 --first-200-budget-ms 1500
+
+- import: `python -X importtime -c "import app.main"` 의 누적 시간 (가장 무거운 모듈 목록 포함)
+- first 200: render.yaml의 startCommand(스키마 확인 + gunicorn 워커 기동)를 그대로 실행한 직후부터
+  /health가 200을 돌려줄 때까지의 시간. 스키마가 최신인 DB 기준 (슬립 후 재기동)
+- first boot: 빈 DB에서 같은 명령을 처음 실행했을 때 (마이그레이션 포함, 참고값 — 예산 대상 아님)
+각 지표는 runs회 중 최솟값(노이즈가 가장 적은 값)을 사용하며, 예산을 넘으면 종료 코드 1로 끝납니다.
+"""
+import argparse
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RENDER_YAML = os.path.join(os.path.dirname(BACKEND_DIR), "render.yaml")
+
+# 회귀 예산 — google.generativeai 지연 import 이후 측정값(import ~0.75s)에 여유를 둔 값
+# (지연 import 이전: import ~1.45s, uvicorn 단독 first 200 ~1.9s)
+# first 200은 startCommand 기준 (gunicorn 워커 2개 + 스키마 확인, 1 CPU에서 ~1.5s — uvicorn 단독은 ~1.0s,
+# 예전 `migrate && gunicorn`은 ~2.1s)
+IMPORT_BUDGET_MS = 1000
+FIRST_200_BUDGET_MS = 2000
+
+
+def _env(database_url: str, **extra: str) -> dict:
+    return {**os.environ, "DATABASE_URL": database_url, "PYTHONWARNINGS": "ignore", **extra}
+
+
+def start_command() -> str:
+    """배포 설정(render.yaml)의 startCommand — 측정 대상이 실제 기동 경로와 어긋나지 않도록 파일에서 읽음"""
+    with open(RENDER_YAML, encoding="utf-8") as f:
+        match = re.search(r"^\s*startCommand:\s*(.+)$", f.read(), re.MULTILINE)
+    if match is None:
+        raise RuntimeError(f"startCommand not found in {RENDER_YAML}")
+    return match.group(1).strip()
+
+
+def measure_import(database_url: str) -> tuple[float, list[tuple[float, str]]]:
+    """(app.main 누적 import ms, 누적 시간 상위 모듈 목록)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=_env(database_url), capture_output=True, text=True, check=True,
+    )
+    modules: list[tuple[float, str]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # 헤더 줄
+        modules.append((int(cumulative) / 1000, name.rstrip()))
+
+    total = next(ms for ms, name in modules if name.strip() == "app.main")
+    # 들여쓰기가 얕은 최상위 import만 모아 무거운 순으로 정렬
+    top_level = [(ms, name.strip()) for ms, name in modules if len(name) - len(name.lstrip()) <= 4]
+    return total, sorted(top_level, reverse=True)[:10]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_200(database_url: str, command: str, timeout: float = 30.0) -> float:
+    """startCommand 실행 → /health 200 까지의 ms"""
+    port = _free_port()
+    start = time.perf_counter()
+    # 셸 명령(&&, $PORT)을 그대로 실행하고, gunicorn 마스터/워커를 함께 끝낼 수 있도록 새 세션으로 띄움
+    process = subprocess.Popen(
+        ["sh", "-c", command], cwd=BACKEND_DIR, env=_env(database_url, PORT=str(port)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - start < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"start command exited early with code {process.returncode}")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                        return (time.perf_counter() - start) * 1000
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        raise TimeoutError(f"/health did not return 200 within {timeout}s")
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--first-200-budget-ms", type=float, default=FIRST_200_BUDGET_MS)
+    args = parser.parse_args()
+
+    database_url = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}"
+    command = start_command()
+    # 첫 실행은 빈 DB라 마이그레이션까지 돌고, 이후 실행은 스키마가 최신인 DB에서 재기동하는 경로
+    first_boot_ms = measure_first_200(database_url, command)
+
+    import_runs = [measure_import(database_url) for _ in range(args.runs)]
+    import_ms, heaviest = min(import_runs, key=lambda run: run[0])
+    first_200_ms = min(measure_first_200(database_url, command) for _ in range(args.runs))
+
+    print("heaviest imports (cumulative ms):")
+    for ms, name in heaviest:
+        print(f"  {ms:8.1f}  {name}")
+    print(f"\nstartCommand: {command}")
+    print(f"import app.main      {import_ms:8.1f} ms  (budget {args.import_budget_ms:.0f})")
+    print(f"time to first 200    {first_200_ms:8.1f} ms  (budget {args.first_200_budget_ms:.0f})")
+    print(f"first boot (migrate) {first_boot_ms:8.1f} ms")
+
+    failed = []
+    if import_ms > args.import_budget_ms:
+        failed.append("import")
+    if first_200_ms > args.first_200_budget_ms:
+        failed.append("first 200")
+    if failed:
+        print(f"\nBUDGET EXCEEDED: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
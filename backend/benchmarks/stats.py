@@ -0,0 +1,109 @@
+"""
+청취 통계(/api/stats/me) 벤치마크 — 1년에 6만 건을 듣는 유저의 range별 콜드/캐시 지연을 측정합니다.
+
+    cd backend && python -W ignore -m benchmarks.stats [유저 수] [유저당 기록 수] [반복 횟수] [--gc-freeze]
+    # PostgreSQL: DATABASE_URL=postgresql+asyncpg://... python -W ignore -m benchmarks.stats
+
+콜드는 매 호출 전에 통계 캐시를 비워 DB 집계(시간 버킷/트랙/날씨)부터 다시 하고,
+Server-Timing 헤더의 DB 시간/쿼리 수를 함께 출력합니다. 캐시는 같은 range를 연달아 호출한 값입니다.
+--gc-freeze는 gunicorn 마스터(gunicorn.conf.py when_ready)처럼 시작 시점의 객체를 freeze한 콜드 호출과
+그렇지 않은 콜드 호출을 번갈아 측정해, 같은 DB/프로세스에서 GC 영향만 비교합니다.
+"""
+import asyncio
+import gc
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+_db_path = os.path.join(tempfile.mkdtemp(), "stats.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+os.environ.setdefault("DEBUG", "true")  # Server-Timing 헤더(DB 시간/쿼리 수)
+
+import httpx
+
+from app.main import app as api_app
+from app.application.stats_service import STATS_RANGES
+from app.infrastructure.db.database import engine, AsyncSessionLocal
+from app.infrastructure.db.migrate import create_schema
+from app.infrastructure.repositories.stats_repository import _stats_cache
+from app.presentation.routers.auth import create_access_token
+
+from benchmarks.seed import seed
+
+DAYS = 365
+_SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+async def main(users: int, per_user: int, repeats: int, compare_freeze: bool) -> None:
+    await create_schema()
+    start = time.perf_counter()
+    seeded = await seed(AsyncSessionLocal, users, users * per_user, DAYS)
+    print(f"seeded {users} users x {per_user} diaries over {DAYS} days on {engine.dialect.name} "
+          f"in {time.perf_counter() - start:.1f}s")
+    if engine.dialect.name == "postgresql":
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("ANALYZE")
+
+    token = create_access_token({"sub": str(seeded.user_ids[0])}, timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api_app), base_url="http://bench") as client:
+        for range_key in STATS_RANGES:
+            cold, cached, db_ms, queries = [], [], [], 0
+            for _ in range(repeats):
+                _stats_cache.clear()
+                t = time.perf_counter()
+                response = await client.get("/api/stats/me", headers=headers, params={"range": range_key})
+                cold.append(time.perf_counter() - t)
+                plays = response.raise_for_status().json()["total_plays"]
+                timing = _SERVER_TIMING.search(response.headers.get("server-timing", ""))
+                if timing:
+                    db_ms.append(float(timing.group(1)) / 1000)
+                    queries = int(timing.group(2))
+                t = time.perf_counter()
+                await client.get("/api/stats/me", headers=headers, params={"range": range_key})
+                cached.append(time.perf_counter() - t)
+            line = f"{range_key:<5} cold p50 {percentile(cold, 0.5):7.1f}ms  p95 {percentile(cold, 0.95):7.1f}ms"
+            if db_ms:
+                line += f"  (db p50 {percentile(db_ms, 0.5):6.1f}ms, {queries} queries)"
+            print(f"{line}  cached p50 {percentile(cached, 0.5):6.1f}ms  plays {plays}")
+        if compare_freeze:
+            await compare_gc_freeze(client, headers, repeats)
+    await engine.dispose()
+
+
+async def compare_gc_freeze(client: httpx.AsyncClient, headers: dict, repeats: int, range_key: str = "365d") -> None:
+    """콜드 호출을 gc.freeze 상태와 아닌 상태로 번갈아 측정 — 같은 DB/프로세스라 DB 변동과 분리된 GC 영향만 남음"""
+    gc.collect()
+    cold = {False: [], True: []}
+    for i in range(repeats * 2):
+        frozen = i % 2 == 0
+        if frozen:
+            gc.freeze()
+        else:
+            gc.unfreeze()
+        _stats_cache.clear()
+        t = time.perf_counter()
+        (await client.get("/api/stats/me", headers=headers, params={"range": range_key})).raise_for_status()
+        cold[frozen].append(time.perf_counter() - t)
+    gc.unfreeze()
+    for frozen, label in ((False, "off"), (True, "on")):
+        print(f"{range_key:<5} cold p50 {percentile(cold[frozen], 0.5):7.1f}ms  "
+              f"p95 {percentile(cold[frozen], 0.95):7.1f}ms  (gc.freeze {label})")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    asyncio.run(main(
+        int(args[0]) if len(args) > 0 else 10,
+        int(args[1]) if len(args) > 1 else 60_000,
+        int(args[2]) if len(args) > 2 else 10,
+        "--gc-freeze" in sys.argv,
+    ))
@@ -0,0 +1,449 @@
+"""
+오프라인 부하 테스트 스위트 — 가짜 외부 서비스 + 합성 데이터로 주요 사용자 시나리오를 측정합니다.
+
+    cd backend && python -W ignore -m benchmarks.suite
+    # 목표 규모 (1k 유저 × 100k 다이어리), 외부 API 지연/에러 주입
+    python -W ignore -m benchmarks.suite --users 1000 --diaries 100000 \\
+        --latency spotify=80,gemini=600,default=30 --jitter default=10 --error-rate spotify=0.01
+    # 커밋 간 비교
+    python -W ignore -m benchmarks.suite --out before.json
+    git checkout <다음 커밋> && python -W ignore -m benchmarks.suite --compare before.json
+    # 녹화된 429/401/지연 응답을 덧씌워 측정 (benchmarks/fixtures, benchmarks/replay.py)
+    python -W ignore -m benchmarks.suite --fixtures rate_limited,slow_upstreams
+
+시나리오
+- dashboard: 대시보드 진입 (/me/status → /me/recently-played 동기화 → /capsules/me → 이번 달 캘린더)
+- calendar:  캘린더 스크롤 (지난 달들로 이동하며 월 요약 + 날짜별 타임라인 조회)
+- capsule:   여러 유저가 동시에 지난 날짜의 AI 캡슐 생성
+- scrobble:  자동 스크로블러 1회 사이클 (전체 유저 최근 재생 동기화)
+- search:    다이어리 검색 (메모 구문/아티스트/짧은 단어 검색 + 다음 페이지)
+
+각 시나리오의 p50/p95/p99 지연, 처리량, 상태 코드 분포, RSS 메모리를 출력하고 JSON으로 저장합니다.
+앱은 httpx.ASGITransport로 인프로세스 호출하므로 startup 이벤트(스키마 생성, 워커 루프)는 실행되지 않습니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+SCENARIOS = ("dashboard", "calendar", "capsule", "scrobble", "search")
+
+
+# ──────────────────────────────────────────────
+# 측정 유틸
+# ──────────────────────────────────────────────
+def rss_mb() -> float:
+    """현재 프로세스 RSS (리눅스가 아니면 최대 RSS로 대체)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(p * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Recorder:
+    """시나리오 하나의 요청별 지연/상태를 모으고 요약 통계를 만듭니다."""
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.by_endpoint: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+        self.elapsed = 0.0
+        self.rss_before = 0.0
+        self.rss_after = 0.0
+        self.extra: dict = {}
+
+    def record(self, endpoint: str, latency: float, status: object) -> None:
+        self.latencies.append(latency)
+        self.by_endpoint.setdefault(endpoint, []).append(latency)
+        key = str(status)
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        if not isinstance(status, int) or status >= 500:
+            self.errors += 1
+
+    async def request(self, client, method: str, endpoint: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except Exception as e:
+            response, status = None, type(e).__name__
+        self.record(endpoint, time.perf_counter() - start, status)
+        return response
+
+    def summary(self) -> dict:
+        def stats(values: List[float]) -> dict:
+            ordered = sorted(values)
+            to_ms = lambda v: round(v * 1000, 2) if v is not None else None
+            return {
+                "count": len(ordered),
+                "p50_ms": to_ms(percentile(ordered, 0.50)),
+                "p95_ms": to_ms(percentile(ordered, 0.95)),
+                "p99_ms": to_ms(percentile(ordered, 0.99)),
+                "max_ms": to_ms(ordered[-1] if ordered else None),
+            }
+
+        return {
+            **stats(self.latencies),
+            "throughput_rps": round(len(self.latencies) / self.elapsed, 2) if self.elapsed else None,
+            "elapsed_s": round(self.elapsed, 3),
+            "errors": self.errors,
+            "statuses": self.statuses,
+            "rss_mb_before": round(self.rss_before, 1),
+            "rss_mb_after": round(self.rss_after, 1),
+            "endpoints": {name: stats(values) for name, values in sorted(self.by_endpoint.items())},
+            **self.extra,
+        }
+
+
+async def run_virtual_users(
+    recorder: Recorder, concurrency: int, iterations: int,
+    step: Callable[[int, int], Awaitable[None]],
+) -> None:
+    """concurrency개의 가상 유저가 각각 iterations번 step(vu, i)을 실행"""
+    async def virtual_user(vu: int) -> None:
+        for i in range(iterations):
+            await step(vu, i)
+
+    recorder.rss_before = rss_mb()
+    start = time.perf_counter()
+    await asyncio.gather(*(virtual_user(vu) for vu in range(concurrency)))
+    recorder.elapsed = time.perf_counter() - start
+    recorder.rss_after = rss_mb()
+
+
+# ──────────────────────────────────────────────
+# 시나리오
+# ──────────────────────────────────────────────
+async def scenario_dashboard(client, ctx, args) -> Recorder:
+    rec = Recorder("dashboard")
+    now_local = datetime.now(ctx.tz)
+
+    async def step(vu: int, i: int) -> None:
+        headers = ctx.headers(vu * args.iterations + i)
+        await rec.request(client, "GET", "/diaries/me/status", "/api/diaries/me/status", headers=headers)
+        await rec.request(client, "GET", "/diaries/me/recently-played", "/api/diaries/me/recently-played", headers=headers)
+        await rec.request(
+            client, "GET", "/capsules/me", "/api/capsules/me",
+            params={"date": (now_local - timedelta(days=1)).strftime("%Y-%m-%d")}, headers=headers,
+        )
+        await rec.request(
+            client, "GET", "/diaries/calendar/monthly", "/api/diaries/calendar/monthly",
+            params={"year": now_local.year, "month": now_local.month}, headers=headers,
+        )
+
+    await run_virtual_users(rec, args.concurrency, args.iterations, step)
+    return rec
+
+
+async def scenario_calendar(client, ctx, args) -> Recorder:
+    rec = Recorder("calendar")
+    rng = random.Random(args.seed)
+    months = max(1, args.days // 30 + 1)
+
+    async def step(vu: int, i: int) -> None:
+        headers = ctx.headers(vu * args.iterations + i)
+        # 이번 달부터 한 달씩 과거로 스크롤하며, 각 달의 임의 날짜 하나를 열어봄
+        cursor = datetime.now(ctx.tz).replace(day=1)
+        for _ in range(months):
+            await rec.request(
+                client, "GET", "/diaries/calendar/monthly", "/api/diaries/calendar/monthly",
+                params={"year": cursor.year, "month": cursor.month}, headers=headers,
+            )
+            day = cursor.replace(day=rng.randint(1, 28))
+            await rec.request(
+                client, "GET", "/diaries/history", "/api/diaries/history",
+                params={"date": day.strftime("%Y-%m-%d")}, headers=headers,
+            )
+            cursor = (cursor - timedelta(days=1)).replace(day=1)
+
+    await run_virtual_users(rec, args.concurrency, args.iterations, step)
+    return rec
+
+
+async def scenario_capsule(client, ctx, args) -> Recorder:
+    rec = Recorder("capsule")
+    # (유저, 날짜) 쌍이 겹치지 않도록 배정 — 같은 날짜 재생성은 409라 측정 대상이 아님
+    past_days = max(1, ctx.seeded.days - 1)
+
+    async def step(vu: int, i: int) -> None:
+        n = vu * args.iterations + i
+        user_index = n % len(ctx.seeded.user_ids)
+        day = ctx.seeded.first_day_local + timedelta(days=(n // len(ctx.seeded.user_ids)) % past_days)
+        await rec.request(
+            client, "POST", "/capsules/generate", "/api/capsules/generate",
+            json={"target_date": day.strftime("%Y-%m-%d")}, headers=ctx.headers(user_index),
+        )
+
+    await run_virtual_users(rec, args.concurrency, args.iterations, step)
+    return rec
+
+
+async def scenario_scrobble(client, ctx, args) -> Recorder:
+    from app.core.metrics import SCROBBLE_USERS
+    from app.infrastructure.worker.scrobble_worker import ScrobbleWorker
+
+    def outcomes() -> Dict[str, float]:
+        return {
+            sample.labels["outcome"]: sample.value
+            for metric in SCROBBLE_USERS.collect() for sample in metric.samples
+            if sample.name.endswith("_total")
+        }
+
+    rec = Recorder("scrobble")
+    worker = ScrobbleWorker()
+    before = outcomes()
+    rec.rss_before = rss_mb()
+    start = time.perf_counter()
+    for _ in range(args.scrobble_cycles):
+        cycle_start = time.perf_counter()
+        try:
+            await worker.run()
+            status: object = 200
+        except Exception as e:
+            status = type(e).__name__
+        rec.record("scrobble_cycle", time.perf_counter() - cycle_start, status)
+    rec.elapsed = time.perf_counter() - start
+    rec.rss_after = rss_mb()
+    # 워커는 유저별 실패를 삼키고 사이클을 끝내므로, 유저 단위 결과는 메트릭 카운터 증가분으로 기록
+    rec.extra["user_outcomes"] = {k: int(v - before.get(k, 0)) for k, v in outcomes().items()}
+    return rec
+
+
+async def scenario_search(client, ctx, args) -> Recorder:
+    from benchmarks.seed import ARTIST_COUNT, MEMO_PHRASES
+
+    rec = Recorder("search")
+    rng = random.Random(args.seed)
+
+    async def step(vu: int, i: int) -> None:
+        headers = ctx.headers(vu * args.iterations + i)
+        queries = (
+            rng.choice(MEMO_PHRASES).split()[0],          # 메모 단어
+            f"artist {rng.randrange(ARTIST_COUNT)}",        # 흔한 단어 + 짧은 단어
+            rng.choice(("비", "밤", "길")),                  # 트라이그램 미만 (최근 기록 스캔)
+        )
+        for query in queries:
+            response = await rec.request(
+                client, "GET", "/diaries/search", "/api/diaries/search",
+                params={"q": query, "limit": 20}, headers=headers,
+            )
+            cursor = response.json().get("next_cursor") if response is not None and response.status_code == 200 else None
+            if cursor:
+                await rec.request(
+                    client, "GET", "/diaries/search (next page)", "/api/diaries/search",
+                    params={"q": query, "limit": 20, "cursor": cursor}, headers=headers,
+                )
+
+    await run_virtual_users(rec, args.concurrency, args.iterations, step)
+    return rec
+
+
+SCENARIO_RUNNERS = {
+    "dashboard": scenario_dashboard,
+    "calendar": scenario_calendar,
+    "capsule": scenario_capsule,
+    "scrobble": scenario_scrobble,
+    "search": scenario_search,
+}
+
+
+class BenchContext:
+    def __init__(self, seeded, create_access_token, tz):
+        self.seeded = seeded
+        self.tz = tz
+        self._headers = [
+            {"Authorization": f"Bearer {create_access_token({'sub': str(uid)}, timedelta(hours=2))}"}
+            for uid in seeded.user_ids
+        ]
+
+    def headers(self, n: int) -> dict:
+        return self._headers[n % len(self._headers)]
+
+
+# ──────────────────────────────────────────────
+# 결과 저장/비교
+# ──────────────────────────────────────────────
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(results: dict) -> None:
+    print(f"\n{'scenario':<12}{'reqs':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>10}{'errors':>8}{'rss MB':>9}")
+    for name, s in results["scenarios"].items():
+        print(
+            f"{name:<12}{s['count']:>7}{s['p50_ms'] or 0:>10.1f}{s['p95_ms'] or 0:>10.1f}"
+            f"{s['p99_ms'] or 0:>10.1f}{s['throughput_rps'] or 0:>10.1f}{s['errors']:>8}{s['rss_mb_after']:>9.1f}"
+        )
+        if "user_outcomes" in s:
+            print(f"{'':<12}users per outcome: {s['user_outcomes']}")
+    print(f"upstream calls: {results['upstream_calls']}")
+
+
+def print_comparison(baseline: dict, current: dict) -> None:
+    print(f"\ncompared with {baseline['meta'].get('git_revision')} ({baseline['meta'].get('timestamp')})")
+    print(f"{'scenario':<12}{'metric':<16}{'before':>10}{'after':>10}{'change':>10}")
+    for name, after in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            b, a = before.get(metric), after.get(metric)
+            if not b or a is None:
+                continue
+            print(f"{name:<12}{metric:<16}{b:>10.1f}{a:>10.1f}{(a - b) / b * 100:>+9.1f}%")
+
+
+def parse_service_map(value: str) -> Dict[str, float]:
+    """'spotify=80,gemini=600,default=20' → {'spotify': 80.0, ...}"""
+    result: Dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in value.split(","))):
+        service, _, number = part.partition("=")
+        result[service.strip()] = float(number)
+    return result
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Auditory Diary offline load-test suite")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--diaries", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=90, help="다이어리를 퍼뜨릴 과거 일수")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시 가상 유저 수")
+    parser.add_argument("--iterations", type=int, default=10, help="가상 유저당 시나리오 반복 횟수")
+    parser.add_argument("--scrobble-cycles", type=int, default=2)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--latency", type=parse_service_map, default={}, help="서비스별 평균 지연(ms)")
+    parser.add_argument("--jitter", type=parse_service_map, default={}, help="서비스별 지연 편차(ms)")
+    parser.add_argument("--error-rate", type=parse_service_map, default={}, help="서비스별 에러율 (0~1)")
+    parser.add_argument("--fixtures", default="", help="가짜 서버 위에 덧씌울 녹화 픽스처 (쉼표 구분, 예: rate_limited,slow_upstreams)")
+    parser.add_argument("--database-url", default=None, help="기본값: 환경변수 DATABASE_URL, 없으면 임시 SQLite 파일")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본값: benchmarks/results/<시각>-<커밋>.json)")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    return parser
+
+
+async def main(args: argparse.Namespace) -> dict:
+    # 설정은 import 시점에 읽히므로 앱 모듈은 DATABASE_URL을 정한 뒤에 가져옴
+    import httpx
+
+    from app.main import app as api_app
+    from app.infrastructure.db.base import Base
+    from app.infrastructure.db.database import engine, AsyncSessionLocal
+    from app.infrastructure.db import models, user_models  # noqa: F401  (Base.metadata 등록)
+    from app.presentation.routers import capsule as capsule_router
+    from app.presentation.routers.auth import create_access_token
+
+    from benchmarks.fakes import FakeServiceConfig, FakeUpstreams
+    from benchmarks.replay import ReplayUpstreams
+    from benchmarks.seed import LOCAL_TZ, seed
+
+    services = set(args.latency) | set(args.jitter) | set(args.error_rate)
+    upstreams = FakeUpstreams(
+        configs={
+            service: FakeServiceConfig(
+                latency_ms=args.latency.get(service, args.latency.get("default", 0.0)),
+                jitter_ms=args.jitter.get(service, args.jitter.get("default", 0.0)),
+                error_rate=args.error_rate.get(service, args.error_rate.get("default", 0.0)),
+            )
+            for service in services | {"default"}
+        },
+        seed=args.seed,
+    )
+    fixtures = [name.strip() for name in args.fixtures.split(",") if name.strip()]
+    if fixtures:
+        # 픽스처에 녹화된 요청은 녹화대로, 나머지는 가짜 서버 규칙대로 응답
+        upstreams = ReplayUpstreams.load(*fixtures, fallback=upstreams)
+    upstreams.install()
+    upstreams.install_gemini(capsule_router.ai_client)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    seed_start = time.perf_counter()
+    seeded = await seed(AsyncSessionLocal, args.users, args.diaries, args.days, args.seed)
+    seed_seconds = time.perf_counter() - seed_start
+    print(f"seeded {args.users} users / {args.diaries} diaries over {args.days} days in {seed_seconds:.1f}s")
+
+    ctx = BenchContext(seeded, create_access_token, LOCAL_TZ)
+    results = {
+        "meta": {
+            "git_revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": engine.url.get_backend_name(),
+            "seed_seconds": round(seed_seconds, 2),
+            "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        },
+        "scenarios": {},
+        "upstream_calls": {},
+    }
+
+    transport = httpx.ASGITransport(app=api_app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name in filter(None, (s.strip() for s in args.scenarios.split(","))):
+                if name not in SCENARIO_RUNNERS:
+                    raise SystemExit(f"unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+                print(f"running {name}...")
+                recorder = await SCENARIO_RUNNERS[name](client, ctx, args)
+                results["scenarios"][name] = recorder.summary()
+    finally:
+        upstreams.uninstall()
+        await engine.dispose()
+
+    results["upstream_calls"] = dict(sorted(upstreams.calls.items()))
+    return results
+
+
+if __name__ == "__main__":
+    cli_args = build_parser().parse_args()
+    if cli_args.database_url:
+        os.environ["DATABASE_URL"] = cli_args.database_url
+    else:
+        os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    # 예산 초과 경고 등 요청마다 찍히는 로그가 측정값을 왜곡하지 않도록 조용히 실행
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    bench_results = asyncio.run(main(cli_args))
+    print_summary(bench_results)
+
+    out_path = cli_args.out or os.path.join(
+        os.path.dirname(__file__), "results",
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{bench_results['meta']['git_revision'] or 'local'}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(bench_results, f, ensure_ascii=False, indent=2)
+    print(f"results written to {out_path}")
+
+    if cli_args.compare:
+        with open(cli_args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), bench_results)
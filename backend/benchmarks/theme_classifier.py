@@ -0,0 +1,94 @@
+"""
+장르 → 테마 분류 마이크로벤치마크 (장르 태그 10만 개).
+
+    cd backend && python -m benchmarks.theme_classifier
+
+- 기존 방식: 장르 태그마다 테마별 키워드 목록을 any(k in g)로 부분 문자열 검사
+- 변경 방식: 장르별 테마 벡터 캐시 + 아티스트 벡터 재사용 (ThemeClassifier)
+"""
+import random
+import time
+from collections import Counter
+
+from app.domain.theme_classifier import ThemeClassifier
+
+TAGS = 100_000
+GENRES_PER_ARTIST = 5
+DAYS = 2_000
+ARTISTS_PER_DAY = 30
+
+_PREFIXES = ["", "k-", "korean ", "j-", "indie ", "dark ", "alt ", "uk ", "bedroom ", "neo ", "dream ", "modern ", "classic "]
+_BASES = [
+    "pop", "rap", "hip hop", "r&b", "soul", "jazz", "folk", "rock", "metal", "house", "techno", "ambient",
+    "lo-fi", "ballad", "trot", "emo", "punk", "shoegaze", "piano", "ost", "singer-songwriter", "blues",
+    "edm", "drill", "garage", "city pop", "bossa nova", "classical", "acoustic", "idol", "dance", "chill",
+]
+_SUFFIXES = ["", " pop", " rock", " rap", " fusion", " revival"]
+
+
+def legacy_classify(genres_map: dict) -> str:
+    """변경 전 generate_daily_capsule의 테마 매핑 (비교 기준)"""
+    theme_scores = {"y2k": 0, "midnight": 0, "editorial": 0, "aura": 0}
+    y2k_keywords = ["hip hop", "rap", "dance", "techno", "electronic", "house", "idol", "pop"]
+    midnight_keywords = ["r&b", "soul", "jazz", "indie", "ambient", "lo-fi", "chill", "blues"]
+    editorial_keywords = ["acoustic", "folk", "classical", "piano", "ost", "singer-songwriter"]
+    for artist, genres in genres_map.items():
+        for genre in genres:
+            g = genre.lower()
+            if any(k in g for k in y2k_keywords): theme_scores["y2k"] += 1
+            if any(k in g for k in midnight_keywords): theme_scores["midnight"] += 1
+            if any(k in g for k in editorial_keywords): theme_scores["editorial"] += 1
+    determined_theme = "aura"
+    max_score = 0
+    for t_name, score in theme_scores.items():
+        if score > max_score:
+            max_score = score
+            determined_theme = t_name
+    return determined_theme
+
+
+def _report(label: str, elapsed: float, units: int, unit: str) -> None:
+    print(f"{label:<48} {elapsed * 1000:9.1f} ms  ({elapsed / units * 1e6:7.2f} us/{unit})")
+
+
+def main() -> None:
+    rng = random.Random(42)
+    vocabulary = [f"{p}{b}{s}".strip() for p in _PREFIXES for b in _BASES for s in _SUFFIXES]
+    artists = [f"Artist {i}" for i in range(TAGS // GENRES_PER_ARTIST)]
+    genres_map = {artist: rng.sample(vocabulary, GENRES_PER_ARTIST) for artist in artists}
+    days = [Counter({rng.choice(artists): rng.randint(1, 20) for _ in range(ARTISTS_PER_DAY)}) for _ in range(DAYS)]
+    print(f"{TAGS} genre tags, {len(vocabulary)} distinct genres, {len(artists)} artists, {DAYS} days")
+
+    # 1. 장르 태그 10만 개 한 번에 분류
+    start = time.perf_counter()
+    legacy_classify(genres_map)
+    _report("legacy any(k in g) loop", time.perf_counter() - start, TAGS, "tag")
+
+    classifier = ThemeClassifier()
+    start = time.perf_counter()
+    classifier.classify(genres_map)
+    _report("ThemeClassifier.classify (cold vocabulary)", time.perf_counter() - start, TAGS, "tag")
+
+    start = time.perf_counter()
+    classifier.classify(genres_map)
+    _report("ThemeClassifier.classify (warm vocabulary)", time.perf_counter() - start, TAGS, "tag")
+
+    # 2. 여러 날 배치 분류 (백필/연말 결산) — 날마다 그날 들은 아티스트의 장르만 사용
+    start = time.perf_counter()
+    for plays in days:
+        legacy_classify({artist: genres_map[artist] for artist in plays})
+    _report("legacy per-day loop", time.perf_counter() - start, DAYS, "day")
+
+    start = time.perf_counter()
+    for plays in days:
+        classifier.classify({artist: genres_map[artist] for artist in plays}, plays)
+    _report("ThemeClassifier.classify per day (play-weighted)", time.perf_counter() - start, DAYS, "day")
+
+    start = time.perf_counter()
+    themes = ThemeClassifier().classify_days(genres_map, days)
+    _report("ThemeClassifier.classify_days (cold, batch)", time.perf_counter() - start, DAYS, "day")
+    print(f"theme distribution: {dict(Counter(themes))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+트랙 카탈로그 캐시 벤치마크 — 항목 10만 건당 메모리와, 동기화 쓰기 경로의 적중률/tracks 조회 수를 측정합니다.
+
+    cd backend && python -W ignore -m benchmarks.track_catalog [트랙 수] [쓰기 수]
+
+1) 메모리: 같은 10만 건을 단순 dict[str, UUID]와 TrackIdCache에 넣어 tracemalloc으로 비교
+2) 쓰기 경로: 여러 유저의 최근 재생 동기화(get_or_create_by_listened_at)를 인기 곡에 치우친(Zipf) 분포로 재현하고,
+   캐시 없음(매번 clear) / 빈 캐시로 시작 / 시작 시 최근 재생된 트랙으로 미리 채움 세 가지를 비교
+"""
+import asyncio
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+
+_db_path = os.path.join(tempfile.mkdtemp(), "track_catalog.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+
+from sqlalchemy import event, insert
+
+from app.core.timezones import DEFAULT_TIMEZONE
+from app.domain.models import AuditoryDiary as DomainDiary, Context as DomainContext, Track as DomainTrack
+from app.infrastructure.db.base import Base
+from app.infrastructure.db.database import engine, AsyncSessionLocal
+from app.infrastructure.db.models import TrackORM
+from app.infrastructure.db.user_models import UserORM
+from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
+from app.infrastructure.repositories.track_catalog import TrackIdCache, track_id_cache, warm_track_catalog
+from app.infrastructure.db import models  # noqa: F401  (Base.metadata 등록)
+
+USERS = 200
+ZIPF_S = 1.1  # 재생 분포의 치우침 (클수록 인기 곡 쏠림)
+WARM_SIZE = 5000
+
+
+def spotify_id(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_letters + string.digits, k=22))
+
+
+def measure_memory(entries: int) -> None:
+    rng = random.Random(1)
+    pairs = [(spotify_id(rng), uuid.uuid4()) for _ in range(entries)]
+    # 키 문자열은 양쪽이 같이 쓰므로 컨테이너 + 값만 비교하되, 실제 운영처럼 DB 행에서 온 새 문자열로 넣음
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    plain = {"".join(ext_id): uuid.UUID(bytes=track_id.bytes) for ext_id, track_id in pairs}
+    plain_bytes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, "filename"))
+    del plain
+
+    before = tracemalloc.take_snapshot()
+    # 세대 하나가 maxsize의 절반이므로 전부 남도록 두 배로
+    cache = TrackIdCache(maxsize=entries * 2 + 2)
+    cache.update(("".join(ext_id), track_id) for ext_id, track_id in pairs)
+    cache_bytes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, "filename"))
+    tracemalloc.stop()
+    assert len(cache) == entries
+    scale = 100_000 / entries
+    print(f"memory per 100k entries: dict[str, UUID] {plain_bytes * scale / 2**20:.1f} MB, "
+          f"TrackIdCache {cache_bytes * scale / 2**20:.1f} MB")
+
+
+async def seed(tracks: int, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    users = [
+        {"id": uuid.uuid4(), "email": f"cat{i}@bench.local", "name": f"cat {i}",
+         "google_id": f"cat-{i}", "timezone": DEFAULT_TIMEZONE, "created_at": now}
+        for i in range(USERS)
+    ]
+    catalog = [
+        DomainTrack(title=f"Track {n}", artist=f"Artist {n % 997}", external_platform_id=spotify_id(rng))
+        for n in range(tracks)
+    ]
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(UserORM), users)
+        # 절반은 이미 누군가 기록한 트랙 (나머지는 동기화 중 처음 등장)
+        await session.execute(insert(TrackORM), [
+            {"id": uuid.uuid4(), "title": t.title, "artist": t.artist,
+             "external_platform_id": t.external_platform_id, "platform_name": "spotify"}
+            for t in catalog[: tracks // 2]
+        ])
+        await session.commit()
+    return [user["id"] for user in users], catalog
+
+
+async def sync_writes(label: str, user_ids, catalog, writes: int, rng: random.Random, clear_each: bool) -> None:
+    weights = [1 / (rank + 1) ** ZIPF_S for rank in range(len(catalog))]
+    picks = rng.choices(catalog, weights=weights, k=writes)
+    track_selects = 0
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        nonlocal track_selects
+        if statement.lstrip().upper().startswith("SELECT") and "FROM tracks" in statement:
+            track_selects += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    track_id_cache.hits = track_id_cache.misses = 0
+    base = datetime.now(timezone.utc) - timedelta(days=rng.randint(10, 1000))
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        for n, track in enumerate(picks):
+            if clear_each:
+                track_id_cache.clear()
+            # 동기화 요청마다 새 리포지토리 (요청 세션 단위 캐시는 다음 요청에 남지 않음)
+            repo = AuditoryDiaryRepository(session)
+            await repo.get_or_create_by_listened_at(DomainDiary(
+                user_id=user_ids[n % len(user_ids)], track=track,
+                context=DomainContext(place_name="Spotify에서 재생", weather="", timezone=DEFAULT_TIMEZONE),
+                listened_at=base + timedelta(seconds=n),
+            ))
+    elapsed = time.perf_counter() - start
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+    print(f"{label:<28} hit rate {track_id_cache.hit_rate * 100:5.1f}%  "
+          f"tracks SELECTs {track_selects:6d} ({track_selects / writes:.2f}/write)  "
+          f"{writes / elapsed:7.0f} writes/s")
+
+
+async def main(tracks: int, writes: int) -> None:
+    measure_memory(100_000)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    rng = random.Random(42)
+    user_ids, catalog = await seed(tracks, rng)
+
+    track_id_cache.clear()
+    await sync_writes("no cache", user_ids, catalog, writes, random.Random(1), clear_each=True)
+    track_id_cache.clear()
+    await sync_writes("cold cache", user_ids, catalog, writes, random.Random(2), clear_each=False)
+    track_id_cache.clear()
+    warmed = await warm_track_catalog(WARM_SIZE)
+    await sync_writes(f"warmed ({warmed} tracks)", user_ids, catalog, writes, random.Random(3), clear_each=False)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20_000,
+    ))
@@ -0,0 +1,27 @@
+"""
+gunicorn 설정 — render.yaml startCommand에서 `-c gunicorn.conf.py`로 사용
+(워커 수/바인드 주소는 startCommand 인자로 지정)
+"""
+import asyncio
+import gc
+
+# 앱을 마스터에서 한 번 import하고 워커는 fork로 물려받음 (when_ready의 gc.freeze 대상이 되도록)
+preload_app = True
+
+
+def on_starting(server):
+    # 워커를 띄우기 전 마스터에서 한 번 — schema_version 1행만 비교하고, 모델이 바뀐 배포 직후에만 전체 마이그레이션
+    # Why: free 플랜은 preDeployCommand를 실행하지 않아 기동 경로에서 확인해야 하지만, 슬립 후 재기동마다
+    #      create_schema 전체를 돌리면 콜드 스타트에 ~1s가 더해짐. 마스터가 import한 모듈은 워커가 fork로 물려받음
+    from app.infrastructure.db.migrate import ensure_schema
+
+    if asyncio.run(ensure_schema()):
+        server.log.info("Schema migrated (schema_version fingerprint changed)")
+
+
+def when_ready(server):
+    # 워커를 fork하기 직전 — 마스터가 import한 모듈/라우트/ORM 매퍼만 GC 추적 대상에서 뺌
+    # Why: 집계 요청(/stats/me 등)이 만든 수천 행이 gen2 GC를 일으키면 이 객체들까지 훑어 요청당 ~45ms가 더해짐.
+    #      워커가 기동 후 만드는 객체(lifespan의 브로커, 감독 태스크, 캐시)는 그대로 추적됨
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,109 @@
+"""
+테스트 공용 픽스처 — 임시 SQLite DB와 가짜 외부 서비스(benchmarks/fakes.py) 위에서 앱을 TestClient로 호출합니다.
+
+    cd backend && pip install pytest && python -m pytest -q
+"""
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import date, timedelta
+
+# 설정은 import 시점에 읽히므로 앱 모듈보다 먼저 테스트용 환경을 정함
+_db_dir = tempfile.mkdtemp(prefix="auditory-diary-test-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["NOW_PLAYING_BROKER"] = "memory"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.core import query_counter
+from app.core.timezones import local_date
+from app.infrastructure.db.database import AsyncSessionLocal, engine
+from app.infrastructure.db.migrate import create_schema
+from app.infrastructure.db.models import AuditoryDiaryORM, DailyCapsuleORM
+from app.presentation.routers.auth import create_access_token
+
+from benchmarks.fakes import FakeUpstreams
+from benchmarks.seed import LOCAL_TZ, seed
+
+SEED_USERS = 3
+SEED_DIARIES = 600
+SEED_DAYS = 30
+
+
+class SeededUser:
+    def __init__(self, user_id: uuid.UUID, diary_id: uuid.UUID, capsule_date: date):
+        self.id = user_id
+        self.diary_id = diary_id
+        self.capsule_date = capsule_date
+        self.headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)}, timedelta(hours=1))}"}
+
+
+async def _prepare() -> SeededUser:
+    await create_schema()
+    seeded = await seed(AsyncSessionLocal, SEED_USERS, SEED_DIARIES, SEED_DAYS)
+    user_id = seeded.user_ids[0]
+    async with AsyncSessionLocal() as session:
+        diary = (await session.execute(
+            select(AuditoryDiaryORM).where(AuditoryDiaryORM.user_id == user_id)
+            .order_by(AuditoryDiaryORM.listened_at.desc()).limit(1)
+        )).scalar_one()
+        capsule_date = local_date(diary.listened_at, "Asia/Seoul")
+        session.add(DailyCapsuleORM(user_id=user_id, target_date=capsule_date, ai_summary="테스트 캡슐"))
+        await session.commit()
+        diary_id = diary.id
+    # Why: TestClient는 자체 이벤트 루프에서 요청을 처리하므로 시딩 루프에서 만든 커넥션을 남기지 않음
+    await engine.dispose()
+    return SeededUser(user_id, diary_id, capsule_date)
+
+
+@pytest.fixture(scope="session")
+def seeded_user() -> SeededUser:
+    """Spotify 연동 유저 여럿과 최근 SEED_DAYS일의 기록, 첫 유저의 최근 날짜 Daily Capsule 하나"""
+    return asyncio.run(_prepare())
+
+
+@pytest.fixture(scope="session")
+def upstreams():
+    fake = FakeUpstreams()
+    fake.install()
+    yield fake
+    fake.uninstall()
+
+
+@pytest.fixture(scope="session")
+def client(seeded_user, upstreams) -> TestClient:
+    # with 블록 없이 사용 — lifespan(스크로블러 등 백그라운드 루프)은 띄우지 않음
+    from app.main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def query_budget(monkeypatch):
+    """
+    요청마다 QueryCountMiddleware가 track_queries와 같은 방식으로 집계한 SQL 실행 수를 라우트별로 모읍니다.
+    엄격 모드를 켜므로 ENDPOINT_QUERY_BUDGETS를 넘긴 요청은 QueryBudgetExceeded로 실패합니다.
+
+        client.get(...)
+        assert query_budget["GET /diaries/history"] <= 3
+    """
+    counts: dict[str, int] = {}
+    check_budget = query_counter._check_budget
+
+    def record(stats, budget):
+        counts[stats.label] = stats.count
+        check_budget(stats, budget)
+
+    monkeypatch.setattr(query_counter.settings, "DB_QUERY_BUDGET_STRICT", True)
+    monkeypatch.setattr(query_counter, "_check_budget", record)
+    return counts
+
+
+@pytest.fixture
+def local_today() -> date:
+    from datetime import datetime, timezone
+    return datetime.now(timezone.utc).astimezone(LOCAL_TZ).date()
@@ -0,0 +1,17 @@
+"""주간/월간 캡슐 — 형식은 맞지만 존재하지 않는 날짜는 500이 아니라 400"""
+
+
+def test_period_capsule_lookup_rejects_nonexistent_date(client, seeded_user):
+    response = client.get("/api/capsules/period?period=month&date=2026-02-30", headers=seeded_user.headers)
+
+    assert response.status_code == 400
+
+
+def test_period_capsule_generation_rejects_nonexistent_date(client, seeded_user):
+    response = client.post(
+        "/api/capsules/generate-period",
+        json={"period": "week", "target_date": "2026-13-01"},
+        headers=seeded_user.headers,
+    )
+
+    assert response.status_code == 400
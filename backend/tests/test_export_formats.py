@@ -0,0 +1,32 @@
+"""내보내기 포맷 — parquet은 pyarrow가 설치된 서버에서만 받고 OpenAPI에도 그때만 노출"""
+import importlib.util
+
+from app.application import diary_export
+from app.application.diary_export import available_export_formats
+from app.main import app
+
+
+def test_parquet_is_not_offered_without_pyarrow(monkeypatch):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        diary_export.importlib.util, "find_spec", lambda name, *args: None if name == "pyarrow" else find_spec(name, *args)
+    )
+
+    assert available_export_formats() == ("jsonl", "csv")
+
+
+def test_openapi_enum_matches_available_formats():
+    parameters = app.openapi()["paths"]["/api/diaries/export"]["get"]["parameters"]
+    schema = next(p["schema"] for p in parameters if p["name"] == "format")
+
+    assert schema["enum"] == list(available_export_formats())
+
+
+def test_parquet_request_matches_what_is_advertised(client, seeded_user):
+    response = client.get("/api/diaries/export", params={"format": "parquet"}, headers=seeded_user.headers)
+
+    if "parquet" in available_export_formats():
+        assert response.status_code == 200
+        assert response.content[:4] == b"PAR1"
+    else:
+        assert response.status_code == 422
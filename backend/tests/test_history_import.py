@@ -0,0 +1,38 @@
+"""스트리밍 기록 가져오기 시작 — 같은 파일이 동시에 올라와도 작업 하나, 실행도 한 번"""
+import asyncio
+import uuid
+
+from sqlalchemy import insert, update
+
+from app.application.history_import import HistoryImportService
+from app.infrastructure.db.database import AsyncSessionLocal, engine
+from app.infrastructure.db.models import HistoryImportORM
+from app.infrastructure.db.user_models import UserORM
+
+
+async def _concurrent_starts():
+    user_id = uuid.uuid4()
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(UserORM), [{
+            "id": user_id, "email": f"{user_id.hex}@import.test", "name": "import", "google_id": user_id.hex,
+        }])
+        await session.commit()
+
+    service = HistoryImportService()
+    first = await asyncio.gather(*(service.start(user_id, "same-file", "history.zip") for _ in range(3)))
+
+    # 실패한 작업을 같은 파일로 동시에 다시 올리면 그중 하나만 재실행
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(HistoryImportORM).where(HistoryImportORM.user_id == user_id).values(status="failed"))
+        await session.commit()
+    retried = await asyncio.gather(*(service.start(user_id, "same-file", "history.zip") for _ in range(3)))
+    await engine.dispose()
+    return first, retried
+
+
+def test_concurrent_uploads_of_the_same_file_start_one_job(seeded_user):
+    first, retried = asyncio.run(_concurrent_starts())
+
+    assert len({job.id for job, _ in first + retried}) == 1
+    assert sorted(should_run for _, should_run in first) == [False, False, True]
+    assert sorted(should_run for _, should_run in retried) == [False, False, True]
@@ -0,0 +1,110 @@
+"""Idempotency-Key — 재시도는 저장된 응답을, 같은 키의 동시 요청은 한 번만 실행, 실패한 요청은 키를 돌려줌"""
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import insert
+
+from app.application.idempotency import IdempotencyError, StoredResponse, run_idempotent
+from app.infrastructure.db.database import AsyncSessionLocal, engine
+from app.infrastructure.db.user_models import UserORM
+from app.infrastructure.repositories.idempotency_repository import IdempotencyRepository
+
+
+class Operation:
+    """호출 횟수를 세는 operation — 호출마다 다른 본문을 돌려주어 재사용 여부를 구분"""
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self) -> StoredResponse:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return StoredResponse(201, {"call": self.calls})
+
+
+async def _new_user() -> uuid.UUID:
+    user_id = uuid.uuid4()
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(UserORM), [{
+            "id": user_id, "email": f"{user_id.hex}@idempotency.test", "name": "idempotency", "google_id": user_id.hex,
+        }])
+        await session.commit()
+    return user_id
+
+
+async def _run(user_id, key, fingerprint, operation):
+    # 요청마다 세션이 따로 열리는 것과 같게
+    async with AsyncSessionLocal() as session:
+        return await run_idempotent(session, user_id, key, fingerprint, operation)
+
+
+def test_replay_returns_stored_response_without_running_operation(seeded_user):
+    async def scenario():
+        user_id = await _new_user()
+        operation = Operation()
+        first = await _run(user_id, "key-1", "fp", operation)
+        replay = await _run(user_id, "key-1", "fp", operation)
+        await engine.dispose()
+        return first, replay, operation.calls
+
+    (first, first_replayed), (replay, replayed), calls = asyncio.run(scenario())
+
+    assert calls == 1
+    assert (first_replayed, replayed) == (False, True)
+    assert (replay.status_code, replay.body) == (201, {"call": 1}) == (first.status_code, first.body)
+
+
+def test_same_key_with_different_request_is_rejected(seeded_user):
+    async def scenario():
+        user_id = await _new_user()
+        operation = Operation()
+        await _run(user_id, "key-1", "fp-a", operation)
+        try:
+            with pytest.raises(IdempotencyError) as exc:
+                await _run(user_id, "key-1", "fp-b", operation)
+        finally:
+            await engine.dispose()
+        return exc.value, operation.calls
+
+    error, calls = asyncio.run(scenario())
+
+    assert error.status_code == 422
+    assert calls == 1
+
+
+def test_concurrent_requests_with_same_key_run_operation_once(seeded_user):
+    async def scenario():
+        user_id = await _new_user()
+        operation = Operation(delay=0.2)
+        results = await asyncio.gather(*(_run(user_id, "key-1", "fp", operation) for _ in range(3)))
+        await engine.dispose()
+        return results, operation.calls
+
+    results, calls = asyncio.run(scenario())
+
+    assert calls == 1
+    assert sorted(replayed for _, replayed in results) == [False, True, True]
+    assert all(response.body == {"call": 1} for response, _ in results)
+
+
+def test_failed_operation_releases_the_key(seeded_user):
+    async def scenario():
+        user_id = await _new_user()
+        with pytest.raises(RuntimeError):
+            await _run(user_id, "key-1", "fp", Operation(fail=True))
+        async with AsyncSessionLocal() as session:
+            released = await IdempotencyRepository(session).get(user_id, "key-1") is None
+        retry = Operation()
+        response, replayed = await _run(user_id, "key-1", "fp", retry)
+        await engine.dispose()
+        return released, retry.calls, replayed, response
+
+    released, calls, replayed, response = asyncio.run(scenario())
+
+    assert released
+    assert (calls, replayed) == (1, False)
+    assert response.body == {"call": 1}
@@ -0,0 +1,29 @@
+"""이미지 프록시 썸네일 — 리사이즈할 수 없는 원본은 500이 아니라 413(너무 큼)/502(디코딩 불가)로"""
+import benchmarks.fakes as fakes
+from app.infrastructure.external.image_client import ImageProxyClient
+
+PROXY = "/api/capsules/image-proxy"
+
+
+def test_thumbnail_is_resized(client):
+    response = client.get(PROXY, params={"url": "https://i.scdn.co/image/proxy-ok", "w": 64})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+
+
+def test_oversized_source_is_413(client, monkeypatch):
+    monkeypatch.setattr(ImageProxyClient, "MAX_SOURCE_BYTES", 1024)
+
+    response = client.get(PROXY, params={"url": "https://i.scdn.co/image/proxy-too-large", "w": 64})
+
+    assert response.status_code == 413
+
+
+def test_undecodable_source_is_502(client, monkeypatch):
+    monkeypatch.setattr(fakes, "_fake_jpeg", lambda: b"<html>not an image</html>")
+
+    response = client.get(PROXY, params={"url": "https://i.scdn.co/image/proxy-not-image", "w": 64})
+
+    assert response.status_code == 502
+    assert "not an image" not in response.text
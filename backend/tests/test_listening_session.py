@@ -0,0 +1,86 @@
+"""청취 세션 병합 — 같은 재생의 반복 관찰은 하나로, 곡이 끝난 뒤 다시 들으면 새 기록"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.application.diary_service import DiaryService
+from app.application.listening_session import ListeningSessionTracker
+from app.core.config import settings
+
+DURATION_MS = 180_000
+STARTED_AT = datetime(2026, 1, 1, 9, 0, tzinfo=timezone.utc)
+TOLERANCE = timedelta(seconds=settings.LISTENING_SESSION_TOLERANCE_SECONDS)
+
+
+async def _open_and_match(observations):
+    tracker = ListeningSessionTracker(maxsize=10)
+    user_id = uuid.uuid4()
+    session = tracker.open(user_id, "track-a", STARTED_AT, DURATION_MS)
+    return [tracker.match(user_id, track_id, started_at) is session for track_id, started_at in observations]
+
+
+def test_seek_or_pause_inside_the_window_is_the_same_playback():
+    assert asyncio.run(_open_and_match([
+        ("track-a", STARTED_AT),                          # 같은 재생을 다시 관찰
+        ("track-a", STARTED_AT - timedelta(seconds=90)),  # 앞으로 건너뛰기 → 시작 시각이 앞당겨짐
+        ("track-a", STARTED_AT + timedelta(seconds=60)),  # 일시정지 후 재개 → 시작 시각이 밀림
+    ])) == [True, True, True]
+
+
+def test_replay_after_the_track_ends_is_a_new_playback():
+    end = STARTED_AT + timedelta(milliseconds=DURATION_MS)
+    assert asyncio.run(_open_and_match([
+        ("track-a", end - TOLERANCE - timedelta(seconds=1)),  # 허용 오차 직전까지는 같은 재생
+        ("track-a", end - TOLERANCE),                         # 곡 길이 - 허용 오차부터는 다음 회차
+        ("track-a", end + timedelta(seconds=5)),
+        ("track-b", STARTED_AT),                              # 다른 곡
+    ])) == [True, False, False, False]
+
+
+class _Spotify:
+    """재생 중인 곡 하나를 계속 돌려주는 Spotify"""
+    async def get_currently_playing(self, access_token):
+        elapsed = datetime.now(timezone.utc) - STARTED_AT
+        return {
+            "progress_ms": int(elapsed.total_seconds() * 1000) % DURATION_MS,
+            "item": {"id": "track-a", "name": "Song", "duration_ms": DURATION_MS, "artists": [{"name": "Artist"}]},
+        }
+
+
+class _FlakyRepository:
+    """첫 저장은 실패하고 이후 저장은 성공 — 저장 전에 들어온 같은 재생 요청이 실패를 기다리도록 잠시 멈춤"""
+    def __init__(self):
+        self.saved = []
+        self.calls = 0
+
+    async def save(self, diary):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.calls == 1:
+            raise RuntimeError("db down")
+        self.saved.append(diary)
+        return diary
+
+
+async def _failed_save_then_retry():
+    tracker = ListeningSessionTracker(maxsize=10)
+    repo = _FlakyRepository()
+    service = DiaryService(repo, _Spotify(), None, None, sessions=tracker)
+    user_id = uuid.uuid4()
+    # 첫 요청이 저장하는 동안 같은 재생의 두 번째 요청이 들어옴
+    first, second = await asyncio.gather(
+        service.create_diary_from_current_context(user_id, "token"),
+        service.create_diary_from_current_context(user_id, "token"),
+        return_exceptions=True,
+    )
+    third = await service.create_diary_from_current_context(user_id, "token")
+    return first, second, third, repo
+
+
+def test_failed_save_discards_the_session():
+    first, second, third, repo = asyncio.run(_failed_save_then_retry())
+
+    assert isinstance(first, RuntimeError)
+    # 기다리던 요청은 실패한 세션에 묶이지 않고 새로 기록, 이후 관찰은 그 기록에 합쳐짐
+    assert repo.saved == [second]
+    assert third.id == second.id
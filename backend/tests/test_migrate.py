@@ -0,0 +1,12 @@
+"""기동 경로의 스키마 확인(ensure_schema) — 지문이 같으면 건너뛰고, 모델/리비전이 바뀌면 마이그레이션"""
+import asyncio
+
+from app.infrastructure.db import migrate
+
+
+def test_start_guard_runs_migration_only_when_fingerprint_changes(seeded_user, monkeypatch):
+    assert asyncio.run(migrate.ensure_schema()) is False
+
+    monkeypatch.setattr(migrate, "SCHEMA_REVISION", migrate.SCHEMA_REVISION + 1)
+    assert asyncio.run(migrate.ensure_schema()) is True
+    assert asyncio.run(migrate.ensure_schema()) is False
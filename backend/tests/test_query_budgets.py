@@ -0,0 +1,40 @@
+"""
+엔드포인트별 SQL 쿼리 예산 (app/core/query_counter.py의 ENDPOINT_QUERY_BUDGETS).
+N+1이 다시 들어오면 QueryBudgetExceeded로 실패합니다. 예산을 추가하면 여기에도 요청을 추가해야 합니다.
+"""
+import pytest
+
+from app.core.query_counter import ENDPOINT_QUERY_BUDGETS
+
+
+def _requests(user, today):
+    """라우트 템플릿 → (메서드, URL, 추가 인자, 기대 상태 코드)"""
+    return {
+        "/diaries/calendar/monthly": ("GET", f"/api/diaries/calendar/monthly?year={today.year}&month={today.month}", {}, 200),
+        "/diaries/history": ("GET", f"/api/diaries/history?date={user.capsule_date.isoformat()}", {}, 200),
+        "/diaries/search": ("GET", "/api/diaries/search?q=Track", {}, 200),
+        "/diaries/nearby": ("GET", "/api/diaries/nearby?lat=37.5665&lon=126.978", {}, 200),
+        "/diaries/export": ("GET", "/api/diaries/export?format=jsonl", {}, 200),
+        "/stats/me": ("GET", "/api/stats/me?range=30d", {}, 200),
+        "/stats/me/year/{year}": ("GET", f"/api/stats/me/year/{today.year}", {}, 404),
+        "/capsules/me": ("GET", f"/api/capsules/me?date={user.capsule_date.isoformat()}", {}, 200),
+        "/capsules/period": ("GET", f"/api/capsules/period?period=month&date={today.isoformat()}", {}, 404),
+        "/diaries/{diary_id}/memo": ("PATCH", f"/api/diaries/{user.diary_id}/memo", {"json": {"memo": "예산 테스트"}}, 200),
+        "/diaries/me/status": ("GET", "/api/diaries/me/status", {}, 200),
+        "/auth/google": ("POST", "/api/auth/google", {"json": {"access_token": "budget-test-google-token"}}, 200),
+    }
+
+
+@pytest.mark.parametrize("route", sorted(ENDPOINT_QUERY_BUDGETS))
+def test_endpoint_stays_within_query_budget(route, client, seeded_user, local_today, query_budget):
+    cases = _requests(seeded_user, local_today)
+    assert route in cases, f"{route}에 대한 예산 테스트 요청이 없습니다."
+    method, url, kwargs, expected_status = cases[route]
+
+    response = client.request(method, url, headers=seeded_user.headers, **kwargs)
+
+    assert response.status_code == expected_status, response.text
+    label = f"{method} {route}"
+    # 라우트 템플릿이 예산 키와 다르면 미들웨어가 기본 예산을 적용하므로 여기서 드러남
+    assert label in query_budget, f"recorded: {sorted(query_budget)}"
+    assert query_budget[label] <= ENDPOINT_QUERY_BUDGETS[route]
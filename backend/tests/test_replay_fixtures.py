@@ -0,0 +1,26 @@
+"""녹화된 외부 API 픽스처(benchmarks/fixtures/*.json) — 429/401/204/느린 업스트림에서 클라이언트가 expect대로 동작하는지"""
+import asyncio
+
+import pytest
+
+from benchmarks.replay import FIXTURES_DIR, ReplayUpstreams, run_checks
+
+FIXTURES = sorted(path.stem for path in FIXTURES_DIR.glob("*.json"))
+# 타임아웃 판정은 녹화된 지연 기준이므로 재생 속도와 무관 — CI 시간만 줄임
+REPLAY_SPEED = 100.0
+
+
+@pytest.mark.parametrize("fixture", FIXTURES)
+def test_fixture_expectations(fixture):
+    upstreams = ReplayUpstreams.load(fixture, speed=REPLAY_SPEED)
+    expect = upstreams.cassette.expect
+    assert expect, f"{fixture}.json에 expect가 없습니다."
+
+    upstreams.install()
+    try:
+        results = asyncio.run(run_checks(upstreams))
+    finally:
+        upstreams.uninstall()
+
+    assert {probe: results.get(probe) for probe in expect} == expect
+    assert upstreams.unmatched == []
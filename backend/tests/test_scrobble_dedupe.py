@@ -0,0 +1,94 @@
+"""자동 스크로블 중복 방지 — 워커 간 임대(한 워커만 실행)와 recently-played 항목의 played_at 키"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select
+
+from app.application.diary_service import AUTO_SCROBBLE_MEMO, DiaryService
+from app.application.listening_session import ListeningSessionTracker
+from app.infrastructure.db.database import AsyncSessionLocal, engine
+from app.infrastructure.db.models import AuditoryDiaryORM
+from app.infrastructure.db.user_models import UserORM
+from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
+from app.infrastructure.repositories.lease_repository import WorkerLeaseRepository
+
+
+class RecentlyPlayedOnly:
+    """재생 중인 곡은 없고 최근 재생 목록에 같은 항목만 계속 보이는 Spotify (유휴 유저)"""
+    def __init__(self, item: dict):
+        self.item = item
+
+    async def get_currently_playing(self, access_token):
+        return None
+
+    async def get_recently_played(self, access_token, limit=1):
+        return [self.item]
+
+
+def _recent_item(played_at: datetime) -> dict:
+    return {
+        "played_at": played_at.isoformat().replace("+00:00", "Z"),
+        "track": {
+            "id": "dedupe-track", "name": "Idle Song", "duration_ms": 180_000,
+            "artists": [{"name": "Idle Artist"}], "album": {"images": [{"url": "https://img.test/idle.jpg"}]},
+        },
+    }
+
+
+async def _observe_idle_user(played_at):
+    # 공용 시드 유저의 기록 수를 바꾸지 않도록 새 유저로
+    user_id = uuid.uuid4()
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(UserORM), [{
+            "id": user_id, "email": f"{user_id.hex}@dedupe.test", "name": "dedupe", "google_id": user_id.hex,
+        }])
+        await session.commit()
+        service = DiaryService(
+            AuditoryDiaryRepository(session), RecentlyPlayedOnly(_recent_item(played_at)), None, None,
+            sessions=ListeningSessionTracker(),
+        )
+        first = await service.create_diary_from_current_context(user_id, "token", memo=AUTO_SCROBBLE_MEMO)
+        # 세션이 만료되거나 LRU로 밀려난 뒤(또는 다른 워커의 트래커)에 같은 항목을 다시 관찰
+        service.sessions = ListeningSessionTracker()
+        second = await service.create_diary_from_current_context(user_id, "token", memo=AUTO_SCROBBLE_MEMO)
+        stored = (await session.execute(
+            select(func.count()).select_from(AuditoryDiaryORM).where(
+                AuditoryDiaryORM.user_id == user_id, AuditoryDiaryORM.listened_at == played_at
+            )
+        )).scalar_one()
+    await engine.dispose()
+    return first, second, stored
+
+
+def test_recently_played_item_is_recorded_once_after_session_is_gone(seeded_user):
+    played_at = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(days=400)
+
+    first, second, stored = asyncio.run(_observe_idle_user(played_at))
+
+    assert stored == 1
+    assert second.id == first.id
+    assert first.listened_at.replace(tzinfo=timezone.utc) == played_at
+
+
+async def _contend_for_lease():
+    async def attempt(holder, lease_seconds):
+        async with AsyncSessionLocal() as session:
+            return await WorkerLeaseRepository(session).try_acquire("test_lease", holder, lease_seconds)
+
+    results = [
+        await attempt("worker-a", 60),
+        await attempt("worker-b", 60),   # 유효한 임대가 있으면 거절
+        await attempt("worker-a", 0),    # 보유자는 갱신 (즉시 만료되도록)
+        await attempt("worker-b", 60),   # 만료된 임대는 이어받음
+        await attempt("worker-a", 60),
+    ]
+    async with AsyncSessionLocal() as session:
+        await WorkerLeaseRepository(session).release("test_lease", "worker-b")
+    results.append(await attempt("worker-a", 60))  # 반납 후 바로 획득
+    await engine.dispose()
+    return results
+
+
+def test_worker_lease_is_held_by_one_worker_at_a_time(seeded_user):
+    assert asyncio.run(_contend_for_lease()) == [True, False, True, True, False, True]
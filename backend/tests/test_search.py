@@ -0,0 +1,33 @@
+"""다이어리 검색 — 후보 상한을 넘으면 truncated로 알리고, 페이지는 상한 안에서만 넘어감"""
+from app.core.config import settings
+
+
+def _collect(client, headers, query):
+    items, cursor, pages = [], None, []
+    while True:
+        params = {"q": query, "limit": 50} | ({"cursor": cursor} if cursor else {})
+        page = client.get("/api/diaries/search", params=params, headers=headers).json()
+        pages.append(page)
+        items += page["items"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return items, pages
+
+
+def test_search_pages_through_every_match_under_the_cap(client, seeded_user, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_CANDIDATE_LIMIT", 10_000)
+
+    items, pages = _collect(client, seeded_user.headers, "Track")
+
+    # 시드 유저 한 명당 기록 수 (모든 곡 제목이 'Track N')
+    assert len(items) == len({item["id"] for item in items}) == 200
+    assert not any(page["truncated"] for page in pages)
+
+
+def test_search_reports_truncation_when_matches_exceed_the_cap(client, seeded_user, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_CANDIDATE_LIMIT", 120)
+
+    items, pages = _collect(client, seeded_user.headers, "Track")
+
+    assert len(items) == 120
+    assert all(page["truncated"] for page in pages)
@@ -0,0 +1,90 @@
+"""청취 통계 롤업(listening_hourly, listening_hourly_weather) — 쓰기 경로마다 더해진 값이 다이어리에서 다시 계산한 값과 같아야 함"""
+import asyncio
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select
+
+from app.domain.models import AuditoryDiary, Context, Track
+from app.infrastructure.db.database import AsyncSessionLocal, engine
+from app.infrastructure.db.models import (
+    AuditoryDiaryORM,
+    ContextORM,
+    ListeningHourlyORM,
+    ListeningWeatherHourlyORM,
+)
+from app.infrastructure.db.user_models import UserORM
+from app.infrastructure.repositories.diary_repository import AuditoryDiaryRepository
+from app.infrastructure.repositories.stats_repository import StatsRepository
+
+
+async def _rollup(session, user_id):
+    hourly = (await session.execute(
+        select(ListeningHourlyORM.hour_start, ListeningHourlyORM.plays).where(ListeningHourlyORM.user_id == user_id)
+    )).all()
+    weather = (await session.execute(
+        select(ListeningWeatherHourlyORM.hour_start, ListeningWeatherHourlyORM.weather, ListeningWeatherHourlyORM.plays)
+        .where(ListeningWeatherHourlyORM.user_id == user_id)
+    )).all()
+    return dict(hourly), {(hour_start, weather): plays for hour_start, weather, plays in weather}
+
+
+async def _write_and_compare():
+    user_id = uuid.uuid4()
+    base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(days=2)
+    track = Track(title="Rollup Song", artist="Rollup Artist", external_platform_id=f"rollup-{user_id.hex}")
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(UserORM), [{
+            "id": user_id, "email": f"{user_id.hex}@rollup.test", "name": "rollup", "google_id": user_id.hex,
+        }])
+        await session.commit()
+
+        repo = AuditoryDiaryRepository(session)
+        # ORM 저장 두 경로 — 같은 시간 버킷/날씨는 UPSERT로 누적
+        for minutes, weather in ((5, "Rain"), (10, "Rain"), (15, None), (70, "Clear")):
+            await repo.save(AuditoryDiary(
+                user_id=user_id, track=track, context=Context(weather=weather),
+                listened_at=base + timedelta(minutes=minutes),
+            ))
+        await repo.get_or_create_by_listened_at(AuditoryDiary(
+            user_id=user_id, track=track, context=Context(weather="Rain"), listened_at=base + timedelta(minutes=20),
+        ))
+        # 대량 가져오기 경로 (날씨 없음)
+        await repo.bulk_insert_listens(user_id, [(base + timedelta(minutes=m), track) for m in (25, 30, 130)])
+        await session.commit()
+
+        incremental = await _rollup(session, user_id)
+        await StatsRepository(session).rebuild_listening_rollup([user_id])
+        rebuilt = await _rollup(session, user_id)
+
+        weather = Counter(dict((await session.execute(
+            select(ContextORM.weather, func.count())
+            .join(AuditoryDiaryORM, AuditoryDiaryORM.context_id == ContextORM.id)
+            .where(AuditoryDiaryORM.user_id == user_id)
+            .group_by(ContextORM.weather)
+        )).all()))
+        aggregates = await StatsRepository(session).get_listening_aggregates(user_id, None, None)
+    await engine.dispose()
+    return incremental, rebuilt, weather, aggregates
+
+
+def test_rollup_matches_recomputation_for_every_write_path(seeded_user):
+    incremental, rebuilt, weather, aggregates = asyncio.run(_write_and_compare())
+
+    assert incremental == rebuilt
+    hourly, by_weather = incremental
+    assert sum(hourly.values()) == sum(by_weather.values()) == 8
+    assert len(hourly) == 3  # base, base+1h, base+2h
+    # 날씨 없음(NULL, 가져오기의 '')은 롤업에서 ''로 합쳐짐
+    assert weather == Counter({None: 1, "": 3, "Rain": 3, "Clear": 1})
+    assert aggregates.weather_counts == Counter({"": 4, "Rain": 3, "Clear": 1})
+    assert sum(aggregates.hour_counts.values()) == sum(aggregates.track_counts.values()) == 8
+
+
+def test_stats_weather_and_heatmap_agree_with_total(client, seeded_user):
+    body = client.get("/api/stats/me", params={"range": "all"}, headers=seeded_user.headers).json()
+
+    assert body["total_plays"] == 200
+    assert sum(row["plays"] for row in body["weather"]) == 200
+    assert sum(map(sum, body["hourly_heatmap"])) == 200
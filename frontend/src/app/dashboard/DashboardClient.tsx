@@ -39,6 +39,13 @@ interface CalendarSummary {
     representative_thumbnail: string | null;
 }
 
+// ---------- 이미지 프록시 썸네일 ----------
+// 캘린더 칩처럼 작은 UI는 640px 원본 대신 백엔드에서 리사이즈된 썸네일을 사용 (대역폭 절감)
+const getThumbnailUrl = (url: string, width: 64 | 160 | 300 | 640) => {
+    const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://127.0.0.1:8000/api";
+    return `${API_URL}/capsules/image-proxy?url=${encodeURIComponent(url)}&w=${width}`;
+};
+
 // ---------- 게스트용 Mock 데이터 ----------
 const MOCK_DIARIES: DiaryEntry[] = [
     {
@@ -262,6 +269,53 @@ export default function Dashboard() {
         }
     }, [isLoggedIn, fetchMonthlySummary]);
 
+    // 실시간 재생 알림 (SSE) — 오늘 타임라인을 보는 동안 새 기록을 바로 맨 위에 추가 (recently-played 반복 호출 대신)
+    // EventSource는 Authorization 헤더를 보낼 수 없어 fetch 스트림으로 읽음
+    useEffect(() => {
+        const token = localStorage.getItem("access_token");
+        if (!isLoggedIn || !token || selectedDate !== getKstDateString()) return;
+
+        const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://127.0.0.1:8000/api";
+        const controller = new AbortController();
+        let retryTimer: ReturnType<typeof setTimeout> | undefined;
+
+        const connect = async () => {
+            try {
+                const res = await fetch(`${API_URL}/diaries/me/now-playing/stream`, {
+                    headers: { "Authorization": `Bearer ${token}` },
+                    signal: controller.signal,
+                });
+                if (!res.ok || !res.body) return; // 인증 실패 등은 재연결하지 않음
+                const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+                let buffer = "";
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += value;
+                    const frames = buffer.split("\n\n");
+                    buffer = frames.pop() ?? "";
+                    for (const frame of frames) {
+                        const lines = frame.split("\n");
+                        if (!lines.includes("event: diary")) continue; // ': ping' 하트비트 등
+                        const data = lines.filter(line => line.startsWith("data: ")).map(line => line.slice(6)).join("\n");
+                        const diary: DiaryEntry = JSON.parse(data);
+                        setDiaries(prev => prev.some(d => d.id === diary.id) ? prev : [diary, ...prev]);
+                    }
+                }
+            } catch (err) {
+                if (controller.signal.aborted) return;
+                console.error("실시간 알림 연결 끊김:", err);
+            }
+            // 서버 재배포/네트워크 끊김 시 재연결
+            if (!controller.signal.aborted) retryTimer = setTimeout(connect, 3000);
+        };
+        connect();
+        return () => {
+            controller.abort();
+            clearTimeout(retryTimer);
+        };
+    }, [isLoggedIn, selectedDate]);
+
     // Spotify 연동 후 자동 새로고침 (window.location.search 사용 — useSearchParams SSR 이슈 회피)
     useEffect(() => {
         if (typeof window !== "undefined" && window.location.search.includes("spotify=connected")) {
@@ -457,7 +511,7 @@ export default function Dashboard() {
                                             {hasRecord && summary.representative_thumbnail && (
                                                 <div
                                                     className="absolute inset-0 z-0 opacity-20 bg-cover bg-center mix-blend-screen scale-110"
-                                                    style={{ backgroundImage: `url(${summary.representative_thumbnail})`, filter: 'blur(3px)' }}
+                                                    style={{ backgroundImage: `url(${getThumbnailUrl(summary.representative_thumbnail, 160)})`, filter: 'blur(3px)' }}
                                                 />
                                             )}
 